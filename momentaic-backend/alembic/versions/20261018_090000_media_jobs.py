@@ -0,0 +1,53 @@
+"""Add media_jobs table (durable Kling/Imagen/TTS job tracking)
+
+Revision ID: 20261018_090000_media_jobs
+Revises: 345fe0813ef7
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+# revision identifiers, used by Alembic.
+revision = '20261018_090000_media_jobs'
+down_revision = '345fe0813ef7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_jobs',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=True),
+        sa.Column('character_content_id', UUID(as_uuid=True), sa.ForeignKey('character_content.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('provider', sa.Enum('KLING', 'IMAGEN', 'TTS', name='mediajobprovider'), nullable=False),
+        sa.Column('job_type', sa.String(50), nullable=False),
+        sa.Column('external_task_id', sa.String(200), nullable=True),
+        sa.Column('request_payload', JSONB, nullable=False, server_default='{}'),
+        sa.Column('status', sa.Enum('PENDING', 'PROCESSING', 'COMPLETED', 'FAILED', 'TIMED_OUT', name='mediajobstatus'), nullable=False),
+        sa.Column('poll_attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('next_poll_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('deadline_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('result_url', sa.Text, nullable=True),
+        sa.Column('result_payload', JSONB, nullable=True),
+        sa.Column('error', sa.Text, nullable=True),
+        sa.Column('callback', sa.String(100), nullable=True),
+        sa.Column('callback_context', JSONB, nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_media_jobs_status_next_poll', 'media_jobs', ['status', 'next_poll_at'])
+    op.create_index('ix_media_jobs_provider_task', 'media_jobs', ['provider', 'external_task_id'], unique=True)
+    op.create_index('ix_media_jobs_startup', 'media_jobs', ['startup_id'])
+    op.create_index('ix_media_jobs_content', 'media_jobs', ['character_content_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_media_jobs_content', table_name='media_jobs')
+    op.drop_index('ix_media_jobs_startup', table_name='media_jobs')
+    op.drop_index('ix_media_jobs_provider_task', table_name='media_jobs')
+    op.drop_index('ix_media_jobs_status_next_poll', table_name='media_jobs')
+    op.drop_table('media_jobs')
+    op.execute("DROP TYPE IF EXISTS mediajobstatus, mediajobprovider CASCADE;")
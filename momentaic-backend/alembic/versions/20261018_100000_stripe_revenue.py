@@ -0,0 +1,92 @@
+"""Add materialized Stripe revenue tables (event cursor, subscriptions, customers, monthly buckets)
+
+Revision ID: 20261018_100000_stripe_revenue
+Revises: 20261018_090000_media_jobs
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '20261018_100000_stripe_revenue'
+down_revision = '20261018_090000_media_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stripe_revenue_state',
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('integration_id', UUID(as_uuid=True), sa.ForeignKey('integrations.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('event_cursor', sa.String(255), nullable=True),
+        sa.Column('last_event_at', sa.DateTime, nullable=True),
+        sa.Column('mrr_cents', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('active_subscriptions', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('trialing_subscriptions', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('customers_total', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('last_rebuilt_at', sa.DateTime, nullable=True),
+        sa.Column('updated_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+
+    op.create_table(
+        'stripe_subscriptions',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('subscription_id', sa.String(255), nullable=False),
+        sa.Column('customer_id', sa.String(255), nullable=True),
+        sa.Column('status', sa.String(50), nullable=False),
+        sa.Column('mrr_cents', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('canceled_at', sa.DateTime, nullable=True),
+        sa.Column('last_event_created', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_stripe_subscriptions_startup_sub', 'stripe_subscriptions', ['startup_id', 'subscription_id'], unique=True)
+    op.create_index('ix_stripe_subscriptions_startup_canceled', 'stripe_subscriptions', ['startup_id', 'canceled_at'])
+
+    op.create_table(
+        'stripe_customers',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('customer_id', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime, nullable=True),
+        sa.Column('deleted', sa.Boolean, nullable=False, server_default=sa.false()),
+    )
+    op.create_index('ix_stripe_customers_startup_customer', 'stripe_customers', ['startup_id', 'customer_id'], unique=True)
+    op.create_index('ix_stripe_customers_startup_created', 'stripe_customers', ['startup_id', 'created_at'])
+
+    op.create_table(
+        'revenue_monthly_buckets',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('month', sa.String(7), nullable=False),
+        sa.Column('gross_cents', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('refunded_cents', sa.BigInteger, nullable=False, server_default='0'),
+        sa.Column('charge_count', sa.Integer, nullable=False, server_default='0'),
+    )
+    op.create_index('ix_revenue_buckets_startup_month', 'revenue_monthly_buckets', ['startup_id', 'month'], unique=True)
+
+    op.create_table(
+        'stripe_event_log',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('event_id', sa.String(255), nullable=False),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('received_at', sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_stripe_event_log_startup_event', 'stripe_event_log', ['startup_id', 'event_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stripe_event_log_startup_event', table_name='stripe_event_log')
+    op.drop_table('stripe_event_log')
+    op.drop_index('ix_revenue_buckets_startup_month', table_name='revenue_monthly_buckets')
+    op.drop_table('revenue_monthly_buckets')
+    op.drop_index('ix_stripe_customers_startup_created', table_name='stripe_customers')
+    op.drop_index('ix_stripe_customers_startup_customer', table_name='stripe_customers')
+    op.drop_table('stripe_customers')
+    op.drop_index('ix_stripe_subscriptions_startup_canceled', table_name='stripe_subscriptions')
+    op.drop_index('ix_stripe_subscriptions_startup_sub', table_name='stripe_subscriptions')
+    op.drop_table('stripe_subscriptions')
+    op.drop_table('stripe_revenue_state')
@@ -0,0 +1,23 @@
+"""Add indexes backing the dashboard read model (recent leads / recent content per startup)
+
+Revision ID: 20261018_110000_dashboard_indexes
+Revises: 20261018_100000_stripe_revenue
+Create Date: 2026-10-18 11:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_110000_dashboard_indexes'
+down_revision = '20261018_100000_stripe_revenue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_leads_startup_created', 'leads', ['startup_id', 'created_at'])
+    op.create_index('ix_content_startup_updated', 'content_items', ['startup_id', 'updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_content_startup_updated', table_name='content_items')
+    op.drop_index('ix_leads_startup_created', table_name='leads')
@@ -0,0 +1,47 @@
+"""Add startup_goals table (durable GoalTracker goals, indexed for the overdue sweep)
+
+Revision ID: 20261018_120000_startup_goals
+Revises: 20261018_110000_dashboard_indexes
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+# revision identifiers, used by Alembic.
+revision = '20261018_120000_startup_goals'
+down_revision = '20261018_110000_dashboard_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'startup_goals',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text, nullable=False, server_default=''),
+        sa.Column('target_metric', sa.String(100), nullable=False),
+        sa.Column('target_value', sa.Float, nullable=False),
+        sa.Column('current_value', sa.Float, nullable=False, server_default='0'),
+        sa.Column('priority', sa.Enum('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', name='goalpriority'), nullable=False),
+        sa.Column('phase', sa.String(50), nullable=False, server_default='idea'),
+        sa.Column('assigned_agent_chain', JSONB, nullable=False, server_default='[]'),
+        sa.Column('notes', JSONB, nullable=False, server_default='[]'),
+        sa.Column('status', sa.Enum('PENDING', 'IN_PROGRESS', 'COMPLETED', 'BLOCKED', 'CANCELLED', name='goalstatus'), nullable=False),
+        sa.Column('deadline', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_nagged_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_startup_goals_status_deadline', 'startup_goals', ['status', 'deadline'])
+    op.create_index('ix_startup_goals_startup', 'startup_goals', ['startup_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_startup_goals_startup', table_name='startup_goals')
+    op.drop_index('ix_startup_goals_status_deadline', table_name='startup_goals')
+    op.drop_table('startup_goals')
+    op.execute("DROP TYPE IF EXISTS goalstatus, goalpriority CASCADE;")
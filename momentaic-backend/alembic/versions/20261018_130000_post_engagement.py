@@ -0,0 +1,57 @@
+"""Add post_engagement fact table and backfill it from published social posts
+
+Revision ID: 20261018_130000_post_engagement
+Revises: 20261018_120000_startup_goals
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision = '20261018_130000_post_engagement'
+down_revision = '20261018_120000_startup_goals'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'post_engagement',
+        sa.Column('post_id', UUID(as_uuid=True), sa.ForeignKey('social_posts.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('platform', sa.String(50), primary_key=True),
+        sa.Column('startup_id', UUID(as_uuid=True), sa.ForeignKey('startups.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('published_at', sa.DateTime, nullable=False),
+        sa.Column('likes', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('shares', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('comments', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('engagement', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('metrics_updated_at', sa.DateTime, nullable=True),
+    )
+    op.create_index('ix_post_engagement_startup_published', 'post_engagement', ['startup_id', 'published_at'])
+
+    # One fact per (published post, platform); metrics come from the legacy
+    # platform_ids JSON when a platform entry holds likes/retweets/comments.
+    op.execute("""
+        INSERT INTO post_engagement (post_id, platform, startup_id, published_at, likes, shares, comments, engagement)
+        SELECT post_id, platform, startup_id, published_at, likes, shares, comments, likes + shares + comments
+        FROM (
+            SELECT
+                p.id AS post_id,
+                pl.platform,
+                p.startup_id,
+                p.published_at,
+                COALESCE((p.platform_ids -> pl.platform ->> 'likes')::numeric, 0)::int AS likes,
+                COALESCE((p.platform_ids -> pl.platform ->> 'retweets')::numeric, 0)::int AS shares,
+                COALESCE((p.platform_ids -> pl.platform ->> 'comments')::numeric, 0)::int AS comments
+            FROM social_posts p
+            CROSS JOIN LATERAL jsonb_array_elements_text(p.platforms) AS pl(platform)
+            WHERE p.status = 'PUBLISHED' AND p.published_at IS NOT NULL
+        ) facts
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_engagement_startup_published', table_name='post_engagement')
+    op.drop_table('post_engagement')
@@ -0,0 +1,21 @@
+"""Index stripe_customers by customer id so webhooks can find the owning startup
+
+Revision ID: 20261018_140000_stripe_customer_lookup
+Revises: 20261018_130000_post_engagement
+Create Date: 2026-10-18 14:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261018_140000_stripe_customer_lookup'
+down_revision = '20261018_130000_post_engagement'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stripe_customers_customer', 'stripe_customers', ['customer_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stripe_customers_customer', table_name='stripe_customers')
@@ -5,13 +5,23 @@ AI-powered business intelligence and analytics
 
 from typing import Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
+import numpy as np
 import structlog
 
 from app.agents.base import get_llm, get_agent_config
 from app.models.conversation import AgentType
+from app.services.stats_engine import (
+    bootstrap_lift_ci,
+    find_anomalies,
+    sequential_test,
+    two_proportion_ztest,
+)
 
 logger = structlog.get_logger()
 
+ANOMALY_WINDOW = 30      # trailing points used as the baseline on long series
+AB_TEST_ALPHA = 0.05
+
 
 class DataAnalystAgent:
     """
@@ -72,7 +82,11 @@ As Data Analyst, provide:
         test_data: Dict[str, Any],
     ) -> Dict[str, Any]:
         """Analyze A/B test results"""
-        stats = self._calculate_significance(test_data)
+        try:
+            stats = self._calculate_significance(test_data)
+        except ValueError as e:
+            logger.warning("A/B analysis rejected invalid counts", error=str(e))
+            return {"analysis": f"Invalid A/B test data: {e}", "agent": "data_analyst", "error": True}
         
         if not self.llm:
             return {"analysis": "AI Service Unavailable", "stats": stats, "agent": "data_analyst", "error": True}
@@ -93,8 +107,9 @@ Variant:
 - Rate: {stats['variant_rate']:.2%}
 
 Calculated:
-- Lift: {stats['lift']:.1%}
-- Significant: {stats['significant']}
+- Lift: {stats['lift']:.1%} (95% CI {stats['lift_ci_low']:.1%} to {stats['lift_ci_high']:.1%})
+- Two-proportion z-test: z = {stats['z_score']:.2f}, p = {stats['p_value']:.4f}
+- Significant at {AB_TEST_ALPHA:.0%}: {stats['significant']}
 
 Provide:
 1. Winner determination
@@ -232,47 +247,61 @@ Explain findings in business terms, not just technical terms."""
 - MRR: ${metrics.get('mrr', 0):,}
 - DAU: {metrics.get('dau', 0):,}"""
     
+    @staticmethod
+    def _validate_counts(counts: Dict[str, Any], where: str, require_visitors: bool) -> None:
+        """Raise ValueError unless both arms have whole, non-negative counts with conversions <= visitors."""
+        for arm in ("control", "variant"):
+            visitors, conversions = counts.get(f"{arm}_visitors", 0), counts.get(f"{arm}_conversions", 0)
+            for field, value in ((f"{arm}_visitors", visitors), (f"{arm}_conversions", conversions)):
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 or value != int(value):
+                    raise ValueError(f"{where}{field} must be a non-negative whole number, got {value!r}")
+            if require_visitors and visitors == 0:
+                raise ValueError(f"{where}{arm}_visitors must be positive")
+            if conversions > visitors:
+                raise ValueError(f"{where}{arm}_conversions ({conversions}) exceeds {arm}_visitors ({visitors})")
+
     def _calculate_significance(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate A/B test statistics"""
-        c_visitors = max(data.get('control_visitors', 1), 1)
-        c_conv = data.get('control_conversions', 0)
-        v_visitors = max(data.get('variant_visitors', 1), 1)
-        v_conv = data.get('variant_conversions', 0)
+        """
+        Calculate A/B test statistics: two-proportion z-test, bootstrap interval
+        for lift and, when per-day counts are given under "daily", a sequential
+        test that stays valid although the test was checked every day.
+        Raises ValueError for counts that are not a valid test (e.g. more
+        conversions than visitors).
+        """
+        self._validate_counts(data, "", require_visitors=True)
+        daily = data.get('daily') or []
+        for i, day in enumerate(daily):
+            self._validate_counts(day, f"daily[{i}].", require_visitors=False)
+
+        c_visitors = int(data['control_visitors'])
+        c_conv = int(data.get('control_conversions', 0))
+        v_visitors = int(data['variant_visitors'])
+        v_conv = int(data.get('variant_conversions', 0))
         
-        c_rate = c_conv / c_visitors
-        v_rate = v_conv / v_visitors
-        lift = (v_rate - c_rate) / c_rate if c_rate > 0 else 0
+        stats = two_proportion_ztest(c_conv, c_visitors, v_conv, v_visitors, alpha=AB_TEST_ALPHA)
+        lift_ci = bootstrap_lift_ci(c_conv, c_visitors, v_conv, v_visitors, seed=0)
+        stats.update(lift_ci_low=lift_ci["ci_low"], lift_ci_high=lift_ci["ci_high"])
         
-        # Simplified significance (in production use scipy)
-        significant = (c_visitors > 100 and v_visitors > 100 and abs(lift) > 0.05)
+        if daily:
+            keys = ("control_conversions", "control_visitors", "variant_conversions", "variant_visitors")
+            cumulative = np.cumsum([[day.get(key, 0) for key in keys] for day in daily], axis=0)
+            sequential = sequential_test(*cumulative.T, alpha=AB_TEST_ALPHA)
+            stats["sequential"] = {
+                "p_value": sequential["p_value"],
+                "significant": sequential["significant"],
+                "stopped_at_day": sequential["stopped_at"] + 1 if sequential["significant"] else None,
+                "days": sequential["looks"],
+            }
         
-        return {
-            "control_rate": c_rate,
-            "variant_rate": v_rate,
-            "lift": lift,
-            "significant": significant,
-        }
+        return stats
     
     def _find_anomalies(self, values: List[float]) -> List[Dict[str, Any]]:
-        """Find anomalies using simple z-score"""
+        """Find anomalies using robust (median / MAD) z-scores, rolling on long series"""
         if len(values) < 3:
             return []
         
-        mean = sum(values) / len(values)
-        std = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5
-        
-        anomalies = []
-        for i, v in enumerate(values):
-            if std > 0:
-                z = abs((v - mean) / std)
-                if z > 2:  # 2 standard deviations
-                    anomalies.append({
-                        "index": i,
-                        "value": v,
-                        "z_score": round(z, 2),
-                    })
-        
-        return anomalies
+        window = ANOMALY_WINDOW if len(values) >= 2 * ANOMALY_WINDOW else None
+        return find_anomalies(values, window=window)
 
     async def proactive_scan(self, startup_context: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
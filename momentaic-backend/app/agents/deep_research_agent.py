@@ -7,12 +7,16 @@ from typing import Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
 import structlog
-import asyncio
 
-from app.agents.base import BaseAgent, web_search, read_url_content
+from app.agents.base import BaseAgent, get_llm, web_search
+from app.core.token_budget import FALLBACK_CHAIN_CONTEXT_TOKENS, count_tokens, fit_to_budget
+from app.services.source_fetcher import source_fetcher
 
 logger = structlog.get_logger()
 
+READ_DEADLINE_SECONDS = 45.0       # overall budget for reading all sources
+SYNTHESIS_OUTPUT_TOKENS = 8192     # context kept free for the report itself
+
 class UrlListResponse(BaseModel):
     urls: List[str] = Field(description="A list of promising URLs to read for a deep technical/market report")
 
@@ -22,6 +26,17 @@ class DeepResearchAgent(BaseAgent):
     """
     # Uses BaseAgent inheritance
 
+    @property
+    def llm(self):
+        # Large-context model for synthesis; the prompt is still budgeted for
+        # the smallest fallback model (see _synthesis_budget)
+        return get_llm("gemini-flash", temperature=0.4)
+
+    @staticmethod
+    def _synthesis_budget(prompt_without_sources: str) -> int:
+        """Tokens left for source material once the prompt and the answer are accounted for."""
+        return FALLBACK_CHAIN_CONTEXT_TOKENS - SYNTHESIS_OUTPUT_TOKENS - count_tokens(prompt_without_sources)
+
     async def research_topic(
         self,
         topic: str,
@@ -66,28 +81,17 @@ class DeepResearchAgent(BaseAgent):
 
             logger.info("DeepResearch: Selected URLs", count=len(urls), urls=urls)
 
-            # Phase 2: Read (Parallel)
+            # Phase 2: Read (Parallel, per-host polite, cached, bounded by a deadline)
             logger.info("DeepResearch: Phase 2 - Reading")
-            knowledge_base = []
-            
-            # Limit parallelism to avoid browser overload
-            for i, url in enumerate(urls[:depth]):
-                try:
-                    content = await read_url_content.ainvoke(url)
-                    if "Failed to read" not in content:
-                        knowledge_base.append(content)
-                except Exception as e:
-                    logger.error(f"Failed to read {url}", error=str(e))
-                await asyncio.sleep(1) # Polite delay
+            sources = await source_fetcher.fetch_many(urls[:depth], deadline=READ_DEADLINE_SECONDS)
+            knowledge_base = [source.format() for source in sources]
             
             if not knowledge_base:
                 return {"error": "Could not read any sources", "report": "Research failed - no sources accessible."}
 
             # Phase 3: Synthesize
             logger.info("DeepResearch: Phase 3 - Synthesizing", sources=len(knowledge_base))
-            full_context = "\n\n".join(knowledge_base)
-            
-            report_prompt = f"""
+            report_template = """
             You are a Senior Market Research Analyst.
             
             Topic: {topic}
@@ -108,10 +112,14 @@ class DeepResearchAgent(BaseAgent):
             Source Materials:
             {full_context}
             """
+            system_prompt = "You produce high-quality, dense, and factual research reports."
+            budget = self._synthesis_budget(system_prompt + report_template.format(topic=topic, full_context=""))
+            full_context = "\n\n".join(fit_to_budget(knowledge_base, budget))
+            report_prompt = report_template.format(topic=topic, full_context=full_context)
             
             try:
                 report_response = await self.llm.ainvoke([
-                    SystemMessage(content="You produce high-quality, dense, and factual research reports."),
+                    SystemMessage(content=system_prompt),
                     HumanMessage(content=report_prompt)
                 ])
                 report_content = report_response.content
@@ -124,6 +132,8 @@ class DeepResearchAgent(BaseAgent):
                 "topic": topic,
                 "report": report_content,
                 "sources_read": len(knowledge_base),
+                "sources": [source.url for source in sources],
+                "cached_sources": sum(source.cached for source in sources),
                 "agent": "deep_research"
             }
 
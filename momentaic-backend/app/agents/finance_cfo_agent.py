@@ -3,6 +3,7 @@ Finance CFO Agent
 LangGraph-based financial advisor and fundraising expert
 """
 
+import asyncio
 from typing import Dict, Any, List, Optional
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 import structlog
@@ -18,6 +19,7 @@ from app.agents.base import (
 from app.models.conversation import AgentType
 from app.services.deliverable_service import deliverable_service
 from app.services.live_data_service import live_data_service
+from app.services.projection_engine import project_metrics
 
 logger = structlog.get_logger()
 
@@ -191,13 +193,18 @@ Provide:
         if not self.llm:
             return {"narrative": "AI Service Unavailable", "projections": [], "agent": AgentType.FINANCE_CFO.value, "error": True}
         
-        prompt = f"""Create {months}-month financial projection ({scenario} case):
+        try:
+            simulation = await asyncio.to_thread(project_metrics, current_metrics, months, scenario)
+            
+            prompt = f"""Create {months}-month financial projection ({scenario} case):
 
 Starting Point:
 - MRR: ${current_metrics.get('mrr', 0):,}
 - Burn Rate: ${current_metrics.get('burn_rate', 0):,}/month
 - Growth Rate: {current_metrics.get('growth_rate', 10)}% MoM
 
+{self._simulation_summary(simulation)}
+
 Provide:
 1. Month-by-month MRR projection
 2. Break-even point (if applicable)
@@ -206,17 +213,15 @@ Provide:
 5. Sensitivity analysis
 6. Major milestones to hit"""
 
-        try:
             response = await self.llm.ainvoke([
                 SystemMessage(content=self.config["system_prompt"]),
                 HumanMessage(content=prompt),
             ])
             
-            projections = self._calculate_projections(current_metrics, months, scenario)
-            
             return {
                 "narrative": response.content,
-                "projections": projections,
+                "projections": self._calculate_projections(simulation),
+                "simulation": simulation,
                 "agent": AgentType.FINANCE_CFO.value,
             }
         except Exception as e:
@@ -345,30 +350,37 @@ Provide:
         
         return min(100, score)
     
-    def _calculate_projections(
-        self, metrics: Dict[str, Any], months: int, scenario: str
-    ) -> List[Dict[str, Any]]:
-        """Calculate month-by-month projections"""
-        mrr = metrics.get('mrr', 0)
-        growth_rates = {
-            "pessimistic": 0.05,
-            "base": 0.10,
-            "optimistic": 0.20,
-        }
-        growth = growth_rates.get(scenario, 0.10)
-        
-        projections = []
-        current_mrr = mrr
-        
-        for month in range(1, months + 1):
-            current_mrr = current_mrr * (1 + growth)
-            projections.append({
+    def _calculate_projections(self, simulation: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Month-by-month median projection with P10/P90 MRR bands from the simulation"""
+        mrr = simulation["mrr"]
+        cash = simulation.get("cash")
+        return [
+            {
                 "month": month,
-                "mrr": round(current_mrr, 2),
-                "arr": round(current_mrr * 12, 2),
-            })
-        
-        return projections
+                "mrr": mrr["p50"][i],
+                "arr": round(mrr["p50"][i] * 12, 2),
+                "mrr_p10": mrr["p10"][i],
+                "mrr_p90": mrr["p90"][i],
+                "cash": cash["p50"][i] if cash else None,
+            }
+            for i, month in enumerate(range(1, simulation["months"] + 1))
+        ]
+    
+    def _simulation_summary(self, simulation: Dict[str, Any]) -> str:
+        """Monte Carlo bands for the LLM prompt"""
+        months = simulation["months"]
+        mrr = simulation["mrr"]
+        lines = [
+            f"Monte Carlo simulation ({simulation['paths']:,} paths):",
+            f"- Month {months} MRR: P10 ${mrr['p10'][-1]:,.0f} / P50 ${mrr['p50'][-1]:,.0f} / P90 ${mrr['p90'][-1]:,.0f}",
+            f"- Chance revenue covers burn by month {months}: {simulation['prob_default_alive']:.0%}",
+        ]
+        runway = simulation.get("runway")
+        if runway:
+            fmt = lambda value: f"{value} months" if value is not None else f">{months} months"
+            lines.append(f"- Runway: P10 {fmt(runway['p10'])} / P50 {fmt(runway['p50'])} / P90 {fmt(runway['p90'])}")
+            lines.append(f"- Chance of running out of cash within {months} months: {runway['prob_out_of_cash']:.0%}")
+        return "\n".join(lines)
 
     async def proactive_scan(self, startup_context: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -317,28 +317,24 @@ class QATesterAgent(BaseAgent):
                 }))
             """)
             
-            import httpx
-            async with httpx.AsyncClient(timeout=5.0, follow_redirects=True) as client:
-                for link in links:
-                    href = link.get("href", "")
-                    if not href or href.startswith("javascript:") or href.startswith("#") or href.startswith("mailto:"):
-                        continue
-                    
-                    try:
-                        resp = await client.head(href)
-                        if resp.status_code >= 400:
-                            report.broken_links.append(BrokenLink(
-                                url=href,
-                                text=link.get("text", ""),
-                                status_code=resp.status_code,
-                            ))
-                    except Exception as link_err:
-                        report.broken_links.append(BrokenLink(
-                            url=href,
-                            text=link.get("text", ""),
-                            status_code=0,
-                            error=str(link_err)[:100],
-                        ))
+            links = [
+                link for link in links
+                if link.get("href") and not link["href"].startswith(("javascript:", "#", "mailto:"))
+            ]
+            
+            # Checked concurrently; statuses are cached across audits and pages
+            from app.services.link_checker import link_checker
+            statuses = await link_checker.check_many([link["href"] for link in links])
+            
+            for link in links:
+                status = statuses[link["href"]]
+                if status.broken:
+                    report.broken_links.append(BrokenLink(
+                        url=link["href"],
+                        text=link.get("text", ""),
+                        status_code=status.status_code,
+                        error=status.error,
+                    ))
                         
         except Exception as e:
             logger.warning("Link validation failed", error=str(e))
@@ -15,7 +15,7 @@ from app.core.database import get_db
 from app.models.heartbeat_ledger import HeartbeatLedger, HeartbeatResult
 from app.models.agent_message import AgentMessage, A2AMessageType, MessagePriority
 from app.services.message_bus import MessageBus
-from app.services.company_dna import CompanyDNAService
+from app.services.company_dna import company_dna_service
 
 router = APIRouter(prefix="/a2a", tags=["A2A Protocol"])
 
@@ -336,8 +336,7 @@ async def get_company_dna(
     db: AsyncSession = Depends(get_db),
 ):
     """Get the Company DNA document for a startup."""
-    service = CompanyDNAService()
-    dna = await service.get_dna(db, startup_id)
+    dna = await company_dna_service.get_dna(db, startup_id)
     if not dna:
         raise HTTPException(status_code=404, detail="Startup not found")
     return {"startup_id": startup_id, "dna": dna}
@@ -339,6 +339,24 @@ async def get_trending_content(
     return {"platform": platform, "trends": trends}
 
 
+@router.get("/{startup_id}/media-jobs/{job_id}")
+async def get_media_job(
+    startup_id: UUID,
+    job_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the status of a video/image/voice media job (also pushed over /ws/agents)."""
+    await verify_startup_access(startup_id, current_user, db)
+
+    from app.models.media_job import MediaJob
+    from app.services.media_jobs import media_job_service
+    job = await db.get(MediaJob, job_id)
+    if not job or job.startup_id != startup_id:
+        raise HTTPException(status_code=404, detail="Media job not found")
+    return media_job_service.to_dict(job)
+
+
 @router.post("/{startup_id}/{character_id}/score-virality")
 async def score_content_virality(
     startup_id: UUID,
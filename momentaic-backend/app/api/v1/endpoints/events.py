@@ -1,39 +1,78 @@
-
 """
 Events Endpoint
 Real-time activity stream for dashboard
 """
 
-from fastapi import APIRouter, Depends
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-import json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import asyncio
+import contextlib
+import json
 
+from app.core.database import get_db
 from app.core.security import get_current_active_user, get_superuser
+from app.models.startup import Startup
 from app.models.user import User
-from app.core.events import subscribe_events
+from app.core.events import event_hub
 
 router = APIRouter()
 
+HEARTBEAT_SECONDS = 15
+
+
 @router.get("/activity-stream")
 async def activity_stream(
+    startup_id: Optional[UUID] = Query(None, description="Only stream events for this startup"),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
     current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Stream real-time activity events (SSE).
-    
+
+    Clients see broadcast events plus events for the startups they own.
+    Reconnecting browsers send Last-Event-ID and get the missed events replayed.
+
     Returns:
         Server-Sent Events stream of application activities.
     """
-    
+    result = await db.execute(select(Startup.id).where(Startup.owner_id == current_user.id))
+    startup_ids = {str(sid) for sid in result.scalars().all()}
+    if startup_id is not None:
+        if str(startup_id) not in startup_ids:
+            raise HTTPException(status_code=404, detail="Startup not found")
+        startup_ids = {str(startup_id)}
+
+    resume_from = last_event_id_header or last_event_id
+    events = event_hub.stream(str(current_user.id), startup_ids, last_event_id=resume_from)
+
     async def event_generator():
         # Initial connection message
         yield f"data: {json.dumps({'type': 'connection', 'status': 'connected'})}\n\n"
-        
-        # Subscribe to global events channel
-        # In a real multi-tenant app, we might filter by tenant ID here
-        async for message in subscribe_events(channel="momentaic:events"):
-            yield f"data: {message}\n\n"
+        try:
+            pending = None
+            while True:
+                pending = pending or asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=HEARTBEAT_SECONDS)
+                if not done:
+                    # Keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                event, pending = pending.result(), None
+                frame = f"data: {json.dumps(event, default=str)}\n\n"
+                yield f"id: {event['id']}\n{frame}" if event.get("id") else frame
+        finally:
+            if pending is not None:
+                pending.cancel()
+                with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await pending
+            await events.aclose()
 
     return StreamingResponse(
         event_generator(),
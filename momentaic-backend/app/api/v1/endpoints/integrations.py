@@ -311,6 +311,68 @@ async def sync_integration(
         await integration_client.close()
 
 
+async def _get_stripe_integration(startup_id: UUID, integration_id: UUID, db: AsyncSession) -> Integration:
+    result = await db.execute(
+        select(Integration).where(
+            Integration.id == integration_id,
+            Integration.startup_id == startup_id,
+            Integration.provider == IntegrationProvider.STRIPE,
+        )
+    )
+    integration = result.scalar_one_or_none()
+    if not integration:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stripe integration not found"
+        )
+    return integration
+
+
+@router.get("/{integration_id}/revenue")
+async def get_revenue_metrics(
+    startup_id: UUID,
+    integration_id: UUID,
+    months: int = Query(12, ge=1, le=36),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Materialized Stripe revenue metrics and monthly timeline (no live Stripe calls)"""
+    await verify_startup_access(startup_id, current_user, db)
+    await _get_stripe_integration(startup_id, integration_id, db)
+
+    from app.services.stripe_revenue import stripe_revenue_engine
+
+    metrics = await stripe_revenue_engine.get_metrics(db, startup_id)
+    if metrics is None:
+        return {"ready": False, "message": "Revenue state not built yet; run a sync or rebuild"}
+
+    timeline = await stripe_revenue_engine.get_revenue_timeline(db, startup_id, months)
+    return {"ready": True, **metrics, **timeline}
+
+
+@router.post("/{integration_id}/revenue/rebuild")
+async def rebuild_revenue_metrics(
+    startup_id: UUID,
+    integration_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Recompute Stripe revenue state from scratch (pages every subscription, customer and charge)"""
+    await verify_startup_access(startup_id, current_user, db)
+    integration = await _get_stripe_integration(startup_id, integration_id, db)
+
+    from app.services.stripe_revenue import stripe_revenue_engine
+
+    try:
+        return await stripe_revenue_engine.rebuild(db, integration)
+    except Exception as e:
+        logger.error("Stripe revenue rebuild failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Stripe rebuild failed"
+        )
+
+
 @router.get("/{integration_id}/data", response_model=List[IntegrationDataResponse])
 async def get_integration_data(
     startup_id: UUID,
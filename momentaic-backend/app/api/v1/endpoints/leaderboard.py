@@ -1,15 +1,13 @@
 """
 Leaderboard Endpoint
-Returns real startup rankings from the database using the Traction Score Engine.
+Serves precomputed startup rankings from the Redis-backed traction leaderboard.
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query, status
 
-from app.core.database import get_db
-from app.models.startup import Startup
+from app.services.leaderboard import leaderboard_service
 
 router = APIRouter()
 
@@ -17,78 +15,36 @@ router = APIRouter()
 @router.get("", response_model=dict)
 async def get_leaderboard(
     category: str = "all",
-    time_period: str = "all",
-    db: AsyncSession = Depends(get_db),
+    time_period: str = Query("all", pattern="^(all|day|week|month)$"),
+    limit: int = Query(50, ge=1, le=200),
 ):
     """
     Get the Unfair Advantage Leaderboard.
-    Pulls real startups from the database, sorted by traction score.
+    Global or per-category ranking by traction score; day/week/month rank by
+    score gained since that period's snapshot.
     """
     try:
-        # Query startups from DB
-        query = select(Startup).limit(50)
-        
-        result = await db.execute(query)
-        startups = result.scalars().all()
-        
-        if not startups:
-            return {"leaderboard": [], "message": "No startups registered yet. Be the first!"}
-        
-        # Build leaderboard entries from real data
-        leaderboard = []
-        for idx, startup in enumerate(startups, start=1):
-            metrics = startup.metrics if hasattr(startup, "metrics") and startup.metrics else {}
-            
-            # Calculate a basic traction score from available metrics
-            mrr = metrics.get("mrr", 0) or 0
-            users = metrics.get("users", 0) or 0
-            growth = metrics.get("mrr_growth", 0) or 0
-            
-            # Simple composite score (0-100)
-            traction_score = min(100, int(
-                (min(mrr, 50000) / 50000 * 40) +
-                (min(users, 10000) / 10000 * 30) +
-                (min(growth, 100) / 100 * 30)
-            ))
-            
-            # Determine tier
-            if traction_score >= 80:
-                tier = "rocket"
-            elif traction_score >= 50:
-                tier = "scaling"
-            elif traction_score >= 20:
-                tier = "rising"
-            else:
-                tier = "building"
-            
-            leaderboard.append({
-                "rank": idx,
-                "startup_id": str(startup.id),
-                "name": startup.name,
-                "tagline": startup.tagline or startup.description or "",
-                "traction_score": traction_score,
-                "tier": tier,
-                "verified": bool(metrics.get("_verified", False)),
-                "category": startup.industry or "general",
-                "public_metrics": {
-                    "mrr": mrr,
-                    "growth": growth,
-                    "users": users,
-                },
-                "integrations_connected": metrics.get("integrations_count", 0),
-            })
-        
-        # Sort by traction score descending
-        leaderboard.sort(key=lambda x: x["traction_score"], reverse=True)
-        
-        # Re-rank after sorting
-        for idx, entry in enumerate(leaderboard, start=1):
-            entry["rank"] = idx
-        
-        return {"leaderboard": leaderboard}
-        
+        result = await leaderboard_service.top(limit=limit, category=category, time_period=time_period)
     except Exception as e:
         import structlog
         logger = structlog.get_logger()
         logger.error("Leaderboard query failed", error=str(e))
         return {"leaderboard": [], "error": "Failed to load leaderboard"}
+
+    if not result["leaderboard"] and result["total"] == 0:
+        result["message"] = "No startups registered yet. Be the first!"
+    return result
+
+
+@router.get("/startups/{startup_id}", response_model=dict)
+async def get_startup_rank(startup_id: UUID, category: Optional[str] = None):
+    """
+    Rank, total and percentile of one startup, globally and within its category.
+    """
+    position = await leaderboard_service.rank_of(str(startup_id), category)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Startup is not ranked yet",
+        )
+    return position
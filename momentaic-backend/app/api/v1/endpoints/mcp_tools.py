@@ -109,9 +109,11 @@ async def calculate_traction_score(request: TractionScoreRequest):
     Performance-based ranking - the anti-pedigree approach
     """
     from app.services.traction_score import get_traction_engine
+    from app.services.leaderboard import leaderboard_service
     
     engine = get_traction_engine()
     score = engine.calculate_score(request.metrics, request.startup_id)
+    score.percentile = await leaderboard_service.percentile_for_score(score.overall_score)
     
     return {
         "overall_score": score.overall_score,
@@ -171,17 +173,9 @@ async def get_leaderboard(
     
     Public ranking of startups by traction - pure metrics
     """
-    from app.services.community_showcase import get_showcase_service
-    
-    service = get_showcase_service()
-    leaderboard = await service.get_leaderboard(category, limit, time_period)
+    from app.services.leaderboard import leaderboard_service
     
-    return {
-        "leaderboard": leaderboard,
-        "total": len(leaderboard),
-        "category": category or "all",
-        "time_period": time_period
-    }
+    return await leaderboard_service.top(limit=limit, category=category, time_period=time_period)
 
 
 @leaderboard_router.get("/featured")
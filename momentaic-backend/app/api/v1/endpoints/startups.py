@@ -13,8 +13,7 @@ from sqlalchemy.orm import selectinload
 from app.core.database import get_db
 from app.core.security import get_current_active_user, verify_startup_access
 from app.models.user import User
-from app.models.startup import Startup, StartupStage, Signal, Sprint
-from app.models.growth import Lead, LeadStatus
+from app.models.startup import Startup, StartupStage, Sprint
 from app.models.conversation import Conversation
 from app.schemas.startup import (
     StartupCreate,
@@ -122,6 +121,11 @@ async def create_startup(
     db.add(startup)
     await db.flush()
     
+    from app.services.leaderboard import leaderboard_service
+    await leaderboard_service.record(startup)
+    from app.services.benchmark_service import benchmark_service
+    await benchmark_service.record(startup)
+    
     # === WOW ONBOARDING: PERSIST MEMORY ===
     if startup_data.initial_analysis:
         try:
@@ -241,6 +245,11 @@ async def update_startup(
     for field, value in update_dict.items():
         setattr(startup, field, value)
     
+    from app.services.leaderboard import leaderboard_service
+    await leaderboard_service.record(startup)
+    from app.services.benchmark_service import benchmark_service
+    await benchmark_service.record(startup)
+    
     return StartupResponse.model_validate(startup)
 
 
@@ -261,6 +270,11 @@ async def delete_startup(
     startup = result.scalar_one()
     
     await db.delete(startup)
+    
+    from app.services.leaderboard import leaderboard_service
+    await leaderboard_service.remove(str(startup_id))
+    from app.services.benchmark_service import benchmark_service
+    await benchmark_service.remove(str(startup_id))
 
 
 @router.get("/{startup_id}/dashboard", response_model=StartupDashboard)
@@ -272,143 +286,13 @@ async def get_dashboard(
     """
     Get aggregated dashboard data for a startup.
     Includes latest signal, active sprint, lead summary, and recent activity.
+    Served from the cached read model; writes to leads, content and workflow
+    logs invalidate it.
     """
     await verify_startup_access(startup_id, current_user, db)
-    
-    # Get startup
-    result = await db.execute(
-        select(Startup).where(Startup.id == startup_id)
-    )
-    startup = result.scalar_one()
-    
-    # Get latest signal
-    result = await db.execute(
-        select(Signal)
-        .where(Signal.startup_id == startup_id)
-        .order_by(Signal.calculated_at.desc())
-        .limit(1)
-    )
-    latest_signal = result.scalar_one_or_none()
-    
-    # Get active sprint
-    result = await db.execute(
-        select(Sprint)
-        .where(Sprint.startup_id == startup_id, Sprint.status == "active")
-        .order_by(Sprint.created_at.desc())
-        .limit(1)
-    )
-    active_sprint = result.scalar_one_or_none()
-    
-    # Get lead summary by status
-    lead_counts = {}
-    for status in LeadStatus:
-        result = await db.execute(
-            select(func.count(Lead.id))
-            .where(Lead.startup_id == startup_id, Lead.status == status)
-        )
-        lead_counts[status.value] = result.scalar() or 0
-    
-    # Get scheduled content count
-    from app.models.growth import ContentItem, ContentStatus
-    result = await db.execute(
-        select(func.count(ContentItem.id))
-        .where(
-            ContentItem.startup_id == startup_id,
-            ContentItem.status == ContentStatus.SCHEDULED
-        )
-    )
-    content_scheduled = result.scalar() or 0
-    
-    # Recent activity (REAL)
-    activities = []
-    
-    # 1. New Leads (Last 5)
-    recent_leads = await db.execute(
-        select(Lead)
-        .where(Lead.startup_id == startup_id)
-        .order_by(Lead.created_at.desc())
-        .limit(5)
-    )
-    for lead in recent_leads.scalars():
-        activities.append({
-            "type": "lead_acquired",
-            "message": f"New lead identified: {lead.company_name}",
-            "timestamp": lead.created_at,
-            "agent": "Sales Hunter",
-            "status": "success"
-        })
-
-    # 2. Content Updates (Last 5)
-    recent_content = await db.execute(
-        select(ContentItem)
-        .where(ContentItem.startup_id == startup_id)
-        .order_by(ContentItem.updated_at.desc())
-        .limit(5)
-    )
-    for content in recent_content.scalars():
-        action = "drafted"
-        if content.status == ContentStatus.SCHEDULED: action = "scheduled"
-        elif content.status == ContentStatus.PUBLISHED: action = "published"
-        
-        activities.append({
-            "type": f"content_{action}",
-            "message": f"Content '{content.title[:30]}...' {action}",
-            "timestamp": content.updated_at,
-            "agent": "Content Strategist",
-            "status": "success"
-        })
-
-    # 3. Agent Workflow Logs (Last 10)
-    # We join with WorkflowRun and Workflow to ensure it belongs to this startup
-    from app.models.workflow import WorkflowLog, WorkflowRun, Workflow, LogLevel
-    
-    recent_logs = await db.execute(
-        select(WorkflowLog, Workflow.name)
-        .join(WorkflowRun, WorkflowLog.run_id == WorkflowRun.id)
-        .join(Workflow, WorkflowRun.workflow_id == Workflow.id)
-        .where(Workflow.startup_id == startup_id, WorkflowLog.level == LogLevel.SUCCESS)
-        .order_by(WorkflowLog.timestamp.desc())
-        .limit(10)
-    )
-    
-    for log, wf_name in recent_logs:
-        activities.append({
-            "type": "agent_action",
-            "message": f"{wf_name}: {log.message}",
-            "timestamp": log.timestamp,
-            "agent": "Workflow Agent", # Could be more specific if we had agent name in log
-            "status": "success"
-        })
-        
-    # 4. Startup Creation (Always include if recent)
-    activities.append({
-        "type": "startup_created", 
-        "message": f"Startup '{startup.name}' initialized", 
-        "timestamp": startup.created_at,
-        "agent": "System",
-        "status": "success"
-    })
-    
-    # Sort by timestamp desc and take top 10
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    activities = activities[:10]
-    
-    # Convert timestamps to string for JSON
-    recent_activity = [
-        {**a, "timestamp": a["timestamp"].isoformat()} 
-        for a in activities
-    ]
-    
-    from app.schemas.startup import SignalResponse, SprintResponse
-    
-    return StartupDashboard(
-        startup=StartupResponse.model_validate(startup),
-        latest_signal=SignalResponse.model_validate(latest_signal) if latest_signal else None,
-        active_sprint=SprintResponse.model_validate(active_sprint) if active_sprint else None,
-        lead_summary=lead_counts,
-        content_scheduled=content_scheduled,
-        recent_activity=recent_activity,
-    )
+
+    from app.services.dashboard_read_model import dashboard_read_model
+    return StartupDashboard.model_validate(await dashboard_read_model.get(startup_id))
 
 
 @router.patch("/{startup_id}/metrics", response_model=StartupResponse)
@@ -432,6 +316,12 @@ async def update_metrics(
     new_metrics = metrics_data.model_dump(exclude_unset=True, exclude_none=True)
     startup.metrics = {**startup.metrics, **new_metrics}
     
+    # Re-ranked only if the merged metrics actually changed
+    from app.services.leaderboard import leaderboard_service
+    await leaderboard_service.record(startup)
+    from app.services.benchmark_service import benchmark_service
+    await benchmark_service.record(startup)
+    
     return StartupResponse.model_validate(startup)
 
 
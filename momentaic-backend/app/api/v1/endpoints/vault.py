@@ -1,7 +1,11 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, BackgroundTasks
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, Depends, BackgroundTasks, Header, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import mimetypes
 import os
+import re
+import anyio
 import structlog
 
 from app.core import security
@@ -11,12 +15,16 @@ from app.core.config import settings
 router = APIRouter()
 logger = structlog.get_logger()
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
 class VaultFile(BaseModel):
     filename: str
     url: str
     size: int
     created_at: str
     type: str  # PDF, CSV, DOCX
+    download_url: Optional[str] = None
 
 @router.get("/", response_model=List[VaultFile])
 async def get_vault_files(
@@ -29,7 +37,7 @@ async def get_vault_files(
     if os.path.exists(VAULT_DIR):
         for f in os.listdir(VAULT_DIR):
             path = os.path.join(VAULT_DIR, f)
-            if os.path.isfile(path):
+            if os.path.isfile(path) and not f.startswith("."):  # skip in-progress renders
                 stats = os.stat(path)
                 file_type = "UNKNOWN"
                 if f.endswith(".pdf"): file_type = "PDF"
@@ -40,6 +48,7 @@ async def get_vault_files(
                 files.append({
                     "filename": f,
                     "url": f"/static/vault/{f}",
+                    "download_url": f"{settings.api_v1_prefix}/vault/files/{f}",
                     "size": stats.st_size,
                     "created_at": str(stats.st_mtime),
                     "type": file_type
@@ -49,6 +58,73 @@ async def get_vault_files(
     files.sort(key=lambda x: x["created_at"], reverse=True)
     return files
 
+def _byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range `Range: bytes=...` header into an inclusive (start, end).
+    Returns None to serve the whole file (no header, multiple or malformed ranges).
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1  # suffix range: last N bytes
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+async def _iter_file(path: str, start: int, length: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@router.get("/files/{filename}")
+async def download_vault_file(
+    filename: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: Any = Depends(security.get_current_user),
+) -> Any:
+    """
+    Stream a vault file in chunks. Supports single byte ranges (206 Partial
+    Content) so large deliverables can be resumed or previewed.
+    """
+    path = os.path.join(VAULT_DIR, filename)
+    if os.path.basename(filename) != filename or filename.startswith(".") or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    size = os.path.getsize(path)
+    byte_range = _byte_range(range_header, size)
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    return StreamingResponse(
+        _iter_file(path, start, end - start + 1),
+        status_code=206 if byte_range else 200,
+        media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        headers=headers,
+    )
+
+
 @router.post("/generate-pack")
 async def generate_day_one_pack(
     background_tasks: BackgroundTasks,
@@ -1,3 +1,5 @@
+import hmac
+import json
 import structlog
 from fastapi import APIRouter, Request, HTTPException, status, Header, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -93,6 +95,33 @@ async def yokaizen_webhook(
 
     return {"status": "accepted"}
 
+@router.post("/media/{provider}")
+async def media_job_webhook(
+    provider: str,
+    request: Request,
+    x_webhook_secret: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Completion callbacks for durable media jobs (PiAPI/Kling webhook_config).
+    Resolves the matching MediaJob so the poller doesn't have to.
+    Rejected unless PIAPI_WEBHOOK_SECRET is configured and matches.
+    """
+    if not settings.piapi_webhook_secret or not hmac.compare_digest(
+        x_webhook_secret or "", settings.piapi_webhook_secret
+    ):
+        logger.warning("Unauthorized media webhook attempt", provider=provider, configured=bool(settings.piapi_webhook_secret))
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Webhook Secret")
+
+    if provider != "kling":
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown media provider: {provider}")
+
+    from app.services.media_jobs import media_job_service
+    payload = await request.json()
+    job = await media_job_service.handle_kling_webhook(db, payload)
+    return {"received": True, "job_id": str(job.id) if job else None}
+
+
 @router.post("/stripe")
 async def stripe_webhook(
     request: Request,
@@ -100,11 +129,14 @@ async def stripe_webhook(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Ingests Stripe webhooks and evaluates proactive triggers (Phase 20).
+    Ingests Stripe webhooks: advances the owning startup's materialized
+    revenue state and evaluates proactive triggers (Phase 20).
     """
     if not settings.stripe_webhook_secret or not settings.stripe_secret_key:
         logger.warning("Stripe credentials not configured for webhooks")
         return {"status": "ignored"}
+    if not stripe_signature:
+        raise HTTPException(status_code=400, detail="Missing signature")
 
     stripe.api_key = settings.stripe_secret_key
     payload = await request.body()
@@ -121,6 +153,17 @@ async def stripe_webhook(
         raise HTTPException(status_code=400, detail="Invalid signature")
 
     logger.info("Received Stripe Webhook", event_type=event["type"])
+
+    # Materialized revenue (idempotent per event id), for the startup whose account sent it
+    from app.services.stripe_revenue import stripe_revenue_engine
+    revenue_event = json.loads(payload)
+    try:
+        startup_id = await stripe_revenue_engine.resolve_startup(db, revenue_event)
+        if startup_id and await stripe_revenue_engine.apply_event(db, startup_id, revenue_event):
+            await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.warning("Stripe revenue update failed", error=str(e), event_id=revenue_event.get("id"))
     
     # Extract customer ID to look up the Startup
     data_obj = event["data"]["object"]
@@ -10,7 +10,7 @@ from app.api.v1.endpoints import (
     integrations, triggers, mcp_tools, import_flows, social, 
     growth_analytics, growth_monitor, llm_optimization, social_ugc, 
     characters, webhooks, intelligence, playbooks, ws, a2a, hitl, 
-    swarm, lead_generation, campaigns, deerflow
+    swarm, lead_generation, campaigns, deerflow, leaderboard
 )
 
 api_router = APIRouter()
@@ -179,6 +179,11 @@ api_router.include_router(
 )
 
 # Leaderboard (Public rankings)
+api_router.include_router(
+    leaderboard.router,
+    prefix="/leaderboard",
+    tags=["Leaderboard"],
+)
 api_router.include_router(
     mcp_tools.leaderboard_router,
     tags=["Leaderboard"],
@@ -543,14 +548,6 @@ api_router.include_router(
     tags=["Global Campaign"],
 )
 
-# Stripe Revenue Webhooks (CFO Agent Real-Time Triggers)
-from app.api.v1.endpoints import stripe_webhooks
-api_router.include_router(
-    stripe_webhooks.router,
-    prefix="/webhooks",
-    tags=["Stripe Webhooks"],
-)
-
 # Browser-First Social Integration (No API Keys Needed)
 from app.api.v1.endpoints import browser_social
 api_router.include_router(
@@ -0,0 +1,70 @@
+"""
+Commit-time Cache Invalidation
+ORM session hooks that collect the ids a flush touches and invalidate them
+once the session commits; a rollback discards them.
+
+Used by the read-through Redis caches (dashboard read model, Company DNA) so
+a stale build racing a write can never be served after the write lands.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, Iterable, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class CommitInvalidationHooks:
+    """
+    Session event hooks for one cache.
+
+    touched(session) returns the ids affected by the pending flush;
+    invalidate(*ids) is awaited fire-and-forget after the commit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        touched: Callable[[Session], Set[Hashable]],
+        invalidate: Callable[..., Awaitable[None]],
+    ):
+        self.touched = touched
+        self.invalidate = invalidate
+        self._pending_key = f"{name}_invalidate"
+        self._pending_tasks: Set[asyncio.Task] = set()
+        self._installed = False
+
+    def schedule(self, ids: Iterable[Hashable]) -> None:
+        """Fire-and-forget invalidation from sync ORM hooks; no-op outside an event loop."""
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Sync context (scripts): the cache TTL bounds staleness
+        task = loop.create_task(self.invalidate(*ids))
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+
+    def after_flush(self, session: Session, _flush_context) -> None:
+        touched = self.touched(session)
+        if touched:
+            session.info.setdefault(self._pending_key, set()).update(touched)
+
+    def after_commit(self, session: Session) -> None:
+        pending = session.info.pop(self._pending_key, None)
+        if pending:
+            self.schedule(pending)
+
+    def after_rollback(self, session: Session) -> None:
+        session.info.pop(self._pending_key, None)
+
+    def install(self) -> None:
+        """Listen on every ORM session (AsyncSession delegates to Session)."""
+        if self._installed:
+            return
+        event.listen(Session, "after_flush", self.after_flush)
+        event.listen(Session, "after_commit", self.after_commit)
+        event.listen(Session, "after_rollback", self.after_rollback)
+        self._installed = True
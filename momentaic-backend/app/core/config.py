@@ -107,9 +107,16 @@ class Settings(BaseSettings):
     vapid_public_key: Optional[str] = None
     vapid_private_key_path: Optional[str] = "private_key.pem"
 
+    # MCP Servers
+    mcp_lazy_start: bool = False               # start each server on first list_tools/call_tool
+    mcp_connect_timeout_seconds: float = 30.0  # per server (npx may download on first start)
+    mcp_pool_size: int = 1                     # child processes (sessions) per server
+    mcp_health_probe_seconds: float = 15.0     # ping idle sessions, restart dead children
+
     # OAuth Integrations
     github_client_id: Optional[str] = None
     github_client_secret: Optional[str] = None
+    github_token: Optional[str] = None  # Server token for repo stats (signal engine)
     linkedin_client_id: Optional[str] = None
     linkedin_client_secret: Optional[str] = None
     twitter_client_id: Optional[str] = None
@@ -143,6 +150,16 @@ class Settings(BaseSettings):
     
     # PiAPI (Kling/Sora)
     piapi_api_key: Optional[str] = None
+    piapi_webhook_secret: Optional[str] = None
+
+    # Media Jobs (durable Kling/Imagen/TTS tracking)
+    media_job_poll_interval_seconds: int = 15
+    media_job_poll_batch_size: int = 50
+    media_job_deadline_minutes: int = 20
+
+    # Morning Brief (daily autonomous agent run)
+    morning_brief_concurrency: int = 8                    # startups briefed at once
+    morning_brief_startup_timeout_seconds: float = 600.0  # deadline per startup (four agents)
     
     # CrossPost Integration
     crosspost_api_key: Optional[str] = None
@@ -166,6 +183,9 @@ class Settings(BaseSettings):
     # Sentry
     sentry_dsn: Optional[str] = None
 
+    # Metrics (GET /api/v1/metrics: admins, or scrapers sending this bearer token)
+    metrics_scrape_token: Optional[str] = None
+
     # Rate Limiting
     rate_limit_requests: int = 100
     rate_limit_window: int = 60
@@ -1,17 +1,37 @@
-
 """
 Event Bus Module
 Handles Redis Pub/Sub for real-time application events
+
+Every published event is also appended to a short, capped Redis stream so
+SSE clients can resume after a reconnect (Last-Event-ID). Each process runs
+one EventMultiplexer: a single pub/sub subscription fanned out to bounded
+per-client queues, filtered by startup / user.
 """
 
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, Iterable, List, Optional, Set
+import asyncio
+import itertools
 import json
 import redis.asyncio as redis
 import structlog
 from app.core.config import settings
+from app.core.metrics import metrics
 
 logger = structlog.get_logger()
 
+DEFAULT_CHANNEL = "momentaic:events"
+BACKLOG_MAXLEN = 1000          # approximate; XADD MAXLEN ~
+CLIENT_QUEUE_SIZE = 256        # per-client buffer before oldest events are dropped
+RECONNECT_DELAY_SECONDS = 1.0
+
+# XADD the event to the backlog stream and PUBLISH it with the stream id
+# spliced in, atomically, so live and resumed events share one id sequence.
+_PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[2], '*', 'event', ARGV[1])
+redis.call('PUBLISH', KEYS[2], '{"id":"' .. id .. '",' .. string.sub(ARGV[1], 2))
+return id
+"""
+
 # Global Redis instance for events
 _redis_client: Optional[redis.Redis] = None
 
@@ -27,31 +47,54 @@ async def get_redis_client() -> redis.Redis:
     return _redis_client
 
 
-async def publish_event(event_type: str, data: Dict[str, Any], channel: str = "momentaic:events"):
+def backlog_key(channel: str) -> str:
+    return f"{channel}:backlog"
+
+
+async def publish_event(
+    event_type: str,
+    data: Dict[str, Any],
+    channel: str = DEFAULT_CHANNEL,
+    startup_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Optional[str]:
     """
-    Publish an event to Redis channel
+    Publish an event to Redis channel.
+
+    Events scoped to a startup or user (explicitly or via data["startup_id"] /
+    data["user_id"]) only reach clients allowed to see them; unscoped events
+    are broadcast. Returns the backlog stream id.
     """
     try:
         client = await get_redis_client()
+        startup_id = startup_id or data.get("startup_id")
+        user_id = user_id or data.get("user_id")
         message = {
             "type": event_type,
             "data": data,
-            "timestamp": str(data.get("timestamp", "")) 
+            "timestamp": str(data.get("timestamp", "")),
+            "startup_id": str(startup_id) if startup_id else None,
+            "user_id": str(user_id) if user_id else None,
         }
-        await client.publish(channel, json.dumps(message))
-        logger.debug("Event published", type=event_type, channel=channel)
+        event_id = await client.eval(
+            _PUBLISH_SCRIPT, 2, backlog_key(channel), channel,
+            json.dumps(message, default=str), BACKLOG_MAXLEN,
+        )
+        logger.debug("Event published", type=event_type, channel=channel, id=event_id)
+        return event_id
     except Exception as e:
         logger.error("Failed to publish event", error=str(e))
+        return None
 
 
-async def subscribe_events(channel: str = "momentaic:events"):
+async def subscribe_events(channel: str = DEFAULT_CHANNEL):
     """
     Generator that yields events from Redis channel
     """
     client = await get_redis_client()
     pubsub = client.pubsub()
     await pubsub.subscribe(channel)
-    
+
     try:
         async for message in pubsub.listen():
             if message["type"] == "message":
@@ -61,3 +104,185 @@ async def subscribe_events(channel: str = "momentaic:events"):
     finally:
         await pubsub.unsubscribe(channel)
         # Note: We don't close the global client here as it's shared
+
+
+def _stream_id(event_id: Optional[str]) -> tuple:
+    """Order Redis stream ids ("ms-seq") numerically; unknown ids sort first."""
+    try:
+        ms, seq = str(event_id).split("-")
+        return int(ms), int(seq)
+    except (ValueError, AttributeError):
+        return (0, 0)
+
+
+class EventSubscription:
+    """One SSE client: a bounded queue of events it is allowed to see."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, user_id: Optional[str], startup_ids: Iterable[str], maxsize: int = CLIENT_QUEUE_SIZE):
+        self.key = next(self._ids)
+        self.user_id = str(user_id) if user_id else None
+        self.startup_ids: Set[str] = {str(s) for s in startup_ids}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def allows(self, event: Dict[str, Any]) -> bool:
+        startup_id, user_id = event.get("startup_id"), event.get("user_id")
+        if startup_id is None and user_id is None:
+            return True
+        return (startup_id is not None and startup_id in self.startup_ids) or \
+            (user_id is not None and user_id == self.user_id)
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Enqueue without blocking the fan-out; a slow client loses its oldest events."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            metrics.inc("sse_events_dropped_total")
+        self.queue.put_nowait(event)
+
+
+class EventMultiplexer:
+    """Single Redis subscription per process, fanned out to in-process subscribers."""
+
+    def __init__(self, channel: str = DEFAULT_CHANNEL):
+        self.channel = channel
+        self._subscriptions: Dict[int, EventSubscription] = {}
+        self._by_startup: Dict[str, Set[int]] = {}
+        self._by_user: Dict[str, Set[int]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    # ─── Subscriptions ───────────────────────────────────────────────────────
+
+    def register(self, subscription: EventSubscription) -> None:
+        self._subscriptions[subscription.key] = subscription
+        for startup_id in subscription.startup_ids:
+            self._by_startup.setdefault(startup_id, set()).add(subscription.key)
+        if subscription.user_id:
+            self._by_user.setdefault(subscription.user_id, set()).add(subscription.key)
+        self._ensure_listener()
+
+    def unregister(self, subscription: EventSubscription) -> None:
+        self._subscriptions.pop(subscription.key, None)
+        for startup_id in subscription.startup_ids:
+            keys = self._by_startup.get(startup_id)
+            if keys is not None:
+                keys.discard(subscription.key)
+                if not keys:
+                    del self._by_startup[startup_id]
+        if subscription.user_id and subscription.user_id in self._by_user:
+            self._by_user[subscription.user_id].discard(subscription.key)
+            if not self._by_user[subscription.user_id]:
+                del self._by_user[subscription.user_id]
+
+    @property
+    def client_count(self) -> int:
+        return len(self._subscriptions)
+
+    def dispatch(self, event: Dict[str, Any]) -> int:
+        """Deliver one event to every subscriber allowed to see it. Returns deliveries."""
+        startup_id, user_id = event.get("startup_id"), event.get("user_id")
+        if startup_id is None and user_id is None:
+            targets = self._subscriptions.keys()
+        else:
+            targets = set(self._by_startup.get(startup_id, ())) | set(self._by_user.get(user_id, ()))
+
+        delivered = 0
+        for key in list(targets):
+            subscription = self._subscriptions.get(key)
+            if subscription is not None:
+                subscription.offer(event)
+                delivered += 1
+        metrics.inc("sse_events_delivered_total", amount=delivered)
+        return delivered
+
+    async def stream(
+        self,
+        user_id: Optional[str],
+        startup_ids: Iterable[str],
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Events for one client: backlog after `last_event_id` first, then live events."""
+        subscription = EventSubscription(user_id, startup_ids)
+        # Register before reading the backlog so nothing published in between is lost
+        self.register(subscription)
+        try:
+            high_water = _stream_id(last_event_id)
+            if last_event_id:
+                for event in await self.backlog_since(last_event_id):
+                    if subscription.allows(event):
+                        high_water = max(high_water, _stream_id(event.get("id")))
+                        yield event
+            while True:
+                event = await subscription.queue.get()
+                if last_event_id and _stream_id(event.get("id")) <= high_water:
+                    continue  # already replayed from the backlog
+                yield event
+        finally:
+            self.unregister(subscription)
+
+    async def backlog_since(self, last_event_id: str) -> List[Dict[str, Any]]:
+        try:
+            client = await get_redis_client()
+            entries = await client.xrange(backlog_key(self.channel), min=f"({last_event_id}", max="+",
+                                          count=BACKLOG_MAXLEN)
+        except Exception as e:
+            logger.warning("Event backlog unavailable", error=str(e))
+            return []
+        events = []
+        for entry_id, fields in entries:
+            try:
+                event = json.loads(fields["event"])
+            except (KeyError, ValueError):
+                continue
+            event["id"] = entry_id
+            events.append(event)
+        return events
+
+    # ─── Listener ────────────────────────────────────────────────────────────
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                client = await get_redis_client()
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                    except ValueError:
+                        continue
+                    self.dispatch(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Event subscription error", error=str(e))
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe(self.channel)
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+
+
+# Singleton
+event_hub = EventMultiplexer()
@@ -0,0 +1,91 @@
+"""
+Token Budgets
+Counting and truncation helpers that keep prompts inside a model's context.
+
+Counts use tiktoken's cl100k_base encoding when it is available locally and
+otherwise a conservative characters-per-token estimate. Neither matches every
+provider's tokenizer exactly, so budgets should keep some headroom.
+"""
+
+import math
+from functools import lru_cache
+from typing import List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+CHARS_PER_TOKEN = 3.0  # conservative: English prose averages ~4 chars per token
+TRUNCATION_MARKER = "\n[... truncated ...]"
+
+# Input context of the models get_llm() can route a prompt to. A prompt that
+# may fall back to another provider has to fit the smallest model in the chain.
+MODEL_CONTEXT_TOKENS = {
+    "gemini-2.0-flash": 1_048_576,
+    "gemini-2.5-pro": 1_048_576,
+    "gpt-4o-mini": 128_000,
+    "deepseek-chat": 64_000,
+}
+FALLBACK_CHAIN_CONTEXT_TOKENS = min(MODEL_CONTEXT_TOKENS.values())
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # not installed, or the encoding file cannot be fetched
+        logger.info("tiktoken unavailable, estimating token counts", error=str(e)[:200])
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+    """Cut text to at most max_tokens (marker included), preferring a line or word boundary."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - count_tokens(marker))
+    encoding = _encoding()
+    if encoding is not None:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:keep])
+    else:
+        head = text[:int(keep * CHARS_PER_TOKEN)]
+    cut = max(head.rfind("\n"), head.rfind(" "))
+    if cut > len(head) * 0.8:
+        head = head[:cut]
+    return head.rstrip() + marker
+
+
+def fit_to_budget(texts: List[str], max_tokens: int, separator: str = "\n\n") -> List[str]:
+    """
+    Truncate texts so that together (joined by separator) they fit max_tokens.
+
+    The budget is shared fairly: texts shorter than an equal share are kept
+    whole and their unused share is split among the longer ones, which are
+    cut to the same size.
+    """
+    if not texts:
+        return []
+    budget = max_tokens - count_tokens(separator) * (len(texts) - 1)
+    sizes = [count_tokens(text) for text in texts]
+    if sum(sizes) <= budget:
+        return list(texts)
+
+    cap: Optional[int] = None
+    remaining, pending = budget, sorted(range(len(texts)), key=sizes.__getitem__)
+    while pending:
+        share = remaining // len(pending)
+        if sizes[pending[0]] > share:
+            cap = max(share, 0)
+            break
+        remaining -= sizes[pending.pop(0)]
+    return [text if cap is None or size <= cap else truncate_to_tokens(text, cap)
+            for text, size in zip(texts, sizes, strict=True)]
@@ -66,7 +66,25 @@ class BaseIntegration(ABC):
     def __init__(self, credentials: Optional[IntegrationCredentials] = None, config: Optional[Dict[str, Any]] = None):
         self.credentials = credentials or IntegrationCredentials()
         self.config = config or {}
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._owns_http_client = True
+    
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """HTTP client, created lazily unless a shared pool was attached"""
+        if getattr(self, "_http_client", None) is None:
+            self._http_client = httpx.AsyncClient(timeout=30.0)
+            self._owns_http_client = True
+        return self._http_client
+    
+    @http_client.setter
+    def http_client(self, client: httpx.AsyncClient):
+        self._http_client = client
+    
+    def use_shared_http_client(self, client: httpx.AsyncClient) -> None:
+        """Attach a pooled client owned by the caller; close() will leave it open"""
+        self._http_client = client
+        self._owns_http_client = False
     
     @abstractmethod
     async def get_auth_url(self, redirect_uri: str, state: str) -> str:
@@ -123,4 +141,6 @@ class BaseIntegration(ABC):
     
     async def close(self):
         """Cleanup resources"""
-        await self.http_client.aclose()
+        client = getattr(self, "_http_client", None)
+        if client is not None and getattr(self, "_owns_http_client", True):
+            await client.aclose()
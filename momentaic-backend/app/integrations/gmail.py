@@ -15,7 +15,7 @@ logger = structlog.get_logger()
 
 class GmailIntegration(BaseIntegration):
     """
-    Gmail Integration via SMTP (Sending) and IMAP (Listening - TODO).
+    Gmail Integration via SMTP (Sending) and IMAP (Listening via InboxSyncEngine).
     """
     provider = "gmail"
     display_name = "Gmail"
@@ -41,116 +41,74 @@ class GmailIntegration(BaseIntegration):
         Sync emails (Read Inbox).
         """
         if data_types and "emails" in data_types:
-            emails = self.check_unread_emails()
+            from app.services.inbox_sync import inbox_sync
+            emails = await inbox_sync.sync()
             return SyncResult(success=True, records_synced=len(emails), data={"emails": emails})
         return SyncResult(success=True, records_synced=0)
 
-    def check_unread_emails(self) -> List[Dict[str, Any]]:
+    async def listen_for_replies(self, db=None) -> List[Dict[str, Any]]:
         """
-        Connect to IMAP and fetch unseen emails.
+        Trigger an incremental inbox sync. New messages are delivered to
+        handle_replies (and every other inbox consumer) by the sync engine.
+        Called by the APScheduler every 3 minutes as a fallback to IMAP IDLE.
         """
-        import imaplib
-        import email
-        from email.header import decode_header
-
-        username = getattr(settings, "GMAIL_USER", None)
-        password = getattr(settings, "GMAIL_APP_PASSWORD", None)
-        
-        if not username or not password:
-            logger.warning("GmailIntegration: Cannot check mail. Missing credentials.")
-            return []
-
-        found_emails = []
-        try:
-            # Connect to Gmail IMAP
-            mail = imaplib.IMAP4_SSL("imap.gmail.com")
-            mail.login(username, password)
-            mail.select("inbox")
-
-            # Search for Unseen
-            status, messages = mail.search(None, "UNSEEN")
-            if status != "OK":
-                return []
-            
-            email_ids = messages[0].split()
-            # Fetch last 5 max to avoid overload
-            for e_id in email_ids[-5:]:
-                res, msg_data = mail.fetch(e_id, "(RFC822)")
-                for response_part in msg_data:
-                    if isinstance(response_part, tuple):
-                        msg = email.message_from_bytes(response_part[1])
-                        subject, encoding = decode_header(msg["Subject"])[0]
-                        if isinstance(subject, bytes):
-                            subject = subject.decode(encoding if encoding else "utf-8")
-                        
-                        sender = msg.get("From")
-                        found_emails.append({
-                            "id": e_id.decode(),
-                            "subject": subject,
-                            "sender": sender,
-                            "snippet": str(msg.get_payload())[:100]
-                        })
-            
-            mail.close()
-            mail.logout()
-            logger.info(f"GmailIntegration: Found {len(found_emails)} unread emails.")
-            return found_emails
-
-        except Exception as e:
-            logger.error(f"Gmail IMAP failed: {e}")
-            return []
+        from app.services.inbox_sync import inbox_sync
+        return await inbox_sync.sync()
 
-    async def listen_for_replies(self, db=None) -> List[Dict[str, Any]]:
+    async def handle_replies(self, messages: List[Dict[str, Any]], db=None) -> List[Dict[str, Any]]:
         """
-        Async IMAP listener: checks for new emails that look like replies
-        to outbound SDR emails, and publishes ReplyReceived events.
-        Called by the APScheduler every 5 minutes.
+        Inbox consumer: detects replies to outbound SDR emails among newly
+        synced headers and publishes ReplyReceived events.
         """
-        import asyncio
-        
-        # Run synchronous IMAP check in thread pool
-        loop = asyncio.get_event_loop()
-        emails = await loop.run_in_executor(None, self.check_unread_emails)
-        
-        if not emails:
-            return []
-        
         replies = []
-        for email_data in emails:
+        for email_data in messages:
             subject = email_data.get("subject", "")
             sender = email_data.get("sender", "")
             
-            # Detect replies (Re: prefix or In-Reply-To header match)
-            is_reply = subject.lower().startswith("re:") or "in-reply-to" in str(email_data)
+            # Detect replies (Re: prefix or In-Reply-To header)
+            is_reply = subject.lower().startswith("re:") or bool(email_data.get("in_reply_to"))
             
             if is_reply:
-                reply_event = {
+                replies.append({
                     "type": "reply_received",
                     "sender": sender,
                     "subject": subject,
-                    "snippet": email_data.get("snippet", ""),
-                    "email_id": email_data.get("id"),
-                }
-                replies.append(reply_event)
-                
-                # Publish to message bus for SDR agent to pick up
-                if db:
-                    try:
-                        from app.services.message_bus import MessageBus
-                        bus = MessageBus(db)
-                        await bus.publish(
-                            startup_id="system",
-                            from_agent="gmail_listener",
-                            topic="email.reply_received",
-                            message_type="EVENT",
-                            payload=reply_event,
-                            priority="high",
-                        )
-                        logger.info("Reply event published", sender=sender, subject=subject)
-                    except Exception as e:
-                        logger.warning("Failed to publish reply event", error=str(e))
-        
-        logger.info(f"GmailIntegration: Processed {len(emails)} emails, {len(replies)} replies detected")
+                    "message_id": email_data.get("message_id"),
+                    "in_reply_to": email_data.get("in_reply_to"),
+                    "email_id": email_data.get("uid"),
+                })
+
+        if not replies:
+            return []
+
+        # Publish to message bus for SDR agent to pick up
+        from app.core.database import AsyncSessionLocal
+        from app.services.message_bus import MessageBus
+
+        async def publish(session):
+            bus = MessageBus(session)
+            for reply_event in replies:
+                try:
+                    await bus.publish(
+                        startup_id="system",
+                        from_agent="gmail_listener",
+                        topic="email.reply_received",
+                        message_type="EVENT",
+                        payload=reply_event,
+                        priority="high",
+                    )
+                    logger.info("Reply event published", sender=reply_event["sender"], subject=reply_event["subject"])
+                except Exception as e:
+                    logger.warning("Failed to publish reply event", error=str(e))
+
+        if db is not None:
+            await publish(db)
+        else:
+            async with AsyncSessionLocal() as session:
+                await publish(session)
+                await session.commit()
+
+        logger.info(f"GmailIntegration: Processed {len(messages)} emails, {len(replies)} replies detected")
         return replies
 
         
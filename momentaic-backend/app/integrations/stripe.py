@@ -12,6 +12,23 @@ from app.core.config import settings
 
 logger = structlog.get_logger()
 
+# Event types that move MRR, customer counts or the revenue timeline
+REVENUE_EVENT_TYPES = [
+    "customer.created",
+    "customer.deleted",
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+    "customer.subscription.paused",
+    "customer.subscription.resumed",
+    "charge.succeeded",
+    "charge.refunded",
+]
+
+
+class StripeCursorExpired(Exception):
+    """The stored /events cursor is no longer retrievable (Stripe keeps 30 days)."""
+
 
 class StripeIntegration(BaseIntegration):
     """
@@ -125,17 +142,7 @@ class StripeIntegration(BaseIntegration):
                 subs = data.get("data", [])
                 
                 for sub in subs:
-                    # Handle multi-item subscriptions
-                    for item in sub.get("items", {}).get("data", []):
-                        price = item.get("price", {})
-                        amount = price.get("unit_amount", 0) / 100
-                        interval = price.get("recurring", {}).get("interval", "month")
-                        quantity = item.get("quantity", 1) or 1
-                        
-                        if interval == "year":
-                            mrr += (amount * quantity) / 12
-                        else:
-                            mrr += amount * quantity
+                    mrr += self.subscription_mrr_cents(sub) / 100
                 
                 has_more = data.get("has_more", False)
                 if has_more and subs:
@@ -145,6 +152,109 @@ class StripeIntegration(BaseIntegration):
         except Exception as e:
             logger.error("MRR calculation failed", error=str(e))
             return 0.0
+
+    @staticmethod
+    def subscription_mrr_cents(subscription: Dict[str, Any]) -> int:
+        """Monthly recurring amount of one subscription in cents (handles multi-item subscriptions)"""
+        mrr = 0.0
+        for item in subscription.get("items", {}).get("data", []):
+            price = item.get("price") or {}
+            amount = price.get("unit_amount") or 0
+            interval = (price.get("recurring") or {}).get("interval", "month")
+            quantity = item.get("quantity", 1) or 1
+
+            if interval == "year":
+                mrr += (amount * quantity) / 12
+            else:
+                mrr += amount * quantity
+        return int(round(mrr))
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # Incremental sync: list paging + /events cursor
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+    async def list_all(self, path: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Page through a Stripe list endpoint (used for on-demand full rebuilds only)"""
+        items: List[Dict[str, Any]] = []
+        query = {**(params or {}), "limit": 100}
+
+        while True:
+            response = await self.http_client.get(
+                f"{self.base_url}{path}",
+                params=query,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"Stripe {path} failed with {response.status_code}")
+
+            data = response.json()
+            batch = data.get("data", [])
+            items.extend(batch)
+            if not data.get("has_more") or not batch:
+                return items
+            query["starting_after"] = batch[-1]["id"]
+
+    async def account_id(self) -> Optional[str]:
+        """Id (acct_...) of the account these credentials belong to; Connect events carry it as `account`"""
+        response = await self.http_client.get(
+            f"{self.base_url}/account",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Stripe /account failed with {response.status_code}")
+        return response.json().get("id")
+
+    async def latest_event(self) -> Optional[Dict[str, Any]]:
+        """Newest event on the account, used as the cursor after a rebuild"""
+        response = await self.http_client.get(
+            f"{self.base_url}/events",
+            params={"limit": 1},
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Stripe /events failed with {response.status_code}")
+        events = response.json().get("data", [])
+        return events[0] if events else None
+
+    async def list_events_since(
+        self,
+        cursor: str,
+        types: Optional[List[str]] = None,
+        max_events: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return events newer than `cursor`, oldest first.
+        Stripe lists newest first, so we walk forward with ending_before and
+        reverse each page. Stops after max_events; the caller resumes from the
+        last returned id on its next sync.
+        """
+        events: List[Dict[str, Any]] = []
+        ending_before = cursor
+
+        while len(events) < max_events:
+            params = [("limit", min(100, max_events - len(events))), ("ending_before", ending_before)]
+            params += [("types[]", t) for t in (types or REVENUE_EVENT_TYPES)]
+
+            response = await self.http_client.get(
+                f"{self.base_url}/events",
+                params=params,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+            )
+            if response.status_code in (400, 404):
+                raise StripeCursorExpired(cursor)
+            if response.status_code != 200:
+                raise RuntimeError(f"Stripe /events failed with {response.status_code}")
+
+            data = response.json()
+            page = data.get("data", [])
+            if not page:
+                break
+            events.extend(reversed(page))
+            if not data.get("has_more"):
+                break
+            ending_before = page[0]["id"]
+
+        return events
     
     async def _get_customer_counts(self) -> Dict[str, int]:
         """Get customer counts"""
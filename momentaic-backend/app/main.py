@@ -4,17 +4,23 @@ The Entrepreneur Operating System
 """
 
 from contextlib import asynccontextmanager
-from typing import Any
-from fastapi import FastAPI, Request, status, HTTPException
+from typing import Any, Optional
+from fastapi import Depends, FastAPI, Request, status, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+import asyncio
+import hmac
 import structlog
 import time
 import math
 
 from app.core.config import settings
-from app.core.database import init_db, close_db
+from app.core.admin_guard import AdminGuard
+from app.core.database import get_db, init_db, close_db
+from app.core.security import get_current_user
 from app.api.v1.router import api_router
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.core.test_context import e2e_test_mode
@@ -45,76 +51,73 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("Database initialized")
 
+    # Dashboard read model: invalidate cached payloads on lead/content/workflow writes
+    from app.services.dashboard_read_model import invalidation_hooks as dashboard_invalidation_hooks
+    dashboard_invalidation_hooks.install()
+
+    # Company DNA: invalidate cached documents on global memory / startup writes
+    from app.services.company_dna import invalidation_hooks as dna_invalidation_hooks
+    dna_invalidation_hooks.install()
+
     # === MCP SYSTEM: Connect to Protocol Servers ===
+    # Servers start concurrently in the background (or on first use when
+    # MCP_LAZY_START is set), so workers accept traffic without waiting on npx.
+    # Each server runs MCP_POOL_SIZE child sessions, supervised and restarted
+    # when they die. /api/v1/health reports per-server state, pools and readiness.
     from app.services.mcp_client import mcp_service
     import os
     
     cwd = os.getcwd()
-    mcp_status = {}
+    mcp_options = {
+        "lazy": settings.mcp_lazy_start,
+        "timeout": settings.mcp_connect_timeout_seconds,
+        "pool_size": settings.mcp_pool_size,
+        "probe_interval": settings.mcp_health_probe_seconds,
+    }
     
-    # 1. Browser Server
-    try:
-        browser_script = os.path.join(cwd, "servers/browser/server.py")
-        if os.path.exists(browser_script):
-            await mcp_service.connect_stdio_server(
-                name="browser",
+    # 1. Browser Server / 2. Google Workspace Server
+    for name in ("browser", "google"):
+        script = os.path.join(cwd, f"servers/{name}/server.py")
+        if os.path.exists(script):
+            mcp_service.register_server(
+                name=name,
                 command="python3",
-                args=[browser_script],
-                env={**os.environ}
+                args=[script],
+                env={**os.environ},
+                **mcp_options,
             )
-            mcp_status["browser"] = "connected"
         else:
-            mcp_status["browser"] = "skipped (script not found)"
-    except Exception as e:
-        mcp_status["browser"] = f"failed: {str(e)[:100]}"
-        logger.error("MCP Browser Server failed", error=str(e))
+            logger.info("MCP Server skipped (script not found)", name=name)
     
-    # 2. Google Workspace Server
-    try:
-        google_script = os.path.join(cwd, "servers/google/server.py")
-        if os.path.exists(google_script):
-            await mcp_service.connect_stdio_server(
-                name="google",
-                command="python3",
-                args=[google_script],
-                env={**os.environ}
-            )
-            mcp_status["google"] = "connected"
-        else:
-            mcp_status["google"] = "skipped (script not found)"
-    except Exception as e:
-        mcp_status["google"] = f"failed: {str(e)[:100]}"
-        logger.error("MCP Google Server failed", error=str(e))
-
     # 3. Postgres Server
-    try:
-        pg_url = settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
-        await mcp_service.connect_stdio_server(
-            name="postgres",
-            command="npx",
-            args=["-y", "@zeddotdev/postgres-context-server", pg_url],
-            env={**os.environ, "NPM_CONFIG_CACHE": "/tmp/.npm"}
-        )
-        mcp_status["postgres"] = "connected"
-    except Exception as e:
-        mcp_status["postgres"] = f"failed: {str(e)[:100]}"
-        logger.error("MCP Postgres Server failed", error=str(e))
-
+    pg_url = settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
+    mcp_service.register_server(
+        name="postgres",
+        command="npx",
+        args=["-y", "@zeddotdev/postgres-context-server", pg_url],
+        env={**os.environ, "NPM_CONFIG_CACHE": "/tmp/.npm"},
+        **mcp_options,
+    )
+    
     # 4. Filesystem Server
-    try:
-        project_root = cwd 
-        await mcp_service.connect_stdio_server(
-            name="filesystem",
-            command="npx",
-            args=["-y", "@modelcontextprotocol/server-filesystem", project_root],
-            env={**os.environ, "NPM_CONFIG_CACHE": "/tmp/.npm"}
-        )
-        mcp_status["filesystem"] = "connected"
-    except Exception as e:
-        mcp_status["filesystem"] = f"failed: {str(e)[:100]}"
-        logger.error("MCP Filesystem Server failed", error=str(e))
+    mcp_service.register_server(
+        name="filesystem",
+        command="npx",
+        args=["-y", "@modelcontextprotocol/server-filesystem", cwd],
+        env={**os.environ, "NPM_CONFIG_CACHE": "/tmp/.npm"},
+        **mcp_options,
+    )
     
-    logger.info("MCP Server Status", **mcp_status)
+    mcp_bootstrap = asyncio.create_task(mcp_service.start_all(), name="mcp-bootstrap")
+    
+    # === INBOX SYNC: one incremental IMAP sync feeds every inbox consumer ===
+    from app.services.inbox_sync import inbox_sync
+    from app.integrations.gmail import gmail_integration
+    from app.services.executive_assistant import executive_assistant, URGENT_COMMS_CONSUMER
+
+    inbox_sync.register_consumer("reply_listener", gmail_integration.handle_replies)
+    inbox_sync.register_consumer(URGENT_COMMS_CONSUMER, executive_assistant.handle_inbox_batch)
+    inbox_sync.start_idle()
     
     # === SUPEROS: Proactive Heartbeat (The 10 Elon Musks) ===
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -309,8 +312,8 @@ async def lifespan(app: FastAPI):
     async def schedule_trend_scan():
         await run_trend_scan()
 
-    # 6e. SMS Urgency Escalation Check: Every 5 minutes
-    @scheduler.scheduled_job(IntervalTrigger(minutes=5), id='sms_escalation_check')
+    # 6e. SMS Urgency Escalation Check: Every minute (claims due jobs from the delayed queue)
+    @scheduler.scheduled_job(IntervalTrigger(minutes=1), id='sms_escalation_check')
     async def schedule_sms_escalation_check():
         from app.services.notification_service import notification_service
         await notification_service.check_sms_escalations()
@@ -351,16 +354,28 @@ async def lifespan(app: FastAPI):
         from app.services.outreach_service import outreach_service
         await outreach_service.process_queue()
 
-    # 10b. IMAP Reply Listener: Every 3 minutes
+    # 10b. IMAP Reply Listener: Every 3 minutes (fallback for IMAP IDLE push)
     @scheduler.scheduled_job(IntervalTrigger(minutes=3), id='imap_reply_listener')
     async def schedule_imap_reply_listener():
-        """Poll IMAP for unseen replies and publish to SDR Event Bus"""
+        """Incremental IMAP sync; new replies are published to the SDR Event Bus"""
         from app.integrations.gmail import gmail_integration
         from app.core.database import AsyncSessionLocal
         
         async with AsyncSessionLocal() as db:
             await gmail_integration.listen_for_replies(db=db)
 
+    # 10c. Media Job Poller: resolves in-flight Kling/Imagen/TTS jobs in one batched pass
+    @scheduler.scheduled_job(
+        IntervalTrigger(seconds=settings.media_job_poll_interval_seconds),
+        id='media_job_poller',
+        max_instances=1,
+        coalesce=True,
+    )
+    async def schedule_media_job_poller():
+        """Poll due media jobs and fire their completion callbacks"""
+        from app.services.media_jobs import media_job_service
+        await media_job_service.poll_due_jobs()
+
     # 11. Autonomous Agent Scan: Every 2 hours
     @scheduler.scheduled_job(IntervalTrigger(hours=2), id='autonomous_scan')
     async def schedule_autonomous_scan():
@@ -381,8 +396,24 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down MomentAIc API")
     scheduler.shutdown(wait=False)
+    await inbox_sync.stop_idle()
     await close_db()
+    mcp_bootstrap.cancel()
     await mcp_service.cleanup()
+    from app.services.media_jobs import media_job_service
+    await media_job_service.close()
+    from app.services.integration_sync import integration_sync
+    await integration_sync.close()
+    from app.core.events import event_hub
+    await event_hub.close()
+    from app.services.notification_dispatch import web_push_sender
+    await web_push_sender.close()
+    from app.services.deliverable_service import deliverable_service
+    await deliverable_service.close()
+    from app.services.source_fetcher import source_fetcher
+    await source_fetcher.close()
+    from app.services.link_checker import link_checker
+    await link_checker.close()
 
 
 # Create FastAPI app
@@ -569,10 +600,15 @@ async def health_check():
     if not settings.google_api_key:
         overall = "degraded"
     
-    # Check MCP servers
+    # Check MCP servers (still "starting" while the background bootstrap runs)
     from app.services.mcp_client import mcp_service
-    mcp_servers = list(mcp_service._sessions.keys())
+    mcp_servers = mcp_service.connected_servers()
     checks["mcp_servers"] = mcp_servers if mcp_servers else "none_connected"
+    checks["mcp"] = {
+        "ready": mcp_service.ready,
+        "servers": mcp_service.states(),
+        "pools": mcp_service.pool_stats(),
+    }
     
     return {
         "status": overall,
@@ -583,6 +619,31 @@ async def health_check():
     }
 
 
+async def require_metrics_access(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """Scrapers present METRICS_SCRAPE_TOKEN as a bearer token; anyone else must be an admin."""
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    token = settings.metrics_scrape_token
+    if token and hmac.compare_digest(credentials.credentials, token):
+        return
+    user = await get_current_user(credentials, db)
+    await AdminGuard.require_admin(user)
+
+
+@app.get("/api/v1/metrics", dependencies=[Depends(require_metrics_access)])
+async def metrics_snapshot(prefix: str = ""):
+    """In-process latency / error histograms for this worker (per-tenant counters: admins/scrapers only)"""
+    from app.core.metrics import metrics
+    return metrics.snapshot(prefix)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
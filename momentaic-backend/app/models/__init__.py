@@ -27,6 +27,7 @@ from app.models.action_item import (
 
 from app.models.social import (
     SocialPost,
+    PostEngagement,
     PostStatus,
     SocialPlatform,
 )
@@ -164,6 +165,26 @@ from app.models.platform_account import (
     PlatformAccount,
 )
 
+from app.models.media_job import (
+    MediaJob,
+    MediaJobProvider,
+    MediaJobStatus,
+)
+
+from app.models.goal import (
+    StartupGoal,
+    GoalStatus,
+    GoalPriority,
+)
+
+from app.models.revenue import (
+    StripeRevenueState,
+    StripeSubscriptionRecord,
+    StripeCustomerRecord,
+    RevenueMonthlyBucket,
+    StripeEventLog,
+)
+
 __all__ = [
     # User
     "User",
@@ -263,4 +284,23 @@ __all__ = [
     "ScrapedProfile",
     # Platform Accounts (Scraper)
     "PlatformAccount",
+    # Media Jobs
+    "MediaJob",
+    "MediaJobProvider",
+    "MediaJobStatus",
+    # Goals
+    "StartupGoal",
+    "GoalStatus",
+    "GoalPriority",
+    # Revenue (materialized Stripe metrics)
+    "StripeRevenueState",
+    "StripeSubscriptionRecord",
+    "StripeCustomerRecord",
+    "RevenueMonthlyBucket",
+    "StripeEventLog",
+    # Social
+    "SocialPost",
+    "PostEngagement",
+    "PostStatus",
+    "SocialPlatform",
 ]
@@ -0,0 +1,86 @@
+"""
+Startup Goal Models
+Durable storage for GoalTracker goals, shared by every worker.
+"""
+
+import uuid
+import enum
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    String, DateTime, Text, Float,
+    ForeignKey, Enum as SQLEnum, Index
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.core.database import Base
+
+
+class GoalStatus(str, enum.Enum):
+    """Status of a goal"""
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    BLOCKED = "blocked"
+    CANCELLED = "cancelled"
+
+
+class GoalPriority(str, enum.Enum):
+    """Goal priority levels"""
+    CRITICAL = "critical"  # Must do today
+    HIGH = "high"          # This week
+    MEDIUM = "medium"      # This month
+    LOW = "low"            # Someday
+
+
+ACTIVE_GOAL_STATUSES = (GoalStatus.PENDING, GoalStatus.IN_PROGRESS, GoalStatus.BLOCKED)
+
+
+class StartupGoal(Base):
+    """
+    A goal tracked against a startup metric.
+    The (status, deadline) index backs the all-tenant overdue sweep.
+    """
+    __tablename__ = "startup_goals"
+    __table_args__ = (
+        Index("ix_startup_goals_status_deadline", "status", "deadline"),
+        Index("ix_startup_goals_startup", "startup_id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False
+    )
+
+    # ─── Definition ───
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    target_metric: Mapped[str] = mapped_column(String(100), nullable=False)
+    target_value: Mapped[float] = mapped_column(Float, nullable=False)
+    current_value: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    priority: Mapped[GoalPriority] = mapped_column(
+        SQLEnum(GoalPriority), default=GoalPriority.MEDIUM, nullable=False
+    )
+    phase: Mapped[str] = mapped_column(String(50), nullable=False, default="idea")
+    assigned_agent_chain: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    notes: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+
+    # ─── Lifecycle ───
+    status: Mapped[GoalStatus] = mapped_column(
+        SQLEnum(GoalStatus), default=GoalStatus.PENDING, nullable=False
+    )
+    deadline: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_nagged_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # ─── Timestamps ───
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -105,6 +105,7 @@ class Lead(Base):
 
     __table_args__ = (
         Index("ix_leads_startup_status", "startup_id", "status"),
+        Index("ix_leads_startup_created", "startup_id", "created_at"),
         Index("ix_leads_autopilot", "autopilot_enabled"),
     )
 
@@ -223,6 +224,7 @@ class ContentItem(Base):
 
     __table_args__ = (
         Index("ix_content_startup_platform", "startup_id", "platform"),
+        Index("ix_content_startup_updated", "startup_id", "updated_at"),
         Index("ix_content_status", "status"),
         Index("ix_content_scheduled", "scheduled_for"),
     )
@@ -0,0 +1,95 @@
+"""
+Media Job Models
+Durable tracking for long-running generative media tasks (Kling video, Imagen, TTS).
+Jobs are submitted once and resolved later by the batched poller or a provider webhook.
+"""
+
+import uuid
+import enum
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    String, DateTime, Text, Integer,
+    ForeignKey, Enum as SQLEnum, Index
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+from app.core.database import Base
+
+
+class MediaJobProvider(str, enum.Enum):
+    KLING = "kling"          # PiAPI Kling (video + avatar)
+    IMAGEN = "imagen"        # Gemini Imagen 3
+    TTS = "tts"              # DashScope / AgentForge voice
+
+
+class MediaJobStatus(str, enum.Enum):
+    PENDING = "pending"          # Row created, not yet accepted by provider
+    PROCESSING = "processing"    # Provider accepted the task, awaiting result
+    COMPLETED = "completed"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+
+    @property
+    def is_terminal(self) -> bool:
+        return self in (MediaJobStatus.COMPLETED, MediaJobStatus.FAILED, MediaJobStatus.TIMED_OUT)
+
+
+class MediaJob(Base):
+    """
+    A single provider-side media generation task.
+    Survives restarts: the poller picks up every non-terminal job whose
+    next_poll_at is due, regardless of which worker submitted it.
+    """
+    __tablename__ = "media_jobs"
+    __table_args__ = (
+        Index("ix_media_jobs_status_next_poll", "status", "next_poll_at"),
+        Index("ix_media_jobs_provider_task", "provider", "external_task_id", unique=True),
+        Index("ix_media_jobs_startup", "startup_id"),
+        Index("ix_media_jobs_content", "character_content_id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    startup_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=True
+    )
+    character_content_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("character_content.id", ondelete="SET NULL"), nullable=True
+    )
+
+    # ─── Provider Task ───
+    provider: Mapped[MediaJobProvider] = mapped_column(SQLEnum(MediaJobProvider), nullable=False)
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g. "video_generation", "avatar"
+    external_task_id: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    request_payload: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+
+    # ─── Lifecycle ───
+    status: Mapped[MediaJobStatus] = mapped_column(
+        SQLEnum(MediaJobStatus), default=MediaJobStatus.PENDING, nullable=False
+    )
+    poll_attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_poll_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    deadline_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # ─── Result ───
+    result_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    result_payload: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # ─── Completion Callback ───
+    # Name of a handler registered with MediaJobService.register_callback
+    callback: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    callback_context: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
+    # ─── Timestamps ───
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,130 @@
+"""
+Revenue Models
+Materialized Stripe revenue state, maintained incrementally from Stripe events.
+
+The aggregate row (StripeRevenueState) holds the event cursor plus running
+totals; per-subscription / per-customer rows hold just enough to apply the
+next event as a delta; monthly buckets back the revenue timeline.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    String, DateTime, Integer, BigInteger, Boolean,
+    ForeignKey, Index
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class StripeRevenueState(Base):
+    """Per-startup revenue aggregates plus the Stripe /events cursor."""
+    __tablename__ = "stripe_revenue_state"
+
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), primary_key=True
+    )
+    integration_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("integrations.id", ondelete="SET NULL"), nullable=True
+    )
+
+    # Id of the newest Stripe event folded into the aggregates
+    event_cursor: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    last_event_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    mrr_cents: Mapped[int] = mapped_column(BigInteger, default=0)
+    active_subscriptions: Mapped[int] = mapped_column(Integer, default=0)
+    trialing_subscriptions: Mapped[int] = mapped_column(Integer, default=0)
+    customers_total: Mapped[int] = mapped_column(Integer, default=0)
+
+    last_rebuilt_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class StripeSubscriptionRecord(Base):
+    """Last known status and MRR contribution of a Stripe subscription."""
+    __tablename__ = "stripe_subscriptions"
+    __table_args__ = (
+        Index("ix_stripe_subscriptions_startup_sub", "startup_id", "subscription_id", unique=True),
+        Index("ix_stripe_subscriptions_startup_canceled", "startup_id", "canceled_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False
+    )
+    subscription_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    customer_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    mrr_cents: Mapped[int] = mapped_column(BigInteger, default=0)
+    canceled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Stripe `created` of the event that produced this state; older events are ignored
+    last_event_created: Mapped[int] = mapped_column(BigInteger, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class StripeCustomerRecord(Base):
+    """Known Stripe customers (for totals and new-this-month counts)."""
+    __tablename__ = "stripe_customers"
+    __table_args__ = (
+        Index("ix_stripe_customers_startup_customer", "startup_id", "customer_id", unique=True),
+        Index("ix_stripe_customers_startup_created", "startup_id", "created_at"),
+        Index("ix_stripe_customers_customer", "customer_id"),  # webhook → owning startup
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False
+    )
+    customer_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+class RevenueMonthlyBucket(Base):
+    """Gross and refunded charge volume per calendar month."""
+    __tablename__ = "revenue_monthly_buckets"
+    __table_args__ = (
+        Index("ix_revenue_buckets_startup_month", "startup_id", "month", unique=True),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False
+    )
+    month: Mapped[str] = mapped_column(String(7), nullable=False)  # "YYYY-MM"
+    gross_cents: Mapped[int] = mapped_column(BigInteger, default=0)
+    refunded_cents: Mapped[int] = mapped_column(BigInteger, default=0)
+    charge_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class StripeEventLog(Base):
+    """Stripe event ids already applied, so webhook and backfill never double-count."""
+    __tablename__ = "stripe_event_log"
+    __table_args__ = (
+        Index("ix_stripe_event_log_startup_event", "startup_id", "event_id", unique=True),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False
+    )
+    event_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
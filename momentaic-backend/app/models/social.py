@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, Integer
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum as SQLEnum, Integer, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
@@ -60,3 +60,31 @@ class SocialPost(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+
+
+class PostEngagement(Base):
+    """
+    Engagement fact per published post and platform.
+    Rows are created when a post is published and updated as platform
+    metrics arrive; GrowthLoopEngine aggregates over this table in SQL.
+    """
+    __tablename__ = "post_engagement"
+    __table_args__ = (
+        Index("ix_post_engagement_startup_published", "startup_id", "published_at"),
+    )
+
+    post_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("social_posts.id", ondelete="CASCADE"), primary_key=True
+    )
+    platform: Mapped[str] = mapped_column(String(50), primary_key=True)
+    startup_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("startups.id", ondelete="CASCADE"), nullable=False
+    )
+    published_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # Metrics
+    likes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    shares: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # retweets / reposts
+    comments: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    engagement: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # likes + shares + comments
+    metrics_updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
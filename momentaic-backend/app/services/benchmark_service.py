@@ -2,27 +2,91 @@
 Benchmark Engine Service
 Aggregates unstructured JSON metrics across startups to provide anonymized
 industry peer benchmarks.
+
+Percentiles are precomputed in Redis rather than scanned per request:
+- every (industry, metric) pair has a t-digest sketch, updated incrementally
+  when a startup's metrics change, and a summary hash holding median/p75/p90,
+  so a benchmark read is one HGETALL
+- sketches cannot forget values: a replaced value is counted as stale, and the
+  sketch is rebuilt from the stored member values once stale weight exceeds
+  STALE_REBUILD_RATIO of the live count
+- a nightly job recomputes exact percentiles from Postgres, replaces the
+  sketches and records how far the served numbers had drifted
 """
 
-from typing import Dict, Any, List
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 import numpy as np
 
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
 from app.models.startup import Startup, StartupStage
+from app.services.quantile_sketch import TDigest
 
 logger = structlog.get_logger()
 
+MIN_PEERS = 3               # Need at least 3 data points for a meaningful percentile
+STALE_REBUILD_RATIO = 0.25
+RECOMPUTE_BATCH_SIZE = 1000
+DRIFT_THRESHOLD = 0.05      # relative error reported as drift
+DRIFT_REPORT_LIMIT = 20
+
+_INDUSTRY_OF_KEY = "benchmarks:industry"   # HASH startup_id -> industry key
+_DRIFT_KEY = "benchmarks:drift"            # JSON report of the last exact recompute
+
+
+def _members_key(industry: str) -> str:
+    return f"benchmarks:members:{industry}"   # HASH startup_id -> JSON numeric metrics
+
+
+def _sketch_key(industry: str) -> str:
+    return f"benchmarks:sketch:{industry}"    # HASH metric -> JSON {digest, stale}
+
+
+def _summary_key(industry: str) -> str:
+    return f"benchmarks:summary:{industry}"   # HASH metric -> JSON percentiles
+
+
+def industry_key(industry: Optional[str]) -> Optional[str]:
+    return industry.strip().lower() if industry and industry.strip() else None
+
+
+def numeric_metrics(metrics_json: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    return {
+        key: float(val)
+        for key, val in (metrics_json or {}).items()
+        if isinstance(val, (int, float)) and not isinstance(val, bool)
+    }
+
+
+def _summary(median: float, p75: float, p90: float, count: int) -> Dict[str, Any]:
+    return {
+        "median": round(float(median), 2),
+        "top_25": round(float(p75), 2),
+        "top_10": round(float(p90), 2),
+        "count": int(count),
+    }
+
+
 class BenchmarkService:
-    
+
+    # ─── Reads ───────────────────────────────────────────────────────────────
+
     async def get_industry_benchmarks(self, db: AsyncSession, startup_id: str) -> Dict[str, Any]:
         """
         Calculate metrics percentiles for businesses in the same industry.
+
+        Served from the precomputed summaries; percentiles cover the whole
+        industry, peer_count excludes the startup itself.
         """
         # 1. Get current startup
         from uuid import UUID
-        
+
         try:
             sid = UUID(startup_id)
         except ValueError:
@@ -30,51 +94,82 @@ class BenchmarkService:
 
         result = await db.execute(select(Startup).where(Startup.id == sid))
         current_startup = result.scalar_one_or_none()
-        
+
         if not current_startup or not current_startup.industry:
             return {}
-            
+
+        industry = current_startup.industry
+        key = industry_key(industry)
+
+        # 2. Precomputed summaries; an industry Redis has never seen (or a Redis
+        # outage) falls back to the exact scan
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hgetall(_summary_key(key))
+                pipe.hlen(_members_key(key))
+                pipe.hexists(_members_key(key), str(sid))
+                summaries, members, is_member = await pipe.execute()
+        except Exception as e:
+            logger.warning("Benchmark summaries unavailable", industry=industry, error=str(e))
+            members = 0
+
+        if not members:
+            metrics.inc("benchmark_reads_total", source="exact")
+            return await self._exact_benchmarks(db, current_startup)
+        metrics.inc("benchmark_reads_total", source="sketch")
+
+        peer_count = members - (1 if is_member else 0)
+        # If we have < 3 peers, we inject some synthetic data so the user gets a "Wow" factor immediately.
+        # In a real production system we'd wait for real data, but for our MVP this solves the cold start.
+        if peer_count < MIN_PEERS:
+            logger.info("Cold start detected for industry benchmarks. Seeding synthetic peers.", industry=industry)
+            return self._generate_synthetic_benchmarks(industry, current_startup)
+
+        benchmarks = {}
+        for metric, raw in summaries.items():
+            summary = json.loads(raw)
+            if summary["count"] >= MIN_PEERS:
+                benchmarks[metric] = summary
+
+        return {
+            "industry": industry,
+            "peer_count": peer_count,
+            "benchmarks": benchmarks,
+            "current_metrics": current_startup.metrics or {}
+        }
+
+    async def _exact_benchmarks(self, db: AsyncSession, current_startup: Startup) -> Dict[str, Any]:
+        """Scan every peer and compute exact percentiles (pre-sketch behaviour)."""
         industry = current_startup.industry
-        
-        # 2. Get all other startups in the same industry
+
+        # Get all other startups in the same industry
         peers_result = await db.execute(
             select(Startup)
             .where(
                 and_(
                     Startup.industry == industry,
-                    Startup.id != sid
+                    Startup.id != current_startup.id
                 )
             )
         )
         peers = peers_result.scalars().all()
-        
-        # If we have < 3 peers, we inject some synthetic data so the user gets a "Wow" factor immediately.
-        # In a real production system we'd wait for real data, but for our MVP this solves the cold start.
-        if len(peers) < 3:
+
+        if len(peers) < MIN_PEERS:
             logger.info("Cold start detected for industry benchmarks. Seeding synthetic peers.", industry=industry)
             return self._generate_synthetic_benchmarks(industry, current_startup)
 
-        # 3. Aggregate metrics
+        # Aggregate metrics
         aggregated_metrics: Dict[str, List[float]] = {}
         for peer in peers:
-            metrics = peer.metrics or {}
-            for key, val in metrics.items():
-                if isinstance(val, (int, float)):
-                    if key not in aggregated_metrics:
-                        aggregated_metrics[key] = []
-                    aggregated_metrics[key].append(float(val))
-                    
-        # 4. Calculate percentiles
+            for key, val in numeric_metrics(peer.metrics).items():
+                aggregated_metrics.setdefault(key, []).append(val)
+
+        # Calculate percentiles
         benchmarks = {}
         for key, values in aggregated_metrics.items():
-            if len(values) >= 3: # Need at least 3 data points for a meaningful percentile
-                benchmarks[key] = {
-                    "median": round(np.percentile(values, 50), 2),
-                    "top_25": round(np.percentile(values, 75), 2),
-                    "top_10": round(np.percentile(values, 90), 2),
-                    "count": len(values)
-                }
-                
+            if len(values) >= MIN_PEERS:
+                benchmarks[key] = _summary(*np.percentile(values, [50, 75, 90]), len(values))
+
         return {
             "industry": industry,
             "peer_count": len(peers),
@@ -82,13 +177,186 @@ class BenchmarkService:
             "current_metrics": current_startup.metrics or {}
         }
 
+    # ─── Incremental updates ─────────────────────────────────────────────────
+
+    async def record(self, startup: Startup) -> None:
+        """Hook for API writes; never fails the caller (the nightly recompute heals misses)."""
+        try:
+            await self._apply(str(startup.id), industry_key(startup.industry), numeric_metrics(startup.metrics))
+        except Exception as e:
+            logger.warning("Benchmark update failed", startup_id=str(startup.id), error=str(e))
+
+    async def remove(self, startup_id: str) -> None:
+        try:
+            await self._apply(str(startup_id), None, {})
+        except Exception as e:
+            logger.warning("Benchmark removal failed", startup_id=str(startup_id), error=str(e))
+
+    async def _apply(self, member: str, industry: Optional[str], values: Dict[str, float]) -> None:
+        old_industry = await redis_client.hget(_INDUSTRY_OF_KEY, member)
+        old_values: Dict[str, float] = {}
+        if old_industry:
+            raw = await redis_client.hget(_members_key(old_industry), member)
+            old_values = json.loads(raw) if raw else {}
+
+        # (industry, metric) -> [values added, values retired]
+        touched: Dict[Tuple[str, str], List[List[float]]] = {}
+        if old_industry:
+            for metric, value in old_values.items():
+                if old_industry != industry or values.get(metric) != value:
+                    touched.setdefault((old_industry, metric), [[], []])[1].append(value)
+        if industry:
+            for metric, value in values.items():
+                if old_industry != industry or old_values.get(metric) != value:
+                    touched.setdefault((industry, metric), [[], []])[0].append(value)
+        if not touched and old_industry == industry:
+            return
+
+        # Member bookkeeping first, so a rebuild below sees the new values
+        async with redis_client.pipeline(transaction=True) as pipe:
+            if old_industry and old_industry != industry:
+                pipe.hdel(_members_key(old_industry), member)
+            if industry:
+                pipe.hset(_members_key(industry), member, json.dumps(values))
+                pipe.hset(_INDUSTRY_OF_KEY, member, industry)
+            else:
+                pipe.hdel(_INDUSTRY_OF_KEY, member)
+            await pipe.execute()
+
+        for (ind, metric), (added, retired) in touched.items():
+            raw = await redis_client.hget(_sketch_key(ind), metric)
+            state = json.loads(raw) if raw else {"digest": TDigest().to_dict(), "stale": 0}
+            digest = TDigest.from_dict(state["digest"])
+            for value in added:
+                digest.add(value)
+            stale = state["stale"] + len(retired)
+            live = digest.count - stale
+
+            if stale and stale > STALE_REBUILD_RATIO * max(live, 0):
+                digest, stale = await self._rebuild(ind, metric), 0
+                live = digest.count
+                metrics.inc("benchmark_sketch_rebuilds_total")
+
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if live > 0:
+                    pipe.hset(_sketch_key(ind), metric, json.dumps({"digest": digest.to_dict(), "stale": stale}))
+                    pipe.hset(_summary_key(ind), metric, json.dumps(_summary(
+                        digest.quantile(0.5), digest.quantile(0.75), digest.quantile(0.9), live,
+                    )))
+                else:
+                    pipe.hdel(_sketch_key(ind), metric)
+                    pipe.hdel(_summary_key(ind), metric)
+                await pipe.execute()
+
+    async def _rebuild(self, industry: str, metric: str) -> TDigest:
+        """Fresh sketch of one metric from the industry's current member values."""
+        members = await redis_client.hgetall(_members_key(industry))
+        values = (json.loads(raw).get(metric) for raw in members.values())
+        return TDigest.of(v for v in values if v is not None)
+
+    # ─── Nightly exact recompute ─────────────────────────────────────────────
+
+    async def recompute_all(self) -> Dict[str, Any]:
+        """
+        Recompute exact percentiles for every industry from Postgres, replace the
+        sketches and report how far the served summaries had drifted.
+        """
+        groups: Dict[str, Dict[str, Dict[str, float]]] = {}
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(Startup.id, Startup.industry, Startup.metrics)
+                .where(Startup.industry.isnot(None))
+                .execution_options(yield_per=RECOMPUTE_BATCH_SIZE)
+            )
+            async for rows in result.partitions(RECOMPUTE_BATCH_SIZE):
+                for sid, industry, metrics_json in rows:
+                    key = industry_key(industry)
+                    if key:
+                        groups.setdefault(key, {})[str(sid)] = numeric_metrics(metrics_json)
+
+        drift: List[Dict[str, Any]] = []
+        for industry, members in groups.items():
+            served = await redis_client.hgetall(_summary_key(industry))
+            columns: Dict[str, List[float]] = {}
+            for values in members.values():
+                for metric, value in values.items():
+                    columns.setdefault(metric, []).append(value)
+
+            sketches, summaries = {}, {}
+            for metric, values in columns.items():
+                exact = _summary(*np.percentile(values, [50, 75, 90]), len(values))
+                sketches[metric] = json.dumps({"digest": TDigest.of(values).to_dict(), "stale": 0})
+                summaries[metric] = json.dumps(exact)
+                if metric in served:
+                    drift.extend(self._drift(industry, metric, json.loads(served[metric]), exact))
+
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for key in (_members_key(industry), _sketch_key(industry), _summary_key(industry)):
+                    pipe.delete(key)
+                pipe.hset(_members_key(industry), mapping={sid: json.dumps(v) for sid, v in members.items()})
+                if columns:
+                    pipe.hset(_sketch_key(industry), mapping=sketches)
+                    pipe.hset(_summary_key(industry), mapping=summaries)
+                pipe.hset(_INDUSTRY_OF_KEY, mapping={sid: industry for sid in members})
+                await pipe.execute()
+
+        # Industries with no startups left
+        prefix = _summary_key("")
+        async for key in redis_client.scan_iter(match=f"{prefix}*"):
+            industry = key[len(prefix):]
+            if industry not in groups:
+                await redis_client.delete(_members_key(industry), _sketch_key(industry), key)
+        indexed = await redis_client.hgetall(_INDUSTRY_OF_KEY)
+        gone = [sid for sid, industry in indexed.items() if sid not in groups.get(industry, {})]
+        if gone:
+            await redis_client.hdel(_INDUSTRY_OF_KEY, *gone)
+
+        report = self._drift_report(groups, drift)
+        await redis_client.set(_DRIFT_KEY, json.dumps(report))
+        logger.info(
+            "Benchmarks recomputed",
+            industries=report["industries"], metrics=report["metrics"],
+            max_drift=report["max_drift"], drifted=report["drifted"],
+        )
+        return report
+
+    @staticmethod
+    def _drift(industry: str, metric: str, served: Dict[str, Any], exact: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = []
+        for stat in ("median", "top_25", "top_10"):
+            error = abs(served[stat] - exact[stat]) / max(abs(exact[stat]), 1e-9)
+            metrics.observe("benchmark_sketch_drift", error, buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 1.0))
+            rows.append({
+                "industry": industry, "metric": metric, "stat": stat,
+                "served": served[stat], "exact": exact[stat], "drift": round(error, 4),
+            })
+        return rows
+
+    @staticmethod
+    def _drift_report(groups: Dict[str, Dict[str, Dict[str, float]]], drift: List[Dict[str, Any]]) -> Dict[str, Any]:
+        errors = [row["drift"] for row in drift]
+        worst = sorted((row for row in drift if row["drift"] > DRIFT_THRESHOLD), key=lambda r: -r["drift"])
+        return {
+            "generated_at": datetime.utcnow().isoformat(),
+            "industries": len(groups),
+            "metrics": len({(row["industry"], row["metric"]) for row in drift}),
+            "max_drift": max(errors, default=0.0),
+            "mean_drift": round(sum(errors) / len(errors), 4) if errors else 0.0,
+            "drifted": len(worst),
+            "worst": worst[:DRIFT_REPORT_LIMIT],
+        }
+
+    async def last_drift_report(self) -> Optional[Dict[str, Any]]:
+        raw = await redis_client.get(_DRIFT_KEY)
+        return json.loads(raw) if raw else None
+
     def _generate_synthetic_benchmarks(self, industry: str, startup: Startup) -> Dict[str, Any]:
         """
         Generates realistic-looking synthetic benchmarks for cold-starts based on
         the startup's own metrics or industry averages.
         """
         base_metrics = startup.metrics or {}
-        
+
         # Defaults if startup hasn't entered metrics
         if not base_metrics:
             base_metrics = {
@@ -97,7 +365,7 @@ class BenchmarkService:
                 "ltv": 1200,
                 "retention_rate": 85
             }
-            
+
         synthetic_benchmarks = {}
         for key, current_val in base_metrics.items():
             if isinstance(current_val, (int, float)):
@@ -109,7 +377,7 @@ class BenchmarkService:
                     "top_10": round(median * 2.5, 2),
                     "count": 42  # Synthetic peer count
                 }
-                
+
         # Fill in missing common ones if they aren't there
         if "mrr" not in synthetic_benchmarks:
             synthetic_benchmarks["mrr"] = {"median": 5000, "top_25": 12000, "top_10": 55000, "count": 42}
@@ -122,5 +390,5 @@ class BenchmarkService:
             "benchmarks": synthetic_benchmarks,
             "current_metrics": base_metrics
         }
-        
+
 benchmark_service = BenchmarkService()
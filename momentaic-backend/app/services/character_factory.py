@@ -270,19 +270,26 @@ Product to Promote: {product_to_promote}"""
             script_override=script or None,
         )
 
-        # Store as CharacterContent
+        # Store as CharacterContent (stays GENERATING until media jobs resolve)
+        pending_jobs = result.get("content_data", {}).get("pending_media_jobs", [])
         content_piece = CharacterContent(
             character_id=character.id,
             platform=CharacterPlatform(platform),
             content_type=CharacterContentType.VIDEO,
             content_data=result.get("content_data", {}),
             generation_pipeline=result.get("pipeline", {}),
-            status=CharacterContentStatus.REVIEW,
+            status=CharacterContentStatus.GENERATING if pending_jobs else CharacterContentStatus.REVIEW,
             funnel_stage=FunnelStage(funnel_stage) if funnel_stage else None,
             cost_usd=result.get("total_cost_usd", 0),
             virality_score=result.get("virality_score"),
         )
         db.add(content_piece)
+        await db.flush()
+
+        if pending_jobs:
+            from app.services.media_jobs import media_job_service
+            await media_job_service.attach_to_content(db, pending_jobs, content_piece.id)
+
         await db.commit()
         await db.refresh(content_piece)
 
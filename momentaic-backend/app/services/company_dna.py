@@ -3,21 +3,50 @@ Company DNA Service — The Institutional Memory
 Auto-generates and maintains a Company DNA Markdown document per startup.
 All agents read this on every heartbeat to stay aligned.
 OpenClaw-inspired: like HEARTBEAT.md but at the organizational level.
+
+The rendered document is cached in Redis per startup under a generation
+counter. Committed writes to global memories ("*" scope) or to the startup's
+rendered fields bump the counter (ORM session events), so readers never get
+a document older than the last committed write and never rebuild one that
+is still current.
 """
 
+import itertools
 import json
 import structlog
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Set
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.core.cache_invalidation import CommitInvalidationHooks
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
 from app.models.startup import Startup
 from app.models.agent_memory import AgentMemoryEntry
 
 logger = structlog.get_logger()
 
+DNA_CACHE_TTL_SECONDS = 3600
+DNA_MEMORY_LIMIT = 20
+GLOBAL_SCOPE = "*"
+
+# Columns that end up in the document. Writes touching nothing else (e.g. the
+# access_count bump on every recall()) keep the cached copy.
+RENDERED_MEMORY_FIELDS = ("startup_id", "agent_name", "memory_type", "key", "value", "importance")
+RENDERED_STARTUP_FIELDS = ("name", "stage", "industry", "metrics")
+
+
+def _document_key(startup_id: UUID, generation: int) -> str:
+    return f"company_dna:{startup_id}:g{generation}"
+
+
+def _generation_key(startup_id: UUID) -> str:
+    return f"company_dna_gen:{startup_id}"
+
 
 class CompanyDNAService:
     """
@@ -86,13 +115,41 @@ class CompanyDNAService:
         return dna
 
     async def get_dna(self, db: AsyncSession, startup_id: str) -> Optional[str]:
-        """Get or generate the Company DNA document for a startup."""
+        """Get the cached Company DNA document for a startup, generating it on miss."""
         try:
-            from uuid import UUID
             sid = UUID(startup_id)
+        except ValueError:
+            return None
+
+        generation = 0
+        try:
+            generation = int(await redis_client.get(_generation_key(sid)) or 0)
+            cached = await redis_client.get(_document_key(sid, generation))
+        except Exception as e:
+            logger.warning("Company DNA cache unavailable", error=str(e))
+            cached = None
 
+        if cached:
+            metrics.inc("company_dna_cache_total", result="hit")
+            return cached
+
+        metrics.inc("company_dna_cache_total", result="miss")
+        dna = await self.build_dna(db, sid)
+        if dna is None:
+            return None
+        try:
+            # Stored under the generation read before building: if a write
+            # committed meanwhile, readers have moved on to the next one.
+            await redis_client.set(_document_key(sid, generation), dna, ex=DNA_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("Company DNA cache write failed", error=str(e))
+        return dna
+
+    async def build_dna(self, db: AsyncSession, startup_id: UUID) -> Optional[str]:
+        """Render the Company DNA document from the database."""
+        try:
             # Fetch startup
-            result = await db.execute(select(Startup).where(Startup.id == sid))
+            result = await db.execute(select(Startup).where(Startup.id == startup_id))
             startup = result.scalar_one_or_none()
             if not startup:
                 return None
@@ -101,18 +158,18 @@ class CompanyDNAService:
             mem_result = await db.execute(
                 select(AgentMemoryEntry)
                 .where(
-                    AgentMemoryEntry.startup_id == sid,
-                    AgentMemoryEntry.agent_name == "*",  # Global memories
+                    AgentMemoryEntry.startup_id == startup_id,
+                    AgentMemoryEntry.agent_name == GLOBAL_SCOPE,  # Global memories
                 )
                 .order_by(AgentMemoryEntry.importance.desc())
-                .limit(20)
+                .limit(DNA_MEMORY_LIMIT)
             )
             memories = list(mem_result.scalars().all())
 
             return self._generate_dna_markdown(startup, memories)
 
         except Exception as e:
-            logger.error("Failed to generate Company DNA", startup_id=startup_id, error=str(e))
+            logger.error("Failed to generate Company DNA", startup_id=str(startup_id), error=str(e))
             return None
 
     async def update_dna_entry(
@@ -124,8 +181,10 @@ class CompanyDNAService:
         memory_type: str = "strategy",
         importance: int = 7,
     ) -> None:
-        """Write a new entry to the Company DNA (persisted in agent memory)."""
-        from uuid import UUID
+        """
+        Write a new entry to the Company DNA (persisted in agent memory).
+        The cached document is invalidated when the caller's session commits.
+        """
         from app.models.agent_memory import MemoryType
 
         try:
@@ -135,7 +194,7 @@ class CompanyDNAService:
 
         entry = AgentMemoryEntry(
             startup_id=UUID(startup_id),
-            agent_name="*",  # Global scope — all agents can read
+            agent_name=GLOBAL_SCOPE,  # Global scope — all agents can read
             memory_type=mem_type,
             key=key,
             value=value,
@@ -145,3 +204,50 @@ class CompanyDNAService:
         await db.flush()
 
         logger.info("Company DNA updated", startup_id=startup_id, key=key)
+
+    # ─── Invalidation ────────────────────────────────────────────────────────
+
+    async def invalidate(self, *startup_ids: UUID) -> None:
+        """Bump the generation counter so cached documents for these startups are skipped."""
+        if not startup_ids:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for startup_id in startup_ids:
+                    pipe.incr(_generation_key(startup_id))
+                    pipe.expire(_generation_key(startup_id), DNA_CACHE_TTL_SECONDS * 4)
+                await pipe.execute()
+            metrics.inc("company_dna_invalidations_total", amount=len(startup_ids))
+        except Exception as e:
+            logger.warning("Company DNA invalidation failed", error=str(e))
+
+
+def _rendered_change(obj, fields) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+
+def touched_startups(session: Session) -> Set[UUID]:
+    """Startup ids whose Company DNA is affected by the pending flush of `session`."""
+    startup_ids: Set[UUID] = set()
+    for obj in itertools.chain(session.new, session.deleted):
+        if isinstance(obj, Startup):
+            startup_ids.add(obj.id)
+        elif isinstance(obj, AgentMemoryEntry) and obj.agent_name == GLOBAL_SCOPE:
+            startup_ids.add(obj.startup_id)
+    for obj in session.dirty:
+        if isinstance(obj, Startup) and _rendered_change(obj, RENDERED_STARTUP_FIELDS):
+            startup_ids.add(obj.id)
+        elif isinstance(obj, AgentMemoryEntry) and _rendered_change(obj, RENDERED_MEMORY_FIELDS):
+            # An entry moving out of the global scope also changes the document
+            if obj.agent_name == GLOBAL_SCOPE or GLOBAL_SCOPE in inspect(obj).attrs.agent_name.history.deleted:
+                startup_ids.add(obj.startup_id)
+    startup_ids.discard(None)
+    return startup_ids
+
+
+# Singleton
+company_dna_service = CompanyDNAService()
+
+# Invalidate cached documents when global memory or the startup changes
+invalidation_hooks = CommitInvalidationHooks("company_dna", touched_startups, company_dna_service.invalidate)
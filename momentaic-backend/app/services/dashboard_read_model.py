@@ -0,0 +1,265 @@
+"""
+Dashboard Read Model
+Cached, concurrently-built payload for GET /startups/{id}/dashboard.
+
+- Lead summary is one GROUP BY status query instead of a COUNT per status
+- Independent queries run concurrently, each lane on its own pooled connection
+- The serialized payload is cached in Redis per startup under a generation
+  counter; writes to leads, content, workflow logs, signals, sprints and the
+  startup itself bump the counter on commit (ORM session events), so a stale
+  build racing a write can never be served after the write lands
+- Cache hit/miss counters and build latency in app.core.metrics
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Dict, List, Set
+from uuid import UUID
+
+import structlog
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.database import AsyncSessionLocal
+from app.core.cache_invalidation import CommitInvalidationHooks
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+from app.models.growth import ContentItem, ContentStatus, Lead, LeadStatus
+from app.models.startup import Signal, Sprint, Startup
+from app.models.workflow import LogLevel, Workflow, WorkflowLog, WorkflowRun
+
+logger = structlog.get_logger()
+
+CACHE_TTL_SECONDS = 300
+RECENT_ACTIVITY_LIMIT = 10
+
+
+def _payload_key(startup_id: UUID, generation: int) -> str:
+    return f"dashboard:{startup_id}:g{generation}"
+
+
+def _generation_key(startup_id: UUID) -> str:
+    return f"dashboard_gen:{startup_id}"
+
+
+class DashboardReadModel:
+    """Builds, caches and invalidates the startup dashboard payload."""
+
+    # ─── Reads ───────────────────────────────────────────────────────────────
+
+    async def get(self, startup_id: UUID) -> Dict[str, Any]:
+        """Cached payload for a startup, built on miss. Redis outages degrade to a rebuild."""
+        generation = 0
+        try:
+            generation = int(await redis_client.get(_generation_key(startup_id)) or 0)
+            cached = await redis_client.get(_payload_key(startup_id, generation))
+        except Exception as e:
+            logger.warning("Dashboard cache unavailable", error=str(e))
+            cached = None
+
+        if cached:
+            metrics.inc("dashboard_cache_total", result="hit")
+            return json.loads(cached)
+
+        metrics.inc("dashboard_cache_total", result="miss")
+        payload = await self.build(startup_id)
+        try:
+            await redis_client.set(
+                _payload_key(startup_id, generation), json.dumps(payload), ex=CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning("Dashboard cache write failed", error=str(e))
+        return payload
+
+    async def build(self, startup_id: UUID) -> Dict[str, Any]:
+        """Run the dashboard queries concurrently and assemble the JSON payload."""
+        from app.schemas.startup import SignalResponse, SprintResponse, StartupDashboard, StartupResponse
+
+        started = time.perf_counter()
+        (startup, signal, sprint), (lead_counts, content_scheduled), (leads, content), logs = await asyncio.gather(
+            self._lane(self._load_entities, startup_id),
+            self._lane(self._load_counts, startup_id),
+            self._lane(self._load_recent_items, startup_id),
+            self._lane(self._load_recent_logs, startup_id),
+        )
+        metrics.observe("dashboard_build_seconds", time.perf_counter() - started)
+
+        dashboard = StartupDashboard(
+            startup=StartupResponse.model_validate(startup),
+            latest_signal=SignalResponse.model_validate(signal) if signal else None,
+            active_sprint=SprintResponse.model_validate(sprint) if sprint else None,
+            lead_summary=lead_counts,
+            content_scheduled=content_scheduled,
+            recent_activity=self.recent_activity(startup, leads, content, logs),
+        )
+        return dashboard.model_dump(mode="json")
+
+    @staticmethod
+    async def _lane(loader, startup_id: UUID):
+        # One session (and pooled connection) per lane so lanes can overlap
+        async with AsyncSessionLocal() as db:
+            return await loader(db, startup_id)
+
+    # ─── Query Lanes ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    async def _load_entities(db, startup_id: UUID):
+        startup = (await db.execute(select(Startup).where(Startup.id == startup_id))).scalar_one()
+        signal = (await db.execute(
+            select(Signal)
+            .where(Signal.startup_id == startup_id)
+            .order_by(Signal.calculated_at.desc())
+            .limit(1)
+        )).scalar_one_or_none()
+        sprint = (await db.execute(
+            select(Sprint)
+            .where(Sprint.startup_id == startup_id, Sprint.status == "active")
+            .order_by(Sprint.created_at.desc())
+            .limit(1)
+        )).scalar_one_or_none()
+        return startup, signal, sprint
+
+    @classmethod
+    async def _load_counts(cls, db, startup_id: UUID):
+        lead_counts = await cls.lead_counts(db, startup_id)
+        content_scheduled = (await db.execute(
+            select(func.count(ContentItem.id)).where(
+                ContentItem.startup_id == startup_id,
+                ContentItem.status == ContentStatus.SCHEDULED,
+            )
+        )).scalar() or 0
+        return lead_counts, content_scheduled
+
+    @staticmethod
+    async def lead_counts(db, startup_id: UUID) -> Dict[str, int]:
+        """Lead count per status in one grouped query; statuses with no leads report 0."""
+        result = await db.execute(
+            select(Lead.status, func.count(Lead.id))
+            .where(Lead.startup_id == startup_id)
+            .group_by(Lead.status)
+        )
+        counts = {status.value: 0 for status in LeadStatus}
+        for status, count in result.all():
+            counts[LeadStatus(status).value] = count
+        return counts
+
+    @staticmethod
+    async def _load_recent_items(db, startup_id: UUID):
+        leads = (await db.execute(
+            select(Lead)
+            .where(Lead.startup_id == startup_id)
+            .order_by(Lead.created_at.desc())
+            .limit(5)
+        )).scalars().all()
+        content = (await db.execute(
+            select(ContentItem)
+            .where(ContentItem.startup_id == startup_id)
+            .order_by(ContentItem.updated_at.desc())
+            .limit(5)
+        )).scalars().all()
+        return leads, content
+
+    @staticmethod
+    async def _load_recent_logs(db, startup_id: UUID):
+        result = await db.execute(
+            select(WorkflowLog, Workflow.name)
+            .join(WorkflowRun, WorkflowLog.run_id == WorkflowRun.id)
+            .join(Workflow, WorkflowRun.workflow_id == Workflow.id)
+            .where(Workflow.startup_id == startup_id, WorkflowLog.level == LogLevel.SUCCESS)
+            .order_by(WorkflowLog.timestamp.desc())
+            .limit(RECENT_ACTIVITY_LIMIT)
+        )
+        return result.all()
+
+    @staticmethod
+    def recent_activity(startup, leads, content, logs) -> List[Dict[str, Any]]:
+        activities = []
+        for lead in leads:
+            activities.append({
+                "type": "lead_acquired",
+                "message": f"New lead identified: {lead.company_name}",
+                "timestamp": lead.created_at,
+                "agent": "Sales Hunter",
+                "status": "success",
+            })
+        for item in content:
+            action = "drafted"
+            if item.status == ContentStatus.SCHEDULED:
+                action = "scheduled"
+            elif item.status == ContentStatus.PUBLISHED:
+                action = "published"
+            activities.append({
+                "type": f"content_{action}",
+                "message": f"Content '{item.title[:30]}...' {action}",
+                "timestamp": item.updated_at,
+                "agent": "Content Strategist",
+                "status": "success",
+            })
+        for log, workflow_name in logs:
+            activities.append({
+                "type": "agent_action",
+                "message": f"{workflow_name}: {log.message}",
+                "timestamp": log.timestamp,
+                "agent": "Workflow Agent",
+                "status": "success",
+            })
+        activities.append({
+            "type": "startup_created",
+            "message": f"Startup '{startup.name}' initialized",
+            "timestamp": startup.created_at,
+            "agent": "System",
+            "status": "success",
+        })
+
+        activities = [a for a in activities if a["timestamp"] is not None]
+        activities.sort(key=lambda a: a["timestamp"], reverse=True)
+        return [{**a, "timestamp": a["timestamp"].isoformat()} for a in activities[:RECENT_ACTIVITY_LIMIT]]
+
+    # ─── Invalidation ────────────────────────────────────────────────────────
+
+    async def invalidate(self, *startup_ids: UUID) -> None:
+        """Bump the generation counter so cached payloads for these startups are skipped."""
+        if not startup_ids:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for startup_id in startup_ids:
+                    pipe.incr(_generation_key(startup_id))
+                    pipe.expire(_generation_key(startup_id), CACHE_TTL_SECONDS * 4)
+                await pipe.execute()
+            metrics.inc("dashboard_invalidations_total", amount=len(startup_ids))
+        except Exception as e:
+            logger.warning("Dashboard invalidation failed", error=str(e))
+
+
+def touched_startups(session: Session) -> Set[UUID]:
+    """Startup ids whose dashboard is affected by the pending flush of `session`."""
+    startup_ids: Set[UUID] = set()
+    run_ids: Set[UUID] = set()
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Startup):
+            startup_ids.add(obj.id)
+        elif isinstance(obj, (Lead, ContentItem, Signal, Sprint, Workflow)):
+            startup_ids.add(obj.startup_id)
+        elif isinstance(obj, WorkflowLog) and obj.level == LogLevel.SUCCESS:
+            run_ids.add(obj.run_id)
+
+    if run_ids:
+        # Logs only know their run; resolve the owning startups in one query
+        rows = session.execute(
+            select(Workflow.startup_id)
+            .join(WorkflowRun, WorkflowRun.workflow_id == Workflow.id)
+            .where(WorkflowRun.id.in_(run_ids))
+        )
+        startup_ids.update(rows.scalars())
+    startup_ids.discard(None)
+    return startup_ids
+
+
+# Singleton
+dashboard_read_model = DashboardReadModel()
+
+# Invalidate cached payloads on lead/content/workflow/signal/sprint/startup writes
+invalidation_hooks = CommitInvalidationHooks("dashboard", touched_startups, dashboard_read_model.invalidate)
@@ -0,0 +1,230 @@
+"""
+Delayed Job Queue
+Redis sorted-set scheduler for work that must run at (or after) a point in time.
+
+- Jobs live in a ZSET scored by due time plus a payload HASH, so finding due
+  work is one ZRANGEBYSCORE instead of a keyspace SCAN
+- claim_due() atomically moves a batch of due jobs into a "claimed" ZSET
+  scored by lease expiry (Lua), so concurrent pollers never share a job and a
+  worker that dies mid-batch has its jobs re-delivered once the lease lapses
+- run_due() hands whole batches to a handler so lookups can be batched too;
+  the handler returns the jobs to retry later, everything else is
+  acknowledged. A handler may also schedule() a claimed job again (recurring
+  reminders): ack only removes jobs that are still claimed
+"""
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+
+logger = structlog.get_logger()
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+
+# KEYS: due zset, claimed zset, payload hash, attempts hash
+# ARGV: now, batch limit, lease expiry
+_CLAIM_SCRIPT = """
+local now, limit = tonumber(ARGV[1]), tonumber(ARGV[2])
+local ids = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, limit)
+if #ids < limit then
+  local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, limit - #ids)
+  for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], id)
+    table.insert(ids, id)
+  end
+end
+local out = {}
+for _, id in ipairs(ids) do
+  redis.call('ZADD', KEYS[2], ARGV[3], id)
+  table.insert(out, id)
+  table.insert(out, redis.call('HGET', KEYS[3], id) or '')
+  table.insert(out, redis.call('HINCRBY', KEYS[4], id, 1))
+end
+return out
+"""
+
+# KEYS: claimed zset, payload hash, attempts hash; ARGV: job ids
+_ACK_SCRIPT = """
+local n = 0
+for _, id in ipairs(ARGV) do
+  if redis.call('ZREM', KEYS[1], id) == 1 then
+    redis.call('HDEL', KEYS[2], id)
+    redis.call('HDEL', KEYS[3], id)
+    n = n + 1
+  end
+end
+return n
+"""
+
+
+@dataclass
+class DelayedJob:
+    """A claimed job; `attempts` counts deliveries since it was scheduled, including this one."""
+    id: str
+    payload: Dict[str, Any]
+    due_at: float
+    attempts: int
+
+
+# Handler gets a batch and returns {job_id: retry_delay_seconds} for jobs to retry
+BatchHandler = Callable[[List[DelayedJob]], Awaitable[Optional[Dict[str, float]]]]
+
+
+class DelayedJobQueue:
+    """Named delayed-job queue backed by Redis sorted sets."""
+
+    def __init__(
+        self,
+        name: str,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._due_key = f"delayed:{name}:due"
+        self._claimed_key = f"delayed:{name}:claimed"
+        self._jobs_key = f"delayed:{name}:jobs"
+        self._attempts_key = f"delayed:{name}:attempts"
+        self._claim = None
+        self._ack = None
+
+    # ─── Producers ───────────────────────────────────────────────────────────
+
+    async def schedule(
+        self,
+        job_id: str,
+        payload: Dict[str, Any],
+        delay_seconds: float = 0,
+        run_at: Optional[float] = None,
+    ) -> float:
+        """Schedule (or reschedule) a job. Re-using a job_id replaces the pending job."""
+        due_at = run_at if run_at is not None else time.time() + delay_seconds
+        envelope = json.dumps({"payload": payload, "due_at": due_at}, default=str)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._jobs_key, job_id, envelope)
+            pipe.zrem(self._claimed_key, job_id)
+            pipe.hdel(self._attempts_key, job_id)
+            pipe.zadd(self._due_key, {job_id: due_at})
+            await pipe.execute()
+        metrics.inc("delayed_jobs_scheduled_total", queue=self.name)
+        return due_at
+
+    async def cancel(self, *job_ids: str) -> None:
+        if not job_ids:
+            return
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._due_key, *job_ids)
+            pipe.zrem(self._claimed_key, *job_ids)
+            pipe.hdel(self._jobs_key, *job_ids)
+            pipe.hdel(self._attempts_key, *job_ids)
+            await pipe.execute()
+
+    async def depth(self) -> int:
+        """Jobs waiting (due or not), excluding claimed ones."""
+        return await redis_client.zcard(self._due_key)
+
+    # ─── Consumers ───────────────────────────────────────────────────────────
+
+    async def claim_due(self, limit: int = DEFAULT_BATCH_SIZE, now: Optional[float] = None) -> List[DelayedJob]:
+        """Atomically claim up to `limit` due jobs (and jobs whose lease expired)."""
+        now = now if now is not None else time.time()
+        if self._claim is None:
+            self._claim = redis_client.register_script(_CLAIM_SCRIPT)
+        flat = await self._claim(
+            keys=[self._due_key, self._claimed_key, self._jobs_key, self._attempts_key],
+            args=[now, limit, now + self.lease_seconds],
+        )
+
+        jobs, orphans = [], []
+        for i in range(0, len(flat), 3):
+            job_id, raw, attempts = flat[i], flat[i + 1], int(flat[i + 2])
+            if not raw:
+                orphans.append(job_id)  # cancelled between ZADD and HGET
+                continue
+            envelope = json.loads(raw)
+            jobs.append(DelayedJob(job_id, envelope["payload"], envelope["due_at"], attempts))
+        if orphans:
+            await self.ack(*orphans)
+
+        for job in jobs:
+            metrics.observe("delayed_jobs_lag_seconds", max(0.0, now - job.due_at), queue=self.name)
+        metrics.inc("delayed_jobs_claimed_total", amount=len(jobs), queue=self.name)
+        return jobs
+
+    async def ack(self, *job_ids: str) -> int:
+        """Finish claimed jobs. Jobs re-scheduled since the claim are left alone."""
+        if not job_ids:
+            return 0
+        if self._ack is None:
+            self._ack = redis_client.register_script(_ACK_SCRIPT)
+        return await self._ack(
+            keys=[self._claimed_key, self._jobs_key, self._attempts_key],
+            args=list(job_ids),
+        )
+
+    async def retry(self, job_id: str, delay_seconds: float) -> None:
+        """Put a claimed job back on the schedule, keeping its payload and attempt count."""
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._claimed_key, job_id)
+            pipe.zadd(self._due_key, {job_id: time.time() + delay_seconds})
+            await pipe.execute()
+
+    async def run_due(
+        self,
+        handler: BatchHandler,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_batches: int = 10,
+    ) -> Dict[str, int]:
+        """
+        Drain due jobs batch by batch. If the handler raises, the batch stays
+        claimed and is re-delivered after the lease expires.
+        """
+        summary = {"claimed": 0, "completed": 0, "retried": 0, "dropped": 0}
+        for _ in range(max_batches):
+            jobs = await self.claim_due(batch_size)
+            if not jobs:
+                break
+            summary["claimed"] += len(jobs)
+
+            exhausted = [j for j in jobs if j.attempts > self.max_attempts]
+            if exhausted:
+                logger.warning("Delayed jobs dropped after max attempts",
+                               queue=self.name, jobs=[j.id for j in exhausted])
+                await self.ack(*(j.id for j in exhausted))
+                summary["dropped"] += len(exhausted)
+                jobs = [j for j in jobs if j.attempts <= self.max_attempts]
+            if not jobs:
+                continue
+
+            try:
+                with metrics.timer("delayed_jobs_batch_seconds", queue=self.name):
+                    retries = await handler(jobs) or {}
+            except Exception as e:
+                metrics.inc("delayed_jobs_failed_total", amount=len(jobs), queue=self.name)
+                logger.error("Delayed job batch failed", queue=self.name, jobs=len(jobs), error=str(e))
+                break
+
+            for job_id, delay in retries.items():
+                await self.retry(job_id, delay)
+            done = [j.id for j in jobs if j.id not in retries]
+            await self.ack(*done)
+            summary["completed"] += len(done)
+            summary["retried"] += len(retries)
+            if len(jobs) + len(exhausted) < batch_size:
+                break
+
+        metrics.inc("delayed_jobs_completed_total", amount=summary["completed"], queue=self.name)
+        metrics.inc("delayed_jobs_retried_total", amount=summary["retried"], queue=self.name)
+        metrics.inc("delayed_jobs_dropped_total", amount=summary["dropped"], queue=self.name)
+        if summary["claimed"]:
+            logger.info("Delayed jobs processed", queue=self.name, **summary)
+        return summary
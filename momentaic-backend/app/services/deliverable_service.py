@@ -2,12 +2,23 @@
 Deliverable Service
 Generates tangible files (PDF, CSV, MD) from AI output.
 This converts "talk" into "action" deliverables.
+
+Rendering is CPU-bound (FPDF, docx, CSV), so it runs in a process pool rather
+than on the event loop. Artifacts are content-addressed: the filename carries
+a hash of (template version, content), an existing file is a cache hit, and
+identical concurrent requests share one render.
 """
 
 import os
 import csv
 import io
-from typing import Dict, List, Any, Optional
+import json
+import asyncio
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime
 import structlog
 try:
@@ -25,6 +36,9 @@ try:
 except ImportError:
     HAS_DOCX = False
 
+from app.core.config import settings
+from app.core.metrics import metrics
+
 logger = structlog.get_logger()
 
 # Directory to store generated vault files
@@ -33,233 +47,344 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 VAULT_DIR = os.path.join(BASE_DIR, "static", "vault")
 os.makedirs(VAULT_DIR, exist_ok=True)
 
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+# Bump a template's version whenever its layout changes, so cached artifacts
+# rendered from the old template are not served again
+TEMPLATE_VERSIONS = {
+    "business_plan": 1,
+    "financial_model": 1,
+    "cohort_analysis": 1,
+    "legal_contract": 1,
+}
+
+
+def artifact_key(kind: str, payload: Dict[str, Any]) -> str:
+    """Content hash of a deliverable: same template version + same content = same artifact"""
+    blob = json.dumps(
+        {"kind": kind, "version": TEMPLATE_VERSIONS[kind], "payload": payload},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+def _write_atomic(filepath: str, write: Callable[[str], None]) -> None:
+    """Render to a hidden temp file and rename, so readers never see partial files"""
+    directory, filename = os.path.split(filepath)
+    tmp = os.path.join(directory, f".{filename}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, filepath)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def _write_csv(filepath: str, rows: List[List[Any]]) -> None:
+    def write(path: str) -> None:
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerows(rows)
+    _write_atomic(filepath, write)
+
+
+# ─── Renderers (run in worker processes) ─────────────────────────────────────
+
+def render_business_plan_pdf(filepath: str, content: Dict[str, Any], company_name: str, generated_on: str) -> None:
+    pdf = FPDF()
+    pdf.add_page()
+    
+    # Header
+    pdf.set_font("Arial", "B", 24)
+    pdf.cell(0, 20, f"Strategic Plan: {company_name}", ln=True, align="C")
+    pdf.ln(10)
+    
+    pdf.set_font("Arial", "I", 12)
+    pdf.cell(0, 10, f"Generated by MomentAIc OS on {generated_on}", ln=True, align="C")
+    pdf.ln(20)
+    
+    # content logic
+    sections = [
+        ("Executive Summary", content.get("executive_summary", "")),
+        ("Market Analysis", content.get("market_analysis", "")),
+        ("Growth Strategy", content.get("growth_strategy", "")),
+        ("Financial Projections", content.get("financial_projections", "")),
+    ]
+    
+    for title, text in sections:
+        if not text:
+            continue
+        
+        pdf.set_font("Arial", "B", 16)
+        pdf.set_text_color(40, 40, 40)
+        pdf.cell(0, 10, title, ln=True)
+        pdf.ln(5)
+        
+        pdf.set_font("Arial", "", 11)
+        pdf.set_text_color(0, 0, 0)
+        
+        # Simple word wrap simulation
+        pdf.multi_cell(0, 6, text)
+        pdf.ln(10)
+    
+    _write_atomic(filepath, pdf.output)
+
+
+def render_financial_model_csv(filepath: str, metrics: Dict[str, Any], company_name: str, generated_on: str) -> None:
+    rows = []
+    
+    # Header
+    rows.append(["MomentAIc Generated Financial Model", f"Company: {company_name}", generated_on])
+    rows.append([])
+    
+    # Monthly Projections Header
+    months = ["Metric"] + [f"Month {i+1}" for i in range(12)] + ["Total Year 1"]
+    rows.append(months)
+    
+    # Revenue
+    revenue_base = metrics.get("monthly_revenue", 0)
+    growth_rate = metrics.get("growth_rate_percent", 5) / 100
+    
+    rev_row = ["Revenue ($)"]
+    current_rev = revenue_base
+    total_rev = 0
+    for _ in range(12):
+        rev_row.append(round(current_rev, 2))
+        total_rev += current_rev
+        current_rev *= (1 + growth_rate)
+    rev_row.append(round(total_rev, 2))
+    rows.append(rev_row)
+    
+    # Expenses (Simplified)
+    burn_rate = metrics.get("monthly_burn", 5000)
+    exp_row = ["Expenses ($)"]
+    current_exp = burn_rate
+    total_exp = 0
+    for _ in range(12):
+        exp_row.append(round(current_exp, 2))
+        total_exp += current_exp
+        current_exp *= 1.02 # Assuming 2% monthly inflation/hiring
+    exp_row.append(round(total_exp, 2))
+    rows.append(exp_row)
+    
+    # Profit/Loss
+    rows.append([])
+    rows.append(["NET Income"])
+    
+    # Valuation (Live Data Injection)
+    if "valuation_multiple" in metrics:
+        rows.append([])
+        rows.append([f"LIVE VALUATION (Based on {metrics.get('valuation_multiple')}x ARR)"])
+        
+        # Simple valuation calculation based on Year 1 ARR
+        # ARR = last month revenue * 12
+        arr = (current_rev / (1+growth_rate)) * 12 
+        val = arr * metrics.get("valuation_multiple", 5)
+        rows.append([f"Estimated Post-Money: ${round(val, 2)}"])
+        rows.append([f"Note: {metrics.get('valuation_note', '')}"])
+    
+    _write_csv(filepath, rows)
+
+
+def render_cohort_analysis_csv(filepath: str, industry: str, benchmarks: Dict[str, float], generated_on: str) -> None:
+    rows = []
+    rows.append(["Cohort Analysis & Retention", f"Industry: {industry}", generated_on])
+    rows.append([])
+    
+    # Header
+    rows.append(["Cohort Month", "Users", "Month 1", "Month 2", "Month 3", "Month 6", "Month 12"])
+    
+    # Simulate some cohorts
+    for i in range(1, 7):
+        month = f"2025-{i:02d}"
+        users = 100 + (i * 20)
+        
+        # Retention decay based on benchmark but simulated
+        m1 = benchmarks.get("month_1", 0.5)
+        m3 = benchmarks.get("month_3", 0.3)
+        
+        row = [month, users, f"{int(m1*100)}%", f"{int(m1*0.9*100)}%", f"{int(m3*100)}%", "-", "-"]
+        rows.append(row)
+        
+    rows.append([])
+    rows.append(["INDUSTRY BENCHMARKS (Live Data)"])
+    rows.append(["Month 1", f"{int(benchmarks.get('month_1',0)*100)}%"])
+    rows.append(["Month 3", f"{int(benchmarks.get('month_3',0)*100)}%"])
+    rows.append(["Month 6", f"{int(benchmarks.get('month_6',0)*100)}%"])
+    rows.append(["Note", benchmarks.get("insight", "")])
+    
+    _write_csv(filepath, rows)
+
+
+def render_legal_contract(
+    filepath: str, contract_type: str, parties: Dict[str, str], company_name: str, generated_on: str
+) -> None:
+    # Content generation (simplified template)
+    title = f"{contract_type.upper().replace('_', ' ')} AGREEMENT"
+    
+    if HAS_DOCX:
+        doc = Document()
+        doc.add_heading(title, 0)
+        
+        p = doc.add_paragraph(f"This agreement is made on {generated_on} between:")
+        doc.add_paragraph(f"Party A: {parties.get('party_a', company_name)}")
+        doc.add_paragraph(f"Party B: {parties.get('party_b', '[Counterparty Name]')}")
+        
+        doc.add_heading('1. Purpose', level=1)
+        doc.add_paragraph("The purpose of this agreement is to define the relationship and obligations...")
+        
+        doc.add_heading('2. Term', level=1)
+        doc.add_paragraph("This agreement shall commence on the date hereof and continue until terminated.")
+        
+        doc.add_heading('3. Confidentiality', level=1)
+        doc.add_paragraph("Both parties agree to keep all proprietary information confidential.")
+        
+        doc.add_paragraph("\n\n___________________________\nSigned (Party A)")
+        
+        _write_atomic(filepath, doc.save)
+    else:
+        # Fallback to text file if docx missing
+        def write(path: str) -> None:
+            with open(path, 'w') as f:
+                f.write(f"{title}\n\n")
+                f.write(f"Date: {generated_on}\n\n")
+                f.write(f"Between {parties.get('party_a', company_name)} and {parties.get('party_b', '[Counterparty Name]')}\n\n")
+                f.write("1. PURPOSE\nThe purpose is...\n\n")
+        _write_atomic(filepath, write)
+
+
 class DeliverableService:
     """
     Service to generate professional deliverables.
     types: PDF (Plans), CSV (Data/Finance), DOCX (Legal/Contracts)
     """
     
+    def __init__(self, workers: int = RENDER_WORKERS):
+        self._workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}  # filename -> render in progress
+    
     def _get_filepath(self, filename: str) -> str:
         return os.path.join(VAULT_DIR, filename)
     
     def _get_public_url(self, filename: str) -> str:
         # Assuming static files are served from /static/vault
         return f"/static/vault/{filename}"
-
-    async def generate_business_plan_pdf(self, content: Dict[str, Any], company_name: str) -> Dict[str, str]:
-        """Generate a professional PDF Business Plan"""
-        filename = f"{company_name.replace(' ', '_')}_Business_Plan.pdf"
+    
+    def _get_download_url(self, filename: str) -> str:
+        # Authenticated, Range-aware download (see endpoints/vault.py)
+        return f"{settings.api_v1_prefix}/vault/files/{filename}"
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # forkserver: workers are not forked from the threaded app process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+        return self._executor
+    
+    async def _render(self, kind: str, stem: str, ext: str, payload: Dict[str, Any],
+                      renderer: Callable[..., None], *args: Any) -> str:
+        """
+        Render `renderer(filepath, *args)` in the process pool unless an
+        artifact for this (template version, payload) already exists.
+        Returns the artifact's filename.
+        """
+        filename = f"{stem}_{artifact_key(kind, payload)}.{ext}"
         filepath = self._get_filepath(filename)
+        if os.path.exists(filepath):
+            metrics.inc("deliverables_rendered_total", kind=kind, cache="hit")
+            return filename
         
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Header
-        pdf.set_font("Arial", "B", 24)
-        pdf.cell(0, 20, f"Strategic Plan: {company_name}", ln=True, align="C")
-        pdf.ln(10)
-        
-        pdf.set_font("Arial", "I", 12)
-        pdf.cell(0, 10, f"Generated by MomentAIc OS on {datetime.now().strftime('%Y-%m-%d')}", ln=True, align="C")
-        pdf.ln(20)
+        inflight = self._inflight.get(filename)
+        if inflight is not None:
+            await asyncio.shield(inflight)
+            metrics.inc("deliverables_rendered_total", kind=kind, cache="shared")
+            return filename
         
-        # content logic
-        sections = [
-            ("Executive Summary", content.get("executive_summary", "")),
-            ("Market Analysis", content.get("market_analysis", "")),
-            ("Growth Strategy", content.get("growth_strategy", "")),
-            ("Financial Projections", content.get("financial_projections", "")),
-        ]
+        future = asyncio.get_running_loop().run_in_executor(self._pool(), renderer, filepath, *args)
+        self._inflight[filename] = future
         
-        for title, text in sections:
-            if not text:
-                continue
-            
-            pdf.set_font("Arial", "B", 16)
-            pdf.set_text_color(40, 40, 40)
-            pdf.cell(0, 10, title, ln=True)
-            pdf.ln(5)
-            
-            pdf.set_font("Arial", "", 11)
-            pdf.set_text_color(0, 0, 0)
-            
-            # Simple word wrap simulation
-            pdf.multi_cell(0, 6, text)
-            pdf.ln(10)
-            
-        pdf.output(filepath)
+        def _done(done: asyncio.Future) -> None:
+            # The entry lives as long as the render, not as long as this caller waits
+            self._inflight.pop(filename, None)
+            if not done.cancelled():
+                done.exception()  # retrieved even if every waiter was cancelled
         
+        future.add_done_callback(_done)
+        try:
+            with metrics.timer("deliverable_render_seconds", kind=kind):
+                # Shielded: cancelling the caller that started the render must not fail its joiners
+                await asyncio.shield(future)
+        except BrokenProcessPool:
+            self._executor = None  # a worker died; start a fresh pool next time
+            raise
+        metrics.inc("deliverables_rendered_total", kind=kind, cache="miss")
+        return filename
+    
+    def _deliverable(self, title: str, file_type: str, filename: str) -> Dict[str, str]:
         return {
-            "title": "Strategic Business Plan",
-            "type": "PDF",
+            "title": title,
+            "type": file_type,
             "url": self._get_public_url(filename),
+            "download_url": self._get_download_url(filename),
             "created_at": datetime.now().isoformat()
         }
+    
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def generate_business_plan_pdf(self, content: Dict[str, Any], company_name: str) -> Dict[str, str]:
+        """Generate a professional PDF Business Plan"""
+        filename = await self._render(
+            "business_plan", f"{company_name.replace(' ', '_')}_Business_Plan", "pdf",
+            {"content": content, "company_name": company_name},
+            render_business_plan_pdf, content, company_name, datetime.now().strftime('%Y-%m-%d'),
+        )
+        return self._deliverable("Strategic Business Plan", "PDF", filename)
 
     async def generate_financial_model_csv(self, metrics: Dict[str, Any], company_name: str) -> Dict[str, str]:
         """Generate a CSV Financial Model (Burn Rate, P&L)"""
-        filename = f"{company_name.replace(' ', '_')}_Financial_Model.csv"
-        filepath = self._get_filepath(filename)
-        
-        rows = []
-        
-        # Header
-        rows.append(["MomentAIc Generated Financial Model", f"Company: {company_name}", datetime.now().strftime('%Y-%m-%d')])
-        rows.append([])
-        
-        # Monthly Projections Header
-        months = ["Metric"] + [f"Month {i+1}" for i in range(12)] + ["Total Year 1"]
-        rows.append(months)
-        
-        # Revenue
-        revenue_base = metrics.get("monthly_revenue", 0)
-        growth_rate = metrics.get("growth_rate_percent", 5) / 100
-        
-        rev_row = ["Revenue ($)"]
-        current_rev = revenue_base
-        total_rev = 0
-        for _ in range(12):
-            rev_row.append(round(current_rev, 2))
-            total_rev += current_rev
-            current_rev *= (1 + growth_rate)
-        rev_row.append(round(total_rev, 2))
-        rows.append(rev_row)
-        
-        # Expenses (Simplified)
-        burn_rate = metrics.get("monthly_burn", 5000)
-        exp_row = ["Expenses ($)"]
-        current_exp = burn_rate
-        total_exp = 0
-        for _ in range(12):
-            exp_row.append(round(current_exp, 2))
-            total_exp += current_exp
-            current_exp *= 1.02 # Assuming 2% monthly inflation/hiring
-        exp_row.append(round(total_exp, 2))
-        rows.append(exp_row)
-        
-        # Profit/Loss
-        rows.append([])
-        rows.append(["NET Income"])
-        
-        # Valuation (Live Data Injection)
-        if "valuation_multiple" in metrics:
-            rows.append([])
-            rows.append([f"LIVE VALUATION (Based on {metrics.get('valuation_multiple')}x ARR)"])
-            
-            # Simple valuation calculation based on Year 1 ARR
-            # ARR = last month revenue * 12
-            arr = (current_rev / (1+growth_rate)) * 12 
-            val = arr * metrics.get("valuation_multiple", 5)
-            rows.append([f"Estimated Post-Money: ${round(val, 2)}"])
-            rows.append([f"Note: {metrics.get('valuation_note', '')}"])
-        
-        with open(filepath, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerows(rows)
-            
-        return {
-            "title": "Financial Model (Year 1)",
-            "type": "CSV",
-            "url": self._get_public_url(filename),
-            "created_at": datetime.now().isoformat()
-        }
+        filename = await self._render(
+            "financial_model", f"{company_name.replace(' ', '_')}_Financial_Model", "csv",
+            {"metrics": metrics, "company_name": company_name},
+            render_financial_model_csv, metrics, company_name, datetime.now().strftime('%Y-%m-%d'),
+        )
+        return self._deliverable("Financial Model (Year 1)", "CSV", filename)
 
     async def generate_cohort_analysis_csv(self, industry: str, benchmarks: Dict[str, float], company_name: str) -> Dict[str, str]:
         """Generate a Cohort Analysis CSV with Benchmark comparison"""
-        filename = f"{company_name.replace(' ', '_')}_Cohort_Analysis.csv"
-        filepath = self._get_filepath(filename)
-        
-        rows = []
-        rows.append(["Cohort Analysis & Retention", f"Industry: {industry}", datetime.now().strftime('%Y-%m-%d')])
-        rows.append([])
-        
-        # Header
-        rows.append(["Cohort Month", "Users", "Month 1", "Month 2", "Month 3", "Month 6", "Month 12"])
-        
-        # Simulate some cohorts
-        for i in range(1, 7):
-            month = f"2025-{i:02d}"
-            users = 100 + (i * 20)
-            
-            # Retention decay based on benchmark but simulated
-            m1 = benchmarks.get("month_1", 0.5)
-            m3 = benchmarks.get("month_3", 0.3)
-            
-            row = [month, users, f"{int(m1*100)}%", f"{int(m1*0.9*100)}%", f"{int(m3*100)}%", "-", "-"]
-            rows.append(row)
-            
-        rows.append([])
-        rows.append(["INDUSTRY BENCHMARKS (Live Data)"])
-        rows.append(["Month 1", f"{int(benchmarks.get('month_1',0)*100)}%"])
-        rows.append(["Month 3", f"{int(benchmarks.get('month_3',0)*100)}%"])
-        rows.append(["Month 6", f"{int(benchmarks.get('month_6',0)*100)}%"])
-        rows.append(["Note", benchmarks.get("insight", "")])
-            
-        with open(filepath, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerows(rows)
-            
-        return {
-            "title": "Cohort Analysis (Live Benchmarks)",
-            "type": "CSV",
-            "url": self._get_public_url(filename),
-            "created_at": datetime.now().isoformat()
-        }
+        filename = await self._render(
+            "cohort_analysis", f"{company_name.replace(' ', '_')}_Cohort_Analysis", "csv",
+            {"industry": industry, "benchmarks": benchmarks},
+            render_cohort_analysis_csv, industry, benchmarks, datetime.now().strftime('%Y-%m-%d'),
+        )
+        return self._deliverable("Cohort Analysis (Live Benchmarks)", "CSV", filename)
 
     async def generate_legal_contract(self, contract_type: str, parties: Dict[str, str], company_name: str) -> Dict[str, str]:
-        """Generate a Legal Contract (DOCX or MD fallback)"""
-        filename = f"{company_name.replace(' ', '_')}_{contract_type}.docx"
-        filepath = self._get_filepath(filename)
-        
-        # Content generation (simplified template)
-        title = f"{contract_type.upper().replace('_', ' ')} AGREEMENT"
-        
-        if HAS_DOCX:
-            doc = Document()
-            doc.add_heading(title, 0)
-            
-            p = doc.add_paragraph(f"This agreement is made on {datetime.now().strftime('%B %d, %Y')} between:")
-            doc.add_paragraph(f"Party A: {parties.get('party_a', company_name)}")
-            doc.add_paragraph(f"Party B: {parties.get('party_b', '[Counterparty Name]')}")
-            
-            doc.add_heading('1. Purpose', level=1)
-            doc.add_paragraph("The purpose of this agreement is to define the relationship and obligations...")
-            
-            doc.add_heading('2. Term', level=1)
-            doc.add_paragraph("This agreement shall commence on the date hereof and continue until terminated.")
-            
-            doc.add_heading('3. Confidentiality', level=1)
-            doc.add_paragraph("Both parties agree to keep all proprietary information confidential.")
-            
-            doc.add_paragraph("\n\n___________________________\nSigned (Party A)")
-            
-            doc.save(filepath)
-        else:
-            # Fallback to text file if docx missing
-            filename = filename.replace('.docx', '.txt')
-            filepath = self._get_filepath(filename)
-            with open(filepath, 'w') as f:
-                f.write(f"{title}\n\n")
-                f.write(f"Date: {datetime.now().strftime('%B %d, %Y')}\n\n")
-                f.write(f"Between {parties.get('party_a', company_name)} and {parties.get('party_b', '[Counterparty Name]')}\n\n")
-                f.write("1. PURPOSE\nThe purpose is...\n\n")
-        
-        return {
-            "title": f"{contract_type.replace('_', ' ').title()}",
-            "type": "DOCX" if HAS_DOCX else "TXT",
-            "url": self._get_public_url(filename),
-            "created_at": datetime.now().isoformat()
-        }
+        """Generate a Legal Contract (DOCX or TXT fallback)"""
+        filename = await self._render(
+            "legal_contract", f"{company_name.replace(' ', '_')}_{contract_type}", "docx" if HAS_DOCX else "txt",
+            {"contract_type": contract_type, "parties": parties, "company_name": company_name},
+            render_legal_contract, contract_type, parties, company_name, datetime.now().strftime('%B %d, %Y'),
+        )
+        return self._deliverable(
+            f"{contract_type.replace('_', ' ').title()}", "DOCX" if HAS_DOCX else "TXT", filename
+        )
 
     async def generate_day_one_pack(self, company_name: str, industry: str) -> List[Dict[str, str]]:
         """
         Generates the 'Day 1' bundle:
         - Strategy Plan
         - Financial Model
-        - Content Calendar
+        - Cohort Analysis
         - NDA
+        Live data is fetched concurrently, then all documents render in parallel.
         """
-        deliverables = []
+        from app.services.live_data_service import live_data_service
         
         # 1. Strategy Plan (Simulated AI content for now)
         plan_content = {
@@ -268,31 +393,38 @@ class DeliverableService:
             "growth_strategy": "1. Viral loop via referrals\n2. Content marketing\n3. Strategic partnerships",
             "financial_projections": "Projected to reach profitability in Month 9."
         }
-        deliverables.append(await self.generate_business_plan_pdf(plan_content, company_name))
         
         # 2. Financial Model
         fin_metrics = {"monthly_revenue": 0, "monthly_burn": 2000, "growth_rate_percent": 15}
         # Assuming CFO/finance agent usually calls this with live data, but for direct bulk generation we inject it here too
-        from app.services.live_data_service import live_data_service
-        try:
-            multiples = await live_data_service.get_saas_multiples()
+        multiples, benchmarks = await asyncio.gather(
+            live_data_service.get_saas_multiples(),
+            live_data_service.get_retention_benchmarks(industry),
+            return_exceptions=True,
+        )
+        if not isinstance(multiples, BaseException):
             fin_metrics["valuation_multiple"] = multiples["median_arr_multiple"]
             fin_metrics["valuation_note"] = "Live SaaS Index"
-        except Exception:
-            pass
-            
-        deliverables.append(await self.generate_financial_model_csv(fin_metrics, company_name))
         
+        renders = [
+            self.generate_business_plan_pdf(plan_content, company_name),
+            self.generate_financial_model_csv(fin_metrics, company_name),
+        ]
         # 3. Cohort Analysis (New Live Data)
-        try:
-            benchmarks = await live_data_service.get_retention_benchmarks(industry)
-            deliverables.append(await self.generate_cohort_analysis_csv(industry, benchmarks, company_name))
-        except Exception as e:
-            logger.error("Cohort generation failed", error=str(e))
+        if isinstance(benchmarks, BaseException):
+            logger.error("Cohort generation failed", error=str(benchmarks))
+        else:
+            renders.append(self.generate_cohort_analysis_csv(industry, benchmarks, company_name))
         
         # 4. Legal
-        deliverables.append(await self.generate_legal_contract("Non_Disclosure_Agreement", {}, company_name))
+        renders.append(self.generate_legal_contract("Non_Disclosure_Agreement", {}, company_name))
         
+        deliverables = []
+        for result in await asyncio.gather(*renders, return_exceptions=True):
+            if isinstance(result, BaseException):
+                logger.error("Day 1 deliverable failed", error=str(result))
+            else:
+                deliverables.append(result)
         return deliverables
 
 # Singleton
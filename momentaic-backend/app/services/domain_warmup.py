@@ -1,86 +1,109 @@
-import structlog
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+"""
+Domain Warm-Up Scheduler
+Paces outbound email per sending domain to protect sender reputation.
+
+Counters live in Redis so every Uvicorn / Celery process shares them:
+- warmup:domains              HASH domain -> registered_at (HSETNX registers once)
+- warmup:domain:{domain}      HASH status, current_limit, spam_score, bounces
+- warmup:day:{domain}:{day}   HASH sent, bounces, updated with HINCRBY; each
+  day's key expires WARMUP_HISTORY_DAYS after it was last written, so daily
+  rollover needs no cleanup job
+
+log_dispatch() reserves sends with HINCRBY and hands them back when the day's
+allowance is exceeded, so parallel senders never lose an increment or push a
+domain past its limit. import_json_stats() moves the old domain_stats.json
+file into Redis once.
+"""
+
 import json
-import os
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.core.redis_client import redis_client
 
 logger = structlog.get_logger()
 
+DOMAINS_KEY = "warmup:domains"
+WARMUP_HISTORY_DAYS = 7
+DAY_TTL_SECONDS = (WARMUP_HISTORY_DAYS + 1) * 24 * 3600
+LEGACY_STATS_FILE = Path("/app/data/domain_stats.json")
+
+
+def _domain_key(domain: str) -> str:
+    return f"warmup:domain:{domain}"
+
+
+def _day_key(domain: str, day: str) -> str:
+    return f"warmup:day:{domain}:{day}"
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
 class DomainWarmUpScheduler:
     """
     Algorithmic Domain Warm-Up Engine
     Designed to protect sender reputation when launching new domains for outreach.
-    
+
     Phases:
     1. Dormant (0-7 days): No sends.
     2. Warm-up (8-30 days): Strict daily limits, scaling algorithmically.
     3. Production: Full volume based on domain health.
     """
-    
-    def __init__(self, data_file: str = "domain_stats.json"):
-        # For this prototype, we store stats in a local file.
-        # In a fully productionized system, this binds to PostgreSQL or Redis.
-        self.data_dir = Path("/app/data")
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.data_file = self.data_dir / data_file
-        
+
+    def __init__(self):
         # Core algorithmic constraints
         self.BASE_WARMUP_LIMIT = 10  # Start at 10 emails/day
         self.SCALE_FACTOR = 1.25     # 25% increase per progression step
 
-    def _load_stats(self) -> Dict[str, Any]:
-        if not self.data_file.exists():
-            return {}
-        try:
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error("failed_to_load_warmup_stats", error=str(e))
-            return {}
-            
-    def _save_stats(self, stats: Dict[str, Any]) -> None:
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(stats, f, indent=2)
-        except Exception as e:
-            logger.error("failed_to_save_warmup_stats", error=str(e))
-
-    def register_domain(self, domain: str) -> None:
-        """Initializes a new domain for warm-up tracking"""
-        stats = self._load_stats()
-        if domain not in stats:
-            stats[domain] = {
-                "registered_at": datetime.utcnow().isoformat(),
-                "status": "dormant",
-                "current_limit": 0,
-                "history": {},
-                "spam_score": 0.0,
-                "bounces": 0
-            }
-            self._save_stats(stats)
-            logger.info("domain_registered_for_warmup", domain=domain)
-            
-    def get_daily_allowance(self, domain: str) -> int:
+    async def register_domain(self, domain: str) -> bool:
+        """Initializes a new domain for warm-up tracking; False if it was already registered"""
+        if not await redis_client.hsetnx(DOMAINS_KEY, domain, _utcnow().isoformat()):
+            return False
+        await redis_client.hset(_domain_key(domain), mapping={
+            "status": "dormant",
+            "current_limit": 0,
+            "spam_score": 0.0,
+            "bounces": 0,
+        })
+        logger.info("domain_registered_for_warmup", domain=domain)
+        return True
+
+    async def _load(self, domain: str) -> Dict[str, Any]:
+        """Registration date, domain state and today's counters in one round trip."""
+        today = _utcnow().strftime("%Y-%m-%d")
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hget(DOMAINS_KEY, domain)
+            pipe.hgetall(_domain_key(domain))
+            pipe.hget(_day_key(domain, today), "sent")
+            registered_at, domain_data, sent_today = await pipe.execute()
+        return {
+            "today": today,
+            "registered_at": registered_at,
+            "status": domain_data.get("status", "dormant"),
+            "current_limit": int(domain_data.get("current_limit") or 0),
+            "spam_score": float(domain_data.get("spam_score") or 0.0),
+            "bounces": int(domain_data.get("bounces") or 0),
+            "sent_today": int(sent_today or 0),
+        }
+
+    def _daily_limit(self, domain: str, state: Dict[str, Any]) -> int:
         """
-        Calculates how many emails can be sent TODAY securely.
+        Calculates how many emails the domain may send per day.
         Implements the Algorithmic Pacing outlined in the Symbiotask Framework.
         """
-        stats = self._load_stats()
-        if domain not in stats:
-            self.register_domain(domain)
-            stats = self._load_stats()
-            
-        domain_data = stats[domain]
-        reg_date = datetime.fromisoformat(domain_data["registered_at"]) - timedelta(days=8)
-        days_active = (datetime.utcnow() - reg_date).days
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        
+        reg_date = datetime.fromisoformat(state["registered_at"]) - timedelta(days=8)
+        days_active = (_utcnow() - reg_date).days
+
         # Emergency stop mechanism
-        if domain_data.get("spam_score", 0) > 3.0 or domain_data.get("bounces", 0) > 5:
+        if state["spam_score"] > 3.0 or state["bounces"] > 5:
             logger.warning("domain_warmup_halted_due_to_poor_health", domain=domain)
             return 0
-            
+
         # Algorithmic phases constraint
         calculated_limit = 0
         if days_active < 7:
@@ -90,60 +113,109 @@ class DomainWarmUpScheduler:
             # Controlled Micro-Volume Escalation
             progression_steps = days_active - 7
             calculated_limit = int(self.BASE_WARMUP_LIMIT * (self.SCALE_FACTOR ** (progression_steps // 3))) # Scale every 3 days
-            
-        # Retrieve how many sent today to calculate remainder
-        sent_today = domain_data.get("history", {}).get(today, {}).get("sent", 0)
-        allowance = max(0, calculated_limit - sent_today)
-        
+
         # Override limit based on hard-saved 'current_limit' state if manual intervention occurred
-        if domain_data.get("current_limit", 0) > 0 and domain_data.get("status") != "dormant":
-             allowance = max(0, domain_data["current_limit"] - sent_today)
-
-        logger.debug("warmup_allowance_calculated", 
-                     domain=domain, 
-                     days_active=days_active,
-                     calculated_limit=calculated_limit, 
-                     sent_today=sent_today, 
-                     allowance=allowance)
-                     
+        if state["current_limit"] > 0 and state["status"] != "dormant":
+            return state["current_limit"]
+
+        logger.debug("warmup_limit_calculated", domain=domain, days_active=days_active, calculated_limit=calculated_limit)
+        return calculated_limit
+
+    async def _state(self, domain: str) -> Dict[str, Any]:
+        state = await self._load(domain)
+        if state["registered_at"] is None:
+            await self.register_domain(domain)
+            state = await self._load(domain)
+        return state
+
+    async def get_daily_allowance(self, domain: str) -> int:
+        """Calculates how many emails can be sent TODAY securely."""
+        state = await self._state(domain)
+        allowance = max(0, self._daily_limit(domain, state) - state["sent_today"])
+        logger.debug("warmup_allowance_calculated", domain=domain, sent_today=state["sent_today"], allowance=allowance)
         return allowance
 
-    def log_dispatch(self, domain: str, count: int = 1) -> bool:
+    async def log_dispatch(self, domain: str, count: int = 1) -> bool:
         """
         Logs that emails were sent, deducting from the daily allowance.
         Returns True if successful, False if the limit was breached.
         """
-        allowance = self.get_daily_allowance(domain)
-        if count > allowance:
-            logger.warning("warmup_throttle_breached", domain=domain, requested=count, allowed=allowance)
+        state = await self._state(domain)
+        limit = self._daily_limit(domain, state)
+        if count > limit - state["sent_today"]:
+            logger.warning("warmup_throttle_breached", domain=domain, requested=count, allowed=max(0, limit - state["sent_today"]))
             return False
-            
-        stats = self._load_stats()
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        
-        if today not in stats[domain]["history"]:
-            stats[domain]["history"][today] = {"sent": 0, "bounces": 0}
-            
-        stats[domain]["history"][today]["sent"] += count
-        
+
+        # Reserve atomically; a concurrent sender may have taken the allowance since the read
+        day_key = _day_key(domain, state["today"])
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(day_key, "sent", count)
+            pipe.expire(day_key, DAY_TTL_SECONDS)
+            sent_today, _ = await pipe.execute()
+        if sent_today > limit:
+            await redis_client.hincrby(day_key, "sent", -count)
+            logger.warning("warmup_throttle_breached", domain=domain, requested=count, allowed=max(0, limit - sent_today + count))
+            return False
+
         # Transition out of dormant status upon first send
-        if stats[domain]["status"] == "dormant":
-             stats[domain]["status"] = "warming_up"
-             stats[domain]["current_limit"] = self.BASE_WARMUP_LIMIT
-             
-        self._save_stats(stats)
-        logger.info("warmup_dispatch_logged", domain=domain, amount=count, total_today=stats[domain]["history"][today]["sent"])
+        if state["status"] == "dormant":
+            await redis_client.hset(_domain_key(domain), mapping={
+                "status": "warming_up",
+                "current_limit": self.BASE_WARMUP_LIMIT,
+            })
+
+        logger.info("warmup_dispatch_logged", domain=domain, amount=count, total_today=sent_today)
         return True
-        
-    def report_bounce(self, domain: str) -> None:
+
+    async def report_bounce(self, domain: str) -> None:
         """Registers a bounce to penalize domain health"""
-        stats = self._load_stats()
-        if domain in stats:
-             stats[domain]["bounces"] += 1
-             today = datetime.utcnow().strftime("%Y-%m-%d")
-             if today in stats[domain]["history"]:
-                 stats[domain]["history"][today]["bounces"] = stats[domain]["history"][today].get("bounces", 0) + 1
-             self._save_stats(stats)
-             logger.warning("domain_bounce_recorded", domain=domain, total_bounces=stats[domain]["bounces"])
+        if await redis_client.hget(DOMAINS_KEY, domain) is None:
+            return
+        day_key = _day_key(domain, _utcnow().strftime("%Y-%m-%d"))
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(_domain_key(domain), "bounces", 1)
+            pipe.hincrby(day_key, "bounces", 1)
+            pipe.expire(day_key, DAY_TTL_SECONDS)
+            total_bounces, _, _ = await pipe.execute()
+        logger.warning("domain_bounce_recorded", domain=domain, total_bounces=total_bounces)
+
+    async def import_json_stats(self, path: Optional[Path] = None) -> int:
+        """
+        One-time import of the legacy domain_stats.json file. Sent/bounce counts
+        are added to any already in Redis; status, limits and spam score already
+        in Redis win. Days older than WARMUP_HISTORY_DAYS are dropped. The file
+        is renamed to *.imported so it is never imported twice.
+        Returns the number of domains imported.
+        """
+        path = Path(path or LEGACY_STATS_FILE)
+        if not path.exists():
+            return 0
+        stats = json.loads(path.read_text())
+        today = _utcnow().date()
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for domain, data in stats.items():
+                if data.get("registered_at"):
+                    pipe.hset(DOMAINS_KEY, domain, data["registered_at"])  # older than any live registration
+                else:
+                    pipe.hsetnx(DOMAINS_KEY, domain, _utcnow().isoformat())
+                for field in ("status", "current_limit", "spam_score"):
+                    if field in data:
+                        pipe.hsetnx(_domain_key(domain), field, data[field])
+                pipe.hincrby(_domain_key(domain), "bounces", int(data.get("bounces") or 0))
+
+                for day, counts in (data.get("history") or {}).items():
+                    ttl = DAY_TTL_SECONDS - (today - date.fromisoformat(day)).days * 24 * 3600
+                    if ttl <= 0:
+                        continue
+                    for field in ("sent", "bounces"):
+                        if counts.get(field):
+                            pipe.hincrby(_day_key(domain, day), field, int(counts[field]))
+                    pipe.expire(_day_key(domain, day), ttl)
+            await pipe.execute()
+
+        path.rename(path.with_name(path.name + ".imported"))
+        logger.info("warmup_stats_imported", domains=len(stats), source=str(path))
+        return len(stats)
 
 domain_warmup_service = DomainWarmUpScheduler()
@@ -1,5 +1,6 @@
 import structlog
 import asyncio
+import re
 from datetime import datetime
 from typing import Dict, Any, List
 
@@ -11,6 +12,9 @@ from app.core.config import settings
 
 logger = structlog.get_logger()
 
+URGENT_COMMS_CONSUMER = "urgent_comms"
+URGENT_SUBJECT_PATTERN = re.compile(r"urgent|server down|term sheet|emergency", re.IGNORECASE)
+
 class ExecutiveAssistantService:
     """
     The 'Proactive' Agent.
@@ -201,7 +205,17 @@ class ExecutiveAssistantService:
         """
         Daemon-like check for 'Hair on Fire' issues (Server Down, Term Sheet, Angry Customer).
         Runs frequently (e.g. every 1-5 mins).
+
+        With IMAP configured this is just an incremental inbox sync; new headers
+        reach handle_inbox_batch via the sync engine. Otherwise falls back to
+        querying Gmail through MCP. Either way each message alerts at most once.
         """
+        from app.services.inbox_sync import inbox_sync
+
+        if inbox_sync.is_configured:
+            await inbox_sync.sync()
+            return
+
         try:
             # Quick check for high-priority unread emails
             # We filter for specific keywords to avoid noise
@@ -209,34 +223,48 @@ class ExecutiveAssistantService:
             
             # Use MCP to search
             # We assume 'google' tool is available
-            tools = await mcp_service.list_tools("google")
             result = await mcp_service.call_tool("google", "list_gmail_messages", {
                 "max_results": 3,
                 "query": f"is:unread category:primary {keywords}"
             })
             
-            # If we get a result string that isn't empty/brackets
-            # The MCP returns text, let's parse or just check length
+            # The MCP returns text; pull out message ids so we only alert on new ones
             res_str = str(result)
+            message_ids = list(dict.fromkeys(re.findall(r"['\"]id['\"]\s*:\s*['\"]([\w-]+)['\"]", res_str)))
             
-            if "threadId" in res_str or "snippet" in res_str:
-                logger.warning("ExecutiveAssistant: 🔥 URGENT COMMS DETECTED 🔥")
-                
-                # Immediate Synthesis of the alert
-                alert_msg = await self._synthesize_alert(res_str)
-                
-                # Dispatch Alert (File + Logs for now, SMS/Slack in future)
-                timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                filename = f"RED_ALERT_{timestamp}.md"
-                with open(filename, "w") as f:
-                    f.write(f"# 🚨 RED ALERT\n\n{alert_msg}")
-                    
-                logger.error(f"RED ALERT SAVED TO {filename}")
+            if message_ids:
+                fresh = await inbox_sync.claim(URGENT_COMMS_CONSUMER, message_ids)
+                if fresh:
+                    await self._raise_alert(res_str)
+            elif "threadId" in res_str or "snippet" in res_str:
+                await self._raise_alert(res_str)
                 
         except Exception as e:
             # info level to avoid spamming logs if just no connection
             logger.info("ExecutiveAssistant: Daemon check skipped (No connection)")
 
+    async def handle_inbox_batch(self, messages: List[Dict[str, Any]]):
+        """Inbox consumer: alerts on newly synced messages with urgent subjects."""
+        urgent = [m for m in messages if URGENT_SUBJECT_PATTERN.search(m.get("subject", ""))]
+        if not urgent:
+            return
+        summary = "\n".join(f"- From {m.get('sender')}: {m.get('subject')}" for m in urgent)
+        await self._raise_alert(summary)
+
+    async def _raise_alert(self, email_data: str):
+        logger.warning("ExecutiveAssistant: 🔥 URGENT COMMS DETECTED 🔥")
+        
+        # Immediate Synthesis of the alert
+        alert_msg = await self._synthesize_alert(email_data)
+        
+        # Dispatch Alert (File + Logs for now, SMS/Slack in future)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        filename = f"RED_ALERT_{timestamp}.md"
+        with open(filename, "w") as f:
+            f.write(f"# 🚨 RED ALERT\n\n{alert_msg}")
+            
+        logger.error(f"RED ALERT SAVED TO {filename}")
+
     async def _synthesize_alert(self, email_data) -> str:
         prompt = f"""
         🔥 HAIR ON FIRE ALERT 🔥
@@ -1,33 +1,36 @@
 """
 Goal Tracker - Persistent Goal and Progress Tracking
 Tracks startup goals, milestones, and progress across the journey
+
+Goals are stored in Postgres (startup_goals) with a short-lived, write-through
+per-process cache; overdue detection for every tenant is one indexed query.
 """
 
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from enum import Enum
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
+import time
 import structlog
+from sqlalchemy import or_, select, update
 
-logger = structlog.get_logger()
+from app.core.database import async_session_maker
+from app.models.goal import ACTIVE_GOAL_STATUSES, GoalPriority, GoalStatus, StartupGoal
+from app.models.startup import Startup
+from app.models.user import User
 
+logger = structlog.get_logger()
 
-class GoalStatus(str, Enum):
-    """Status of a goal"""
-    PENDING = "pending"
-    IN_PROGRESS = "in_progress"
-    COMPLETED = "completed"
-    BLOCKED = "blocked"
-    CANCELLED = "cancelled"
+GOAL_CACHE_TTL_SECONDS = 60        # other workers' writes become visible after this
+NAG_REPEAT_INTERVAL = timedelta(days=1)
+OVERDUE_SWEEP_LIMIT = 500
 
 
-class GoalPriority(str, Enum):
-    """Goal priority levels"""
-    CRITICAL = "critical"  # Must do today
-    HIGH = "high"          # This week
-    MEDIUM = "medium"      # This month
-    LOW = "low"            # Someday
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Goals keep naive UTC datetimes; timestamptz columns come back aware."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 @dataclass
@@ -88,6 +91,26 @@ class Goal:
             "notes": self.notes
         }
 
+    @classmethod
+    def from_row(cls, row: StartupGoal) -> "Goal":
+        return cls(
+            id=str(row.id),
+            name=row.name,
+            description=row.description,
+            target_metric=row.target_metric,
+            target_value=row.target_value,
+            current_value=row.current_value,
+            status=row.status,
+            priority=row.priority,
+            phase=row.phase,
+            assigned_agent_chain=list(row.assigned_agent_chain or []),
+            deadline=_naive_utc(row.deadline),
+            created_at=_naive_utc(row.created_at),
+            updated_at=_naive_utc(row.updated_at),
+            completed_at=_naive_utc(row.completed_at),
+            notes=list(row.notes or []),
+        )
+
 
 @dataclass
 class Milestone:
@@ -137,13 +160,76 @@ class GoalTracker:
     """
     
     def __init__(self):
-        # In-memory storage (in production, use database)
-        self._goals: Dict[str, Dict[str, Goal]] = {}  # startup_id -> {goal_id -> Goal}
+        # Write-through cache of the goals table: startup_id -> {goal_id -> Goal}
+        self._goals: Dict[str, Dict[str, Goal]] = {}
+        self._goals_loaded_at: Dict[str, float] = {}  # startup_id -> monotonic load time
         self._milestones: Dict[str, List[Milestone]] = {}  # startup_id -> [Milestone]
         self._daily_progress: Dict[str, List[DailyProgress]] = {}  # startup_id -> [DailyProgress]
         self._metrics: Dict[str, Dict[str, float]] = {}  # startup_id -> {metric_name -> value}
         logger.info("Goal Tracker initialized")
     
+    # ==================
+    # Storage
+    # ==================
+    
+    async def _startup_goals(self, startup_id: str) -> Dict[str, Goal]:
+        """All goals of a startup, from cache or one query"""
+        loaded_at = self._goals_loaded_at.get(startup_id)
+        if loaded_at is not None and time.monotonic() - loaded_at < GOAL_CACHE_TTL_SECONDS:
+            return self._goals[startup_id]
+        try:
+            startup_uuid = UUID(startup_id)
+        except ValueError:
+            return {}
+        
+        async with async_session_maker() as db:
+            result = await db.execute(select(StartupGoal).where(StartupGoal.startup_id == startup_uuid))
+            goals = {str(row.id): Goal.from_row(row) for row in result.scalars().all()}
+        
+        self._goals[startup_id] = goals
+        self._goals_loaded_at[startup_id] = time.monotonic()
+        return goals
+    
+    def _cache_put(self, startup_id: str, goals: List[Goal]) -> None:
+        cached = self._goals.get(startup_id)
+        if cached is not None:
+            for goal in goals:
+                cached[goal.id] = goal
+    
+    async def _modify(self, startup_id: str, goal_ids: Iterable[str], change: Callable[[Goal], None]) -> List[Goal]:
+        """
+        Apply change to fresh copies of goals locked inside the write transaction and
+        write back only the columns it altered, so a cached goal never undoes another
+        worker's write. Refreshes the cache with the results.
+        """
+        ids = []
+        for goal_id in goal_ids:
+            try:
+                ids.append(UUID(goal_id))
+            except ValueError:
+                continue
+        if not ids:
+            return []
+        
+        goals = []
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(StartupGoal)
+                .where(StartupGoal.startup_id == UUID(startup_id), StartupGoal.id.in_(ids))
+                .with_for_update()
+            )
+            for row in result.scalars().all():
+                before = Goal.from_row(row)
+                goal = replace(before, notes=list(before.notes))
+                change(goal)
+                for column in ("current_value", "status", "notes", "updated_at", "completed_at"):
+                    if getattr(goal, column) != getattr(before, column):
+                        setattr(row, column, getattr(goal, column))
+                goals.append(goal)
+            await db.commit()
+        self._cache_put(startup_id, goals)
+        return goals
+    
     # ==================
     # Goal Management
     # ==================
@@ -161,9 +247,6 @@ class GoalTracker:
         deadline: Optional[datetime] = None
     ) -> Goal:
         """Create a new goal"""
-        if startup_id not in self._goals:
-            self._goals[startup_id] = {}
-        
         goal = Goal(
             id=str(uuid4()),
             name=name,
@@ -173,36 +256,59 @@ class GoalTracker:
             priority=priority,
             phase=phase,
             assigned_agent_chain=agent_chain or [],
-            deadline=deadline
+            deadline=_naive_utc(deadline)
         )
         
-        self._goals[startup_id][goal.id] = goal
+        async with async_session_maker() as db:
+            db.add(StartupGoal(
+                id=UUID(goal.id),
+                startup_id=UUID(startup_id),
+                name=goal.name,
+                description=goal.description,
+                target_metric=goal.target_metric,
+                target_value=goal.target_value,
+                current_value=goal.current_value,
+                status=goal.status,
+                priority=goal.priority,
+                phase=goal.phase,
+                assigned_agent_chain=goal.assigned_agent_chain,
+                notes=goal.notes,
+                deadline=goal.deadline,
+                created_at=goal.created_at,
+                updated_at=goal.updated_at,
+            ))
+            await db.commit()
+        
+        self._cache_put(startup_id, [goal])
         logger.info("Goal created", startup_id=startup_id, goal_id=goal.id, name=name)
         return goal
     
-    async def update_goal_progress(
+    async def update_goals_progress(
         self,
         startup_id: str,
-        goal_id: str,
-        current_value: float,
+        values: Dict[str, float],
         note: Optional[str] = None
-    ) -> Optional[Goal]:
-        """Update goal progress"""
-        if startup_id not in self._goals or goal_id not in self._goals[startup_id]:
-            return None
+    ) -> List[Goal]:
+        """Update progress of several goals (goal_id -> current value) in one write"""
+        now = datetime.utcnow()
+        completed = []
         
-        goal = self._goals[startup_id][goal_id]
-        goal.current_value = current_value
-        goal.updated_at = datetime.utcnow()
+        def apply(goal: Goal) -> None:
+            goal.current_value = values[goal.id]
+            goal.updated_at = now
+            if note:
+                goal.notes.append(f"[{now.isoformat()}] {note}")
+            
+            # Check if completed
+            if goal.is_complete and goal.status != GoalStatus.COMPLETED:
+                goal.status = GoalStatus.COMPLETED
+                goal.completed_at = now
+                completed.append(goal)
         
-        if note:
-            goal.notes.append(f"[{datetime.utcnow().isoformat()}] {note}")
+        updated = await self._modify(startup_id, values, apply)
         
-        # Check if completed
-        if goal.is_complete and goal.status != GoalStatus.COMPLETED:
-            goal.status = GoalStatus.COMPLETED
-            goal.completed_at = datetime.utcnow()
-            logger.info("Goal completed!", startup_id=startup_id, goal_id=goal_id, name=goal.name)
+        for goal in completed:
+            logger.info("Goal completed!", startup_id=startup_id, goal_id=goal.id, name=goal.name)
             
             # Auto-create milestone
             await self.record_milestone(
@@ -210,10 +316,21 @@ class GoalTracker:
                 name=f"Completed: {goal.name}",
                 description=f"Achieved {goal.target_value} {goal.target_metric}",
                 phase=goal.phase,
-                related_goal_id=goal_id
+                related_goal_id=goal.id
             )
         
-        return goal
+        return updated
+    
+    async def update_goal_progress(
+        self,
+        startup_id: str,
+        goal_id: str,
+        current_value: float,
+        note: Optional[str] = None
+    ) -> Optional[Goal]:
+        """Update goal progress"""
+        updated = await self.update_goals_progress(startup_id, {goal_id: current_value}, note)
+        return updated[0] if updated else None
     
     async def set_goal_status(
         self,
@@ -222,23 +339,20 @@ class GoalTracker:
         status: GoalStatus
     ) -> Optional[Goal]:
         """Update goal status"""
-        if startup_id not in self._goals or goal_id not in self._goals[startup_id]:
-            return None
-        
-        goal = self._goals[startup_id][goal_id]
-        goal.status = status
-        goal.updated_at = datetime.utcnow()
+        now = datetime.utcnow()
         
-        if status == GoalStatus.COMPLETED:
-            goal.completed_at = datetime.utcnow()
+        def apply(goal: Goal) -> None:
+            goal.status = status
+            goal.updated_at = now
+            if status == GoalStatus.COMPLETED:
+                goal.completed_at = now
         
-        return goal
+        updated = await self._modify(startup_id, [goal_id], apply)
+        return updated[0] if updated else None
     
     async def get_goal(self, startup_id: str, goal_id: str) -> Optional[Goal]:
         """Get a specific goal"""
-        if startup_id not in self._goals:
-            return None
-        return self._goals[startup_id].get(goal_id)
+        return (await self._startup_goals(startup_id)).get(goal_id)
     
     async def get_active_goals(
         self, 
@@ -246,11 +360,8 @@ class GoalTracker:
         phase: Optional[str] = None
     ) -> List[Goal]:
         """Get all active (non-completed) goals"""
-        if startup_id not in self._goals:
-            return []
-        
         goals = [
-            g for g in self._goals[startup_id].values()
+            g for g in (await self._startup_goals(startup_id)).values()
             if g.status not in [GoalStatus.COMPLETED, GoalStatus.CANCELLED]
         ]
         
@@ -266,6 +377,57 @@ class GoalTracker:
         active = await self.get_active_goals(startup_id)
         return [g for g in active if g.is_overdue]
     
+    # ==================
+    # Overdue Sweep
+    # ==================
+    
+    async def overdue_goals_to_nag(
+        self,
+        now: Optional[datetime] = None,
+        limit: int = OVERDUE_SWEEP_LIMIT
+    ) -> List[Tuple[Startup, User, List[Goal]]]:
+        """
+        Overdue goals across all tenants that weren't nagged in the last day,
+        grouped per startup with its owner. One query on (status, deadline).
+        """
+        now = now or datetime.utcnow()
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(StartupGoal, Startup, User)
+                .join(Startup, Startup.id == StartupGoal.startup_id)
+                .join(User, User.id == Startup.owner_id)
+                .where(
+                    StartupGoal.status.in_(ACTIVE_GOAL_STATUSES),
+                    StartupGoal.deadline < now,
+                    StartupGoal.current_value < StartupGoal.target_value,
+                    or_(
+                        StartupGoal.last_nagged_at.is_(None),
+                        StartupGoal.last_nagged_at < now - NAG_REPEAT_INTERVAL,
+                    ),
+                    User.is_active == True,
+                )
+                .order_by(StartupGoal.deadline)
+                .limit(limit)
+            )
+            rows = result.all()
+        
+        grouped: Dict[str, Tuple[Startup, User, List[Goal]]] = {}
+        for row, startup, owner in rows:
+            grouped.setdefault(str(startup.id), (startup, owner, []))[2].append(Goal.from_row(row))
+        return list(grouped.values())
+    
+    async def mark_nagged(self, goal_ids: List[str], now: Optional[datetime] = None) -> None:
+        """Hold off further nags for these goals for NAG_REPEAT_INTERVAL"""
+        if not goal_ids:
+            return
+        async with async_session_maker() as db:
+            await db.execute(
+                update(StartupGoal)
+                .where(StartupGoal.id.in_([UUID(goal_id) for goal_id in goal_ids]))
+                .values(last_nagged_at=now or datetime.utcnow())
+            )
+            await db.commit()
+    
     # ==================
     # Milestone Tracking
     # ==================
@@ -341,10 +503,10 @@ class GoalTracker:
         logger.debug("Metric updated", startup_id=startup_id, metric=metric_name, value=value)
         
         # Auto-update goals tracking this metric
-        if startup_id in self._goals:
-            for goal in self._goals[startup_id].values():
-                if goal.target_metric == metric_name:
-                    await self.update_goal_progress(startup_id, goal.id, value)
+        goals = await self._startup_goals(startup_id)
+        tracking = {goal.id: value for goal in goals.values() if goal.target_metric == metric_name}
+        if tracking:
+            await self.update_goals_progress(startup_id, tracking)
     
     async def get_metrics(self, startup_id: str) -> Dict[str, float]:
         """Get all metrics for a startup"""
@@ -368,8 +530,9 @@ class GoalTracker:
         metrics = await self.get_metrics(startup_id)
         
         # Calculate overall health score
-        total_goals = len(active_goals) + len([g for g in self._goals.get(startup_id, {}).values() if g.status == GoalStatus.COMPLETED])
-        completed_goals = len([g for g in self._goals.get(startup_id, {}).values() if g.status == GoalStatus.COMPLETED])
+        goals = await self._startup_goals(startup_id)
+        completed_goals = len([g for g in goals.values() if g.status == GoalStatus.COMPLETED])
+        total_goals = len(active_goals) + completed_goals
         
         completion_rate = (completed_goals / max(total_goals, 1)) * 100
         overdue_penalty = len(overdue_goals) * 10
@@ -5,18 +5,22 @@ Self-improving marketing machine that learns from past performance
 Part of Project PHOENIX
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, literal, tuple_
+from sqlalchemy.dialects.postgresql import insert
 import structlog
 
 from app.core.database import AsyncSessionLocal
-from app.models.social import SocialPost, PostStatus
+from app.models.social import SocialPost, PostEngagement
 from app.models.growth import Lead, ContentItem
 
 logger = structlog.get_logger()
 
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
 
 class GrowthLoopEngine:
     """
@@ -24,98 +28,241 @@ class GrowthLoopEngine:
     1. Tracks performance of all actions
     2. Learns patterns (best posting times, content types, etc.)
     3. Auto-adjusts strategies based on data
+    
+    Engagement lives in the post_engagement fact table (one row per post and
+    platform), so analytics are GROUP BYs over an indexed window rather than
+    a Python pass over every post's JSON.
     """
     
+    # ==================
+    # Engagement Facts
+    # ==================
+    
+    async def record_published(self, db: AsyncSession, post: SocialPost) -> None:
+        """Create empty engagement facts for a just-published post (in the caller's transaction)"""
+        platforms = list(dict.fromkeys(post.platforms or []))
+        if not platforms or not post.published_at:
+            return
+        await db.execute(
+            insert(PostEngagement)
+            .values([
+                {
+                    "post_id": post.id,
+                    "platform": platform,
+                    "startup_id": post.startup_id,
+                    "published_at": post.published_at,
+                }
+                for platform in platforms
+            ])
+            .on_conflict_do_nothing()
+        )
+    
+    async def record_engagement(
+        self,
+        post_id: str,
+        platform: str,
+        metrics: Dict[str, Any],
+        db: Optional[AsyncSession] = None
+    ) -> None:
+        """
+        Upsert the latest platform metrics for a post.
+        Accepts likes / shares (or retweets) / comments; a single statement,
+        which also creates the fact for posts published before it existed.
+        """
+        likes = int(metrics.get("likes") or 0)
+        shares = int(metrics.get("shares", metrics.get("retweets")) or 0)
+        comments = int(metrics.get("comments") or 0)
+        now = datetime.utcnow()
+        
+        source = select(
+            SocialPost.id,
+            literal(platform),
+            SocialPost.startup_id,
+            SocialPost.published_at,
+            literal(likes),
+            literal(shares),
+            literal(comments),
+            literal(likes + shares + comments),
+            literal(now),
+        ).where(
+            SocialPost.id == UUID(str(post_id)),
+            SocialPost.published_at.isnot(None),
+        )
+        stmt = insert(PostEngagement).from_select(
+            ["post_id", "platform", "startup_id", "published_at",
+             "likes", "shares", "comments", "engagement", "metrics_updated_at"],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PostEngagement.post_id, PostEngagement.platform],
+            set_={
+                "likes": stmt.excluded.likes,
+                "shares": stmt.excluded.shares,
+                "comments": stmt.excluded.comments,
+                "engagement": stmt.excluded.engagement,
+                "metrics_updated_at": stmt.excluded.metrics_updated_at,
+            },
+        )
+        
+        if db is not None:
+            await db.execute(stmt)
+            return
+        async with AsyncSessionLocal() as session:
+            await session.execute(stmt)
+            await session.commit()
+    
+    # ==================
+    # Analytics
+    # ==================
+    
     async def analyze_past_performance(self, startup_id: str, days: int = 30) -> Dict[str, Any]:
         """
         Analyze the past N days of performance data.
         Returns insights about what's working and what's not.
         """
-        async with AsyncSessionLocal() as db:
-            # Get published posts and their performance
-            cutoff = datetime.utcnow() - timedelta(days=days)
-            
-            result = await db.execute(
-                select(SocialPost).where(
-                    SocialPost.startup_id == startup_id,
-                    SocialPost.status == PostStatus.PUBLISHED,
-                    SocialPost.published_at >= cutoff
-                )
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        in_window = (
+            PostEngagement.startup_id == UUID(str(startup_id)),
+            PostEngagement.published_at >= cutoff,
+        )
+        
+        # Per-post engagement (summed over platforms), then day and hour averages
+        # plus the overall post count in one GROUPING SETS pass
+        per_post = (
+            select(
+                PostEngagement.post_id,
+                (func.extract("isodow", PostEngagement.published_at) - 1).label("dow"),
+                func.extract("hour", PostEngagement.published_at).label("hour"),
+                func.sum(PostEngagement.engagement).label("engagement"),
             )
-            posts = result.scalars().all()
-            
-            if not posts:
-                return {
-                    "posts_analyzed": 0,
-                    "insights": ["No published posts in the last 30 days. Start posting!"],
-                    "recommendations": []
-                }
-            
-            # Analyze by day of week
-            day_performance: Dict[int, List[int]] = {i: [] for i in range(7)}
-            hour_performance: Dict[int, List[int]] = {i: [] for i in range(24)}
-            platform_performance: Dict[str, int] = {}
-            
-            for post in posts:
-                if post.published_at:
-                    day_of_week = post.published_at.weekday()
-                    hour = post.published_at.hour
-                    
-                    # Use engagement from platform_ids if available
-                    engagement = 1  # Default minimal engagement
-                    if post.platform_ids:
-                        for platform, data in post.platform_ids.items():
-                            if isinstance(data, dict):
-                                engagement = data.get("likes", 0) + data.get("retweets", 0) + data.get("comments", 0)
-                    
-                    day_performance[day_of_week].append(engagement)
-                    hour_performance[hour].append(engagement)
-                    
-                    for platform in post.platforms:
-                        platform_performance[platform] = platform_performance.get(platform, 0) + engagement
-            
-            # Find best performing day
-            avg_by_day = {day: sum(engagements)/len(engagements) if engagements else 0 
-                          for day, engagements in day_performance.items()}
-            best_day = max(avg_by_day, key=avg_by_day.get)
-            day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-            
-            # Find best hour
-            avg_by_hour = {hour: sum(engagements)/len(engagements) if engagements else 0 
-                          for hour, engagements in hour_performance.items()}
-            best_hour = max(avg_by_hour, key=avg_by_hour.get)
-            
-            # Find best platform
-            best_platform = max(platform_performance, key=platform_performance.get) if platform_performance else "twitter"
-            
-            insights = [
-                f"Your best posting day is {day_names[best_day]}",
-                f"Your best posting hour is {best_hour}:00 UTC",
-                f"Your best performing platform is {best_platform}",
-                f"Analyzed {len(posts)} posts over the last {days} days"
-            ]
-            
-            recommendations = [
-                f"Schedule more posts for {day_names[best_day]}s around {best_hour}:00 UTC",
-                f"Focus more effort on {best_platform}" if platform_performance else "Connect social accounts to track performance",
-                "Experiment with different content types to find what resonates"
-            ]
-            
+            .where(*in_window)
+            .group_by(PostEngagement.post_id, PostEngagement.published_at)
+            .subquery()
+        )
+        buckets_stmt = (
+            select(
+                per_post.c.dow,
+                per_post.c.hour,
+                func.count().label("posts"),
+                func.avg(per_post.c.engagement).label("avg_engagement"),
+            )
+            .group_by(func.grouping_sets(
+                tuple_(per_post.c.dow), tuple_(per_post.c.hour), tuple_()
+            ))
+        )
+        platforms_stmt = (
+            select(PostEngagement.platform, func.sum(PostEngagement.engagement))
+            .where(*in_window)
+            .group_by(PostEngagement.platform)
+        )
+        
+        async with AsyncSessionLocal() as db:
+            buckets = (await db.execute(buckets_stmt)).all()
+            platform_performance = {
+                platform: int(total or 0)
+                for platform, total in (await db.execute(platforms_stmt)).all()
+            }
+        
+        avg_by_day = {day: 0.0 for day in range(7)}
+        avg_by_hour = {hour: 0.0 for hour in range(24)}
+        # (avg engagement, post count) of the buckets that actually have posts
+        posted_days: Dict[int, Tuple[float, int]] = {}
+        posted_hours: Dict[int, Tuple[float, int]] = {}
+        posts_analyzed = 0
+        for dow, hour, posts, avg_engagement in buckets:
+            if dow is not None:
+                avg_by_day[int(dow)] = float(avg_engagement or 0)
+                posted_days[int(dow)] = (avg_by_day[int(dow)], posts)
+            elif hour is not None:
+                avg_by_hour[int(hour)] = float(avg_engagement or 0)
+                posted_hours[int(hour)] = (avg_by_hour[int(hour)], posts)
+            else:
+                posts_analyzed = posts
+        
+        if not posts_analyzed:
             return {
-                "posts_analyzed": len(posts),
-                "best_day": day_names[best_day],
-                "best_hour": best_hour,
-                "best_platform": best_platform,
-                "performance_by_day": {day_names[d]: round(v, 2) for d, v in avg_by_day.items()},
-                "insights": insights,
-                "recommendations": recommendations
+                "posts_analyzed": 0,
+                "insights": [f"No published posts in the last {days} days. Start posting!"],
+                "recommendations": []
             }
+        
+        # Find best performing day, hour and platform. Only buckets with posts
+        # compete; ties (e.g. no engagement synced yet) go to post volume
+        best_day = max(posted_days, key=posted_days.get)
+        best_hour = max(posted_hours, key=posted_hours.get)
+        best_platform = max(platform_performance, key=platform_performance.get) if platform_performance else "twitter"
+        
+        insights = [
+            f"Your best posting day is {DAY_NAMES[best_day]}",
+            f"Your best posting hour is {best_hour}:00 UTC",
+            f"Your best performing platform is {best_platform}",
+            f"Analyzed {posts_analyzed} posts over the last {days} days"
+        ]
+        
+        recommendations = [
+            f"Schedule more posts for {DAY_NAMES[best_day]}s around {best_hour}:00 UTC",
+            f"Focus more effort on {best_platform}" if platform_performance else "Connect social accounts to track performance",
+            "Experiment with different content types to find what resonates"
+        ]
+        
+        return {
+            "posts_analyzed": posts_analyzed,
+            "best_day": DAY_NAMES[best_day],
+            "best_hour": best_hour,
+            "best_platform": best_platform,
+            "performance_by_day": {DAY_NAMES[d]: round(v, 2) for d, v in avg_by_day.items()},
+            "performance_by_platform": platform_performance,
+            "insights": insights,
+            "recommendations": recommendations
+        }
+    
+    async def compare_startups(
+        self,
+        startup_ids: Optional[List[str]] = None,
+        days: int = 90
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Posts and average engagement per post for many startups (all when
+        startup_ids is None) in one query over the fact table.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        per_post = (
+            select(
+                PostEngagement.startup_id,
+                PostEngagement.post_id,
+                func.sum(PostEngagement.engagement).label("engagement"),
+            )
+            .where(PostEngagement.published_at >= cutoff)
+            .group_by(PostEngagement.startup_id, PostEngagement.post_id)
+        )
+        if startup_ids is not None:
+            per_post = per_post.where(
+                PostEngagement.startup_id.in_([UUID(str(sid)) for sid in startup_ids])
+            )
+        per_post = per_post.subquery()
+        
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(per_post.c.startup_id, func.count(), func.avg(per_post.c.engagement))
+                .group_by(per_post.c.startup_id)
+            )).all()
+        
+        return {
+            str(startup_id): {"posts": posts, "avg_engagement": round(float(avg or 0), 2)}
+            for startup_id, posts, avg in rows
+        }
     
-    async def optimize_schedule(self, startup_id: str) -> Dict[str, Any]:
+    async def optimize_schedule(
+        self,
+        startup_id: str,
+        performance: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Based on past performance, suggest optimal posting schedule.
+        Pass an analyze_past_performance() result to avoid recomputing it.
         """
-        performance = await self.analyze_past_performance(startup_id)
+        if performance is None:
+            performance = await self.analyze_past_performance(startup_id)
         
         if performance["posts_analyzed"] < 5:
             return {
@@ -88,9 +88,8 @@ async def assemble_context(
 
     # Try to load Company DNA if it exists
     try:
-        from app.services.company_dna import CompanyDNAService
-        dna_service = CompanyDNAService()
-        dna = await dna_service.get_dna(db, str(startup.id))
+        from app.services.company_dna import company_dna_service
+        dna = await company_dna_service.get_dna(db, str(startup.id))
         if dna:
             context["company_dna"] = dna
     except Exception:
@@ -0,0 +1,369 @@
+"""
+Inbox Sync Engine
+Incremental IMAP sync shared by every inbox consumer (SDR reply listener,
+Executive Assistant "hair on fire" daemon).
+
+- Blocking imaplib runs on a small dedicated thread pool, never on the event loop
+- UIDVALIDITY / last-UID checkpoints per mailbox are persisted in Redis, so each
+  sync only asks the server for UIDs above the checkpoint
+- Only headers are fetched during sync (BODY.PEEK, messages stay unread);
+  bodies are pulled on demand with fetch_body()
+- IMAP IDLE push loop triggers a sync as soon as the server reports new mail
+- Each consumer claims Message-IDs in Redis, so no message is handled twice by
+  the same consumer across workers, restarts or UIDVALIDITY resets
+"""
+
+import asyncio
+import email
+import imaplib
+import re
+import select
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.header import decode_header, make_header
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+InboxConsumer = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+HEADER_FIELDS = "FROM SUBJECT MESSAGE-ID IN-REPLY-TO REFERENCES DATE"
+CHECKPOINT_KEY = "imap_checkpoint:{account}:{mailbox}"
+CLAIM_KEY = "inbox_processed:{consumer}:{message_id}"
+CLAIM_TTL_SECONDS = 60 * 60 * 24 * 30  # 30 days
+IDLE_RENEW_SECONDS = 25 * 60           # RFC 2177: re-issue IDLE before 29 min
+
+
+def _decode(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    try:
+        return str(make_header(decode_header(value)))
+    except Exception:
+        return value
+
+
+class InboxSyncEngine:
+    """Incremental, header-first IMAP sync with per-consumer de-duplication."""
+
+    def __init__(self, host: str = "imap.gmail.com", initial_backfill: int = 25):
+        self.host = host
+        self.initial_backfill = initial_backfill
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="imap-sync")
+        self._consumers: Dict[str, InboxConsumer] = {}
+        self._sync_lock = asyncio.Lock()
+        self._idle_task: Optional[asyncio.Task] = None
+
+    # ─── Configuration ───────────────────────────────────────────────────────
+
+    def _credentials(self) -> Tuple[Optional[str], Optional[str]]:
+        return getattr(settings, "GMAIL_USER", None), getattr(settings, "GMAIL_APP_PASSWORD", None)
+
+    @property
+    def is_configured(self) -> bool:
+        username, password = self._credentials()
+        return bool(username and password)
+
+    def register_consumer(self, name: str, handler: InboxConsumer) -> None:
+        """Consumers receive each newly synced batch, minus messages they already claimed."""
+        self._consumers[name] = handler
+
+    # ─── Sync ────────────────────────────────────────────────────────────────
+
+    async def sync(self, mailbox: str = "INBOX") -> List[Dict[str, Any]]:
+        """
+        Fetch headers for messages above the mailbox checkpoint and hand them
+        to every registered consumer. Returns the new messages.
+        """
+        if not self.is_configured:
+            logger.warning("InboxSync: Cannot check mail. Missing credentials.")
+            return []
+
+        async with self._sync_lock:
+            checkpoint = await self._load_checkpoint(mailbox)
+            loop = asyncio.get_running_loop()
+            try:
+                messages, new_checkpoint = await loop.run_in_executor(
+                    self._executor, self._sync_blocking, mailbox, checkpoint
+                )
+            except Exception as e:
+                logger.error("InboxSync: IMAP sync failed", mailbox=mailbox, error=str(e))
+                return []
+
+            if messages:
+                logger.info("InboxSync: New messages", mailbox=mailbox, count=len(messages), last_uid=new_checkpoint["last_uid"])
+                if not await self._dispatch(messages):
+                    # Keep the old checkpoint so the next sync fetches these again;
+                    # consumers that succeeded skip them via their claims
+                    logger.warning("InboxSync: Checkpoint held back after consumer failure", mailbox=mailbox)
+                    return messages
+            await self._save_checkpoint(mailbox, new_checkpoint)
+        return messages
+
+    def _connect(self) -> imaplib.IMAP4_SSL:
+        username, password = self._credentials()
+        conn = imaplib.IMAP4_SSL(self.host)
+        conn.login(username, password)
+        return conn
+
+    def _sync_blocking(self, mailbox: str, checkpoint: Dict[str, int]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        conn = self._connect()
+        try:
+            status, _ = conn.select(mailbox, readonly=True)
+            if status != "OK":
+                raise RuntimeError(f"Cannot select mailbox {mailbox}")
+            uidvalidity = self._uidvalidity(conn, mailbox)
+
+            if checkpoint.get("uidvalidity") == uidvalidity and checkpoint.get("last_uid"):
+                last_uid = checkpoint["last_uid"]
+                status, data = conn.uid("SEARCH", None, f"UID {last_uid + 1}:*")
+                # "n:*" always matches the newest message, even when n is past it
+                uids = [u for u in self._parse_uids(data) if u > last_uid]
+            else:
+                # First sync (or mailbox was rebuilt): only look at recent unread mail
+                if checkpoint.get("uidvalidity"):
+                    logger.warning("InboxSync: UIDVALIDITY changed, resetting checkpoint", mailbox=mailbox)
+                status, data = conn.uid("SEARCH", None, "UNSEEN")
+                uids = self._parse_uids(data)[-self.initial_backfill:]
+                status, all_data = conn.uid("SEARCH", None, "ALL")
+                all_uids = self._parse_uids(all_data)
+                last_uid = all_uids[-1] if all_uids else 0
+
+            messages = self._fetch_headers(conn, mailbox, uids) if uids else []
+            new_last = max([last_uid, *uids]) if uids else last_uid
+            return messages, {"uidvalidity": uidvalidity, "last_uid": new_last}
+        finally:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _uidvalidity(conn: imaplib.IMAP4, mailbox: str) -> int:
+        _, data = conn.response("UIDVALIDITY")
+        try:
+            return int(data[0])
+        except (TypeError, ValueError, IndexError):
+            _, status = conn.status(mailbox, "(UIDVALIDITY)")
+            match = re.search(rb"UIDVALIDITY (\d+)", (status and status[0]) or b"")
+            return int(match.group(1)) if match else 0
+
+    @staticmethod
+    def _parse_uids(data) -> List[int]:
+        if not data or not data[0]:
+            return []
+        return sorted(int(u) for u in data[0].split())
+
+    def _fetch_headers(self, conn: imaplib.IMAP4, mailbox: str, uids: List[int]) -> List[Dict[str, Any]]:
+        uid_set = ",".join(str(u) for u in uids)
+        status, data = conn.uid("FETCH", uid_set, f"(UID FLAGS BODY.PEEK[HEADER.FIELDS ({HEADER_FIELDS})])")
+        if status != "OK":
+            return []
+
+        messages = []
+        for part in data:
+            if not isinstance(part, tuple):
+                continue
+            meta, raw_headers = part
+            uid_match = re.search(rb"UID (\d+)", meta)
+            if not uid_match:
+                continue
+            headers = email.message_from_bytes(raw_headers)
+            uid = int(uid_match.group(1))
+            messages.append({
+                "uid": uid,
+                "mailbox": mailbox,
+                "message_id": (headers.get("Message-ID") or f"<uid-{uid}@{mailbox}>").strip(),
+                "subject": _decode(headers.get("Subject")),
+                "sender": _decode(headers.get("From")),
+                "in_reply_to": (headers.get("In-Reply-To") or "").strip() or None,
+                "references": (headers.get("References") or "").split(),
+                "date": headers.get("Date"),
+                "seen": b"\\Seen" in meta,
+            })
+        return messages
+
+    # ─── Bodies On Demand ────────────────────────────────────────────────────
+
+    async def fetch_body(self, uid: int, mailbox: str = "INBOX", max_chars: int = 4000) -> str:
+        """Fetch the plain-text body of a single message without marking it read."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._fetch_body_blocking, uid, mailbox, max_chars)
+
+    def _fetch_body_blocking(self, uid: int, mailbox: str, max_chars: int) -> str:
+        conn = self._connect()
+        try:
+            conn.select(mailbox, readonly=True)
+            status, data = conn.uid("FETCH", str(uid), "(BODY.PEEK[])")
+            if status != "OK" or not data or not isinstance(data[0], tuple):
+                return ""
+            msg = email.message_from_bytes(data[0][1])
+            for part in msg.walk() if msg.is_multipart() else [msg]:
+                if part.get_content_type() == "text/plain":
+                    payload = part.get_payload(decode=True) or b""
+                    return payload.decode(part.get_content_charset() or "utf-8", errors="replace")[:max_chars]
+            return ""
+        finally:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+    # ─── IDLE Push ───────────────────────────────────────────────────────────
+
+    def start_idle(self, mailbox: str = "INBOX") -> None:
+        """Start the IMAP IDLE loop as a background task (no-op if already running)."""
+        if self._idle_task and not self._idle_task.done():
+            return
+        if not self.is_configured:
+            return
+        self._idle_task = asyncio.create_task(self._idle_loop(mailbox))
+
+    async def stop_idle(self) -> None:
+        if self._idle_task:
+            self._idle_task.cancel()
+            try:
+                await self._idle_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._idle_task = None
+
+    async def _idle_loop(self, mailbox: str) -> None:
+        loop = asyncio.get_running_loop()
+        backoff = 5
+        while True:
+            try:
+                has_new = await loop.run_in_executor(self._executor, self._idle_wait_blocking, mailbox)
+                backoff = 5
+                if has_new:
+                    await self.sync(mailbox)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("InboxSync: IDLE connection dropped", error=str(e), retry_in=backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 300)
+
+    def _idle_wait_blocking(self, mailbox: str) -> bool:
+        """Block in IDLE until the server reports EXISTS or the renew timer fires."""
+        conn = self._connect()
+        try:
+            conn.select(mailbox, readonly=True)
+            tag = conn._new_tag()
+            conn.send(tag + b" IDLE\r\n")
+
+            # Read the IDLE exchange straight off the socket and wait with select()
+            # rather than a socket timeout: once a timeout fires the socket's file
+            # object can't be read again, breaking the DONE handshake. Bypassing
+            # conn.readline() also keeps lines from hiding in its read buffer.
+            idling, has_new = False, False
+            buffered = b""
+            deadline = time.monotonic() + IDLE_RENEW_SECONDS
+            while not has_new:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                ssl_pending = getattr(conn.sock, "pending", None)
+                if not (ssl_pending and ssl_pending()):
+                    if not select.select([conn.sock], [], [], remaining)[0]:
+                        break
+                chunk = conn.sock.recv(4096)
+                if not chunk:
+                    raise RuntimeError("IDLE connection closed")
+                buffered += chunk
+                *lines, buffered = buffered.split(b"\r\n")
+                for line in lines:
+                    if not idling:
+                        if not line.startswith(b"+"):
+                            raise RuntimeError("Server rejected IDLE")
+                        idling = True
+                    elif line.startswith(b"*") and b"EXISTS" in line:
+                        has_new = True
+            if not idling:
+                raise RuntimeError("Server did not acknowledge IDLE")
+
+            conn.send(b"DONE\r\n")
+            while not conn.readline().startswith(tag):
+                pass
+            return has_new
+        finally:
+            try:
+                conn.logout()
+            except Exception:
+                pass
+
+    # ─── De-duplication ──────────────────────────────────────────────────────
+
+    async def claim(self, consumer: str, message_ids: List[str]) -> List[str]:
+        """
+        Atomically mark message ids as processed for a consumer.
+        Returns only the ids this call claimed (i.e. not seen before).
+        """
+        if not message_ids:
+            return []
+        try:
+            from app.core.redis_client import redis_client
+            pipe = redis_client.pipeline()
+            for message_id in message_ids:
+                pipe.set(CLAIM_KEY.format(consumer=consumer, message_id=message_id), "1", nx=True, ex=CLAIM_TTL_SECONDS)
+            results = await pipe.execute()
+            return [mid for mid, ok in zip(message_ids, results, strict=True) if ok]
+        except Exception as e:
+            logger.warning("InboxSync: Claim store unavailable, processing without de-dup", error=str(e))
+            return list(message_ids)
+
+    async def release(self, consumer: str, message_ids: List[str]) -> None:
+        """Drop a consumer's claims so the messages are delivered to it again."""
+        if not message_ids:
+            return
+        try:
+            from app.core.redis_client import redis_client
+            await redis_client.delete(*(CLAIM_KEY.format(consumer=consumer, message_id=m) for m in message_ids))
+        except Exception as e:
+            logger.warning("InboxSync: Claim release failed", consumer=consumer, error=str(e))
+
+    async def _dispatch(self, messages: List[Dict[str, Any]]) -> bool:
+        """Hand messages to every consumer. Returns False if any consumer failed."""
+        delivered = True
+        for name, handler in list(self._consumers.items()):
+            claimed = set(await self.claim(name, [m["message_id"] for m in messages]))
+            batch = [m for m in messages if m["message_id"] in claimed]
+            if not batch:
+                continue
+            try:
+                await handler(batch)
+            except Exception as e:
+                logger.error("InboxSync: Consumer failed", consumer=name, error=str(e))
+                await self.release(name, [m["message_id"] for m in batch])
+                delivered = False
+        return delivered
+
+    # ─── Checkpoints ─────────────────────────────────────────────────────────
+
+    def _checkpoint_key(self, mailbox: str) -> str:
+        username, _ = self._credentials()
+        return CHECKPOINT_KEY.format(account=username or "default", mailbox=mailbox)
+
+    async def _load_checkpoint(self, mailbox: str) -> Dict[str, int]:
+        try:
+            from app.core.redis_client import redis_client
+            raw = await redis_client.hgetall(self._checkpoint_key(mailbox))
+            return {k: int(v) for k, v in (raw or {}).items()}
+        except Exception as e:
+            logger.warning("InboxSync: Checkpoint load failed", error=str(e))
+            return {}
+
+    async def _save_checkpoint(self, mailbox: str, checkpoint: Dict[str, int]) -> None:
+        try:
+            from app.core.redis_client import redis_client
+            await redis_client.hset(self._checkpoint_key(mailbox), mapping=checkpoint)
+        except Exception as e:
+            logger.warning("InboxSync: Checkpoint save failed", error=str(e))
+
+
+# Singleton
+inbox_sync = InboxSyncEngine()
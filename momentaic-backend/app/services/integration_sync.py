@@ -0,0 +1,264 @@
+"""
+Integration Sync Orchestrator
+Runs scheduled syncs for every active integration concurrently.
+
+- Per-provider concurrency (semaphore) and rate quota (token bucket), so one
+  tenant-heavy provider cannot starve the others or trip its API limits
+- One pooled httpx client per provider, shared by every integration of that
+  provider instead of a fresh client per row
+- Integrations synced within their freshness window are skipped
+- Status updates and IntegrationData rows are written in bulk at the end
+- Per-provider latency / error histograms in app.core.metrics
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import httpx
+import structlog
+from sqlalchemy import insert, select, update
+
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.integrations.base import IntegrationCredentials, SyncResult
+from app.models.integration import DataCategory, Integration, IntegrationData, IntegrationStatus
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class ProviderQuota:
+    concurrency: int = 4            # syncs in flight for this provider
+    syncs_per_minute: int = 60      # sync starts per minute (token bucket)
+    freshness_minutes: int = 55     # skip integrations synced more recently than this
+
+
+# Providers whose sync_data is implemented; add more as they are
+PROVIDER_QUOTAS: Dict[str, ProviderQuota] = {
+    "stripe": ProviderQuota(concurrency=8, syncs_per_minute=120),
+    "github": ProviderQuota(concurrency=4, syncs_per_minute=30),
+}
+
+DATA_CATEGORIES = {
+    "mrr": DataCategory.REVENUE,
+    "arr": DataCategory.REVENUE,
+    "customers": DataCategory.CUSTOMERS,
+    "commits": DataCategory.COMMITS,
+    "issues": DataCategory.ISSUES,
+}
+
+
+class _RateLimiter:
+    """Token bucket: `rate_per_minute` tokens refill continuously, bursts up to `burst`."""
+
+    def __init__(self, rate_per_minute: int, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+@dataclass
+class _Outcome:
+    integration_id: UUID
+    startup_id: UUID
+    provider: str
+    result: SyncResult
+    duration: float
+
+
+class IntegrationSyncOrchestrator:
+    """Concurrent, quota-aware sync of all active integrations."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._limiters: Dict[str, _RateLimiter] = {}
+
+    # ─── Provider Resources ──────────────────────────────────────────────────
+
+    def quota_for(self, provider: str) -> ProviderQuota:
+        return PROVIDER_QUOTAS.get(provider, ProviderQuota())
+
+    def _http_client(self, provider: str) -> httpx.AsyncClient:
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            quota = self.quota_for(provider)
+            client = self._clients[provider] = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=quota.concurrency * 2,
+                    max_keepalive_connections=quota.concurrency,
+                ),
+            )
+        return client
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        if provider not in self._semaphores:
+            self._semaphores[provider] = asyncio.Semaphore(self.quota_for(provider).concurrency)
+        return self._semaphores[provider]
+
+    def _limiter(self, provider: str) -> _RateLimiter:
+        if provider not in self._limiters:
+            quota = self.quota_for(provider)
+            self._limiters[provider] = _RateLimiter(quota.syncs_per_minute, burst=quota.concurrency)
+        return self._limiters[provider]
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    # ─── Scheduling ──────────────────────────────────────────────────────────
+
+    def is_due(self, integration: Integration, now: Optional[datetime] = None) -> bool:
+        if not integration.last_sync_at:
+            return True
+        quota = self.quota_for(integration.provider.value)
+        window = (integration.config or {}).get("sync_freshness_minutes", quota.freshness_minutes)
+        return (now or datetime.utcnow()) - integration.last_sync_at >= timedelta(minutes=window)
+
+    async def sync_all(self, force: bool = False) -> Dict[str, Any]:
+        """Sync every due, active integration of a supported provider."""
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Integration).where(Integration.status == IntegrationStatus.ACTIVE)
+            )
+            integrations = [i for i in result.scalars().all() if i.provider.value in PROVIDER_QUOTAS]
+
+        now = datetime.utcnow()
+        due = [i for i in integrations if force or self.is_due(i, now)]
+        skipped = len(integrations) - len(due)
+
+        outcomes = await asyncio.gather(*(self._sync_one(i) for i in due))
+        await self._persist(outcomes)
+
+        summary = {
+            "due": len(due),
+            "skipped_fresh": skipped,
+            "succeeded": sum(1 for o in outcomes if o.result.success),
+            "failed": sum(1 for o in outcomes if not o.result.success),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info("Integration sync complete", **summary)
+        return summary
+
+    async def _sync_one(self, integration: Integration) -> _Outcome:
+        provider = integration.provider.value
+        async with self._semaphore(provider):
+            await self._limiter(provider).acquire()
+            started = time.perf_counter()
+            try:
+                result = await self._run_provider_sync(integration, provider)
+            except Exception as e:
+                logger.error("Integration sync failed", provider=provider, integration_id=str(integration.id), error=str(e))
+                result = SyncResult(success=False, errors=[str(e)])
+            duration = time.perf_counter() - started
+
+        metrics.observe("integration_sync_seconds", duration, provider=provider)
+        if not result.success:
+            metrics.inc("integration_sync_errors_total", provider=provider)
+        return _Outcome(integration.id, integration.startup_id, provider, result, duration)
+
+    async def _run_provider_sync(self, integration: Integration, provider: str) -> SyncResult:
+        http_client = self._http_client(provider)
+
+        if provider == "stripe":
+            # Incremental /events backfill into materialized revenue state
+            from app.services.stripe_revenue import stripe_revenue_engine
+            async with AsyncSessionLocal() as db:
+                summary = await stripe_revenue_engine.sync(db, integration, http_client=http_client)
+                revenue = await stripe_revenue_engine.get_metrics(db, integration.startup_id) or {}
+                await db.commit()
+            return SyncResult(
+                success=True,
+                records_synced=summary.get("applied", 0),
+                data={k: revenue[k] for k in ("mrr", "arr", "customers", "subscriptions") if k in revenue},
+            )
+
+        from app.integrations import get_integration_class
+        integration_class = get_integration_class(provider)
+        if not integration_class:
+            return SyncResult(success=False, errors=[f"Sync not implemented for {provider}"])
+
+        credentials = IntegrationCredentials(
+            access_token=integration.access_token,
+            api_key=integration.api_key,
+            api_secret=integration.api_secret,
+        )
+        if "config" in inspect.signature(integration_class.__init__).parameters:
+            client = integration_class(credentials, config=integration.config)
+        else:
+            client = integration_class(credentials)
+        client.use_shared_http_client(http_client)
+        try:
+            return await client.sync_data()
+        finally:
+            await client.close()
+
+    # ─── Persistence ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _data_rows(outcome: _Outcome, synced_at: datetime) -> List[Dict[str, Any]]:
+        rows = []
+        for data_type, value in (outcome.result.data or {}).items():
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            rows.append({
+                "integration_id": outcome.integration_id,
+                "startup_id": outcome.startup_id,
+                "category": DATA_CATEGORIES.get(data_type, DataCategory.METRICS),
+                "data_type": data_type,
+                "data": value if isinstance(value, dict) else {"value": value},
+                "metric_value": int(round(value)) if numeric else None,
+                "metric_date": synced_at,
+                "synced_at": synced_at,
+            })
+        return rows
+
+    async def _persist(self, outcomes: List[_Outcome]) -> None:
+        if not outcomes:
+            return
+        synced_at = datetime.utcnow()
+        status_rows: List[Dict[str, Any]] = []
+        data_rows: List[Dict[str, Any]] = []
+
+        for outcome in outcomes:
+            if outcome.result.success:
+                status_rows.append({"id": outcome.integration_id, "last_sync_at": synced_at, "last_error": None})
+                data_rows.extend(self._data_rows(outcome, synced_at))
+            else:
+                status_rows.append({"id": outcome.integration_id, "last_error": "; ".join(outcome.result.errors)[:2000]})
+
+        async with AsyncSessionLocal() as db:
+            # ORM bulk UPDATE by primary key / bulk INSERT (one executemany each)
+            success_rows = [r for r in status_rows if "last_sync_at" in r]
+            failure_rows = [r for r in status_rows if "last_sync_at" not in r]
+            if success_rows:
+                await db.execute(update(Integration), success_rows)
+            if failure_rows:
+                await db.execute(update(Integration), failure_rows)
+            if data_rows:
+                await db.execute(insert(IntegrationData), data_rows)
+            await db.commit()
+
+
+# Singleton
+integration_sync = IntegrationSyncOrchestrator()
@@ -1,7 +1,7 @@
 import asyncio
 import httpx
 import structlog
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from openai import AsyncOpenAI
 from app.core.config import settings
 
@@ -54,40 +54,25 @@ class KlingService:
             
         try:
             # 1. Dispatch the Generation Task
-            dispatch_url = f"{self.base_url}/task"
-            
             # PiAPI explicitly requires 'local_dubbing_url' for Kling Avatars (lip sync)
             if not local_dubbing_url:
                 logger.info("kling_service_generating_tts", prompt=prompt)
                 local_dubbing_url = await self._generate_and_host_tts(prompt)
             
-            payload = {
-                "model": "kling",
-                "task_type": "avatar",
-                "input": {
-                    "image_url": image_url,
-                    "prompt": prompt,
-                    "mode": "std",
-                    "batch_size": 1,
-                    "local_dubbing_url": local_dubbing_url
-                }
+            task_input = {
+                "image_url": image_url,
+                "prompt": prompt,
+                "mode": "std",
+                "batch_size": 1,
+                "local_dubbing_url": local_dubbing_url
             }
 
             logger.info("kling_service_dispatching_avatar", image_url=image_url)
             
             async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(dispatch_url, headers=self.headers, json=payload)
-                if response.status_code != 200:
-                    logger.error("kling_service_dispatch_failed", status=response.status_code, body=response.text)
-                    return None
-                data = response.json()
-                    
-                task_id = data.get("data", {}).get("task_id")
+                task_id = await self.submit_task("avatar", task_input, client)
                 if not task_id:
-                    logger.error("kling_service_missing_task_id", response=data)
                     return None
-                    
-                logger.info("kling_service_task_created", task_id=task_id)
                 
                 # 2. Poll for Completion (Video renders take 3-5 minutes typically)
                 return await self._poll_task_completion(task_id, client)
@@ -96,41 +81,104 @@ class KlingService:
             logger.error("kling_service_error", error=str(e))
             return None
 
+    async def submit_task(
+        self,
+        task_type: str,
+        task_input: Dict[str, Any],
+        client: httpx.AsyncClient,
+        webhook_url: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Dispatches a task to PiAPI and returns its task_id without waiting for the render.
+        If webhook_url is set, PiAPI will POST the finished task back to us.
+        """
+        payload: Dict[str, Any] = {
+            "model": "kling",
+            "task_type": task_type,
+            "input": task_input,
+        }
+        if webhook_url:
+            payload["config"] = {
+                "service_mode": "public",
+                "webhook_config": {
+                    "endpoint": webhook_url,
+                    "secret": settings.piapi_webhook_secret or "",
+                },
+            }
+
+        response = await client.post(f"{self.base_url}/task", headers=self.headers, json=payload)
+        if response.status_code != 200:
+            logger.error("kling_service_dispatch_failed", status=response.status_code, body=response.text)
+            return None
+        data = response.json()
+
+        task_id = data.get("data", {}).get("task_id")
+        if not task_id:
+            logger.error("kling_service_missing_task_id", response=data)
+            return None
+
+        logger.info("kling_service_task_created", task_id=task_id, task_type=task_type)
+        return task_id
+
+    async def fetch_task(self, task_id: str, client: httpx.AsyncClient) -> Tuple[str, Optional[str], Dict[str, Any]]:
+        """Single status check for a task. Returns (status, video_url, raw_response)."""
+        response = await client.get(f"{self.base_url}/task/{task_id}", headers=self.headers)
+        response.raise_for_status()
+        data = response.json()
+        status, video_url = self.parse_task_result(data)
+        return status, video_url, data
+
+    @staticmethod
+    def parse_task_result(data: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """
+        Normalizes a PiAPI task payload (poll response or webhook body) into
+        one of "completed" / "failed" / "processing" plus the output video URL.
+        """
+        task = data.get("data", data) or {}
+        status = task.get("status")
+
+        if status == "completed":
+            output = task.get("output") or {}
+            # Kling works array contains the final generated assets
+            works = output.get("works", [])
+            if works and len(works) > 0:
+                video_url = works[0].get("video", {}).get("resource") if isinstance(works[0], dict) else None
+                if not video_url and isinstance(works[0], dict):
+                    video_url = works[0].get("url")
+                if not video_url: # Handle different potential Kling PiAPI output payloads
+                    video_url = works[0] if isinstance(works[0], str) else str(works[0])
+                return "completed", video_url
+            # Plain video_generation tasks return the URL directly on the output
+            return "completed", output.get("video_url") or output.get("url")
+
+        if status in ["failed", "error", "canceled"]:
+            return "failed", None
+
+        return "processing", None
+
     async def _poll_task_completion(self, task_id: str, client: httpx.AsyncClient) -> Optional[str]:
         """Polls the PiAPI endpoint until the task status resolves (completed/failed)."""
-        poll_url = f"{self.base_url}/task/{task_id}"
         max_attempts = 60 # 60 * 10s = 10 minutes max wait
         
         for attempt in range(max_attempts):
             await asyncio.sleep(10) # 10 second polling interval
             
             try:
-                response = await client.get(poll_url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                
-                status = data.get("data", {}).get("status")
+                status, video_url, data = await self.fetch_task(task_id, client)
                 
                 if status == "completed":
-                    # Kling works array contains the final generated assets
-                    works = data.get("data", {}).get("output", {}).get("works", [])
-                    if works and len(works) > 0:
-                        video_url = works[0].get("video", {}).get("resource") or works[0].get("url")
-                        if not video_url: # Handle different potential Kling PiAPI output payloads
-                            video_url = works[0] if isinstance(works[0], str) else str(works[0])
-                            
+                    if video_url:
                         logger.info("kling_service_task_completed", task_id=task_id, video_url=video_url)
                         return video_url
-                    else:
-                        logger.error("kling_service_empty_works", task_id=task_id, response=data)
-                        return None
+                    logger.error("kling_service_empty_works", task_id=task_id, response=data)
+                    return None
                         
-                elif status in ["failed", "error", "canceled"]:
-                    logger.error("kling_service_task_failed", task_id=task_id, status=status, response=data)
+                elif status == "failed":
+                    logger.error("kling_service_task_failed", task_id=task_id, response=data)
                     return None
                     
                 else:
-                    logger.debug("kling_service_polling", task_id=task_id, status=status, attempt=attempt)
+                    logger.debug("kling_service_polling", task_id=task_id, attempt=attempt)
                     
             except Exception as e:
                 logger.warning("kling_service_polling_error", task_id=task_id, error=str(e), attempt=attempt)
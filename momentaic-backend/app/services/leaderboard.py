@@ -0,0 +1,303 @@
+"""
+Traction Leaderboard
+Precomputed, incrementally maintained startup rankings in Redis sorted sets.
+
+- A startup is re-scored through TractionScoreEngine only when its ranked
+  inputs (metrics, name, category) change; unchanged rows are skipped by hash
+- Global and per-category ZSETs: top-N is ZREVRANGE, rank is ZREVRANK and the
+  real percentile is ZCOUNT below / ZCARD, all O(log n)
+- Daily snapshots of every ranking back the day/week/month windows, which rank
+  by score gained since the snapshot (ZUNIONSTORE current - snapshot)
+- An hourly refresh streams all startups and re-scores only the changed ones,
+  so writes that bypass the API hooks (scripts, bulk imports) still land
+"""
+
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_client
+from app.models.startup import Startup
+from app.services.traction_score import get_traction_engine
+
+logger = structlog.get_logger()
+
+GLOBAL_SCOPE = "global"
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30}
+SNAPSHOT_RETENTION_DAYS = 40
+WINDOW_CACHE_SECONDS = 300
+REFRESH_BATCH_SIZE = 1000
+
+_ENTRIES_KEY = "leaderboard:entries"   # HASH startup_id -> JSON display entry
+_HASHES_KEY = "leaderboard:hashes"     # HASH startup_id -> hash of ranked inputs
+
+
+def _ranking_key(scope: str) -> str:
+    return f"leaderboard:rank:{scope}"
+
+
+def _snapshot_key(day: date, scope: str) -> str:
+    return f"leaderboard:snap:{day.isoformat()}:{scope}"
+
+
+def _window_key(period: str, scope: str) -> str:
+    return f"leaderboard:window:{period}:{scope}"
+
+
+def category_scope(category: Optional[str]) -> str:
+    """Normalized ZSET scope for a category; None/"all" is the global ranking."""
+    if not category or category.strip().lower() == "all":
+        return GLOBAL_SCOPE
+    return f"cat:{category.strip().lower()}"
+
+
+def _percentile(below: int, total: int) -> Optional[float]:
+    """Share of ranked startups with a strictly lower score."""
+    return round(below / total * 100, 1) if total else None
+
+
+class LeaderboardService:
+    """Maintains and queries the traction rankings."""
+
+    # ─── Writes ──────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def inputs_hash(startup) -> str:
+        payload = {
+            "metrics": startup.metrics or {},
+            "name": startup.name,
+            "tagline": startup.tagline or startup.description or "",
+            "category": startup.industry or "general",
+        }
+        return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def build_entry(startup) -> Dict[str, Any]:
+        metrics = startup.metrics or {}
+        score = get_traction_engine().calculate_score(metrics, str(startup.id))
+        return {
+            "startup_id": str(startup.id),
+            "name": startup.name,
+            "tagline": startup.tagline or startup.description or "",
+            "traction_score": score.overall_score,
+            "tier": score.tier,
+            "verified": score.verified,
+            "category": (startup.industry or "general").strip().lower(),
+            "public_metrics": {
+                "mrr": metrics.get("mrr", 0) or 0,
+                "growth": metrics.get("mrr_growth", 0) or 0,
+                "users": metrics.get("users", 0) or 0,
+            },
+            "integrations_connected": metrics.get("integrations_count", 0),
+            "breakdown": {
+                "revenue": score.revenue_score,
+                "growth": score.velocity_score,
+                "engagement": score.product_score,
+                "momentum": score.momentum_score,
+            },
+            "updated_at": score.last_updated.isoformat(),
+        }
+
+    async def record_many(self, startups: Iterable[Startup]) -> int:
+        """Re-score the startups whose ranked inputs changed. Returns how many were re-scored."""
+        startups = list(startups)
+        if not startups:
+            return 0
+        ids = [str(s.id) for s in startups]
+        stored_hashes = await redis_client.hmget(_HASHES_KEY, ids)
+        changed = [
+            (startup, digest)
+            for startup, stored in zip(startups, stored_hashes, strict=True)
+            if (digest := self.inputs_hash(startup)) != stored
+        ]
+        if not changed:
+            return 0
+
+        previous = await redis_client.hmget(_ENTRIES_KEY, [str(s.id) for s, _ in changed])
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for (startup, digest), old in zip(changed, previous, strict=True):
+                entry = self.build_entry(startup)
+                member = entry["startup_id"]
+                scope = category_scope(entry["category"])
+                if old:
+                    old_scope = category_scope(json.loads(old)["category"])
+                    if old_scope != scope:
+                        pipe.zrem(_ranking_key(old_scope), member)
+                pipe.zadd(_ranking_key(GLOBAL_SCOPE), {member: entry["traction_score"]})
+                pipe.zadd(_ranking_key(scope), {member: entry["traction_score"]})
+                pipe.hset(_ENTRIES_KEY, member, json.dumps(entry))
+                pipe.hset(_HASHES_KEY, member, digest)
+            await pipe.execute()
+        return len(changed)
+
+    async def record(self, startup: Startup) -> bool:
+        """Hook for API writes; never fails the caller (the hourly refresh heals misses)."""
+        try:
+            return bool(await self.record_many([startup]))
+        except Exception as e:
+            logger.warning("Leaderboard update failed", startup_id=str(startup.id), error=str(e))
+            return False
+
+    async def remove(self, startup_id: str) -> None:
+        member = str(startup_id)
+        try:
+            old = await redis_client.hget(_ENTRIES_KEY, member)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.zrem(_ranking_key(GLOBAL_SCOPE), member)
+                if old:
+                    pipe.zrem(_ranking_key(category_scope(json.loads(old)["category"])), member)
+                pipe.hdel(_ENTRIES_KEY, member)
+                pipe.hdel(_HASHES_KEY, member)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Leaderboard removal failed", startup_id=member, error=str(e))
+
+    async def refresh_all(self) -> Dict[str, int]:
+        """Stream every startup, re-score the changed ones and drop deleted ones."""
+        seen, rescored = set(), 0
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(Startup)
+                .options(load_only(
+                    Startup.id, Startup.name, Startup.tagline, Startup.description,
+                    Startup.industry, Startup.metrics,
+                ))
+                .execution_options(yield_per=REFRESH_BATCH_SIZE)
+            )
+            async for batch in result.scalars().partitions(REFRESH_BATCH_SIZE):
+                seen.update(str(s.id) for s in batch)
+                rescored += await self.record_many(batch)
+
+        stale = [m for m in await redis_client.hkeys(_HASHES_KEY) if m not in seen]
+        for member in stale:
+            await self.remove(member)
+
+        summary = {"startups": len(seen), "rescored": rescored, "removed": len(stale)}
+        logger.info("Leaderboard refreshed", **summary)
+        return summary
+
+    # ─── Snapshots ───────────────────────────────────────────────────────────
+
+    async def _scopes(self) -> List[str]:
+        prefix = _ranking_key("")
+        return [key[len(prefix):] async for key in redis_client.scan_iter(match=f"{prefix}*")]
+
+    async def snapshot(self, day: Optional[date] = None) -> int:
+        """Copy every ranking into a dated snapshot (run once a day)."""
+        day = day or datetime.utcnow().date()
+        scopes = await self._scopes()
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for scope in scopes:
+                key = _snapshot_key(day, scope)
+                pipe.zunionstore(key, [_ranking_key(scope)])
+                pipe.expire(key, timedelta(days=SNAPSHOT_RETENTION_DAYS))
+            await pipe.execute()
+        logger.info("Leaderboard snapshot stored", day=day.isoformat(), scopes=len(scopes))
+        return len(scopes)
+
+    async def _window(self, period: str, scope: str) -> Optional[str]:
+        """ZSET of score gained since the period's snapshot, or None if no snapshot exists."""
+        window = _window_key(period, scope)
+        if await redis_client.exists(window):
+            return window
+        snapshot = _snapshot_key(datetime.utcnow().date() - timedelta(days=PERIOD_DAYS[period]), scope)
+        if not await redis_client.exists(snapshot):
+            return None
+
+        current, diff = _ranking_key(scope), f"{window}:tmp"
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.zunionstore(diff, {current: 1, snapshot: -1})
+            # Keep only startups still ranked now (drops deleted / re-categorized ones)
+            pipe.zinterstore(window, {diff: 1, current: 0})
+            pipe.delete(diff)
+            pipe.expire(window, WINDOW_CACHE_SECONDS)
+            await pipe.execute()
+        return window
+
+    # ─── Reads ───────────────────────────────────────────────────────────────
+
+    async def top(self, limit: int = 50, category: Optional[str] = None, time_period: str = "all") -> Dict[str, Any]:
+        scope = category_scope(category)
+        key, windowed = _ranking_key(scope), False
+        if time_period in PERIOD_DAYS:
+            window = await self._window(time_period, scope)
+            if window:
+                key, windowed = window, True
+
+        rows = await redis_client.zrevrange(key, 0, max(0, limit - 1), withscores=True)
+        total = await redis_client.zcard(_ranking_key(scope))
+        entries = await redis_client.hmget(_ENTRIES_KEY, [m for m, _ in rows]) if rows else []
+
+        leaderboard = []
+        for rank, ((_, value), raw) in enumerate(zip(rows, entries, strict=True), start=1):
+            if not raw:
+                continue
+            entry = json.loads(raw)
+            entry.pop("breakdown", None)
+            entry["rank"] = rank
+            if windowed:
+                entry["score_change"] = round(value, 1)
+            leaderboard.append(entry)
+
+        return {
+            "leaderboard": leaderboard,
+            "total": total,
+            "category": category or "all",
+            # Falls back to all-time until the window's snapshot exists
+            "time_period": time_period if windowed else "all",
+        }
+
+    async def rank_of(self, startup_id: str, category: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Rank, total and percentile of a startup globally and within its category."""
+        member = str(startup_id)
+        raw = await redis_client.hget(_ENTRIES_KEY, member)
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        scope = category_scope(category or entry["category"])
+
+        positions = {}
+        for name, key in (("global", _ranking_key(GLOBAL_SCOPE)), ("category", _ranking_key(scope))):
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zscore(key, member)
+                pipe.zrevrank(key, member)
+                pipe.zcard(key)
+                score, rank, total = await pipe.execute()
+            if score is None:
+                positions[name] = None
+                continue
+            below = await redis_client.zcount(key, "-inf", f"({score}")
+            positions[name] = {"rank": rank + 1, "total": total, "percentile": _percentile(below, total)}
+
+        return {
+            "startup_id": member,
+            "traction_score": entry["traction_score"],
+            "tier": entry["tier"],
+            "category": entry["category"],
+            "breakdown": entry.get("breakdown", {}),
+            "global": positions["global"],
+            "category_rank": positions["category"],
+        }
+
+    async def percentile_for_score(self, score: float, category: Optional[str] = None) -> Optional[float]:
+        """Percentile an arbitrary score would hold in the current ranking."""
+        key = _ranking_key(category_scope(category))
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zcount(key, "-inf", f"({score}")
+                pipe.zcard(key)
+                below, total = await pipe.execute()
+        except Exception as e:
+            logger.warning("Leaderboard percentile unavailable", error=str(e))
+            return None
+        return _percentile(below, total)
+
+
+# Singleton
+leaderboard_service = LeaderboardService()
@@ -0,0 +1,133 @@
+"""
+Link Checker
+Validates page links for QA audits: concurrently, and cached across audits.
+
+- One pooled httpx client; checks run under a global semaphore with at most
+  PER_HOST_CONNECTIONS in flight per host, so a large site is not hammered
+- HEAD first, then a streamed GET (headers only) for servers that reject or
+  mishandle HEAD
+- URL -> status results are kept in a TTL cache shared by every audit and
+  page in the worker; concurrent checks of the same URL share one request
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from app.core.metrics import metrics
+
+logger = structlog.get_logger()
+
+LINK_CHECK_CONCURRENCY = 32
+PER_HOST_CONNECTIONS = 4
+LINK_TIMEOUT_SECONDS = 5.0
+LINK_CACHE_TTL_SECONDS = 15 * 60
+LINK_ERROR_CACHE_TTL_SECONDS = 60    # transport errors are often transient
+LINK_CACHE_MAX_ENTRIES = 10000
+HEAD_REJECTED_STATUSES = {400, 403, 404, 405, 501}
+USER_AGENT = "MomentAIc-QA-Tester/1.0"
+
+
+@dataclass(frozen=True)
+class LinkStatus:
+    status_code: int          # 0 when the request failed
+    error: Optional[str] = None
+
+    @property
+    def broken(self) -> bool:
+        return self.status_code == 0 or self.status_code >= 400
+
+
+class LinkChecker:
+
+    def __init__(self, concurrency: int = LINK_CHECK_CONCURRENCY, per_host: int = PER_HOST_CONNECTIONS):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host))
+        self._cache: "OrderedDict[str, Tuple[float, LinkStatus]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=LINK_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=self._concurrency,
+                                    max_keepalive_connections=self._concurrency),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ─── Checks ──────────────────────────────────────────────────────────────
+
+    async def check_many(self, urls: Iterable[str]) -> Dict[str, LinkStatus]:
+        """Status of every distinct url, checked concurrently."""
+        unique = list(dict.fromkeys(urls))
+        with metrics.timer("qa_link_batch_seconds"):
+            statuses = await asyncio.gather(*(self.check(url) for url in unique))
+        return dict(zip(unique, statuses, strict=True))
+
+    async def check(self, url: str) -> LinkStatus:
+        cached = self._cache.get(url)
+        if cached and cached[0] > time.monotonic():
+            metrics.inc("qa_link_checks_total", outcome="cache_hit")
+            return cached[1]
+
+        pending = self._in_flight.get(url)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                return await self.check(url)  # the audit that owned the request was cancelled
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            status = await self._request(url)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[url]
+        ttl = LINK_ERROR_CACHE_TTL_SECONDS if status.status_code == 0 else LINK_CACHE_TTL_SECONDS
+        self._remember(url, status, ttl)
+        future.set_result(status)
+        return status
+
+    async def _request(self, url: str) -> LinkStatus:
+        async with self._host_semaphores[urlsplit(url).hostname or ""], self._semaphore:
+            try:
+                response = await self._http().head(url)
+                status_code = response.status_code
+                if status_code in HEAD_REJECTED_STATUSES:
+                    async with self._http().stream("GET", url) as response:
+                        status_code = response.status_code
+                metrics.inc("qa_link_checks_total", outcome="broken" if status_code >= 400 else "ok")
+                return LinkStatus(status_code)
+            except Exception as e:
+                metrics.inc("qa_link_checks_total", outcome="error")
+                return LinkStatus(0, error=(str(e) or type(e).__name__)[:100])
+
+    def _remember(self, url: str, status: LinkStatus, ttl: float) -> None:
+        self._cache[url] = (time.monotonic() + ttl, status)
+        self._cache.move_to_end(url)
+        while len(self._cache) > LINK_CACHE_MAX_ENTRIES:
+            self._cache.popitem(last=False)
+
+
+# Singleton
+link_checker = LinkChecker()
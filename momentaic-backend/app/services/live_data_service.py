@@ -104,6 +104,22 @@ class LiveDataService:
         
         if not integration or not integration.api_key:
             return None
+        
+        # Prefer the materialized, event-driven metrics (no Stripe round trips)
+        from app.services.stripe_revenue import stripe_revenue_engine
+        data = await stripe_revenue_engine.get_metrics(db, integration.startup_id)
+        if data:
+            subs = data["subscriptions"]
+            return {
+                "monthly_recurring_revenue": data["mrr"],
+                "annual_recurring_revenue": data["arr"],
+                "active_subscriptions": subs["active"],
+                "churn_rate_percent": subs["churn_rate"],
+                "recent_cancellations": subs["canceled_this_month"],
+                "total_customers": data["customers"]["total"],
+                "source": "Stripe (event-synced)",
+                "timestamp": data["last_event_at"] or datetime.now().isoformat(),
+            }
             
         try:
             # Initialize credentials and client
@@ -1,68 +1,375 @@
+"""
+MCP Client Service
+Hosts the Model Context Protocol servers the agents talk to.
+
+- Each server is a pool of stdio child processes. Each child's session is held
+  open by its own long-lived owner task, so servers and pool members start
+  concurrently and shut down independently
+- Every start is bounded by a per-server timeout
+- Lazy servers are only started on their first list_tools / call_tool; calls
+  made while a server is still starting wait for that same start
+- Calls go to the least-busy live session, so concurrent call_tool
+  invocations do not queue behind one stdio pipe
+- A supervisor pings idle sessions and restarts children that died; a
+  transport error on a call triggers the same check at once
+- The tool catalog is cached per server and dropped whenever a child reconnects
+- states() / ready / pool_stats() expose per-server state for the health endpoint;
+  status() adds the last error for logs
+"""
 
 import asyncio
-import os
+import enum
+import time
 import structlog
-from contextlib import AsyncExitStack
-from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+from app.core.metrics import metrics
+
 logger = structlog.get_logger()
 
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 30.0
+DEFAULT_PROBE_INTERVAL_SECONDS = 15.0
+PROBE_TIMEOUT_SECONDS = 5.0
+SHUTDOWN_TIMEOUT_SECONDS = 5.0
+
+
+class ServerState(str, enum.Enum):
+    IDLE = "idle"            # registered, not started (lazy)
+    STARTING = "starting"
+    READY = "ready"
+    FAILED = "failed"
+    STOPPED = "stopped"
+
+
+@dataclass
+class MCPServerSpec:
+    name: str
+    command: str
+    args: List[str]
+    env: Optional[Dict[str, str]] = None
+    lazy: bool = False
+    timeout: float = DEFAULT_CONNECT_TIMEOUT_SECONDS
+    pool_size: int = 1
+    probe_interval: float = DEFAULT_PROBE_INTERVAL_SECONDS
+
+
+class _Connection:
+    """One pool member: a child process whose session is held open by its owner task."""
+
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.session: Optional[ClientSession] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stop = asyncio.Event()
+        self.in_flight = 0
+
+    @property
+    def dead(self) -> bool:
+        return self.error is not None or (self.task is not None and self.task.done())
+
+
+class _ServerHandle:
+    """Runtime state of one server: its pool, supervisor and cached tool catalog."""
+
+    def __init__(self, spec: MCPServerSpec):
+        self.spec = spec
+        self.state = ServerState.IDLE
+        self.error: Optional[str] = None
+        self.ready: Optional[asyncio.Future] = None
+        self.connections: List[_Connection] = []
+        self.supervisor: Optional[asyncio.Task] = None
+        self.retiring: set = set()   # owner tasks of replaced members, still winding down
+        self.tools: Optional[list] = None
+        self.generation = 0      # bumped on every (re)connect; guards the tool cache
+        self.reconnects = 0
+
+    def alive(self) -> List[_Connection]:
+        return [conn for conn in self.connections if conn.session is not None]
+
+
 class MCPClientService:
     """
     Manages connections to MCP Servers.
     Acts as the 'Host' for the Model Context Protocol.
     """
-    
+
     def __init__(self):
-        self._exit_stack = AsyncExitStack()
-        self._sessions: Dict[str, ClientSession] = {}
-        
-    async def connect_stdio_server(self, name: str, command: str, args: List[str], env: Optional[Dict[str, str]] = None):
+        self._servers: Dict[str, _ServerHandle] = {}
+
+    # ─── Registration ────────────────────────────────────────────────────────
+
+    def register_server(
+        self,
+        name: str,
+        command: str,
+        args: List[str],
+        env: Optional[Dict[str, str]] = None,
+        lazy: bool = False,
+        timeout: float = DEFAULT_CONNECT_TIMEOUT_SECONDS,
+        pool_size: int = 1,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL_SECONDS,
+    ) -> None:
+        """Declare a stdio server. Nothing is spawned until start()/start_all() or first use."""
+        spec = MCPServerSpec(name, command, args, env, lazy, timeout, max(1, pool_size), probe_interval)
+        self._servers[name] = _ServerHandle(spec)
+
+    async def connect_stdio_server(
+        self,
+        name: str,
+        command: str,
+        args: List[str],
+        env: Optional[Dict[str, str]] = None,
+        timeout: float = DEFAULT_CONNECT_TIMEOUT_SECONDS,
+    ) -> ClientSession:
         """Connect to a local MCP server running via stdio."""
-        server_params = StdioServerParameters(
-            command=command,
-            args=args,
-            env=env
-        )
-        
+        self.register_server(name, command, args, env, timeout=timeout)
+        return await self.start(name)
+
+    # ─── Lifecycle ───────────────────────────────────────────────────────────
+
+    async def start(self, name: str) -> ClientSession:
+        """Start a server (or join its in-flight start) and wait until a session is live."""
+        handle = self._servers.get(name)
+        if handle is None:
+            raise ValueError(f"Server {name} not connected")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + handle.spec.timeout
+        while True:
+            if handle.state == ServerState.READY:
+                if handle.alive():
+                    return self._pick(handle).session
+                # Every child exited under us, possibly between ready and this waiter resuming
+                for conn in [conn for conn in handle.connections if conn.dead]:
+                    self._restart(handle, conn)
+                if handle.state == ServerState.READY:
+                    self._launch(handle)
+            elif handle.state != ServerState.STARTING:
+                self._launch(handle)
+
+            try:
+                await asyncio.wait_for(asyncio.shield(handle.ready), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                if handle.state == ServerState.STARTING:
+                    handle.state = ServerState.FAILED
+                    handle.error = f"timed out after {handle.spec.timeout:g}s"
+                    for conn in handle.connections:
+                        conn.task.cancel()
+                    logger.error("MCP Server start timed out", name=name, timeout=handle.spec.timeout)
+                raise TimeoutError(f"MCP server {name} {handle.error}")
+
+    def _launch(self, handle: _ServerHandle) -> None:
+        """Spawn the whole pool; the server is ready as soon as one member is."""
+        handle.state = ServerState.STARTING
+        handle.error = None
+        handle.tools = None
+        handle.generation += 1
+        handle.ready = asyncio.get_running_loop().create_future()
+        handle.connections = [self._spawn(handle, slot) for slot in range(handle.spec.pool_size)]
+        if handle.supervisor is None or handle.supervisor.done():
+            handle.supervisor = asyncio.create_task(self._supervise(handle), name=f"mcp:{handle.spec.name}:supervisor")
+
+    def _spawn(self, handle: _ServerHandle, slot: int) -> _Connection:
+        conn = _Connection(slot)
+        conn.task = asyncio.create_task(self._run(handle, conn), name=f"mcp:{handle.spec.name}:{slot}")
+        return conn
+
+    async def _run(self, handle: _ServerHandle, conn: _Connection) -> None:
+        """Owner task: holds one child's stdio process and session open until stop is set."""
+        spec = handle.spec
+        started = time.perf_counter()
         try:
-            stdio_transport = await self._exit_stack.enter_async_context(stdio_client(server_params))
-            session = await self._exit_stack.enter_async_context(ClientSession(stdio_transport[0], stdio_transport[1]))
-            await session.initialize()
-            
-            self._sessions[name] = session
-            logger.info("Connected to MCP Server", name=name)
-            return session
-            
+            server_params = StdioServerParameters(command=spec.command, args=spec.args, env=spec.env)
+            async with stdio_client(server_params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    conn.session = session
+                    if handle.state == ServerState.STARTING:
+                        handle.state = ServerState.READY
+                        handle.error = None
+                    if not handle.ready.done():
+                        handle.ready.set_result(None)
+                    logger.info("Connected to MCP Server", name=spec.name, slot=conn.slot,
+                                seconds=round(time.perf_counter() - started, 3))
+                    await conn.stop.wait()
         except Exception as e:
-            logger.error("Failed to connect to MCP Server", name=name, error=str(e))
-            raise e
+            conn.error = str(e)[:200]
+            logger.error("Failed to connect to MCP Server", name=spec.name, slot=conn.slot, error=str(e))
+            if handle.state == ServerState.STARTING and conn in handle.connections \
+                    and all(member.error for member in handle.connections):
+                handle.state = ServerState.FAILED
+                handle.error = conn.error
+                if not handle.ready.done():
+                    handle.ready.set_exception(e)
+        finally:
+            conn.session = None
+
+    async def _supervise(self, handle: _ServerHandle) -> None:
+        """Periodically probe the pool and replace dead children."""
+        while handle.state != ServerState.STOPPED:
+            await asyncio.sleep(handle.spec.probe_interval)
+            if handle.state == ServerState.READY:
+                await asyncio.gather(*(self._probe(handle, conn) for conn in list(handle.connections)))
+
+    async def _probe(self, handle: _ServerHandle, conn: _Connection, force: bool = False) -> None:
+        """
+        Restart a member whose child is gone or whose session no longer answers
+        a ping. Busy members are skipped unless forced: a stuck pipe surfaces
+        through the calls themselves.
+        """
+        if conn not in handle.connections or handle.state == ServerState.STOPPED:
+            return  # already replaced
+        if not conn.dead:
+            if conn.session is None or (conn.in_flight and not force):
+                return  # still connecting / busy
+            try:
+                await asyncio.wait_for(conn.session.send_ping(), PROBE_TIMEOUT_SECONDS)
+                return
+            except Exception as e:
+                conn.error = f"health probe failed: {e}"[:200]
+            if conn not in handle.connections:
+                return
+        self._restart(handle, conn)
+
+    def _restart(self, handle: _ServerHandle, conn: _Connection) -> None:
+        name = handle.spec.name
+        logger.warning("Restarting MCP Server child", name=name, slot=conn.slot, error=conn.error)
+        conn.stop.set()
+        conn.session = None
+        if not conn.task.done():
+            handle.retiring.add(conn.task)
+            conn.task.add_done_callback(handle.retiring.discard)
+        handle.reconnects += 1
+        handle.generation += 1
+        handle.tools = None
+        metrics.inc("mcp_reconnects_total", server=name)
+        if handle.state == ServerState.READY and not handle.alive():
+            handle.state = ServerState.STARTING
+            handle.ready = asyncio.get_running_loop().create_future()
+        handle.connections[handle.connections.index(conn)] = self._spawn(handle, conn.slot)
+
+    async def start_all(self) -> Dict[str, str]:
+        """Start every non-lazy server concurrently; failures are reported, not raised."""
+        eager = [name for name, handle in self._servers.items() if not handle.spec.lazy]
+        started = time.perf_counter()
+        await asyncio.gather(*(self.start(name) for name in eager), return_exceptions=True)
+        status = self.status()
+        logger.info("MCP Server Status", seconds=round(time.perf_counter() - started, 3), **status)
+        return status
+
+    @property
+    def ready(self) -> bool:
+        """True once no eagerly started server is still bootstrapping."""
+        return all(
+            handle.spec.lazy or handle.state not in (ServerState.IDLE, ServerState.STARTING)
+            for handle in self._servers.values()
+        )
+
+    def status(self) -> Dict[str, str]:
+        """Per-server state with the last error, for logs."""
+        return {
+            name: f"{handle.state.value}: {handle.error}" if handle.error else handle.state.value
+            for name, handle in self._servers.items()
+        }
+
+    def states(self) -> Dict[str, str]:
+        """Per-server state only; safe for the unauthenticated health endpoint."""
+        return {name: handle.state.value for name, handle in self._servers.items()}
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            name: {
+                "size": handle.spec.pool_size,
+                "alive": len(handle.alive()),
+                "in_flight": sum(conn.in_flight for conn in handle.connections),
+                "reconnects": handle.reconnects,
+            }
+            for name, handle in self._servers.items()
+        }
+
+    def connected_servers(self) -> List[str]:
+        return [name for name, handle in self._servers.items() if handle.state == ServerState.READY]
+
+    # ─── Tools ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _pick(handle: _ServerHandle) -> _Connection:
+        """Least-busy live member (lowest slot wins ties)."""
+        alive = handle.alive()
+        if not alive:
+            raise ConnectionError(f"MCP server {handle.spec.name} has no live session")
+        return min(alive, key=lambda conn: conn.in_flight)
+
+    async def _acquire(self, server_name: str) -> Tuple[_ServerHandle, _Connection]:
+        await self.start(server_name)
+        handle = self._servers[server_name]
+        return handle, self._pick(handle)
 
     async def list_tools(self, server_name: str):
-        """List tools available on a connected server."""
-        session = self._sessions.get(server_name)
-        if not session:
-            raise ValueError(f"Server {server_name} not connected")
-            
-        result = await session.list_tools()
+        """List tools available on a server, from the cached catalog when possible."""
+        handle, conn = await self._acquire(server_name)
+        if handle.tools is not None:
+            return handle.tools
+
+        generation = handle.generation
+        conn.in_flight += 1
+        try:
+            result = await conn.session.list_tools()
+        except Exception:
+            await self._probe(handle, conn, force=True)
+            raise
+        finally:
+            conn.in_flight -= 1
+        if handle.generation == generation:
+            handle.tools = result.tools
         return result.tools
 
     async def call_tool(self, server_name: str, tool_name: str, arguments: Dict[str, Any]):
-        """Call a tool on a connected server."""
-        session = self._sessions.get(server_name)
-        if not session:
-            raise ValueError(f"Server {server_name} not connected")
-            
-        result = await session.call_tool(tool_name, arguments)
-        return result
+        """Call a tool on the least-busy session of a server, starting it first if needed."""
+        handle, conn = await self._acquire(server_name)
+        conn.in_flight += 1
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            result = await conn.session.call_tool(tool_name, arguments)
+            is_error = getattr(result, "is_error", getattr(result, "isError", False))
+            outcome = "tool_error" if is_error else "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            conn.in_flight -= 1
+            metrics.observe("mcp_tool_call_seconds", time.perf_counter() - started,
+                            server=server_name, tool=tool_name)
+            metrics.inc("mcp_tool_calls_total", server=server_name, tool=tool_name, outcome=outcome)
+            if outcome == "error":
+                await self._probe(handle, conn, force=True)
 
     async def cleanup(self):
         """Close all connections."""
-        await self._exit_stack.aclose()
-        self._sessions.clear()
+        tasks = []
+        for handle in self._servers.values():
+            handle.state = ServerState.STOPPED
+            if handle.supervisor:
+                handle.supervisor.cancel()
+                tasks.append(handle.supervisor)
+            for conn in handle.connections:
+                conn.stop.set()
+                if conn.task and not conn.task.done():
+                    tasks.append(conn.task)
+            tasks.extend(handle.retiring)
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_TIMEOUT_SECONDS)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._servers.clear()
 
 # Global instance
 mcp_service = MCPClientService()
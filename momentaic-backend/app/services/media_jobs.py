@@ -0,0 +1,395 @@
+"""
+Media Job Service
+Durable submit-and-resolve tracking for generative media (Kling video, Imagen, TTS).
+
+Instead of holding a coroutine open for minutes while a render finishes, callers
+submit a job and move on. Jobs are resolved by:
+  - a single batched poller (scheduler, every few seconds, all workers share the
+    queue via FOR UPDATE SKIP LOCKED), or
+  - a provider webhook (PiAPI webhook_config) hitting /webhooks/media/{provider}.
+
+On resolution a named completion callback runs (e.g. patching CharacterContent)
+and the status is broadcast to the startup's WebSocket channel.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+import httpx
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.media_job import MediaJob, MediaJobProvider, MediaJobStatus
+
+logger = structlog.get_logger()
+
+CompletionCallback = Callable[[AsyncSession, MediaJob], Awaitable[None]]
+
+
+class MediaJobService:
+    """Submits, polls and resolves persisted media jobs."""
+
+    MAX_POLL_BACKOFF_SECONDS = 60
+    POLL_CONCURRENCY = 10
+
+    def __init__(self):
+        self._callbacks: Dict[str, CompletionCallback] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inline_tasks: set = set()
+
+    # ─── Callback Registry ───────────────────────────────────────────────────
+
+    def register_callback(self, name: str, handler: CompletionCallback) -> None:
+        """Register a completion handler that jobs can reference by name."""
+        self._callbacks[name] = handler
+
+    # ─── Shared HTTP Client ──────────────────────────────────────────────────
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=30.0)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ─── Submission ──────────────────────────────────────────────────────────
+
+    async def submit_kling(
+        self,
+        job_type: str,
+        task_input: Dict[str, Any],
+        startup_id: Optional[UUID] = None,
+        callback: Optional[str] = None,
+        callback_context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[MediaJob]:
+        """
+        Dispatch a Kling task to PiAPI and persist it for later resolution.
+        Returns the job row, or None if PiAPI rejected the task.
+        """
+        from app.services.kling_service import kling_service
+
+        # Without a shared secret the webhook endpoint rejects callbacks, so rely on the poller
+        webhook_url = (
+            f"{settings.backend_url}{settings.api_v1_prefix}/webhooks/media/kling"
+            if settings.piapi_webhook_secret else None
+        )
+        task_id = await kling_service.submit_task(
+            job_type, task_input, self._get_client(), webhook_url=webhook_url
+        )
+        if not task_id:
+            return None
+
+        now = datetime.utcnow()
+        job = MediaJob(
+            startup_id=startup_id,
+            provider=MediaJobProvider.KLING,
+            job_type=job_type,
+            external_task_id=task_id,
+            request_payload=task_input,
+            status=MediaJobStatus.PROCESSING,
+            next_poll_at=now + timedelta(seconds=settings.media_job_poll_interval_seconds),
+            deadline_at=now + timedelta(minutes=settings.media_job_deadline_minutes),
+            callback=callback,
+            callback_context=callback_context,
+        )
+        async with AsyncSessionLocal() as db:
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+
+        logger.info("media_job_submitted", job_id=str(job.id), provider="kling", task_id=task_id)
+        await self._broadcast(job)
+        return job
+
+    async def run_tracked(
+        self,
+        provider: MediaJobProvider,
+        job_type: str,
+        runner: Callable[[], Awaitable[Optional[str]]],
+        startup_id: Optional[UUID] = None,
+        request_payload: Optional[Dict[str, Any]] = None,
+        callback: Optional[str] = None,
+        callback_context: Optional[Dict[str, Any]] = None,
+    ) -> MediaJob:
+        """
+        Track a provider call that has no remote task id (Imagen, TTS).
+        The call runs in the background; the job row records its outcome.
+        If the process dies mid-call, the poller times the job out at its deadline.
+        """
+        now = datetime.utcnow()
+        job = MediaJob(
+            startup_id=startup_id,
+            provider=provider,
+            job_type=job_type,
+            request_payload=request_payload or {},
+            status=MediaJobStatus.PROCESSING,
+            next_poll_at=None,
+            deadline_at=now + timedelta(minutes=settings.media_job_deadline_minutes),
+            callback=callback,
+            callback_context=callback_context,
+        )
+        async with AsyncSessionLocal() as db:
+            db.add(job)
+            await db.commit()
+            await db.refresh(job)
+
+        task = asyncio.create_task(self._run_inline(job.id, runner))
+        self._inline_tasks.add(task)
+        task.add_done_callback(self._inline_tasks.discard)
+        return job
+
+    async def _run_inline(self, job_id: UUID, runner: Callable[[], Awaitable[Optional[str]]]) -> None:
+        try:
+            url = await runner()
+            status = MediaJobStatus.COMPLETED if url else MediaJobStatus.FAILED
+            error = None if url else "Provider returned no output"
+        except Exception as e:
+            url, status, error = None, MediaJobStatus.FAILED, str(e)[:500]
+
+        async with AsyncSessionLocal() as db:
+            job = await db.get(MediaJob, job_id, with_for_update=True)
+            if job and not job.status.is_terminal:
+                await self._resolve(db, job, status, result_url=url, error=error)
+                await db.commit()
+
+    # ─── Attachment ──────────────────────────────────────────────────────────
+
+    async def attach_to_content(self, db: AsyncSession, job_ids: List[str], content_id: UUID) -> None:
+        """
+        Link already-submitted jobs to the CharacterContent row they feed.
+        Jobs that finished before the row existed have their callback replayed.
+        """
+        if not job_ids:
+            return
+        result = await db.execute(
+            select(MediaJob)
+            .where(MediaJob.id.in_([UUID(str(j)) for j in job_ids]))
+            .with_for_update()
+        )
+        for job in result.scalars().all():
+            job.character_content_id = content_id
+            if job.status.is_terminal:
+                await self._run_callback(db, job)
+        await db.flush()
+
+    # ─── Resolution: Batched Poller ──────────────────────────────────────────
+
+    async def poll_due_jobs(self, batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Resolve every due job in one pass. Safe to run from multiple workers:
+        rows are claimed with FOR UPDATE SKIP LOCKED.
+        """
+        from app.services.kling_service import kling_service
+
+        batch_size = batch_size or settings.media_job_poll_batch_size
+        stats = {"polled": 0, "completed": 0, "failed": 0, "timed_out": 0}
+        now = datetime.utcnow()
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(MediaJob)
+                .where(
+                    MediaJob.status.in_([MediaJobStatus.PENDING, MediaJobStatus.PROCESSING]),
+                    (MediaJob.next_poll_at <= now) | (MediaJob.deadline_at <= now),
+                )
+                .order_by(MediaJob.next_poll_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            jobs = result.scalars().all()
+            if not jobs:
+                return stats
+
+            client = self._get_client()
+            semaphore = asyncio.Semaphore(self.POLL_CONCURRENCY)
+
+            async def check(job: MediaJob):
+                if job.provider != MediaJobProvider.KLING or not job.external_task_id:
+                    return job, None
+                async with semaphore:
+                    try:
+                        return job, await kling_service.fetch_task(job.external_task_id, client)
+                    except Exception as e:
+                        logger.warning("media_job_poll_error", job_id=str(job.id), error=str(e))
+                        return job, None
+
+            for job, outcome in await asyncio.gather(*(check(j) for j in jobs)):
+                stats["polled"] += 1
+                job.poll_attempts += 1
+
+                if outcome is not None:
+                    status, url, raw = outcome
+                    if status == "completed":
+                        resolved = MediaJobStatus.COMPLETED if url else MediaJobStatus.FAILED
+                        await self._resolve(
+                            db, job, resolved, result_url=url, result_payload=raw,
+                            error=None if url else "Task completed without output",
+                        )
+                        stats["completed" if url else "failed"] += 1
+                        continue
+                    if status == "failed":
+                        await self._resolve(db, job, MediaJobStatus.FAILED, result_payload=raw, error="Provider reported failure")
+                        stats["failed"] += 1
+                        continue
+
+                if job.deadline_at and job.deadline_at.replace(tzinfo=None) <= now:
+                    await self._resolve(db, job, MediaJobStatus.TIMED_OUT, error="Deadline exceeded")
+                    stats["timed_out"] += 1
+                    continue
+
+                job.next_poll_at = now + timedelta(seconds=self._backoff(job.poll_attempts))
+
+            await db.commit()
+
+        logger.info("media_job_poll_complete", **stats)
+        return stats
+
+    def _backoff(self, attempts: int) -> int:
+        """Poll every interval for the first minute, then back off up to the cap."""
+        base = settings.media_job_poll_interval_seconds
+        return min(base * (2 ** max(0, attempts // 4)), self.MAX_POLL_BACKOFF_SECONDS)
+
+    # ─── Resolution: Webhooks ────────────────────────────────────────────────
+
+    async def handle_kling_webhook(self, db: AsyncSession, payload: Dict[str, Any]) -> Optional[MediaJob]:
+        """Resolve a job from a PiAPI webhook body. Unknown or finished tasks are ignored."""
+        from app.services.kling_service import KlingService
+
+        task = payload.get("data", payload) or {}
+        task_id = task.get("task_id")
+        if not task_id:
+            return None
+
+        result = await db.execute(
+            select(MediaJob)
+            .where(MediaJob.provider == MediaJobProvider.KLING, MediaJob.external_task_id == task_id)
+            .with_for_update()
+        )
+        job = result.scalar_one_or_none()
+        if not job or job.status.is_terminal:
+            return job
+
+        status, url = KlingService.parse_task_result(payload)
+        if status == "completed":
+            await self._resolve(
+                db, job, MediaJobStatus.COMPLETED if url else MediaJobStatus.FAILED,
+                result_url=url, result_payload=payload,
+                error=None if url else "Task completed without output",
+            )
+        elif status == "failed":
+            await self._resolve(db, job, MediaJobStatus.FAILED, result_payload=payload, error="Provider reported failure")
+        return job
+
+    # ─── Internals ───────────────────────────────────────────────────────────
+
+    async def _resolve(
+        self,
+        db: AsyncSession,
+        job: MediaJob,
+        status: MediaJobStatus,
+        result_url: Optional[str] = None,
+        result_payload: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        job.status = status
+        job.result_url = result_url
+        job.result_payload = result_payload
+        job.error = error
+        job.next_poll_at = None
+        job.completed_at = datetime.utcnow()
+
+        logger.info("media_job_resolved", job_id=str(job.id), status=status.value, url=result_url)
+        await self._run_callback(db, job)
+        await self._broadcast(job)
+
+    async def _run_callback(self, db: AsyncSession, job: MediaJob) -> None:
+        if not job.callback:
+            return
+        handler = self._callbacks.get(job.callback)
+        if not handler:
+            logger.warning("media_job_unknown_callback", job_id=str(job.id), callback=job.callback)
+            return
+        try:
+            await handler(db, job)
+        except Exception as e:
+            logger.error("media_job_callback_failed", job_id=str(job.id), callback=job.callback, error=str(e))
+
+    async def _broadcast(self, job: MediaJob) -> None:
+        if not job.startup_id:
+            return
+        try:
+            from app.core.websocket import websocket_manager
+            await websocket_manager.broadcast_to_startup(
+                str(job.startup_id), {"type": "media_job", "job": self.to_dict(job)}
+            )
+        except Exception as e:
+            logger.warning("media_job_broadcast_failed", job_id=str(job.id), error=str(e))
+
+    @staticmethod
+    def to_dict(job: MediaJob) -> Dict[str, Any]:
+        return {
+            "id": str(job.id),
+            "provider": job.provider.value,
+            "job_type": job.job_type,
+            "status": job.status.value,
+            "result_url": job.result_url,
+            "error": job.error,
+            "character_content_id": str(job.character_content_id) if job.character_content_id else None,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        }
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPLETION CALLBACKS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+async def _apply_to_character_content(db: AsyncSession, job: MediaJob) -> None:
+    """Patch a UGC CharacterContent row once one of its media jobs resolves."""
+    from app.models.character import CharacterContent, CharacterContentStatus
+
+    if not job.character_content_id:
+        return  # Not attached yet; attach_to_content replays this callback
+    content = await db.get(CharacterContent, job.character_content_id)
+    if not content:
+        return
+
+    job_id = str(job.id)
+    data = dict(content.content_data or {})
+    pending = [j for j in data.get("pending_media_jobs", []) if j != job_id]
+    data["pending_media_jobs"] = pending
+
+    field = (job.callback_context or {}).get("field", "video_url")
+    if job.status == MediaJobStatus.COMPLETED and job.result_url:
+        data[field] = job.result_url
+        media_urls = list(data.get("media_urls", []))
+        if field != "voice_url" and job.result_url not in media_urls:
+            media_urls.append(job.result_url)
+        data["media_urls"] = media_urls
+    content.content_data = data
+
+    pipeline = dict(content.generation_pipeline or {})
+    steps = []
+    for step in pipeline.get("steps", []):
+        if step.get("job_id") == job_id:
+            step = {**step, "status": job.status.value, "output_url": job.result_url}
+        steps.append(step)
+    if steps:
+        pipeline["steps"] = steps
+        content.generation_pipeline = pipeline
+
+    if not pending and content.status == CharacterContentStatus.GENERATING:
+        content.status = CharacterContentStatus.REVIEW
+
+
+# Singleton
+media_job_service = MediaJobService()
+media_job_service.register_callback("character_content", _apply_to_character_content)
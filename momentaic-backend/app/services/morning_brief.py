@@ -1,10 +1,38 @@
+"""
+Morning Brief Service
+Daily autonomous run of the Sales, Marketing, CompetitorIntel and Acquisition
+agents for every growth / god_mode startup.
 
-import structlog
+- Startups are processed concurrently (settings.morning_brief_concurrency),
+  each on its own session and under its own deadline, so one slow LLM call
+  only delays its own brief
+- One run per UTC day at a time: a Redis lock (SET NX EX) keeps the 6 AM
+  brief and the 9 AM daily summary job, or two workers, from overlapping
+- Progress is checkpointed in Redis per UTC day: a startup whose action items
+  are committed is never regenerated, and one whose notification did not go
+  out only gets the notification. A crashed run, or the 9 AM daily summary
+  job that calls the same entry point, resumes where the last one stopped.
+  The checkpoint is marked "committing" before the commit, so a run cut off
+  between the two checks the database instead of generating the items again
+- Per-run duration and per-startup outcome counters in app.core.metrics
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, select
 
+from app.core.config import settings
 from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
 from app.models.startup import Startup
 from app.models.action_item import ActionItem, ActionStatus, ActionPriority
 from app.agents.sales_agent import sales_agent
@@ -13,45 +41,192 @@ from app.agents.competitor_intel_agent import competitor_intel_agent
 
 logger = structlog.get_logger()
 
+CHECKPOINT_TTL_SECONDS = 2 * 24 * 3600
+RUN_LOCK_TTL_SECONDS = 3 * 3600           # a crashed run's lock lapses before the next scheduled one
+OUTCOMES = ("generated", "resumed", "skipped", "failed", "timeout")
+BRIEF_SOURCE_AGENTS = ("SalesHunter", "MarketingAgent", "CompetitorIntel", "AcquisitionAgent")
+
+# KEYS: lock; ARGV: owner token. Only the run that took the lock releases it.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _checkpoint_key(run_date: str) -> str:
+    return f"morning_brief:{run_date}"
+
+
+def _lock_key(run_date: str) -> str:
+    return f"morning_brief:{run_date}:lock"
+
+
 class MorningBriefService:
     """
     Orchestrates the daily "Morning Brief" - a massive autonomous run of all agents.
     Runs at 6:00 AM UTC.
     """
+
+    def __init__(self, concurrency: Optional[int] = None, startup_timeout: Optional[float] = None):
+        self.concurrency = concurrency or settings.morning_brief_concurrency
+        self.startup_timeout = startup_timeout or settings.morning_brief_startup_timeout_seconds
+        self._release = None
     
-    async def generate_daily_brief(self):
+    async def generate_daily_brief(self, run_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Main entry point. triggered by Scheduler.
-        Iterates all active startups and runs autonomous agents.
+        Runs the autonomous agents for every eligible startup concurrently,
+        skipping work already checkpointed for run_date (UTC day by default).
+        Returns {"run", "in_progress": True} when another run holds the day's lock.
         """
-        logger.info("MorningBrief: Starting global daily brief generation")
-        
+        run_date = run_date or datetime.utcnow().date().isoformat()
+        token = uuid4().hex
+        if not await self._acquire_run_lock(run_date, token):
+            logger.info("MorningBrief: Run already in progress", run=run_date)
+            return {"run": run_date, "in_progress": True}
+        try:
+            return await self._generate(run_date)
+        finally:
+            await self._release_run_lock(run_date, token)
+
+    async def _generate(self, run_date: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        logger.info("MorningBrief: Starting global daily brief generation", run=run_date)
+
+        startup_ids = await self._eligible_startups()
+        checkpoints = await self._load_checkpoints(run_date)
+        logger.info("MorningBrief: Processing startups", run=run_date, total=len(startup_ids), checkpointed=len(checkpoints))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(startup_id: UUID) -> str:
+            async with semaphore:
+                return await self._run_startup(run_date, startup_id, checkpoints.get(str(startup_id)))
+
+        counts = Counter(await asyncio.gather(*(bounded(sid) for sid in startup_ids)))
+        elapsed = time.perf_counter() - started
+        metrics.observe("morning_brief_run_seconds", elapsed)
+        for outcome, count in counts.items():
+            metrics.inc("morning_brief_startups_total", amount=count, result=outcome)
+
+        summary = {"run": run_date, "total": len(startup_ids), **{o: counts.get(o, 0) for o in OUTCOMES},
+                   "duration_seconds": round(elapsed, 2)}
+        logger.info("MorningBrief: Completed global generation", **summary)
+        return summary
+
+    async def _eligible_startups(self) -> List[UUID]:
+        """Ids of startups owned by growth / god_mode users."""
+        from app.models.user import User
+
         async with async_session_maker() as db:
-            # 1. Get all active startups owned by Pro+ users
-            from app.models.user import User
-            
-            # Subquery or join to find startups where owner has tier >= growth
-            # Assuming 'tier' is on User model
             result = await db.execute(
-                select(Startup)
+                select(Startup.id)
                 .join(User, Startup.owner_id == User.id)
                 .where(User.tier.in_(['growth', 'god_mode']))
-            ) 
-            startups = result.scalars().all()
-            
-            logger.info(f"MorningBrief: Processing {len(startups)} startups")
-            
-            for startup in startups:
-                try:
-                    await self.process_startup(db, startup)
-                except Exception as e:
-                    logger.error("MorningBrief: Failed for startup", startup_id=str(startup.id), error=str(e))
-                    
-        logger.info("MorningBrief: Completed global generation")
-
-    async def process_startup(self, db: AsyncSession, startup: Startup):
+            )
+            return list(result.scalars().all())
+
+    async def _run_startup(self, run_date: str, startup_id: UUID, checkpoint: Optional[Dict[str, Any]]) -> str:
+        """One startup's brief under its deadline; returns its outcome."""
+        if checkpoint and checkpoint.get("state") == "notified":
+            return "skipped"
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(self._brief_startup(run_date, startup_id, checkpoint), self.startup_timeout)
+        except asyncio.TimeoutError:
+            logger.error("MorningBrief: Startup timed out", startup_id=str(startup_id), timeout=self.startup_timeout)
+            return "timeout"
+        except Exception as e:
+            logger.error("MorningBrief: Failed for startup", startup_id=str(startup_id), error=str(e))
+            return "failed"
+        finally:
+            metrics.observe("morning_brief_startup_seconds", time.perf_counter() - started)
+
+    async def _brief_startup(self, run_date: str, startup_id: UUID, checkpoint: Optional[Dict[str, Any]]) -> str:
+        async with async_session_maker() as db:
+            startup = await db.get(Startup, startup_id)
+            if startup is None:
+                return "skipped"
+
+            if checkpoint and checkpoint.get("state") == "committing" \
+                    and not await self._items_committed(db, startup_id, checkpoint["since"]):
+                checkpoint = None  # cut off before the commit landed: generate again
+
+            if checkpoint is None:
+                since = datetime.utcnow().isoformat()
+                notification = await self.process_startup(db, startup)
+                # Mark before committing: if we stop between the two, the next
+                # run looks the items up instead of generating duplicates
+                await self._save_checkpoint(run_date, startup_id,
+                                            {"state": "committing", "since": since, "notification": notification})
+                await db.commit()
+                await self._save_checkpoint(run_date, startup_id, {"state": "generated", "notification": notification})
+                outcome = "generated"
+            else:
+                notification = checkpoint.get("notification")
+                outcome = "resumed"
+
+            if notification and not await self._notify(db, startup, notification):
+                return outcome  # left at "generated": the next run retries the notification
+            await self._save_checkpoint(run_date, startup_id, {"state": "notified"})
+            return outcome
+
+    async def _items_committed(self, db: AsyncSession, startup_id: UUID, since: str) -> bool:
+        """Whether a brief's action items for this startup were committed at or after since."""
+        result = await db.execute(select(exists().where(
+            ActionItem.startup_id == startup_id,
+            ActionItem.source_agent.in_(BRIEF_SOURCE_AGENTS),
+            ActionItem.created_at >= datetime.fromisoformat(since),
+        )))
+        return bool(result.scalar())
+
+    # ─── Run lock ────────────────────────────────────────────────────────────
+
+    async def _acquire_run_lock(self, run_date: str, token: str) -> bool:
+        """SET NX EX on the day's lock; runs unlocked (checkpoints only) when Redis is down."""
+        try:
+            return bool(await redis_client.set(_lock_key(run_date), token, nx=True, ex=RUN_LOCK_TTL_SECONDS))
+        except Exception as e:
+            logger.warning("MorningBrief: Run lock unavailable", error=str(e))
+            return True
+
+    async def _release_run_lock(self, run_date: str, token: str) -> None:
+        try:
+            if self._release is None:
+                self._release = redis_client.register_script(_RELEASE_LOCK_SCRIPT)
+            await self._release(keys=[_lock_key(run_date)], args=[token])
+        except Exception as e:
+            logger.warning("MorningBrief: Run lock release failed", error=str(e))
+
+    # ─── Checkpoints ─────────────────────────────────────────────────────────
+
+    async def _load_checkpoints(self, run_date: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            raw = await redis_client.hgetall(_checkpoint_key(run_date))
+        except Exception as e:
+            logger.warning("MorningBrief: Checkpoints unavailable", error=str(e))
+            return {}
+        return {startup_id: json.loads(value) for startup_id, value in raw.items()}
+
+    async def _save_checkpoint(self, run_date: str, startup_id: UUID, checkpoint: Dict[str, Any]) -> None:
+        key = _checkpoint_key(run_date)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(key, str(startup_id), json.dumps(checkpoint))
+                pipe.expire(key, CHECKPOINT_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("MorningBrief: Checkpoint write failed", startup_id=str(startup_id), error=str(e))
+
+    # ─── Agents ──────────────────────────────────────────────────────────────
+
+    async def process_startup(self, db: AsyncSession, startup: Startup) -> Optional[Dict[str, str]]:
         """
-        Run autonomous agents for a single startup
+        Run autonomous agents for a single startup, add their action items to
+        the session and return the notification to send (None when nothing was
+        produced). The caller commits, together with the checkpoint.
         """
         user_id = str(startup.owner_id) # Using owner as the primary usercontext
         
@@ -63,6 +238,8 @@ class MorningBriefService:
             "tagline": startup.tagline
         }
         
+        sales_result = marketing_result = intel_result = acquisition_result = None
+
         # --- AGENT 1: SALES HUNTER ---
         # "I found 5 leads"
         try:
@@ -101,7 +278,6 @@ class MorningBriefService:
 
         # --- AGENT 3: COMPETITOR INTEL ---
         # "I found a threat" or "I mapped the landscape"
-        intel_result = None
         try:
             # Load known competitors from settings
             current_settings = dict(startup.settings or {})
@@ -147,7 +323,6 @@ class MorningBriefService:
 
         # --- AGENT 4: ACQUISITION (PAID ADS) ---
         # "I generated an ad campaign"
-        acquisition_result = None
         try:
             # We assume user wants growth
             # Randomize platform focus based on day or context? Or just ask for general.
@@ -170,27 +345,19 @@ class MorningBriefService:
         except Exception as e:
              logger.error("MorningBrief: Acquisition Agent failed", error=str(e))
 
-        await db.commit()
-        
-        # --- NOTIFICATION ---
-        try:
-            from app.services.notification_service import notification_service
-            from app.models.user import User
-            
-            # Fetch user email etc
-            user = await db.get(User, startup.owner_id)
-            if user:
-                total_items = (1 if sales_result else 0) + (1 if marketing_result else 0) + (1 if intel_result else 0) + (1 if acquisition_result else 0)
-                if total_items > 0:
-                    intel_summary = "No alerts"
-                    if intel_result:
-                         if intel_result.get("mode") == "discovery":
-                             intel_summary = f"Mapped {len(intel_result.get('new_competitors', []))} competitors"
-                         elif intel_result.get("updates"):
-                             intel_summary = f"{len(intel_result.get('updates'))} alerts found"
-
-                    subject = f"🚀 {startup.name} Morning Brief: {total_items} Actions Ready"
-                    body = f"""Good morning!
+        total_items = (1 if sales_result else 0) + (1 if marketing_result else 0) + (1 if intel_result else 0) + (1 if acquisition_result else 0)
+        if total_items == 0:
+            return None
+
+        intel_summary = "No alerts"
+        if intel_result:
+             if intel_result.get("mode") == "discovery":
+                 intel_summary = f"Mapped {len(intel_result.get('new_competitors', []))} competitors"
+             elif intel_result.get("updates"):
+                 intel_summary = f"{len(intel_result.get('updates'))} alerts found"
+
+        subject = f"🚀 {startup.name} Morning Brief: {total_items} Actions Ready"
+        body = f"""Good morning!
 
 You have {total_items} new opportunities waiting:
 - Sales Hunter: {len(sales_result.get('leads', [])) if sales_result else 0} new leads
@@ -199,16 +366,27 @@ You have {total_items} new opportunities waiting:
 - Paid Ads: {acquisition_result.get('platform') if acquisition_result else 'No campaign'}
 
 One-Click Approve in Command Center."""
+        return {"subject": subject, "body": body}
 
-                    await notification_service.notify_user(
-                        user=user,
-                        subject=subject,
-                        body=body,
-                        action_url="https://app.momentaic.com/dashboard",
-                        db=db
-                    )
-                    logger.info("MorningBrief: Sent notification", user=user.email)
+    async def _notify(self, db: AsyncSession, startup: Startup, notification: Dict[str, str]) -> bool:
+        """Queue the brief for the owner; False when it should be retried."""
+        try:
+            from app.services.notification_service import notification_service
+            from app.models.user import User
+            
+            # Fetch user email etc
+            user = await db.get(User, startup.owner_id)
+            if user:
+                await notification_service.enqueue(
+                    user=user,
+                    subject=notification["subject"],
+                    body=notification["body"],
+                    action_url="https://app.momentaic.com/dashboard"
+                )
+                logger.info("MorningBrief: Sent notification", user=user.email)
+            return True
         except Exception as e:
             logger.error("MorningBrief: Notification failed", error=str(e))
+            return False
 
 morning_brief_service = MorningBriefService()
@@ -0,0 +1,266 @@
+"""
+Notification Dispatch
+Queued, coalesced and concurrent delivery of user notifications.
+
+- enqueue() appends to a per-user Redis list; the first notification of a
+  window schedules a flush DIGEST_WINDOW_SECONDS later on the delayed-job
+  queue, so everything a user receives in that window goes out as one digest
+- A flush batch loads users and push subscriptions in two queries (no session
+  is held while sending), sends email and Web Push concurrently, deletes
+  404/410 subscriptions in one statement and only then trims the delivered
+  items off the user's list
+- Web Push payload encryption runs in worker threads, requests share a pooled
+  httpx client and VAPID JWTs are signed once per push-service origin rather
+  than per send
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import urlparse
+from uuid import UUID
+
+import httpx
+import structlog
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+from app.models.push_subscription import PushSubscription
+from app.models.user import User
+from app.services.delayed_jobs import DelayedJob, DelayedJobQueue
+from app.services.email_service import email_service
+
+logger = structlog.get_logger()
+
+DEFAULT_ACTION_URL = "https://app.momentaic.com/dashboard"
+DIGEST_WINDOW_SECONDS = 120
+DIGEST_MAX_LINES = 10
+PENDING_TTL_SECONDS = 24 * 3600
+PUSH_CONCURRENCY = 20
+PUSH_TIMEOUT_SECONDS = 10.0
+VAPID_TTL_SECONDS = 12 * 3600      # push services reject JWTs valid for more than 24h
+VAPID_REFRESH_MARGIN_SECONDS = 3600
+EXPIRED_STATUSES = (404, 410)
+
+# One flush job per user, due when the user's digest window closes
+notification_flushes = DelayedJobQueue("notification_flush")
+
+
+def _pending_key(user_id: str) -> str:
+    return f"notify:pending:{user_id}"
+
+
+def _window_key(user_id: str) -> str:
+    return f"notify:window:{user_id}"
+
+
+def subscription_info(sub: PushSubscription) -> Dict[str, Any]:
+    return {"endpoint": sub.endpoint, "keys": {"p256dh": sub.p256dh, "auth": sub.auth}}
+
+
+def push_payload(subject: str, body: str, action_url: str) -> str:
+    return json.dumps({
+        "title": subject,
+        "body": body,
+        "url": action_url,
+        "icon": "/logo-new.png"
+    })
+
+
+def _encrypt(info: Dict[str, Any], payload: str) -> Dict[str, Any]:
+    from pywebpush import WebPusher
+    return WebPusher(info).encode(payload, "aes128gcm")
+
+
+# ─── Web Push ────────────────────────────────────────────────────────────────
+
+class WebPushSender:
+    """Async Web Push client: pooled HTTP, threaded encryption, cached VAPID headers."""
+
+    def __init__(self, private_key: str, claims: Dict[str, Any], concurrency: int = PUSH_CONCURRENCY):
+        self._private_key = private_key  # PEM file path or key string
+        self._claims = claims
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._vapid = None
+        self._vapid_headers: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _signer(self):
+        if self._vapid is None:
+            from py_vapid import Vapid
+            if os.path.isfile(self._private_key):
+                self._vapid = Vapid.from_file(private_key_file=self._private_key)
+            else:
+                self._vapid = Vapid.from_string(private_key=self._private_key)
+        return self._vapid
+
+    def vapid_headers(self, endpoint: str) -> Dict[str, str]:
+        url = urlparse(endpoint)
+        audience = f"{url.scheme}://{url.netloc}"
+        now = int(time.time())
+        cached = self._vapid_headers.get(audience)
+        if cached and cached[0] - VAPID_REFRESH_MARGIN_SECONDS > now:
+            return cached[1]
+        expires = now + VAPID_TTL_SECONDS
+        headers = self._signer().sign({**self._claims, "aud": audience, "exp": expires})
+        self._vapid_headers[audience] = (expires, headers)
+        return headers
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=PUSH_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self._concurrency * 2,
+                    max_keepalive_connections=self._concurrency,
+                ),
+            )
+        return self._client
+
+    async def send(self, info: Dict[str, Any], payload: str) -> int:
+        """Deliver one push; returns the push service's HTTP status."""
+        async with self._semaphore:
+            encoded = await asyncio.to_thread(_encrypt, info, payload)
+            headers = {
+                **self.vapid_headers(info["endpoint"]),
+                "content-encoding": "aes128gcm",
+                "ttl": "0",
+            }
+            response = await self._http().post(info["endpoint"], content=encoded["body"], headers=headers)
+            metrics.inc("webpush_sent_total", status=response.status_code)
+            return response.status_code
+
+    async def send_many(self, pushes: List[Tuple[Hashable, Dict[str, Any], str]]) -> Dict[Hashable, int]:
+        """Send (key, subscription_info, payload) pushes concurrently. Failed sends map to 0."""
+        with metrics.timer("webpush_batch_seconds"):
+            results = await asyncio.gather(
+                *(self.send(info, payload) for _, info, payload in pushes),
+                return_exceptions=True,
+            )
+        statuses = {}
+        for (key, _, _), result in zip(pushes, results, strict=True):
+            if isinstance(result, Exception):
+                logger.error("NotificationService: Push failed", error=str(result))
+                metrics.inc("webpush_sent_total", status="error")
+                result = 0
+            statuses[key] = result
+        return statuses
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# ─── Dispatcher ──────────────────────────────────────────────────────────────
+
+class NotificationDispatcher:
+    """Per-user notification queue flushed as digests."""
+
+    def __init__(self, sender: WebPushSender):
+        self.sender = sender
+
+    async def enqueue(self, user_id: str, subject: str, body: str, action_url: str = DEFAULT_ACTION_URL) -> None:
+        user_id = str(user_id)
+        item = json.dumps({"subject": subject, "body": body, "url": action_url, "queued_at": time.time()})
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.rpush(_pending_key(user_id), item)
+            pipe.expire(_pending_key(user_id), PENDING_TTL_SECONDS)
+            pipe.set(_window_key(user_id), "1", ex=DIGEST_WINDOW_SECONDS, nx=True)
+            _, _, opened = await pipe.execute()
+        if opened:
+            await notification_flushes.schedule(user_id, {"user_id": user_id}, delay_seconds=DIGEST_WINDOW_SECONDS)
+        metrics.inc("notifications_enqueued_total")
+
+    @staticmethod
+    def compose(items: List[Dict[str, Any]]) -> Tuple[str, str, str]:
+        """Subject, body and URL for one user's pending items (a digest when there are several)."""
+        if len(items) == 1:
+            return items[0]["subject"], items[0]["body"], items[0]["url"]
+        lines = []
+        for item in items[:DIGEST_MAX_LINES]:
+            first_line = (item["body"] or "").strip().split("\n")[0][:140]
+            lines.append(f"• {item['subject']}: {first_line}" if first_line else f"• {item['subject']}")
+        if len(items) > DIGEST_MAX_LINES:
+            lines.append(f"…and {len(items) - DIGEST_MAX_LINES} more")
+        return f"{len(items)} new updates", "\n".join(lines), DEFAULT_ACTION_URL
+
+    async def flush_due(self) -> Dict[str, int]:
+        return await notification_flushes.run_due(self._flush_batch)
+
+    async def _flush_batch(self, jobs: List[DelayedJob]) -> None:
+        user_ids = [job.payload["user_id"] for job in jobs]
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.lrange(_pending_key(user_id), 0, -1)
+            pending_lists = await pipe.execute()
+        pending = {
+            user_id: [json.loads(raw) for raw in items]
+            for user_id, items in zip(user_ids, pending_lists, strict=True) if items
+        }
+        if not pending:
+            return
+
+        ids = [UUID(user_id) for user_id in pending]
+        async with async_session_maker() as db:
+            users = (await db.execute(select(User).where(User.id.in_(ids)))).scalars().all()
+            subscriptions = (await db.execute(
+                select(PushSubscription).where(PushSubscription.user_id.in_(ids))
+            )).scalars().all()
+
+        emails, pushes = [], []
+        for user in users:
+            items = pending[str(user.id)]
+            subject, body, url = self.compose(items)
+            metrics.inc("notifications_coalesced_total", amount=len(items) - 1)
+            if user.email:
+                emails.append(email_service.send_email(
+                    to_email=user.email, subject=subject, body=f"{body}\n\nView details: {url}",
+                ))
+            payload = push_payload(subject, body, url)
+            pushes.extend(
+                (sub.id, subscription_info(sub), payload)
+                for sub in subscriptions if sub.user_id == user.id
+            )
+
+        email_results, statuses = await asyncio.gather(
+            asyncio.gather(*emails, return_exceptions=True),
+            self.sender.send_many(pushes),
+        )
+        for result in email_results:
+            if isinstance(result, Exception):
+                logger.error("NotificationService: Email failed", error=str(result))
+        await self.prune(statuses)
+
+        # Drop what was delivered; items queued meanwhile stay for the next flush.
+        # If anything above raised, nothing is trimmed and the batch is re-delivered.
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id, items in pending.items():
+                pipe.ltrim(_pending_key(user_id), len(items), -1)
+            await pipe.execute()
+        metrics.inc("notifications_delivered_total", amount=len(users))
+
+    async def prune(self, statuses: Dict[Hashable, int]) -> int:
+        """Delete subscriptions the push service reported as gone, in one statement."""
+        expired = [sub_id for sub_id, status in statuses.items() if status in EXPIRED_STATUSES]
+        if not expired:
+            return 0
+        async with async_session_maker() as db:
+            await db.execute(delete(PushSubscription).where(PushSubscription.id.in_(expired)))
+            await db.commit()
+        logger.info("NotificationService: Pruned expired subscriptions", count=len(expired))
+        return len(expired)
+
+
+# Singletons
+web_push_sender = WebPushSender(
+    private_key=settings.vapid_private_key_path or "private_key.pem",
+    claims={"sub": f"mailto:{settings.smtp_from_email or 'admin@momentaic.com'}"},
+)
+notification_dispatcher = NotificationDispatcher(web_push_sender)
@@ -1,29 +1,32 @@
-import json
+import asyncio
 import structlog
 from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pywebpush import webpush, WebPushException
+from sqlalchemy import delete, select
 
-from app.core.config import settings
 from app.services.email_service import email_service
 from app.models.user import User
 from app.models.push_subscription import PushSubscription
 from app.core.database import async_session_maker
+from app.services.delayed_jobs import DelayedJob, DelayedJobQueue
+from app.services.notification_dispatch import (
+    EXPIRED_STATUSES,
+    notification_dispatcher,
+    push_payload,
+    subscription_info,
+    web_push_sender,
+)
 
 logger = structlog.get_logger()
 
+sms_escalations = DelayedJobQueue("sms_escalation")
+
 class NotificationService:
     """
     Unified Notification Service.
-    Handles Email + Web Push.
+    Handles Email + Web Push (delivery and digests live in notification_dispatch).
     """
     
-    def __init__(self):
-        # Load VAPID keys from env or file
-        self.vapid_private_key = settings.vapid_private_key_path or "private_key.pem"
-        self.vapid_claims = {"sub": f"mailto:{settings.smtp_from_email or 'admin@momentaic.com'}"}
-
     async def notify_user(
         self, 
         user: User, 
@@ -33,66 +36,77 @@ class NotificationService:
         db: Optional[AsyncSession] = None
     ):
         """
-        Send notification to user via all available channels.
+        Send notification to user via all available channels, immediately.
+        Email and every push subscription are sent concurrently.
+        Background jobs should prefer enqueue(), which coalesces into digests.
         """
         results = {"email": False, "push": 0}
-        
-        # 1. Send Email
-        if user.email:
+
+        async def send_email() -> bool:
+            # For generic notifications, simple text is fine.
             try:
-                # Use send_email directly or templated if needed. 
-                # For generic notifications, simple text is fine.
-                sent = await email_service.send_email(
+                return await email_service.send_email(
                     to_email=user.email,
                     subject=subject,
                     body=f"{body}\n\nView details: {action_url}"
                 )
-                results["email"] = sent
             except Exception as e:
                 logger.error("NotificationService: Email failed", error=str(e))
+                return False
 
-        # 2. Send Push (if Db session provided to fetch subs)
-        if db:
+        async def send_push() -> Dict[Any, int]:
+            # Push needs a Db session to fetch subs
+            if not db:
+                return {}
             try:
-                # Fetch subscriptions
                 subs_result = await db.execute(select(PushSubscription).where(PushSubscription.user_id == user.id))
-                subscriptions = subs_result.scalars().all()
-                
-                payload = json.dumps({
-                    "title": subject,
-                    "body": body,
-                    "url": action_url,
-                    "icon": "/logo-new.png"
-                })
-                
-                for sub in subscriptions:
-                    try:
-                        webpush(
-                            subscription_info={
-                                "endpoint": sub.endpoint,
-                                "keys": {
-                                    "p256dh": sub.p256dh,
-                                    "auth": sub.auth
-                                }
-                            },
-                            data=payload,
-                            vapid_private_key=self.vapid_private_key,
-                            vapid_claims=self.vapid_claims
-                        )
-                        results["push"] += 1
-                    except WebPushException as ex:
-                        if ex.response and ex.response.status_code == 410:
-                            # Expired, delete
-                            await db.delete(sub)
-                            logger.info("NotificationService: Pruned expired subscription")
-                        else:
-                            logger.error("NotificationService: Push failed", error=str(ex))
-                            
+                payload = push_payload(subject, body, action_url)
+                return await web_push_sender.send_many([
+                    (sub.id, subscription_info(sub), payload) for sub in subs_result.scalars().all()
+                ])
             except Exception as e:
                 logger.error("NotificationService: Push orchestration failed", error=str(e))
-        
+                return {}
+
+        email_sent, statuses = await asyncio.gather(
+            send_email() if user.email else asyncio.sleep(0, result=False),
+            send_push(),
+        )
+        results["email"] = email_sent
+        results["push"] = sum(1 for status in statuses.values() if 200 <= status < 300)
+
+        expired = [sub_id for sub_id, status in statuses.items() if status in EXPIRED_STATUSES]
+        if expired:
+            await db.execute(delete(PushSubscription).where(PushSubscription.id.in_(expired)))
+            logger.info("NotificationService: Pruned expired subscriptions", count=len(expired))
+
         return results
 
+    async def enqueue(
+        self,
+        user: User,
+        subject: str,
+        body: str,
+        action_url: str = "https://app.momentaic.com/dashboard",
+    ) -> None:
+        """
+        Queue a notification for delivery; everything a user receives within the
+        digest window is sent together. Falls back to an immediate email if the
+        queue is unavailable.
+        """
+        try:
+            await notification_dispatcher.enqueue(str(user.id), subject, body, action_url)
+        except Exception as e:
+            logger.warning("NotificationService: Queue unavailable, sending now", error=str(e))
+            await self.notify_user(user, subject, body, action_url)
+
+    async def flush_pending(self):
+        """Periodic job: deliver the digests whose window has closed."""
+        try:
+            await notification_dispatcher.flush_due()
+        except Exception as e:
+            logger.error("NotificationService: Digest flush failed", error=str(e))
+
     async def subscribe(self, db: AsyncSession, user_id: str, sub_info: Dict[str, Any]):
         """
         Register a push subscription.
@@ -232,23 +246,15 @@ class NotificationService:
     async def schedule_sms_escalation(self, action_item_id: str, startup_id: str, delay_minutes: int = 15):
         """
         Schedule a delayed SMS escalation for a critical alert.
-        Stores a Redis key that expires after the delay.
-        The periodic check_sms_escalations() job will pick it up.
+        Queues a delayed job due after the delay; check_sms_escalations() claims
+        it once due.
         """
         try:
-            from app.core.redis_client import redis_client
-            import json, time
-
-            escalation_key = f"sms_escalation:{action_item_id}"
-            escalation_data = json.dumps({
-                "action_item_id": action_item_id,
-                "startup_id": startup_id,
-                "scheduled_at": time.time(),
-                "escalate_after": time.time() + (delay_minutes * 60),
-            })
-
-            # Store with no TTL — the check job will delete it after escalation or resolution
-            await redis_client.set(escalation_key, escalation_data)
+            await sms_escalations.schedule(
+                action_item_id,
+                {"action_item_id": action_item_id, "startup_id": startup_id},
+                delay_seconds=delay_minutes * 60,
+            )
             logger.info(f"SMS escalation scheduled for action {action_item_id} in {delay_minutes} minutes")
 
         except Exception as e:
@@ -256,121 +262,85 @@ class NotificationService:
 
     async def check_sms_escalations(self):
         """
-        Periodic job (runs every 5 minutes).
-        Scans for pending SMS escalation keys, checks if the ActionItem is still
-        unresolved past the delay window, and sends an SMS to the founder.
+        Periodic job (runs every minute).
+        Claims due SMS escalations in batches, checks whether each ActionItem is
+        still unresolved and sends an SMS to the founder.
         """
         try:
-            from app.core.redis_client import redis_client
-            from app.models.action_item import ActionItem, ActionStatus
-            from app.models.startup import Startup
-            from app.services.twilio_service import twilio_service
-            import json, time
-
-            # Find all escalation keys
-            keys = []
-            async for key in redis_client.scan_iter(match="sms_escalation:*"):
-                keys.append(key)
-
-            if not keys:
-                return
-
-            logger.info(f"SMS Escalation Check: {len(keys)} pending escalations")
-
-            async with async_session_maker() as db:
-                for key in keys:
-                    try:
-                        raw = await redis_client.get(key)
-                        if not raw:
-                            continue
-
-                        data = json.loads(raw)
-                        escalate_after = data.get("escalate_after", 0)
-                        action_item_id = data.get("action_item_id")
-
-                        # Not yet time to escalate
-                        if time.time() < escalate_after:
-                            continue
-
-                        # Check if the ActionItem is still pending
-                        from sqlalchemy import select
-                        result = await db.execute(
-                            select(ActionItem).where(ActionItem.id == action_item_id)
-                        )
-                        action = result.scalar_one_or_none()
-
-                        if not action:
-                            await redis_client.delete(key)
-                            continue
-
-                        # If already resolved, clean up
-                        if action.status != ActionStatus.pending:
-                            await redis_client.delete(key)
-                            logger.info(f"SMS Escalation cancelled — action {action_item_id} already {action.status.value}")
-                            continue
-
-                        # Still pending → escalate via SMS
-                        startup_result = await db.execute(
-                            select(Startup).where(Startup.id == action.startup_id)
-                        )
-                        startup = startup_result.scalar_one_or_none()
-
-                        if not startup:
-                            await redis_client.delete(key)
-                            continue
-
-                        owner_result = await db.execute(
-                            select(User).where(User.id == startup.owner_id)
-                        )
-                        owner = owner_result.scalar_one_or_none()
-
-                        if not owner:
-                            await redis_client.delete(key)
-                            continue
-
-                        # Check if SMS is enabled for this agent
-                        prefs = dict(startup.settings or {}).get("notification_preferences", {})
-                        agent_prefs = prefs.get(action.source_agent, {})
-                        sms_enabled = agent_prefs.get("sms", True)  # Default TRUE for critical escalations
-
-                        if not sms_enabled:
-                            await redis_client.delete(key)
-                            logger.info(f"SMS escalation suppressed by preferences for {action.source_agent}")
-                            continue
-
-                        # Get phone number from user profile or startup settings
-                        phone = getattr(owner, 'phone', None) or dict(startup.settings or {}).get("founder_phone")
-
-                        if not phone:
-                            logger.warning(f"No phone number found for founder of {startup.name}, cannot escalate via SMS")
-                            await redis_client.delete(key)
-                            continue
-
-                        # SEND THE SMS
-                        sms_body = (
-                            f"🚨 URGENT — {startup.name}\n"
-                            f"{action.title}\n"
-                            f"{action.description[:200]}\n\n"
-                            f"This alert has been pending for 15+ minutes. "
-                            f"Reply APPROVE or log in to resolve."
-                        )
-
-                        sent = await twilio_service.send_sms(to_phone=phone, message=sms_body)
-
-                        if sent:
-                            logger.info(f"SMS escalation sent for action {action_item_id} to {phone}")
-                        else:
-                            logger.warning(f"SMS escalation failed for action {action_item_id}")
-
-                        # Clean up — don't re-escalate
-                        await redis_client.delete(key)
-
-                    except Exception as inner_err:
-                        logger.error("SMS escalation check error for single key", error=str(inner_err))
-
+            await sms_escalations.run_due(self._escalate_batch)
         except Exception as e:
             logger.error("SMS escalation check failed", error=str(e))
 
+    async def _escalate_batch(self, jobs: List[DelayedJob]) -> Dict[str, float]:
+        """Escalate one batch: a single joined query loads action, startup and owner."""
+        from app.models.action_item import ActionItem, ActionStatus
+        from app.models.startup import Startup
+        from app.services.twilio_service import twilio_service
+        from uuid import UUID
+
+        ids = []
+        for job in jobs:
+            try:
+                ids.append(UUID(job.payload["action_item_id"]))
+            except (KeyError, ValueError):
+                logger.warning("Malformed SMS escalation job", job_id=job.id)
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(ActionItem, Startup, User)
+                .join(Startup, Startup.id == ActionItem.startup_id)
+                .join(User, User.id == Startup.owner_id)
+                .where(ActionItem.id.in_(ids))
+            )
+            rows = result.all()
+
+        # Jobs with no row (action, startup or owner gone) are simply acknowledged
+        for action, startup, owner in rows:
+            action_item_id = str(action.id)
+            try:
+                # If already resolved, clean up
+                if action.status != ActionStatus.pending:
+                    logger.info(f"SMS Escalation cancelled — action {action_item_id} already {action.status.value}")
+                    continue
+
+                # Check if SMS is enabled for this agent
+                prefs = dict(startup.settings or {}).get("notification_preferences", {})
+                agent_prefs = prefs.get(action.source_agent, {})
+                sms_enabled = agent_prefs.get("sms", True)  # Default TRUE for critical escalations
+
+                if not sms_enabled:
+                    logger.info(f"SMS escalation suppressed by preferences for {action.source_agent}")
+                    continue
+
+                # Get phone number from user profile or startup settings
+                phone = getattr(owner, 'phone', None) or dict(startup.settings or {}).get("founder_phone")
+
+                if not phone:
+                    logger.warning(f"No phone number found for founder of {startup.name}, cannot escalate via SMS")
+                    continue
+
+                # SEND THE SMS
+                sms_body = (
+                    f"🚨 URGENT — {startup.name}\n"
+                    f"{action.title}\n"
+                    f"{action.description[:200]}\n\n"
+                    f"This alert has been pending for 15+ minutes. "
+                    f"Reply APPROVE or log in to resolve."
+                )
+
+                sent = await twilio_service.send_sms(to_phone=phone, message=sms_body)
+
+                if sent:
+                    logger.info(f"SMS escalation sent for action {action_item_id} to {phone}")
+                else:
+                    logger.warning(f"SMS escalation failed for action {action_item_id}")
+
+            except Exception as inner_err:
+                logger.error("SMS escalation check error for single action", error=str(inner_err))
+
+        # Don't re-escalate
+        return {}
+
 # Singleton
 notification_service = NotificationService()
 
@@ -6,7 +6,7 @@ Uses existing SMTP/SendGrid/Resend integration
 
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel, EmailStr, Field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import asyncio
 import structlog
@@ -16,9 +16,13 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 from app.core.config import settings
+from app.services.delayed_jobs import DelayedJob, DelayedJobQueue
 
 logger = structlog.get_logger()
 
+# Scheduled sends, one job per email (payload: the serialized OutreachEmail)
+outreach_sends = DelayedJobQueue("outreach_send")
+
 
 class EmailStatus(str, Enum):
     """Email delivery status."""
@@ -70,7 +74,8 @@ class SelfHostedOutreach:
     - No external dependencies (Instantly.ai, SmartLead, etc.)
     - Uses existing SMTP or transactional email provider
     - Rate limiting to avoid spam filters
-    - Sequence automation
+    - Sequence automation (sends are jobs in a Redis delayed queue, so they
+      survive restarts and are only sent by one worker)
     - Basic tracking (opens, clicks via pixel)
     """
     
@@ -78,10 +83,12 @@ class SelfHostedOutreach:
     MAX_EMAILS_PER_HOUR = 50
     MAX_EMAILS_PER_DAY = 500
     DELAY_BETWEEN_EMAILS_SECONDS = 30
+    SENDS_PER_RUN = 10
+    RATE_LIMIT_RETRY_SECONDS = 3600
+    FAILED_SEND_RETRY_SECONDS = 900
     
     def __init__(self):
         self._campaigns: Dict[str, OutreachCampaign] = {}
-        self._email_queue: List[OutreachEmail] = []
         self._sent_today = 0
         self._sent_this_hour = 0
         self._last_reset_hour = datetime.utcnow().hour
@@ -138,7 +145,11 @@ class SelfHostedOutreach:
                 scheduled_at=send_time
             )
             
-            self._email_queue.append(email)
+            await outreach_sends.schedule(
+                email.id,
+                email.model_dump(mode="json"),
+                run_at=send_time.replace(tzinfo=timezone.utc).timestamp(),
+            )
             send_time += timedelta(seconds=self.DELAY_BETWEEN_EMAILS_SECONDS)
         
         logger.info(
@@ -306,14 +317,25 @@ class SelfHostedOutreach:
             return False
     
     async def process_queue(self):
-        """Process the email queue (call periodically)."""
-        now = datetime.utcnow()
-        
-        pending = [e for e in self._email_queue if e.status == EmailStatus.PENDING and e.scheduled_at <= now]
-        
-        for email in pending[:10]:  # Process 10 at a time
-            await self.send_email(email)
-            await asyncio.sleep(2)  # Small delay between sends
+        """Send due emails from the delayed queue (call periodically)."""
+        await outreach_sends.run_due(self._send_batch, batch_size=self.SENDS_PER_RUN, max_batches=1)
+
+    async def _send_batch(self, jobs: List[DelayedJob]) -> Dict[str, float]:
+        """Send one claimed batch; rate-limited sends are deferred, failed ones retried."""
+        retries: Dict[str, float] = {}
+        for i, job in enumerate(jobs):
+            self._check_rate_limits()
+            if self._sent_today >= self.MAX_EMAILS_PER_DAY or self._sent_this_hour >= self.MAX_EMAILS_PER_HOUR:
+                # Not a failed attempt: push it back without spending a retry
+                await outreach_sends.schedule(job.id, job.payload, delay_seconds=self.RATE_LIMIT_RETRY_SECONDS)
+                continue
+
+            email = OutreachEmail.model_validate(job.payload)
+            if not await self.send_email(email):
+                retries[job.id] = self.FAILED_SEND_RETRY_SECONDS
+            if i < len(jobs) - 1:
+                await asyncio.sleep(2)  # Small delay between sends
+        return retries
     
     def get_campaign_stats(self, campaign_id: str) -> Dict[str, Any]:
         """Get campaign statistics."""
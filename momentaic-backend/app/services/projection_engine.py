@@ -0,0 +1,168 @@
+"""
+Projection Engine
+Monte Carlo MRR / burn / cash projections for FinanceCFOAgent, on NumPy alone.
+
+- Every path draws its own monthly growth, churn and burn drift; all paths
+  and months are simulated in one vectorized pass (cumprod / cumsum over a
+  paths x months matrix), so 10k paths x 60 months take under 100 ms
+- Results are P10 / P50 / P90 curves per month plus the distribution of
+  runway months (first month cash goes negative)
+- project_metrics() maps a startup's metrics dict and a scenario onto the
+  simulation and caches the result per metrics hash and scenario. Without
+  an explicit seed the seed is derived from the metrics hash, so the same
+  metrics always produce the same bands. The cache is shared by every
+  thread (agents may run projections from worker threads) behind a lock
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.core.metrics import metrics as app_metrics
+
+DEFAULT_PATHS = 10000
+DEFAULT_GROWTH_RATE = 0.10                # MoM, when the startup has not reported one
+SCENARIO_GROWTH_MULTIPLIERS = {"pessimistic": 0.5, "base": 1.0, "optimistic": 2.0}
+GROWTH_VOLATILITY = 0.5                   # monthly growth sd, as a fraction of the mean
+MIN_GROWTH_SD = 0.02
+CHURN_VOLATILITY = 0.3                    # monthly churn sd, as a fraction of the mean
+BURN_SD = 0.05                            # month-to-month noise in burn
+PERCENTILES = (10, 50, 90)
+PROJECTION_CACHE_MAX_ENTRIES = 256
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _bands(paths: np.ndarray) -> Dict[str, List[float]]:
+    """P10 / P50 / P90 of each month (column), rounded for JSON."""
+    low, mid, high = np.percentile(paths, PERCENTILES, axis=0)
+    return {"p10": np.round(low, 2).tolist(), "p50": np.round(mid, 2).tolist(), "p90": np.round(high, 2).tolist()}
+
+
+def simulate_projections(
+    mrr: float,
+    burn: float,
+    cash: Optional[float],
+    growth: float,
+    churn: float = 0.0,
+    months: int = 24,
+    paths: int = DEFAULT_PATHS,
+    growth_sd: Optional[float] = None,
+    churn_sd: Optional[float] = None,
+    burn_growth: float = 0.0,
+    burn_sd: float = BURN_SD,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Simulate `paths` monthly trajectories of MRR, gross burn and cash.
+
+    growth is gross new-MRR growth per month and churn the fraction of MRR
+    lost per month (both as fractions); MRR compounds by (1 + growth - churn),
+    with the net rate drawn once per path-month from their combined spread.
+    Burn compounds by burn_growth plus noise. Cash starts at `cash` and moves
+    by MRR - burn each month; runway stats are omitted when cash is None.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (paths, months)
+    growth_sd = max(abs(growth) * GROWTH_VOLATILITY, MIN_GROWTH_SD) if growth_sd is None else growth_sd
+    churn_sd = churn * CHURN_VOLATILITY if churn_sd is None else churn_sd
+
+    net_growth = rng.normal(growth - churn, np.hypot(growth_sd, churn_sd), shape)
+    mrr_paths = mrr * np.cumprod(np.maximum(1.0 + net_growth, 0.0), axis=1)
+    burn_paths = burn * np.cumprod(np.maximum(1.0 + rng.normal(burn_growth, burn_sd, shape), 0.0), axis=1)
+
+    result: Dict[str, Any] = {
+        "months": months,
+        "paths": paths,
+        "seed": seed,
+        "mrr": _bands(mrr_paths),
+        "burn": _bands(burn_paths),
+        # Share of paths where revenue covers burn by the end of the horizon
+        "prob_default_alive": round(float((mrr_paths[:, -1] >= burn_paths[:, -1]).mean()), 4),
+    }
+    if cash is None:
+        return result
+
+    cash_paths = cash + np.cumsum(mrr_paths - burn_paths, axis=1)
+    broke = cash_paths < 0
+    ran_out = broke.any(axis=1)
+    # 1-based month cash first goes negative; months + 1 means "beyond the horizon"
+    runway = np.where(ran_out, broke.argmax(axis=1) + 1, months + 1)
+    low, mid, high = np.percentile(runway, PERCENTILES, method="inverted_cdf")
+    result["cash"] = _bands(cash_paths)
+    result["runway"] = {
+        "p10": int(low) if low <= months else None,   # None: cash lasts past the horizon
+        "p50": int(mid) if mid <= months else None,
+        "p90": int(high) if high <= months else None,
+        "prob_out_of_cash": round(float(ran_out.mean()), 4),
+        "histogram": np.bincount(runway, minlength=months + 2)[1:months + 1].tolist(),  # paths per month 1..months
+        "beyond_horizon": int((~ran_out).sum()),
+    }
+    return result
+
+
+def _metrics_key(inputs: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def starting_cash(metrics: Dict[str, Any]) -> Optional[float]:
+    """Reported cash, else cash implied by runway months at the current net burn."""
+    for key in ("cash", "cash_balance"):
+        if metrics.get(key) is not None:
+            return float(metrics[key])
+    runway = metrics.get("runway_months")
+    net_burn = (metrics.get("burn_rate") or 0) - (metrics.get("mrr") or 0)
+    if runway and net_burn > 0:
+        return float(runway) * net_burn
+    return None
+
+
+def project_metrics(
+    metrics: Dict[str, Any],
+    months: int = 24,
+    scenario: str = "base",
+    paths: int = DEFAULT_PATHS,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Simulate a startup's metrics dict (mrr, burn_rate, growth_rate % MoM,
+    churn_rate % monthly, cash / runway_months) under a scenario, cached per
+    metrics hash and scenario. Callers must not mutate the returned dict.
+    """
+    growth = metrics.get("growth_rate")
+    growth = DEFAULT_GROWTH_RATE if growth is None else float(growth) / 100
+    inputs = {
+        "mrr": float(metrics.get("mrr") or 0),
+        "burn": float(metrics.get("burn_rate") or 0),
+        "cash": starting_cash(metrics),
+        "growth": growth * SCENARIO_GROWTH_MULTIPLIERS.get(scenario, 1.0),
+        "churn": float(metrics.get("churn_rate") or 0) / 100,
+        "months": months,
+        "paths": paths,
+    }
+    inputs_hash = _metrics_key({**inputs, "seed": seed})
+    # Unknown scenarios (and zero growth) scale growth like "base" does, so the
+    # scenario is part of the key or the result would carry the wrong label
+    key = _metrics_key({**inputs, "seed": seed, "scenario": scenario})
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    if cached is not None:
+        app_metrics.inc("finance_projection_cache_total", outcome="hit")
+        return cached
+
+    app_metrics.inc("finance_projection_cache_total", outcome="miss")
+    with app_metrics.timer("finance_projection_seconds"):
+        result = simulate_projections(**inputs, seed=int(inputs_hash[:8], 16) if seed is None else seed)
+    result["scenario"] = scenario
+    with _cache_lock:
+        result = _cache.setdefault(key, result)  # a concurrent miss may have stored it first
+        while len(_cache) > PROJECTION_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return result
@@ -0,0 +1,120 @@
+"""
+Quantile Sketch
+A small merging t-digest for streaming percentile estimates.
+
+Values are buffered and periodically merged into centroids sized by the k1
+scale function, so the tails stay near-exact while the middle is compressed.
+Small samples (under about compression / 2 points) keep one centroid per value,
+so quantile() matches np.percentile (linear interpolation) exactly.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_COMPRESSION = 100
+
+
+class TDigest:
+    """Mergeable quantile sketch; serializes to a compact JSON-friendly dict."""
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self._buffer: List[float] = []
+        self.count = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @classmethod
+    def of(cls, values: Iterable[float], compression: int = DEFAULT_COMPRESSION) -> "TDigest":
+        digest = cls(compression)
+        for value in values:
+            digest.add(value)
+        return digest
+
+    def add(self, value: float) -> None:
+        value = float(value)
+        self._buffer.append(value)
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) >= self.compression * 5:
+            self.compress()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def compress(self) -> None:
+        if not self._buffer:
+            return
+        items = sorted(list(zip(self.means, self.weights, strict=True)) + [(v, 1.0) for v in self._buffer])
+        self._buffer = []
+
+        means, weights = [], []
+        mean, weight = items[0]
+        before = 0.0  # total weight left of the centroid being built
+        for next_mean, next_weight in items[1:]:
+            if self._k((before + weight + next_weight) / self.count) - self._k(before / self.count) <= 1:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                before += weight
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-th quantile (0..1), interpolating between centroid centres."""
+        self.compress()
+        if not self.means:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+
+        # Rank of each centroid's centre on np.percentile's 0..n-1 index scale
+        target = q * (self.count - 1)
+        centres, cumulative = [], 0.0
+        for weight in self.weights:
+            centres.append(cumulative + (weight - 1) / 2)
+            cumulative += weight
+
+        if target <= centres[0]:
+            return self._edge(self.min, self.means[0], centres[0], target)
+        if target >= centres[-1]:
+            last = self.count - 1
+            span = last - centres[-1]
+            return self.means[-1] if span <= 0 else \
+                self.means[-1] + (self.max - self.means[-1]) * (target - centres[-1]) / span
+        for i in range(1, len(centres)):
+            if target <= centres[i]:
+                left, right = centres[i - 1], centres[i]
+                fraction = (target - left) / (right - left) if right > left else 0.0
+                return self.means[i - 1] + (self.means[i] - self.means[i - 1]) * fraction
+        return self.max
+
+    @staticmethod
+    def _edge(low: float, mean: float, centre: float, target: float) -> float:
+        return mean if centre <= 0 else low + (mean - low) * target / centre
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.compress()
+        return {
+            "c": [[m, w] for m, w in zip(self.means, self.weights, strict=True)],
+            "n": self.count,
+            "min": self.min,
+            "max": self.max,
+            "d": self.compression,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(data.get("d", DEFAULT_COMPRESSION))
+        digest.means = [m for m, _ in data.get("c", [])]
+        digest.weights = [w for _, w in data.get("c", [])]
+        digest.count = data.get("n", 0.0)
+        digest.min, digest.max = data.get("min"), data.get("max")
+        return digest
@@ -131,11 +131,20 @@ class SchedulerService:
             description="Scan social platforms for growth opportunities",
         )
         
-        # Overdue Goals Nag — alert founders on overdue goals (3 PM UTC daily)
-        self.add_cron_job(
+        # Notification digests — deliver queued notifications whose window closed
+        self.add_interval_job(
+            job_id="notification_flush",
+            func=self._flush_notifications,
+            seconds=30,
+            description="Deliver queued notifications as per-user digests",
+        )
+        
+        # Overdue Goals Nag — one indexed sweep over all tenants' goals
+        # (every 5 minutes; each overdue goal is nagged at most once a day)
+        self.add_interval_job(
             job_id="overdue_goals_nag",
             func=self._run_overdue_goals_nag,
-            cron="0 15 * * *",
+            minutes=5,
             description="Alert founders about overdue goals",
         )
         
@@ -171,12 +180,36 @@ class SchedulerService:
             description="Autonomous agent opportunity scan",
         )
         
+        # Leaderboard — re-rank startups whose metrics changed (hourly) and
+        # snapshot the rankings for day/week/month windows (00:05 UTC)
+        self.add_interval_job(
+            job_id="leaderboard_refresh",
+            func=self._refresh_leaderboard,
+            hours=1,
+            description="Re-score startups with changed metrics into the leaderboard",
+        )
+        self.add_cron_job(
+            job_id="leaderboard_snapshot",
+            func=self._snapshot_leaderboard,
+            cron="5 0 * * *",
+            description="Snapshot leaderboard rankings for time-period windows",
+        )
+        
+        # Industry benchmarks — exact percentile recompute + sketch drift report (02:30 UTC)
+        self.add_cron_job(
+            job_id="benchmark_recompute",
+            func=self._recompute_benchmarks,
+            cron="30 2 * * *",
+            description="Recompute exact industry benchmark percentiles",
+        )
+        
         all_jobs = [
             "isp_daily_driver", "isp_weekly_reports",
             "evaluate_triggers", "sync_integrations", "daily_summary", "hourly_hunter",
             "content_daily_post", "competitor_weekly_scan", "growth_social_scan",
             "overdue_goals_nag", "reddit_sniper_scan", "morning_brief", "qa_weekly_audit",
-            "autonomous_loop",
+            "autonomous_loop", "leaderboard_refresh", "leaderboard_snapshot",
+            "benchmark_recompute", "notification_flush",
         ]
         logger.info("Default jobs registered", jobs=all_jobs, total=len(all_jobs))
     
@@ -284,63 +317,39 @@ class SchedulerService:
             logger.error("Trigger evaluation failed", error=str(e))
     
     async def _sync_all_integrations(self):
-        """Sync data from all active integrations"""
+        """Sync data from all active integrations (concurrent, per-provider quotas)"""
         logger.info("Starting integration sync")
         
         try:
-            from app.core.database import async_session
-            from app.models.integration import Integration, IntegrationStatus
-            from app.integrations import StripeIntegration, GitHubIntegration
-            from app.integrations.base import IntegrationCredentials
-            from sqlalchemy import select
-            from datetime import datetime
-            
-            async with async_session() as db:
-                # Get active integrations
-                result = await db.execute(
-                    select(Integration).where(
-                        Integration.status == IntegrationStatus.ACTIVE
-                    )
-                )
-                integrations = result.scalars().all()
-                
-                synced = 0
-                for integration in integrations:
-                    try:
-                        # Create appropriate integration client
-                        credentials = IntegrationCredentials(
-                            access_token=integration.access_token,
-                            api_key=integration.api_key,
-                        )
-                        
-                        # Map provider to client (add more as implemented)
-                        if integration.provider.value == "stripe":
-                            client = StripeIntegration(credentials)
-                        elif integration.provider.value == "github":
-                            client = GitHubIntegration(credentials)
-                        else:
-                            continue
-                        
-                        # Sync
-                        result = await client.sync_data()
-                        
-                        if result.success:
-                            integration.last_sync_at = datetime.utcnow()
-                            synced += 1
-                        else:
-                            integration.last_error = "; ".join(result.errors)
-                        
-                        await client.close()
-                    except Exception as e:
-                        logger.error("Integration sync failed", 
-                                   provider=integration.provider.value, 
-                                   error=str(e))
-                
-                await db.commit()
-                logger.info("Integration sync complete", synced=synced)
+            from app.services.integration_sync import integration_sync
+            await integration_sync.sync_all()
         except Exception as e:
             logger.error("Integration sync failed", error=str(e))
     
+    async def _refresh_leaderboard(self):
+        """Re-score startups whose ranked inputs changed since the last pass"""
+        try:
+            from app.services.leaderboard import leaderboard_service
+            await leaderboard_service.refresh_all()
+        except Exception as e:
+            logger.error("Leaderboard refresh failed", error=str(e))
+    
+    async def _snapshot_leaderboard(self):
+        """Store today's rankings as the baseline for time-period windows"""
+        try:
+            from app.services.leaderboard import leaderboard_service
+            await leaderboard_service.snapshot()
+        except Exception as e:
+            logger.error("Leaderboard snapshot failed", error=str(e))
+    
+    async def _recompute_benchmarks(self):
+        """Rebuild benchmark sketches from Postgres and report their drift"""
+        try:
+            from app.services.benchmark_service import benchmark_service
+            await benchmark_service.recompute_all()
+        except Exception as e:
+            logger.error("Benchmark recompute failed", error=str(e))
+    
     async def _generate_daily_summaries(self):
         """Generate daily AI summaries and morning briefs for all startups"""
         logger.info("Starting daily summary + morning brief generation")
@@ -492,12 +501,11 @@ class SchedulerService:
                             owner = user_result.scalar_one_or_none()
                             
                             if owner:
-                                await notification_service.notify_user(
+                                await notification_service.enqueue(
                                     user=owner,
                                     subject=f"Found {new_leads_count} New Leads",
                                     body=f"Sales Agent found {new_leads_count} potential leads for {startup.name}.",
-                                    action_url=f"https://app.momentaic.com/startups/{startup.id}/growth",
-                                    db=db
+                                    action_url=f"https://app.momentaic.com/startups/{startup.id}/growth"
                                 )
                                 logger.info(f"Notified owner {owner.email} of {new_leads_count} new leads")
                             
@@ -816,52 +824,38 @@ class SchedulerService:
         except Exception as e:
             logger.error("Growth Social Scan failed", error=str(e))
 
+    async def _flush_notifications(self):
+        """Send the notification digests that are due"""
+        from app.services.notification_service import notification_service
+        await notification_service.flush_pending()
+
     async def _run_overdue_goals_nag(self):
         """
-        Check all startups for overdue goals and notify founders.
-        Uses GoalTracker.get_overdue_goals().
+        Notify founders about overdue goals.
+        One query finds overdue, not-recently-nagged goals for every tenant
+        together with their owners; each founder gets one nag per startup.
         """
-        logger.info("=== Overdue Goals Nag Triggered ===")
+        from app.services.goal_tracker import goal_tracker
+        from app.services.notification_service import notification_service
 
         try:
-            from app.models.startup import Startup
-            from app.models.user import User
-            from app.core.database import async_session
-            from sqlalchemy import select
-            from app.services.goal_tracker import goal_tracker
-            from app.services.notification_service import notification_service
-
-            async with async_session() as db:
-                result = await db.execute(select(Startup).where(Startup.is_active == True))
-                startups = result.scalars().all()
-
-                nagged = 0
-                for startup in startups:
-                    try:
-                        overdue = await goal_tracker.get_overdue_goals(str(startup.id))
-
-                        if overdue:
-                            user_result = await db.execute(
-                                select(User).where(User.id == startup.owner_id)
-                            )
-                            owner = user_result.scalar_one_or_none()
-
-                            if owner:
-                                goal_names = ", ".join(g.name for g in overdue[:5])
-                                await notification_service.notify_user(
-                                    user=owner,
-                                    subject=f"⚠️ {len(overdue)} Overdue Goals for {startup.name}",
-                                    body=f"These goals are past their deadline: {goal_names}. Time to act!",
-                                    action_url=f"https://app.momentaic.com/startups/{startup.id}/goals",
-                                    db=db,
-                                )
-                                nagged += 1
-
-                    except Exception as e:
-                        logger.error(f"Goal nag failed for {startup.name}", error=str(e))
-
-                logger.info(f"Overdue Goals Nag complete. Nagged {nagged} founders.")
+            now = datetime.utcnow()
+            nagged_goals = []
+            for startup, owner, overdue in await goal_tracker.overdue_goals_to_nag(now):
+                try:
+                    goal_names = ", ".join(g.name for g in overdue[:5])
+                    await notification_service.enqueue(
+                        user=owner,
+                        subject=f"⚠️ {len(overdue)} Overdue Goals for {startup.name}",
+                        body=f"These goals are past their deadline: {goal_names}. Time to act!",
+                        action_url=f"https://app.momentaic.com/startups/{startup.id}/goals",
+                    )
+                    nagged_goals.extend(g.id for g in overdue)
+                except Exception as e:
+                    logger.error(f"Goal nag failed for {startup.name}", error=str(e))
 
+            await goal_tracker.mark_nagged(nagged_goals, now)
+            logger.info(f"Overdue Goals Nag complete. Nagged {len(nagged_goals)} goals.")
         except Exception as e:
             logger.error("Overdue Goals Nag failed", error=str(e))
 
@@ -0,0 +1,372 @@
+"""
+Batch Signal Engine
+Nightly Neural Signal + traction scoring for every startup in one pass.
+
+- Metric snapshots are loaded once into columnar NumPy arrays
+- Signal components (tech velocity, PMF, growth momentum, runway) and the
+  TractionScoreEngine sub-scores are computed vectorized, with true
+  percentiles across all startups
+- GitHub participation stats are fetched concurrently through one pooled
+  client with ETag revalidation (a 304 is free against the rate limit)
+- Signal rows are written with chunked bulk INSERTs
+
+Scoring matches calculate_signal in app/api/v1/endpoints/signals.py, which
+remains the per-startup path for on-demand recalculation.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import httpx
+import numpy as np
+import structlog
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+from app.models.startup import Signal, Startup
+from app.services.traction_score import get_traction_engine, percentile_ranks
+
+logger = structlog.get_logger()
+
+GITHUB_CONCURRENCY = 16
+INSERT_CHUNK_SIZE = 5000
+LOAD_BATCH_SIZE = 5000
+ETAG_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+SIGNAL_WEIGHTS = {"tech_velocity": 0.25, "pmf_score": 0.30, "growth_momentum": 0.30, "runway_health": 0.15}
+
+# Every metric read by the signal components or the traction scorer
+METRIC_FIELDS = (
+    "dau", "mau", "nps", "mrr", "mrr_prev_month", "runway_months", "burn_rate",
+    *get_traction_engine().BATCH_INPUTS.keys(),
+)
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, bool) or value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+@dataclass
+class MetricColumns:
+    """Per-startup metric snapshots as float arrays (NaN = metric absent)."""
+    startup_ids: List[UUID]
+    names: List[str]
+    github_repos: List[Optional[str]]
+    has_metrics: np.ndarray
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[UUID, str, Optional[str], Optional[dict]]]) -> "MetricColumns":
+        n = len(rows)
+        snapshots = [row[3] or {} for row in rows]
+        return cls(
+            startup_ids=[row[0] for row in rows],
+            names=[row[1] for row in rows],
+            github_repos=[row[2] for row in rows],
+            has_metrics=np.fromiter((bool(m) for m in snapshots), dtype=bool, count=n),
+            values={
+                name: np.fromiter((_number(m.get(name)) for m in snapshots), dtype=float, count=n)
+                for name in METRIC_FIELDS
+            },
+        )
+
+    def __len__(self) -> int:
+        return len(self.startup_ids)
+
+    def get(self, name: str, default) -> np.ndarray:
+        """Column with absent values replaced by `default` (scalar or array)."""
+        column = self.values[name]
+        return np.where(np.isnan(column), default, column)
+
+
+def compute_signal_components(
+    columns: MetricColumns,
+    commits_7d: np.ndarray,
+    commits_prev_7d: np.ndarray,
+    has_github: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Vectorized calculate_signal: one array per component plus the weighted overall."""
+    has_metrics = columns.has_metrics
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio_velocity = np.minimum(100, commits_7d / commits_prev_7d * 50)
+        tech_velocity = np.where(
+            has_github,
+            np.where(commits_prev_7d > 0, ratio_velocity, np.where(commits_7d > 0, 75.0, 25.0)),
+            50.0,
+        )
+
+        dau, mau, nps = columns.get("dau", 0), columns.get("mau", 0), columns.get("nps", 0)
+        stickiness = dau / mau * 100
+        pmf_score = np.where(has_metrics & (mau > 0), np.minimum(100, stickiness * 2 + (nps + 100) / 4), 50.0)
+
+        mrr = columns.get("mrr", 0)
+        mrr_prev = columns.get("mrr_prev_month", mrr)
+        mrr_growth = (mrr - mrr_prev) / mrr_prev * 100
+        growth_momentum = np.where(has_metrics & (mrr_prev > 0), np.minimum(100, 50 + mrr_growth * 2), 50.0)
+
+    runway_months = columns.get("runway_months", 12)
+    runway_health = np.where(
+        has_metrics,
+        np.select(
+            [runway_months >= 18, runway_months >= 12, runway_months >= 6],
+            [100.0, 80.0, 50.0],
+            default=np.maximum(10, runway_months * 8),
+        ),
+        50.0,
+    )
+
+    components = {
+        "tech_velocity": tech_velocity,
+        "pmf_score": pmf_score,
+        "growth_momentum": growth_momentum,
+        "runway_health": runway_health,
+    }
+    components["overall_score"] = sum(components[name] * w for name, w in SIGNAL_WEIGHTS.items())
+    return components
+
+
+class GitHubParticipationFetcher:
+    """Concurrent /stats/participation fetches with ETag revalidation cached in Redis."""
+
+    def __init__(self, concurrency: int = GITHUB_CONCURRENCY, http_client: Optional[httpx.AsyncClient] = None):
+        self.concurrency = concurrency
+        self._client = http_client
+
+    @staticmethod
+    def _cache_key(repo: str) -> str:
+        return f"github:participation:{repo.lower()}"
+
+    async def _cached(self, repo: str) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await redis_client.get(self._cache_key(repo))
+            return json.loads(raw) if raw else None
+        except Exception:
+            return None
+
+    async def _store(self, repo: str, etag: Optional[str], weekly: List[int]) -> None:
+        try:
+            await redis_client.set(
+                self._cache_key(repo), json.dumps({"etag": etag, "all": weekly}), ex=ETAG_CACHE_TTL_SECONDS
+            )
+        except Exception:
+            pass
+
+    async def fetch_one(self, client: httpx.AsyncClient, repo: str) -> Tuple[int, int]:
+        """(commits last week, commits the week before); zeros if unavailable."""
+        cached = await self._cached(repo)
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if settings.github_token:
+            headers["Authorization"] = f"Bearer {settings.github_token}"
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+
+        weekly: List[int] = []
+        try:
+            response = await client.get(f"https://api.github.com/repos/{repo}/stats/participation", headers=headers)
+            if response.status_code == 304 and cached:
+                metrics.inc("github_participation_total", result="not_modified")
+                weekly = cached.get("all") or []
+            elif response.status_code == 200:
+                metrics.inc("github_participation_total", result="fetched")
+                weekly = response.json().get("all") or []
+                await self._store(repo, response.headers.get("ETag"), weekly)
+            else:
+                # 202 = stats still being computed by GitHub; reuse the last copy if any
+                metrics.inc("github_participation_total", result=str(response.status_code))
+                weekly = (cached or {}).get("all") or []
+        except Exception as e:
+            logger.warning("Failed to fetch GitHub data for signals", repo=repo, error=str(e))
+            weekly = (cached or {}).get("all") or []
+
+        last = weekly[-1] if weekly else 0
+        previous = weekly[-2] if len(weekly) >= 2 else 0
+        return last, previous
+
+    async def fetch_many(self, repos: Iterable[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        repos = list(repos)
+        commits_7d, commits_prev = np.zeros(len(repos)), np.zeros(len(repos))
+        targets = [(i, repo) for i, repo in enumerate(repos) if repo]
+        if not targets:
+            return commits_7d, commits_prev
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        client = self._client or httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+
+        async def bounded(index: int, repo: str):
+            async with semaphore:
+                commits_7d[index], commits_prev[index] = await self.fetch_one(client, repo)
+
+        try:
+            await asyncio.gather(*(bounded(i, repo) for i, repo in targets))
+        finally:
+            if self._client is None:
+                await client.aclose()
+        return commits_7d, commits_prev
+
+
+class BatchSignalEngine:
+    """Scores every startup in one vectorized pass and bulk-inserts Signal rows."""
+
+    def __init__(self, fetcher: Optional[GitHubParticipationFetcher] = None):
+        self.fetcher = fetcher or GitHubParticipationFetcher()
+
+    async def load_columns(self) -> MetricColumns:
+        rows: List[Tuple] = []
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(
+                select(Startup.id, Startup.name, Startup.github_repo, Startup.metrics)
+                .execution_options(yield_per=LOAD_BATCH_SIZE)
+            )
+            async for batch in result.partitions(LOAD_BATCH_SIZE):
+                rows.extend(tuple(row) for row in batch)
+        return MetricColumns.from_rows(rows)
+
+    def score(
+        self,
+        columns: MetricColumns,
+        commits_7d: np.ndarray,
+        commits_prev_7d: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        has_github = np.array([bool(repo) for repo in columns.github_repos], dtype=bool)
+        signals = compute_signal_components(columns, commits_7d, commits_prev_7d, has_github)
+        signals["overall_percentile"] = percentile_ranks(signals["overall_score"])
+
+        traction_inputs = {name: columns.get(name, default)
+                           for name, default in get_traction_engine().BATCH_INPUTS.items()}
+        traction = get_traction_engine().calculate_scores_batch(traction_inputs)
+        signals.update({f"traction_{name}": values for name, values in traction.items()})
+        return signals
+
+    def build_rows(
+        self,
+        columns: MetricColumns,
+        scores: Dict[str, np.ndarray],
+        commits_7d: np.ndarray,
+        commits_prev_7d: np.ndarray,
+    ) -> List[Dict[str, Any]]:
+        from app.api.v1.endpoints.signals import generate_insights, generate_recommendations
+
+        rounded = {name: np.round(scores[name], 2).tolist() for name in ("overall_score", *SIGNAL_WEIGHTS)}
+        percentile = np.round(scores["overall_percentile"], 1).tolist()
+        traction_score = np.round(scores["traction_overall_score"], 1).tolist()
+        traction_percentile = np.round(scores["traction_percentile"], 1).tolist()
+        traction_tier = scores["traction_tier"].tolist()
+        raw_fields = ("dau", "mau", "nps", "mrr", "mrr_prev_month", "runway_months", "burn_rate")
+        raw_columns = {name: columns.values[name].tolist() for name in raw_fields}
+
+        # Insights/recommendations depend only on which band each component
+        # falls in (plus the name for the fast-shipping insight), so generate
+        # each distinct text once instead of once per startup
+        tech_v, pmf_v, growth_v, runway_v = (scores[name] for name in SIGNAL_WEIGHTS)
+        insight_codes = (
+            np.select([tech_v >= 75, tech_v < 40], [2, 1], 0) * 18
+            + np.select([pmf_v >= 70, pmf_v < 40], [2, 1], 0) * 6
+            + np.select([growth_v >= 75, growth_v < 40], [2, 1], 0) * 2
+            + (runway_v < 50)
+        ).tolist()
+        recommendation_codes = (
+            (tech_v < 50) * 8 + (pmf_v < 50) * 4 + (growth_v < 50) * 2 + (runway_v < 50)
+        ).tolist()
+        names_in_insight = (tech_v >= 75).tolist()
+        insights: Dict[Tuple, str] = {}
+        recommendations: Dict[int, List[str]] = {}
+
+        rows = []
+        for i, startup_id in enumerate(columns.startup_ids):
+            insight_key = (insight_codes[i], columns.names[i] if names_in_insight[i] else None)
+            if insight_key not in insights:
+                insights[insight_key] = generate_insights(
+                    tech_v[i], pmf_v[i], growth_v[i], runway_v[i], _Named(columns.names[i])
+                )
+            if recommendation_codes[i] not in recommendations:
+                recommendations[recommendation_codes[i]] = generate_recommendations(
+                    tech_v[i], pmf_v[i], growth_v[i], runway_v[i]
+                )
+
+            raw_data: Dict[str, Any] = {
+                name: values[i] for name, values in raw_columns.items() if values[i] == values[i]  # skip NaN
+            }
+            if columns.github_repos[i]:
+                raw_data["commits_7d"] = int(commits_7d[i])
+                raw_data["commits_prev_7d"] = int(commits_prev_7d[i])
+            raw_data["overall_percentile"] = percentile[i]
+            raw_data["traction"] = {
+                "score": traction_score[i],
+                "percentile": traction_percentile[i],
+                "tier": traction_tier[i],
+            }
+            rows.append({
+                "startup_id": startup_id,
+                "tech_velocity": rounded["tech_velocity"][i],
+                "pmf_score": rounded["pmf_score"][i],
+                "growth_momentum": rounded["growth_momentum"][i],
+                "runway_health": rounded["runway_health"][i],
+                "overall_score": rounded["overall_score"][i],
+                "raw_data": raw_data,
+                "ai_insights": insights[insight_key],
+                "recommendations": list(recommendations[recommendation_codes[i]]),
+            })
+        return rows
+
+    async def write(self, rows: List[Dict[str, Any]]) -> None:
+        async with AsyncSessionLocal() as db:
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                await db.execute(insert(Signal), rows[start:start + INSERT_CHUNK_SIZE])
+            await db.commit()
+
+    async def run(self) -> Dict[str, Any]:
+        """Score all startups and insert one Signal row each."""
+        timings = {}
+        started = time.perf_counter()
+
+        columns = await self.load_columns()
+        timings["load"] = time.perf_counter() - started
+
+        mark = time.perf_counter()
+        commits_7d, commits_prev = await self.fetcher.fetch_many(columns.github_repos)
+        timings["github"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        scores = self.score(columns, commits_7d, commits_prev)
+        rows = self.build_rows(columns, scores, commits_7d, commits_prev)
+        timings["score"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        await self.write(rows)
+        timings["write"] = time.perf_counter() - mark
+
+        for phase, seconds in timings.items():
+            metrics.observe("signal_batch_seconds", seconds, phase=phase)
+        summary = {
+            "calculated": len(rows),
+            "github_repos": sum(1 for repo in columns.github_repos if repo),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info("Batch signal calculation complete", **summary)
+        return summary
+
+
+@dataclass
+class _Named:
+    """The only Startup attribute generate_insights reads."""
+    name: str
+
+
+# Singleton
+batch_signal_engine = BatchSignalEngine()
@@ -90,7 +90,17 @@ class SocialScheduler:
             
             await db.flush()
             await db.commit()
-            
+
+            # 4. Seed the engagement facts GrowthLoopEngine analyzes
+            if post.status == PostStatus.PUBLISHED:
+                try:
+                    from app.services.growth_loop import growth_loop
+                    await growth_loop.record_published(db, post)
+                    await db.commit()
+                except Exception as e:
+                    await db.rollback()
+                    logger.warning("SocialScheduler: Engagement facts not recorded", post_id=str(post.id), error=str(e))
+
         except Exception as e:
             logger.error("SocialScheduler: Post execution failed", post_id=str(post.id), error=str(e))
             post.status = PostStatus.FAILED
@@ -0,0 +1,293 @@
+"""
+Source Fetcher
+Reads web pages for research agents: concurrently, politely and cached.
+
+- Pages are fetched concurrently under a global semaphore, with at most
+  PER_HOST_CONCURRENCY requests per host and PER_HOST_INTERVAL_SECONDS
+  between request starts to the same host
+- fetch_many() has an overall deadline: sources that are not back in time
+  are cancelled and the caller works with what arrived
+- Plain HTTP is tried first; the shared browser (one page, so one read at a
+  time) is only used for pages that fail or render client-side
+- Extracted text is cached in Redis by content hash, with a per-URL entry
+  holding the ETag / Last-Modified validators. Fresh entries are served
+  directly; stale ones are revalidated with a conditional GET
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+
+logger = structlog.get_logger()
+
+FETCH_CONCURRENCY = 8
+PER_HOST_CONCURRENCY = 2
+PER_HOST_INTERVAL_SECONDS = 1.0
+FETCH_TIMEOUT_SECONDS = 20.0
+FETCH_DEADLINE_SECONDS = 60.0
+PAGE_FRESH_SECONDS = 6 * 3600          # served from cache without revalidation
+PAGE_CACHE_TTL_SECONDS = 7 * 24 * 3600
+MAX_SOURCE_CHARS = 20000                # same cap as read_url_content
+MIN_TEXT_CHARS = 500                    # less than this usually means a JS shell page
+USER_AGENT = "Mozilla/5.0 (Momentaic Research Agent)"
+
+
+def _page_key(url: str) -> str:
+    return f"research:page:{hashlib.sha256(url.encode()).hexdigest()}"   # HASH url -> validators + content hash
+
+
+def _content_key(content_hash: str) -> str:
+    return f"research:content:{content_hash}"                             # STRING extracted text
+
+
+@dataclass
+class Source:
+    url: str
+    title: str
+    text: str
+    cached: bool = False
+
+    def format(self) -> str:
+        return f"Source: {self.url}\nTitle: {self.title}\n\nContent:\n{self.text}"
+
+
+class _TextExtractor(HTMLParser):
+    SKIP = {"script", "style", "noscript", "svg", "template", "iframe"}
+    BLOCK = {
+        "p", "div", "br", "li", "tr", "section", "article", "header", "footer", "blockquote",
+        "pre", "table", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self._parts: List[str] = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.BLOCK:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.BLOCK:
+            self._parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self._parts.append(data)
+
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self._parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+def extract_text(html: str) -> Tuple[str, str]:
+    """(title, readable text) of an HTML document."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return " ".join(parser.title.split()), parser.text()
+
+
+class SourceFetcher:
+
+    def __init__(self, concurrency: int = FETCH_CONCURRENCY):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._concurrency = concurrency
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(PER_HOST_CONCURRENCY)
+        )
+        self._host_next_start: Dict[str, float] = {}
+        self._browser_lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=FETCH_TIMEOUT_SECONDS,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=self._concurrency * 2,
+                                    max_keepalive_connections=self._concurrency),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ─── Fetching ────────────────────────────────────────────────────────────
+
+    async def fetch_many(self, urls: List[str], deadline: float = FETCH_DEADLINE_SECONDS) -> List[Source]:
+        """Fetch urls concurrently; returns the sources read before the deadline, in input order."""
+        tasks = [asyncio.create_task(self._fetch_or_none(url)) for url in dict.fromkeys(urls)]
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            metrics.inc("research_fetch_total", len(pending), outcome="deadline")
+            logger.warning("SourceFetcher: deadline reached", deadline=deadline, dropped=len(pending))
+        return [task.result() for task in tasks if task in done and task.result() is not None]
+
+    async def _fetch_or_none(self, url: str) -> Optional[Source]:
+        try:
+            return await self.fetch(url)
+        except Exception as e:
+            logger.error("SourceFetcher: fetch failed", url=url, error=str(e))
+            metrics.inc("research_fetch_total", outcome="error")
+            return None
+
+    async def fetch(self, url: str) -> Optional[Source]:
+        """Read one page: fresh cache entry, conditional GET, then the browser as a fallback."""
+        cached = await self._cached(url)
+        if cached and time.time() - cached[0] < PAGE_FRESH_SECONDS:
+            metrics.inc("research_fetch_total", outcome="cache_hit")
+            return cached[1]
+
+        with metrics.timer("research_fetch_seconds"):
+            async with self._slot(urlsplit(url).hostname or ""):
+                source = await self._fetch_http(url, cached)
+            if source is None:
+                source = await self._fetch_browser(url)
+        if source is None:
+            metrics.inc("research_fetch_total", outcome="failed")
+        return source
+
+    @asynccontextmanager
+    async def _slot(self, host: str):
+        async with self._host_semaphores[host]:
+            now = time.monotonic()
+            start = max(now, self._host_next_start.get(host, now))
+            self._host_next_start[host] = start + PER_HOST_INTERVAL_SECONDS
+            if start > now:
+                await asyncio.sleep(start - now)
+            async with self._semaphore:
+                yield
+
+    async def _fetch_http(self, url: str, cached: Optional[Tuple[float, Source, Dict[str, str]]]) -> Optional[Source]:
+        headers = {"Accept": "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.5"}
+        if cached:
+            validators = cached[2]
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            response = await self._http().get(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.info("SourceFetcher: HTTP fetch failed", url=url, error=str(e))
+            return None
+
+        if response.status_code == 304 and cached:
+            await self._touch(url)
+            metrics.inc("research_fetch_total", outcome="revalidated")
+            return cached[1]
+        if response.status_code != 200:
+            return None
+
+        content_type = response.headers.get("content-type", "")
+        if "html" in content_type:
+            title, text = extract_text(response.text)
+        elif content_type.startswith("text/"):
+            title, text = "", response.text.strip()
+        else:
+            return None
+        if len(text) < MIN_TEXT_CHARS:
+            return None
+
+        source = Source(url=url, title=title, text=text[:MAX_SOURCE_CHARS])
+        await self._store(source, response.headers.get("etag"), response.headers.get("last-modified"))
+        metrics.inc("research_fetch_total", outcome="fetched")
+        return source
+
+    async def _fetch_browser(self, url: str) -> Optional[Source]:
+        from app.agents.base import read_url_content
+
+        async with self._browser_lock:
+            content = await read_url_content.ainvoke(url)
+        if not content.startswith("Source: "):
+            return None  # "Failed to read ..." / "Error reading URL ..."
+        head, _, text = content.partition("\n\nContent:\n")
+        title = head.partition("\nTitle: ")[2]
+        source = Source(url=url, title=title, text=text)
+        await self._store(source)
+        metrics.inc("research_fetch_total", outcome="browser")
+        return source
+
+    # ─── Cache ───────────────────────────────────────────────────────────────
+
+    async def _cached(self, url: str) -> Optional[Tuple[float, Source, Dict[str, str]]]:
+        """(fetched_at, source, validators) of a cached page, if any."""
+        try:
+            entry = await redis_client.hgetall(_page_key(url))
+            if not entry:
+                return None
+            text = await redis_client.get(_content_key(entry["content_hash"]))
+        except Exception as e:
+            logger.warning("SourceFetcher: cache read failed", error=str(e))
+            return None
+        if text is None:
+            return None
+        validators = {k: entry[k] for k in ("etag", "last_modified") if entry.get(k)}
+        source = Source(url=url, title=entry.get("title", ""), text=text, cached=True)
+        return float(entry.get("fetched_at", 0)), source, validators
+
+    async def _store(self, source: Source, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        content_hash = hashlib.sha256(source.text.encode()).hexdigest()
+        entry = {
+            "url": source.url,
+            "title": source.title,
+            "content_hash": content_hash,
+            "fetched_at": str(time.time()),
+            "etag": etag or "",
+            "last_modified": last_modified or "",
+        }
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(_content_key(content_hash), source.text, ex=PAGE_CACHE_TTL_SECONDS)
+                pipe.delete(_page_key(source.url))
+                pipe.hset(_page_key(source.url), mapping=entry)
+                pipe.expire(_page_key(source.url), PAGE_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("SourceFetcher: cache write failed", error=str(e))
+
+    async def _touch(self, url: str) -> None:
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hset(_page_key(url), "fetched_at", str(time.time()))
+                pipe.expire(_page_key(url), PAGE_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("SourceFetcher: cache write failed", error=str(e))
+
+
+# Singleton
+source_fetcher = SourceFetcher()
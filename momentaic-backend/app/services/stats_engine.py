@@ -0,0 +1,241 @@
+"""
+Stats Engine
+Vectorized statistics for metric series and experiments, on NumPy alone.
+
+- Anomalies: robust modified z-scores (median / MAD, Iglewicz-Hoaglin), either
+  against the whole series or against a trailing rolling window. Rolling
+  windows are processed in fixed-size blocks so million-point series need
+  only a few MB of scratch memory
+- A/B tests: two-proportion z-test with an unpooled confidence interval for
+  the difference, a parametric bootstrap interval for relative lift, and an
+  always-valid sequential test (mSPRT) that can be checked after every look
+  without inflating the false-positive rate
+- bootstrap_ci() for any NumPy reduction that takes an axis argument
+
+Functions accept scalars or arrays; array inputs broadcast, so many tests (or
+many looks) are evaluated in one call.
+"""
+
+import math
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MAD_SCALE = 0.6744897501960817       # MAD of a standard normal (its 75th percentile)
+MEANAD_SCALE = 0.7978845608028654    # mean absolute deviation of a standard normal, sqrt(2/pi)
+ANOMALY_THRESHOLD = 3.5              # Iglewicz & Hoaglin's cut-off for modified z-scores
+BLOCK_ROWS = 65536                   # rolling windows evaluated per block
+BOOTSTRAP_BLOCK_ELEMENTS = 8_000_000 # resampled values held in memory at once
+DEFAULT_MIXING_SD = 0.01             # mSPRT prior sd of the rate difference (~1 point)
+
+# Chebyshev fit of erfc (Numerical Recipes "erfcc"), relative error < 1.2e-7
+_ERFC_COEFFS = (0.17087277, -0.82215223, 1.48851587, -1.13520398, 0.27886807,
+                -0.18628806, 0.09678418, 0.37409196, 1.00002368, -1.26551223)
+
+
+def _erfc(x: np.ndarray) -> np.ndarray:
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = np.zeros_like(t)
+    for coeff in _ERFC_COEFFS:
+        poly = poly * t + coeff
+    tail = t * np.exp(-z * z + poly)
+    return np.where(x >= 0, tail, 2.0 - tail)
+
+
+def _out(value: np.ndarray) -> Any:
+    """Plain floats for scalar inputs, arrays otherwise."""
+    return value.item() if np.ndim(value) == 0 else value
+
+
+def normal_sf(z) -> Any:
+    """Upper tail probability P(Z > z) of the standard normal (exact for scalars)."""
+    z = np.asarray(z, dtype=float)
+    if z.ndim == 0:
+        return 0.5 * math.erfc(float(z) / math.sqrt(2.0))
+    return 0.5 * _erfc(z / math.sqrt(2.0))
+
+
+# ─── Anomalies ───────────────────────────────────────────────────────────────
+
+def _modified_z(deviation: np.ndarray, mad: np.ndarray, mean_ad: np.ndarray) -> np.ndarray:
+    # Falls back to the mean absolute deviation when more than half the
+    # baseline is identical (MAD = 0), and to 0 when the baseline is flat.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            mad > 0, MAD_SCALE * deviation / mad,
+            np.where(mean_ad > 0, MEANAD_SCALE * deviation / mean_ad, 0.0),
+        )
+
+
+def robust_zscores(values) -> np.ndarray:
+    """Modified z-score of every point against the median / MAD of the whole series."""
+    x = np.asarray(values, dtype=float)
+    deviation = x - np.median(x)
+    absolute = np.abs(deviation)
+    return _modified_z(deviation, np.median(absolute), absolute.mean())
+
+
+def rolling_robust_zscores(values, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Modified z-score of every point against the median / MAD of the `window`
+    points before it, so level shifts and trends do not mask later spikes.
+    Returns (z, baseline median); both are NaN for the first `window` points.
+    """
+    x = np.asarray(values, dtype=float)
+    z = np.full(x.shape, np.nan)
+    baseline = np.full(x.shape, np.nan)
+    if len(x) <= window:
+        return z, baseline
+
+    windows = sliding_window_view(x[:-1], window)   # windows[i] is the history of x[i + window]
+    for start in range(0, len(windows), BLOCK_ROWS):
+        block = windows[start:start + BLOCK_ROWS]
+        median = np.median(block, axis=1)
+        absolute = np.abs(block - median[:, None])
+        target = slice(window + start, window + start + len(block))
+        baseline[target] = median
+        z[target] = _modified_z(x[target] - median, np.median(absolute, axis=1), absolute.mean(axis=1))
+    return z, baseline
+
+
+def find_anomalies(
+    values,
+    window: Optional[int] = None,
+    threshold: float = ANOMALY_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Points whose modified z-score exceeds threshold (rolling when window is given)."""
+    x = np.asarray(values, dtype=float)
+    if window:
+        z, baseline = rolling_robust_zscores(x, window)
+    else:
+        z = robust_zscores(x)
+        baseline = np.full(x.shape, np.median(x))
+    hits = np.flatnonzero(np.abs(np.nan_to_num(z)) > threshold)
+    return [
+        {
+            "index": int(i),
+            "value": float(x[i]),
+            "z_score": round(float(z[i]), 2),
+            "expected": float(baseline[i]),
+            "direction": "spike" if z[i] > 0 else "drop",
+        }
+        for i in hits
+    ]
+
+
+# ─── Experiments ─────────────────────────────────────────────────────────────
+
+def two_proportion_ztest(
+    control_conversions, control_visitors,
+    variant_conversions, variant_visitors,
+    alpha: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Two-sided z-test for a difference in conversion rates (pooled standard
+    error), plus a Wald interval for variant - control (unpooled).
+    """
+    c_conv, c_n, v_conv, v_n = (np.asarray(a, dtype=float) for a in
+                                (control_conversions, control_visitors, variant_conversions, variant_visitors))
+    c_rate, v_rate = c_conv / c_n, v_conv / v_n
+    diff = v_rate - c_rate
+    pooled = (c_conv + v_conv) / (c_n + v_n)
+    se_pooled = np.sqrt(pooled * (1 - pooled) * (1 / c_n + 1 / v_n))
+    se_diff = np.sqrt(c_rate * (1 - c_rate) / c_n + v_rate * (1 - v_rate) / v_n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(se_pooled > 0, diff / se_pooled, 0.0)
+        lift = np.where(c_rate > 0, diff / c_rate, 0.0)
+    p_value = 2 * np.asarray(normal_sf(np.abs(z)))
+    margin = NormalDist().inv_cdf(1 - alpha / 2) * se_diff
+    return {
+        "control_rate": _out(c_rate),
+        "variant_rate": _out(v_rate),
+        "difference": _out(diff),
+        "lift": _out(lift),
+        "z_score": _out(z),
+        "p_value": _out(p_value),
+        "ci_low": _out(diff - margin),
+        "ci_high": _out(diff + margin),
+        "significant": _out(p_value < alpha),
+    }
+
+
+def sequential_test(
+    control_conversions, control_visitors,
+    variant_conversions, variant_visitors,
+    alpha: float = 0.05,
+    mixing_sd: float = DEFAULT_MIXING_SD,
+) -> Dict[str, Any]:
+    """
+    Always-valid test over cumulative looks (last axis), using the mixture
+    sequential probability ratio test with a normal prior of sd `mixing_sd`
+    on the rate difference (Johari et al., "Always Valid Inference").
+
+    The returned p-values may be checked after every look; stopping at the
+    first look below alpha keeps the false-positive rate at alpha.
+    """
+    c_conv, c_n, v_conv, v_n = (np.asarray(a, dtype=float) for a in
+                                (control_conversions, control_visitors, variant_conversions, variant_visitors))
+    c_rate, v_rate = c_conv / np.maximum(c_n, 1), v_conv / np.maximum(v_n, 1)
+    theta = v_rate - c_rate
+    variance = c_rate * (1 - c_rate) / np.maximum(c_n, 1) + v_rate * (1 - v_rate) / np.maximum(v_n, 1)
+    tau2 = mixing_sd ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ratio = 0.5 * np.log(variance / (variance + tau2)) \
+            + theta ** 2 * tau2 / (2 * variance * (variance + tau2))
+    log_ratio = np.where(variance > 0, log_ratio, 0.0)
+    p_values = np.minimum.accumulate(np.minimum(1.0, np.exp(-log_ratio)), axis=-1)
+
+    crossed = p_values < alpha
+    significant = crossed.any(axis=-1)
+    stopped_at = np.where(significant, crossed.argmax(axis=-1), -1)
+    return {
+        "p_values": p_values,
+        "p_value": _out(p_values[..., -1]),
+        "significant": _out(significant),
+        "stopped_at": _out(stopped_at),   # first look below alpha, -1 if none
+        "looks": int(p_values.shape[-1]),
+    }
+
+
+def bootstrap_lift_ci(
+    control_conversions: int, control_visitors: int,
+    variant_conversions: int, variant_visitors: int,
+    confidence: float = 0.95,
+    n_resamples: int = 10000,
+    seed: Optional[int] = None,
+) -> Dict[str, float]:
+    """Percentile interval for relative lift, resampling both arms' conversion counts."""
+    rng = np.random.default_rng(seed)
+    c_rate = rng.binomial(control_visitors, control_conversions / control_visitors, n_resamples) / control_visitors
+    v_rate = rng.binomial(variant_visitors, variant_conversions / variant_visitors, n_resamples) / variant_visitors
+    valid = c_rate > 0
+    lift = (v_rate[valid] - c_rate[valid]) / c_rate[valid]
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(lift, [tail, 100 - tail]) if lift.size else (0.0, 0.0)
+    return {"ci_low": float(low), "ci_high": float(high)}
+
+
+def bootstrap_ci(
+    samples,
+    statistic: Callable[..., np.ndarray] = np.mean,
+    confidence: float = 0.95,
+    n_resamples: int = 10000,
+    seed: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Percentile bootstrap interval of statistic (a NumPy reduction taking
+    axis=) over samples, resampled in blocks to bound memory.
+    """
+    x = np.asarray(samples, dtype=float)
+    rng = np.random.default_rng(seed)
+    estimates = np.empty(n_resamples)
+    rows = max(1, BOOTSTRAP_BLOCK_ELEMENTS // max(len(x), 1))
+    for start in range(0, n_resamples, rows):
+        count = min(rows, n_resamples - start)
+        estimates[start:start + count] = statistic(x[rng.integers(0, len(x), size=(count, len(x)))], axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return {"estimate": float(statistic(x)), "ci_low": float(low), "ci_high": float(high)}
@@ -0,0 +1,537 @@
+"""
+Stripe Revenue Engine
+Incremental, event-driven revenue metrics (MRR, customers, monthly revenue).
+
+Instead of re-paging every subscription, customer and charge on each sync,
+per-startup aggregates are materialized in Postgres and advanced by Stripe
+events, which arrive from:
+  - the /webhooks/stripe endpoint (real time), and
+  - an /events cursor backfill run by the integration sync (catches anything
+    the webhook missed).
+
+Both paths go through apply_events(); the event log makes them idempotent,
+and the state row is locked while a batch is folded in, so concurrent
+deliveries for the same startup serialize instead of losing updates.
+Webhook events are routed to the one startup that owns them (resolve_startup).
+A full recompute from the list endpoints only happens on demand (first
+connect, expired cursor, or an explicit rebuild).
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import httpx
+import structlog
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.integrations.base import IntegrationCredentials
+from app.integrations.stripe import REVENUE_EVENT_TYPES, StripeCursorExpired, StripeIntegration
+from app.models.integration import Integration, IntegrationProvider
+from app.models.revenue import (
+    RevenueMonthlyBucket,
+    StripeCustomerRecord,
+    StripeEventLog,
+    StripeRevenueState,
+    StripeSubscriptionRecord,
+)
+
+logger = structlog.get_logger()
+
+TOTAL_FIELDS = ("mrr_cents", "active_subscriptions", "trialing_subscriptions", "customers_total")
+REBUILD_CHARGE_MONTHS = 12
+
+
+def _from_ts(value: Optional[int]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value else None
+
+
+def _month_of(ts: Optional[int]) -> str:
+    return (_from_ts(ts) or datetime.utcnow()).strftime("%Y-%m")
+
+
+class RevenueLedger:
+    """
+    Pure fold of Stripe objects/events onto revenue state.
+    Holds the running totals plus only the subscription, customer and month
+    rows touched by the current batch, so it can be replayed from recorded
+    fixtures without a database.
+    """
+
+    def __init__(
+        self,
+        totals: Optional[Dict[str, int]] = None,
+        subscriptions: Optional[Dict[str, Dict[str, Any]]] = None,
+        customers: Optional[Dict[str, Dict[str, Any]]] = None,
+        buckets: Optional[Dict[str, Dict[str, int]]] = None,
+    ):
+        self.totals = {field: 0 for field in TOTAL_FIELDS}
+        self.totals.update(totals or {})
+        self.subscriptions = subscriptions if subscriptions is not None else {}
+        self.customers = customers if customers is not None else {}
+        self.buckets = buckets if buckets is not None else {}
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        event_type = event.get("type", "")
+        obj = event.get("data", {}).get("object", {})
+        created = event.get("created", 0)
+
+        if event_type.startswith("customer.subscription."):
+            self.apply_subscription(obj, created, deleted=event_type == "customer.subscription.deleted")
+        elif event_type == "customer.created":
+            self.apply_customer(obj)
+        elif event_type == "customer.deleted":
+            self.apply_customer(obj, deleted=True)
+        elif event_type == "charge.succeeded":
+            self.apply_charge(obj)
+        elif event_type == "charge.refunded":
+            previous = event.get("data", {}).get("previous_attributes", {}) or {}
+            self.apply_refund(obj, previous.get("amount_refunded", 0))
+
+    # ─── Subscriptions ───────────────────────────────────────────────────────
+
+    def apply_subscription(self, sub: Dict[str, Any], event_created: int = 0, deleted: bool = False) -> None:
+        sub_id = sub.get("id")
+        previous = self.subscriptions.get(sub_id)
+        if previous and event_created and previous.get("last_event_created", 0) > event_created:
+            return  # Out-of-order delivery; a newer state is already applied
+
+        status = "canceled" if deleted else sub.get("status", "active")
+        current = {
+            "status": status,
+            "customer_id": sub.get("customer"),
+            "mrr_cents": StripeIntegration.subscription_mrr_cents(sub),
+            "canceled_at": _from_ts(sub.get("ended_at") or sub.get("canceled_at") or event_created)
+            if status == "canceled" else None,
+            "last_event_created": event_created,
+        }
+        self._count_subscription(previous, -1)
+        self._count_subscription(current, +1)
+        self.subscriptions[sub_id] = current
+
+    def _count_subscription(self, sub: Optional[Dict[str, Any]], sign: int) -> None:
+        if not sub:
+            return
+        if sub["status"] == "active":
+            self.totals["mrr_cents"] += sign * sub["mrr_cents"]
+            self.totals["active_subscriptions"] += sign
+        elif sub["status"] == "trialing":
+            self.totals["trialing_subscriptions"] += sign
+
+    # ─── Customers ───────────────────────────────────────────────────────────
+
+    def apply_customer(self, customer: Dict[str, Any], deleted: bool = False) -> None:
+        customer_id = customer.get("id")
+        known = self.customers.get(customer_id)
+
+        if deleted:
+            if known and not known["deleted"]:
+                self.totals["customers_total"] -= 1
+            self.customers[customer_id] = {
+                "created_at": (known or {}).get("created_at") or _from_ts(customer.get("created")),
+                "deleted": True,
+            }
+        elif known is None:
+            self.customers[customer_id] = {"created_at": _from_ts(customer.get("created")), "deleted": False}
+            self.totals["customers_total"] += 1
+
+    # ─── Charges ─────────────────────────────────────────────────────────────
+
+    def _bucket(self, charge: Dict[str, Any]) -> Dict[str, int]:
+        month = _month_of(charge.get("created"))
+        return self.buckets.setdefault(month, {"gross_cents": 0, "refunded_cents": 0, "charge_count": 0})
+
+    def apply_charge(self, charge: Dict[str, Any]) -> None:
+        if charge.get("status") != "succeeded":
+            return
+        bucket = self._bucket(charge)
+        bucket["gross_cents"] += charge.get("amount", 0)
+        bucket["charge_count"] += 1
+
+    def apply_refund(self, charge: Dict[str, Any], previously_refunded: int = 0) -> None:
+        # amount_refunded is cumulative; only the delta since the previous event is new
+        delta = charge.get("amount_refunded", 0) - (previously_refunded or 0)
+        if delta > 0:
+            self._bucket(charge)["refunded_cents"] += delta
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        subscriptions: Iterable[Dict[str, Any]],
+        customers: Iterable[Dict[str, Any]],
+        charges: Iterable[Dict[str, Any]],
+    ) -> "RevenueLedger":
+        """Build state from scratch out of list-endpoint objects (full rebuild)."""
+        ledger = cls()
+        for sub in subscriptions:
+            ledger.apply_subscription(sub, deleted=sub.get("status") == "canceled")
+        for customer in customers:
+            ledger.apply_customer(customer)
+        for charge in charges:
+            ledger.apply_charge(charge)
+            ledger.apply_refund(charge)
+        return ledger
+
+
+class StripeRevenueEngine:
+    """Maintains materialized Stripe revenue state per startup."""
+
+    MAX_EVENTS_PER_SYNC = 1000
+
+    def _client(self, integration: Integration, http_client: Optional[httpx.AsyncClient] = None) -> StripeIntegration:
+        credentials = IntegrationCredentials(api_key=integration.api_key, access_token=integration.access_token)
+        client = StripeIntegration(credentials, config=integration.config)
+        if http_client is not None:
+            client.use_shared_http_client(http_client)
+        return client
+
+    # ─── Sync ────────────────────────────────────────────────────────────────
+
+    async def sync(
+        self,
+        db: AsyncSession,
+        integration: Integration,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> Dict[str, Any]:
+        """
+        Advance a startup's revenue state from its /events cursor.
+        Cost scales with the number of new events, not with account size.
+        """
+        client = self._client(integration, http_client)
+        state = await db.get(StripeRevenueState, integration.startup_id)
+        if state is None or not state.event_cursor:
+            # No state yet, or the account had no events at rebuild time: there is
+            # no cursor to page from, and jumping to the newest event would skip
+            # everything since the rebuild. Such accounts are small; rebuild again.
+            try:
+                return await self.rebuild(db, integration, client=client)
+            finally:
+                await client.close()
+
+        try:
+            try:
+                events = await client.list_events_since(state.event_cursor, max_events=self.MAX_EVENTS_PER_SYNC)
+            except StripeCursorExpired:
+                logger.warning("Stripe event cursor expired, rebuilding", startup_id=str(integration.startup_id))
+                return await self.rebuild(db, integration, client=client)
+        finally:
+            await client.close()
+
+        applied = await self.apply_events(db, integration.startup_id, events)
+        if events:
+            state.event_cursor = events[-1]["id"]
+            state.last_event_at = _from_ts(events[-1].get("created"))
+        return {"mode": "incremental", "events": len(events), "applied": applied}
+
+    async def rebuild(
+        self,
+        db: AsyncSession,
+        integration: Integration,
+        client: Optional[StripeIntegration] = None,
+    ) -> Dict[str, Any]:
+        """Recompute a startup's revenue state from the Stripe list endpoints (on demand only)."""
+        startup_id = integration.startup_id
+        owns_client = client is None
+        client = client or self._client(integration)
+        try:
+            # Take the cursor first so events landing mid-rebuild are replayed, not lost.
+            # Charges are cut off at the cursor; later ones arrive as charge.succeeded.
+            latest = await client.latest_event()
+            cursor = latest["id"] if latest else None
+            try:
+                account_id = await client.account_id()
+            except Exception as e:
+                logger.warning("Stripe account lookup failed", startup_id=str(startup_id), error=str(e))
+                account_id = None
+            until = latest["created"] if latest else int(datetime.utcnow().timestamp())
+            since = int((datetime.utcnow() - timedelta(days=31 * REBUILD_CHARGE_MONTHS)).timestamp())
+            subscriptions = await client.list_all("/subscriptions", {"status": "all"})
+            customers = await client.list_all("/customers")
+            charges = await client.list_all("/charges", {"created[gte]": since, "created[lte]": until})
+        finally:
+            if owns_client:
+                await client.close()
+
+        ledger = RevenueLedger.from_snapshot(subscriptions, customers, charges)
+
+        # The event log goes too: the rebuilt state must not dedupe against ids it never folded in
+        for model in (StripeSubscriptionRecord, StripeCustomerRecord, RevenueMonthlyBucket, StripeEventLog):
+            await db.execute(delete(model).where(model.startup_id == startup_id))
+
+        state = await self._locked_state(db, startup_id)
+        if state is None:
+            state = StripeRevenueState(startup_id=startup_id)
+            db.add(state)
+        state.integration_id = integration.id
+        if account_id and (integration.config or {}).get("account_id") != account_id:
+            # The integration may be detached (scheduled syncs load it elsewhere): write through db
+            integration.config = {**(integration.config or {}), "account_id": account_id}
+            await db.execute(
+                update(Integration).where(Integration.id == integration.id).values(config=integration.config)
+            )
+        state.event_cursor = cursor
+        state.last_rebuilt_at = datetime.utcnow()
+
+        self._write_back(db, startup_id, state, ledger, {}, {}, {})
+        await db.flush()
+
+        logger.info(
+            "Stripe revenue rebuilt",
+            startup_id=str(startup_id),
+            subscriptions=len(subscriptions),
+            customers=len(customers),
+            charges=len(charges),
+        )
+        return {
+            "mode": "rebuild",
+            "subscriptions": len(subscriptions),
+            "customers": len(customers),
+            "charges": len(charges),
+        }
+
+    # ─── Event Application ───────────────────────────────────────────────────
+
+    async def resolve_startup(self, db: AsyncSession, event: Dict[str, Any]) -> Optional[UUID]:
+        """
+        The startup whose Stripe account emitted a webhook event: the one whose
+        integration recorded the event's Connect `account`, else the one that
+        owns the event's customer. None when no single owner is found; the
+        per-integration /events backfill still picks the event up.
+        """
+        if event.get("account"):
+            query = select(Integration.startup_id).where(
+                Integration.provider == IntegrationProvider.STRIPE,
+                Integration.config["account_id"].astext == event["account"],
+            )
+        else:
+            obj = event.get("data", {}).get("object", {}) or {}
+            customer_id = obj.get("id") if obj.get("object") == "customer" else obj.get("customer")
+            if not customer_id:
+                return None
+            query = select(StripeCustomerRecord.startup_id).where(StripeCustomerRecord.customer_id == customer_id)
+
+        owners = set((await db.execute(query)).scalars().all())
+        if len(owners) > 1:
+            logger.warning("Stripe event matches several startups, not routed", event_id=event.get("id"))
+        return owners.pop() if len(owners) == 1 else None
+
+    async def _locked_state(self, db: AsyncSession, startup_id: UUID) -> Optional[StripeRevenueState]:
+        """Load the state row FOR UPDATE, refreshing any copy already in the session."""
+        result = await db.execute(
+            select(StripeRevenueState)
+            .where(StripeRevenueState.startup_id == startup_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def apply_event(self, db: AsyncSession, startup_id: UUID, event: Dict[str, Any]) -> int:
+        """Apply a single webhook event. No-op until the first sync has built state."""
+        return await self.apply_events(db, startup_id, [event])
+
+    async def apply_events(
+        self,
+        db: AsyncSession,
+        startup_id: UUID,
+        events: List[Dict[str, Any]],
+    ) -> int:
+        """Fold a batch of events into the materialized state. Returns how many were new."""
+        events = [e for e in events if e.get("type") in REVENUE_EVENT_TYPES]
+        if not events:
+            return 0
+
+        # Row lock: concurrent deliveries for this startup wait here instead of
+        # folding into the same stale totals
+        state = await self._locked_state(db, startup_id)
+        if state is None:
+            return 0
+
+        seen = set((await db.execute(
+            select(StripeEventLog.event_id).where(
+                StripeEventLog.startup_id == startup_id,
+                StripeEventLog.event_id.in_([e["id"] for e in events]),
+            )
+        )).scalars().all())
+        fresh = [e for e in events if e["id"] not in seen]
+        if not fresh:
+            return 0
+
+        sub_rows, customer_rows, bucket_rows = await self._load_touched(db, startup_id, fresh)
+        ledger = RevenueLedger(
+            totals={field: getattr(state, field) or 0 for field in TOTAL_FIELDS},
+            subscriptions={
+                sid: {
+                    "status": row.status,
+                    "customer_id": row.customer_id,
+                    "mrr_cents": row.mrr_cents,
+                    "canceled_at": row.canceled_at,
+                    "last_event_created": row.last_event_created or 0,
+                }
+                for sid, row in sub_rows.items()
+            },
+            customers={cid: {"created_at": row.created_at, "deleted": row.deleted} for cid, row in customer_rows.items()},
+            buckets={
+                month: {"gross_cents": row.gross_cents, "refunded_cents": row.refunded_cents, "charge_count": row.charge_count}
+                for month, row in bucket_rows.items()
+            },
+        )
+
+        for event in sorted(fresh, key=lambda e: e.get("created", 0)):
+            ledger.apply(event)
+            db.add(StripeEventLog(startup_id=startup_id, event_id=event["id"], event_type=event["type"]))
+
+        self._write_back(db, startup_id, state, ledger, sub_rows, customer_rows, bucket_rows)
+        await db.flush()
+        return len(fresh)
+
+    async def _load_touched(
+        self, db: AsyncSession, startup_id: UUID, events: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Load only the rows the batch can change."""
+        sub_ids, customer_ids, months = set(), set(), set()
+        for event in events:
+            obj = event.get("data", {}).get("object", {})
+            if event["type"].startswith("customer.subscription."):
+                sub_ids.add(obj.get("id"))
+            elif event["type"].startswith("customer."):
+                customer_ids.add(obj.get("id"))
+            else:
+                months.add(_month_of(obj.get("created")))
+
+        sub_rows, customer_rows, bucket_rows = {}, {}, {}
+        if sub_ids:
+            result = await db.execute(select(StripeSubscriptionRecord).where(
+                StripeSubscriptionRecord.startup_id == startup_id,
+                StripeSubscriptionRecord.subscription_id.in_(sub_ids),
+            ))
+            sub_rows = {row.subscription_id: row for row in result.scalars().all()}
+        if customer_ids:
+            result = await db.execute(select(StripeCustomerRecord).where(
+                StripeCustomerRecord.startup_id == startup_id,
+                StripeCustomerRecord.customer_id.in_(customer_ids),
+            ))
+            customer_rows = {row.customer_id: row for row in result.scalars().all()}
+        if months:
+            result = await db.execute(select(RevenueMonthlyBucket).where(
+                RevenueMonthlyBucket.startup_id == startup_id,
+                RevenueMonthlyBucket.month.in_(months),
+            ))
+            bucket_rows = {row.month: row for row in result.scalars().all()}
+        return sub_rows, customer_rows, bucket_rows
+
+    def _write_back(
+        self,
+        db: AsyncSession,
+        startup_id: UUID,
+        state: StripeRevenueState,
+        ledger: RevenueLedger,
+        sub_rows: Dict[str, StripeSubscriptionRecord],
+        customer_rows: Dict[str, StripeCustomerRecord],
+        bucket_rows: Dict[str, RevenueMonthlyBucket],
+    ) -> None:
+        for field in TOTAL_FIELDS:
+            setattr(state, field, ledger.totals[field])
+
+        for sub_id, values in ledger.subscriptions.items():
+            row = sub_rows.get(sub_id)
+            if row is None:
+                row = StripeSubscriptionRecord(startup_id=startup_id, subscription_id=sub_id)
+                db.add(row)
+            for key, value in values.items():
+                setattr(row, key, value)
+
+        for customer_id, values in ledger.customers.items():
+            row = customer_rows.get(customer_id)
+            if row is None:
+                row = StripeCustomerRecord(startup_id=startup_id, customer_id=customer_id)
+                db.add(row)
+            row.created_at = values["created_at"]
+            row.deleted = values["deleted"]
+
+        for month, values in ledger.buckets.items():
+            row = bucket_rows.get(month)
+            if row is None:
+                row = RevenueMonthlyBucket(startup_id=startup_id, month=month)
+                db.add(row)
+            for key, value in values.items():
+                setattr(row, key, value)
+
+    # ─── Reads ───────────────────────────────────────────────────────────────
+
+    async def get_metrics(self, db: AsyncSession, startup_id: UUID) -> Optional[Dict[str, Any]]:
+        """Materialized metrics in the same shape as StripeIntegration.sync_data()."""
+        state = await db.get(StripeRevenueState, startup_id)
+        if state is None:
+            return None
+
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        new_this_month = (await db.execute(
+            select(func.count()).select_from(StripeCustomerRecord).where(
+                StripeCustomerRecord.startup_id == startup_id,
+                StripeCustomerRecord.deleted.is_(False),
+                StripeCustomerRecord.created_at >= thirty_days_ago,
+            )
+        )).scalar() or 0
+        canceled_this_month = (await db.execute(
+            select(func.count()).select_from(StripeSubscriptionRecord).where(
+                StripeSubscriptionRecord.startup_id == startup_id,
+                StripeSubscriptionRecord.canceled_at >= thirty_days_ago,
+            )
+        )).scalar() or 0
+
+        total_subs = state.active_subscriptions + canceled_this_month
+        churn_rate = round((canceled_this_month / total_subs) * 100, 1) if total_subs > 0 else 0.0
+        mrr = round(state.mrr_cents / 100, 2)
+
+        return {
+            "mrr": mrr,
+            "arr": round(mrr * 12, 2),
+            "customers": {"total": state.customers_total, "new_this_month": new_this_month},
+            "subscriptions": {
+                "active": state.active_subscriptions,
+                "trialing": state.trialing_subscriptions,
+                "canceled_this_month": canceled_this_month,
+                "churn_rate": churn_rate,
+            },
+            "last_event_at": state.last_event_at.isoformat() if state.last_event_at else None,
+            "last_rebuilt_at": state.last_rebuilt_at.isoformat() if state.last_rebuilt_at else None,
+        }
+
+    async def get_revenue_timeline(self, db: AsyncSession, startup_id: UUID, months: int = 12) -> Dict[str, Any]:
+        """Net revenue per calendar month from the materialized buckets."""
+        now = datetime.utcnow()
+        keys = []
+        year, month = now.year, now.month
+        for _ in range(months):
+            keys.append(f"{year:04d}-{month:02d}")
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        keys.reverse()
+
+        result = await db.execute(select(RevenueMonthlyBucket).where(
+            RevenueMonthlyBucket.startup_id == startup_id,
+            RevenueMonthlyBucket.month.in_(keys),
+        ))
+        buckets = {row.month: row for row in result.scalars().all()}
+
+        timeline = []
+        for key in keys:
+            row = buckets.get(key)
+            net = (row.gross_cents - row.refunded_cents) / 100 if row else 0.0
+            timeline.append({"month": key, "revenue": round(net, 2)})
+
+        if len(timeline) >= 2 and timeline[-2]["revenue"] > 0:
+            growth = ((timeline[-1]["revenue"] - timeline[-2]["revenue"]) / timeline[-2]["revenue"]) * 100
+        else:
+            growth = 0.0
+
+        return {
+            "timeline": timeline,
+            "current_month_revenue": timeline[-1]["revenue"] if timeline else 0,
+            "mom_growth_pct": round(growth, 1),
+            "total_revenue": round(sum(m["revenue"] for m in timeline), 2),
+        }
+
+
+# Singleton
+stripe_revenue_engine = StripeRevenueEngine()
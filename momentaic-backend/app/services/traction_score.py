@@ -7,6 +7,7 @@ from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
+import numpy as np
 import structlog
 
 logger = structlog.get_logger()
@@ -44,7 +45,7 @@ class TractionScore:
     product_score: float  # Engagement/retention
     revenue_score: float  # Revenue metrics
     momentum_score: float  # Week-over-week change
-    percentile: float  # Compared to other startups
+    percentile: Optional[float]  # Share of ranked startups scoring lower (None if unknown)
     tier: str  # "rising", "scaling", "rocket"
     breakdown: Dict[str, float]
     verified: bool
@@ -82,7 +83,8 @@ class TractionScoreEngine:
     def calculate_score(
         self,
         metrics: Dict[str, Any],
-        startup_id: str = None
+        startup_id: str = None,
+        percentile: Optional[float] = None,
     ) -> TractionScore:
         """
         Calculate comprehensive traction score
@@ -90,6 +92,7 @@ class TractionScoreEngine:
         Args:
             metrics: Dict of metric values from integrations
             startup_id: Optional startup ID for comparison
+            percentile: Real percentile from the leaderboard, when known
         
         Returns:
             TractionScore with full breakdown
@@ -123,8 +126,8 @@ class TractionScoreEngine:
         # Determine tier
         tier = self._get_tier(overall)
         
-        # Calculate percentile (would compare against DB in production)
-        percentile = min(99, overall + 10)  # Simplified
+        # Percentile is relative to the ranked population, which lives in the
+        # leaderboard (see LeaderboardService.percentile_for_score)
         
         return TractionScore(
             overall_score=round(overall, 1),
@@ -132,13 +135,99 @@ class TractionScoreEngine:
             product_score=round(engagement_score, 1),
             revenue_score=round(revenue_score, 1),
             momentum_score=round(momentum_score, 1),
-            percentile=round(percentile, 1),
+            percentile=round(percentile, 1) if percentile is not None else None,
             tier=tier,
             breakdown=breakdown,
             verified=self._is_verified(metrics),
             last_updated=datetime.utcnow()
         )
     
+    # ─── Batch Scoring ───────────────────────────────────────────────────────
+    # (threshold, points) bands mirroring the per-startup scorers below; a value
+    # earns the points of the first threshold it strictly exceeds.
+    BATCH_BANDS = {
+        "mrr": ((100000, 40), (50000, 35), (10000, 30), (5000, 25), (1000, 20), (0, 10)),
+        "mrr_growth": ((30, 30), (20, 25), (10, 20), (5, 15), (0, 10)),
+        "ltv_cac": ((5, 30), (3, 25), (2, 20), (1, 15)),
+        "user_growth": ((50, 40), (30, 35), (20, 30), (10, 25), (0, 15)),
+        "waitlist": ((10000, 30), (5000, 25), (1000, 20), (100, 15)),
+        "social_growth": ((100, 30), (50, 25), (20, 20), (0, 10)),
+        "dau_mau": ((40, 40), (25, 35), (15, 25), (10, 20), (0, 10)),
+        "retention_d30": ((30, 40), (20, 35), (15, 30), (10, 25), (0, 15)),
+        "nps": ((50, 20), (30, 15), (0, 10)),
+        "momentum": ((20, 100), (15, 85), (10, 70), (5, 55), (0, 40)),
+    }
+
+    # Metric -> default when absent, as used by the per-startup scorers
+    BATCH_INPUTS = {
+        "mrr": 0, "mrr_growth": 0, "ltv": 0, "cac": 1,
+        "user_growth": 0, "waitlist": 0, "social_growth": 0,
+        "dau": 0, "mau": 1, "retention_d30": 0, "nps": 0,
+        "mrr_wow": 0, "users_wow": 0, "engagement_wow": 0,
+    }
+
+    @classmethod
+    def _band(cls, values: np.ndarray, name: str) -> np.ndarray:
+        bands = cls.BATCH_BANDS[name]
+        return np.select([values > t for t, _ in bands], [p for _, p in bands], default=0).astype(float)
+
+    def calculate_scores_batch(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_score over many startups.
+
+        Args:
+            columns: metric name -> float array (one entry per startup); absent
+                     metrics fall back to the same defaults as calculate_score
+
+        Returns:
+            Arrays of revenue/growth/engagement/momentum/overall scores, the
+            tier per startup and the true percentile within the batch (share
+            of startups scoring strictly lower).
+        """
+        n = len(next(iter(columns.values()))) if columns else 0
+        col = {
+            name: np.asarray(columns[name], dtype=float) if name in columns else np.full(n, float(default))
+            for name, default in self.BATCH_INPUTS.items()
+        }
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ltv_cac = np.where(col["cac"] > 0, col["ltv"] / col["cac"], 0.0)
+            dau_mau = np.where(col["mau"] > 0, col["dau"] / col["mau"] * 100, 0.0)
+
+        revenue = np.minimum(100, self._band(col["mrr"], "mrr") + self._band(col["mrr_growth"], "mrr_growth")
+                             + self._band(ltv_cac, "ltv_cac"))
+        growth = np.minimum(100, self._band(col["user_growth"], "user_growth") + self._band(col["waitlist"], "waitlist")
+                            + self._band(col["social_growth"], "social_growth"))
+        engagement = np.minimum(100, self._band(dau_mau, "dau_mau") + self._band(col["retention_d30"], "retention_d30")
+                                + self._band(col["nps"], "nps"))
+
+        avg_wow = (col["mrr_wow"] + col["users_wow"] + col["engagement_wow"]) / 3
+        momentum = np.where(
+            avg_wow > 0, self._band(avg_wow, "momentum"),
+            np.where(avg_wow == 0, 30.0, np.maximum(0, 30 + avg_wow * 2)),
+        )
+
+        overall = (
+            revenue * self.SCORE_WEIGHTS["revenue"] +
+            growth * self.SCORE_WEIGHTS["growth"] +
+            engagement * self.SCORE_WEIGHTS["engagement"] +
+            momentum * self.SCORE_WEIGHTS["momentum"]
+        )
+        tiers = np.select(
+            [overall >= threshold for threshold in self.TIERS.values()],
+            list(self.TIERS.keys()), default="ideation",
+        )
+
+        return {
+            "revenue_score": revenue,
+            "growth_score": growth,
+            "engagement_score": engagement,
+            "momentum_score": momentum,
+            "overall_score": overall,
+            "tier": tiers,
+            "percentile": percentile_ranks(overall),
+        }
+
     def _calculate_revenue_score(self, metrics: Dict) -> float:
         """Score based on revenue metrics"""
         score = 0
@@ -400,6 +489,15 @@ class TractionScoreEngine:
 """
 
 
+def percentile_ranks(values: np.ndarray) -> np.ndarray:
+    """Percentile of each value within the array: share of values strictly lower, 0-100."""
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return values
+    below = np.searchsorted(np.sort(values), values, side="left")
+    return below / len(values) * 100
+
+
 # Singleton
 _engine: Optional[TractionScoreEngine] = None
 
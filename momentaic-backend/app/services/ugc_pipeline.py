@@ -2,15 +2,22 @@
 UGC Content Generation Pipeline
 ChatCut-style autonomous content generation: Script → Image → Video → Voice → Assembly.
 Integrates Gemini (scripts), Imagen 3 (images), PiAPI/Kling (video), DashScope/AgentForge (voice).
+Video, image and voice renders run as durable media jobs (see app.services.media_jobs).
 """
 
-from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from datetime import datetime
+import asyncio
+import hashlib
+import json
+import time
 import structlog
 
 from app.core.config import settings
 from app.agents.base import get_llm
-from app.models.character import Character, CharacterPlatform
+from app.models.character import Character
+from app.models.media_job import MediaJobProvider
 
 logger = structlog.get_logger()
 
@@ -80,6 +87,54 @@ FUNNEL_CONTENT_STYLE = {
 }
 
 
+# Platforms that get a video + voiceover render
+VIDEO_PLATFORMS = ("tiktok", "instagram", "youtube_shorts")
+
+# Per-stage result cache (Redis), keyed by character + script hash
+STAGE_CACHE_TTL_SECONDS = 60 * 60 * 24
+_CACHE_MISS = object()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STAGE GRAPH
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class PipelineStage:
+    """One node in the UGC stage graph."""
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+    tool: str = ""
+    action: str = ""
+    cost_usd: float = 0.0
+    enabled: bool = True
+    cacheable: bool = True       # Media-job stages and the script itself are never cached
+
+
+def _stage_cache_key(scope: str, script: str, stage: str) -> str:
+    script_hash = hashlib.sha256(script.encode("utf-8")).hexdigest()[:16]
+    return f"ugc_stage:{scope}:{script_hash}:{stage}"
+
+
+async def _cache_get(key: str) -> Any:
+    try:
+        from app.core.redis_client import redis_client
+        raw = await redis_client.get(key)
+        return json.loads(raw) if raw is not None else _CACHE_MISS
+    except Exception as e:
+        logger.debug("UGC stage cache read failed", key=key, error=str(e))
+        return _CACHE_MISS
+
+
+async def _cache_set(key: str, value: Any) -> None:
+    try:
+        from app.core.redis_client import redis_client
+        await redis_client.set(key, json.dumps(value), ex=STAGE_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.debug("UGC stage cache write failed", key=key, error=str(e))
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # UGC PIPELINE
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -104,64 +159,94 @@ class UGCPipeline:
         """
         Full UGC content generation pipeline.
         Returns content data + pipeline metadata + cost tracking.
+
+        Runs as a stage graph: everything downstream of the script (caption,
+        image, video, voice, virality) starts as soon as the script exists, so
+        end-to-end latency is the longest dependency chain, not the sum.
         """
-        pipeline_steps = []
-        total_cost = 0.0
         start_time = datetime.utcnow()
 
         template = PLATFORM_TEMPLATES.get(platform, PLATFORM_TEMPLATES["tiktok"])
-        funnel_style = FUNNEL_CONTENT_STYLE.get(funnel_stage, FUNNEL_CONTENT_STYLE["awareness"])
-
-        # ── Step 1: Script Generation ──────────────────────────────────────
-        if script_override:
-            script = script_override
-            pipeline_steps.append({"tool": "manual", "action": "script_provided", "cost_usd": 0})
-        else:
-            script = await self._generate_script(character, platform, funnel_stage, template, trend_brief)
-            step_cost = 0.002  # ~2000 tokens
-            total_cost += step_cost
-            pipeline_steps.append({"tool": "gemini", "action": "script_generation", "cost_usd": step_cost})
-
-        # ── Step 2: Caption + Hashtags ─────────────────────────────────────
-        caption_data = await self._generate_caption(character, platform, script, funnel_stage, template)
-        step_cost = 0.001
-        total_cost += step_cost
-        pipeline_steps.append({"tool": "gemini", "action": "caption_generation", "cost_usd": step_cost})
-
-        # ── Step 3: Image Generation (Imagen 3) ───────────────────────────
-        image_url = await self._generate_character_image(character, platform, script)
-        step_cost = 0.06  # Imagen 3 pricing
-        total_cost += step_cost
-        pipeline_steps.append({
-            "tool": "imagen3", "action": "character_image",
-            "cost_usd": step_cost, "output_url": image_url,
-        })
-
-        # ── Step 4: Video Generation (PiAPI Kling) ─────────────────────────
-        video_url = None
-        if platform in ("tiktok", "instagram", "youtube_shorts"):
-            video_url = await self._generate_video(character, script, platform)
-            step_cost = 0.25  # Kling pricing
-            total_cost += step_cost
-            pipeline_steps.append({
-                "tool": "kling", "action": "talking_head_video",
-                "cost_usd": step_cost, "output_url": video_url,
-            })
+        is_video_platform = platform in VIDEO_PLATFORMS
+        cache_scope = f"{character.id}:{platform}:{funnel_stage}"
+
+        async def run_script(_: Dict[str, Any]) -> str:
+            if script_override:
+                return script_override
+            return await self._generate_script(character, platform, funnel_stage, template, trend_brief)
+
+        async def run_caption(done: Dict[str, Any]) -> Dict[str, Any]:
+            return await self._generate_caption(character, platform, done["script"], funnel_stage, template)
+
+        async def run_image(done: Dict[str, Any]) -> Dict[str, Optional[str]]:
+            return await self._tracked_media(
+                character, MediaJobProvider.IMAGEN, "character_image", "thumbnail_url",
+                _stage_cache_key(cache_scope, done["script"], "image"),
+                lambda: self._generate_character_image(character, platform, done["script"]),
+            )
 
-        # ── Step 5: Voice Generation (DashScope TTS) ──────────────────────
-        voice_url = None
-        if platform in ("tiktok", "instagram", "youtube_shorts"):
-            voice_url = await self._generate_voice(character, script)
-            step_cost = 0.01
-            total_cost += step_cost
-            pipeline_steps.append({
-                "tool": "dashscope_tts", "action": "voiceover",
-                "cost_usd": step_cost, "output_url": voice_url,
-            })
+        async def run_video(done: Dict[str, Any]) -> Optional[str]:
+            return await self._generate_video(character, done["script"], platform)
 
-        # ── Step 6: Virality Score ─────────────────────────────────────────
-        virality_score = await self._predict_virality(script, platform, funnel_stage, trend_brief)
+        async def run_voice(done: Dict[str, Any]) -> Dict[str, Optional[str]]:
+            return await self._tracked_media(
+                character, MediaJobProvider.TTS, "voiceover", "voice_url",
+                _stage_cache_key(cache_scope, done["script"], "voice"),
+                lambda: self._generate_voice(character, done["script"]),
+            )
 
+        async def run_virality(done: Dict[str, Any]) -> float:
+            return await self._predict_virality(done["script"], platform, funnel_stage, trend_brief)
+
+        stages = [
+            PipelineStage(
+                "script", run_script, (),
+                tool="manual" if script_override else "gemini",
+                action="script_provided" if script_override else "script_generation",
+                cost_usd=0 if script_override else 0.002,  # ~2000 tokens
+                cacheable=False,
+            ),
+            PipelineStage("caption", run_caption, ("script",), tool="gemini", action="caption_generation", cost_usd=0.001),
+            PipelineStage("image", run_image, ("script",), tool="imagen3", action="character_image", cost_usd=0.06,
+                          cacheable=False),
+            PipelineStage("video", run_video, ("script",), tool="kling", action="talking_head_video", cost_usd=0.25,
+                          enabled=is_video_platform, cacheable=False),
+            PipelineStage("voice", run_voice, ("script",), tool="dashscope_tts", action="voiceover", cost_usd=0.01,
+                          enabled=is_video_platform, cacheable=False),
+            PipelineStage("virality", run_virality, ("script",), tool="gemini", action="virality_prediction"),
+        ]
+
+        outputs, pipeline_steps = await self._run_stage_graph(stages, cache_scope)
+
+        script = outputs["script"]
+        caption_data = outputs.get("caption") or {}
+        virality_score = outputs.get("virality", 50.0)
+
+        # Media stages are durable media jobs; the poller/webhook/tracker fills in the URLs later.
+        # Image and voice reuse a URL already rendered for this script instead of starting a job.
+        media_jobs: Dict[str, str] = {}
+        reused_urls: Dict[str, Optional[str]] = {}
+        for stage in ("image", "voice"):
+            tracked = outputs.get(stage) or {}
+            reused_urls[stage] = tracked.get("url")
+            if tracked.get("job_id"):
+                media_jobs[stage] = tracked["job_id"]
+        if outputs.get("video"):
+            media_jobs["video"] = outputs["video"]
+        image_url, voice_url, video_url = reused_urls["image"], reused_urls["voice"], None
+        pending_media_jobs = list(media_jobs.values())
+        for step in pipeline_steps:
+            stage = step["stage"]
+            if stage in media_jobs:
+                step.update({"job_id": media_jobs[stage], "status": "processing"})
+            elif stage == "video":
+                step["status"] = "failed"
+            elif stage in reused_urls:
+                step["output_url"] = reused_urls[stage]
+                if reused_urls[stage]:
+                    step.update({"cached": True, "cost_usd": 0})
+
+        total_cost = sum(step["cost_usd"] for step in pipeline_steps)
         elapsed_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
 
         return {
@@ -176,6 +261,7 @@ class UGCPipeline:
                 "thumbnail_url": image_url,
                 "platform": platform,
                 "funnel_stage": funnel_stage,
+                "pending_media_jobs": pending_media_jobs,
             },
             "pipeline": {
                 "steps": pipeline_steps,
@@ -187,6 +273,77 @@ class UGCPipeline:
             "virality_score": virality_score,
         }
 
+    # ─── Stage Graph Execution ────────────────────────────────────────────────
+
+    async def _run_stage_graph(
+        self,
+        stages: List[PipelineStage],
+        cache_scope: str,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Run stages concurrently, each one starting as soon as its dependencies
+        have produced output. Stage outputs are cached per (character, script
+        hash) so a re-render with the same script skips finished stages.
+        Returns (outputs by stage name, pipeline step records).
+        """
+        graph_start = time.perf_counter()
+        enabled = {stage.name: stage for stage in stages if stage.enabled}
+        futures: Dict[str, asyncio.Future] = {
+            name: asyncio.get_running_loop().create_future() for name in enabled
+        }
+        outputs: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+
+        async def run(stage: PipelineStage):
+            try:
+                deps = {dep: await futures[dep] for dep in stage.depends_on}
+                outputs.update(deps)
+
+                started = time.perf_counter()
+                cache_key = None
+                if stage.cacheable and "script" in outputs:
+                    cache_key = _stage_cache_key(cache_scope, outputs["script"], stage.name)
+
+                cached = await _cache_get(cache_key) if cache_key else _CACHE_MISS
+                if cached is not _CACHE_MISS:
+                    result, from_cache = cached, True
+                else:
+                    result, from_cache = await stage.run(outputs), False
+                    if cache_key and result is not None:
+                        await _cache_set(cache_key, result)
+
+                timings[stage.name] = {
+                    "started_ms": int((started - graph_start) * 1000),
+                    "duration_ms": int((time.perf_counter() - started) * 1000),
+                    "cached": from_cache,
+                }
+                futures[stage.name].set_result(result)
+            except Exception as e:
+                futures[stage.name].set_exception(e)
+
+        await asyncio.gather(*(run(stage) for stage in enabled.values()))
+
+        # Surface the first hard failure (stages already swallow provider errors)
+        failure = next((fut.exception() for fut in futures.values() if fut.exception()), None)
+        if failure:
+            raise failure
+        outputs.update({name: fut.result() for name, fut in futures.items()})
+
+        steps = []
+        for stage in stages:
+            if stage.name not in timings:
+                continue
+            timing = timings[stage.name]
+            steps.append({
+                "stage": stage.name,
+                "tool": stage.tool,
+                "action": stage.action,
+                "cost_usd": 0 if timing["cached"] else stage.cost_usd,
+                "depends_on": list(stage.depends_on),
+                **timing,
+            })
+        return outputs, steps
+
     # ─── Script Generation ───────────────────────────────────────────────────
 
     async def _generate_script(
@@ -322,6 +479,49 @@ Return ONLY valid JSON."""
             logger.warning("Image generation failed, continuing pipeline", error=str(e))
             return None
 
+    # ─── Tracked Media (Imagen / TTS) ─────────────────────────────────────────
+
+    async def _tracked_media(
+        self,
+        character: Character,
+        provider: MediaJobProvider,
+        job_type: str,
+        field: str,
+        cache_key: str,
+        generate: Callable[[], Awaitable[Optional[str]]],
+    ) -> Dict[str, Optional[str]]:
+        """
+        Run an Imagen / TTS call as a tracked media job (media_job_service.run_tracked).
+        A URL already rendered for this script is reused without a new job; otherwise
+        returns the job id, and the 'character_content' callback fills in `field`.
+        """
+        from app.services.media_jobs import media_job_service
+
+        cached = await _cache_get(cache_key)
+        if cached is not _CACHE_MISS and cached:
+            return {"url": cached}
+
+        async def runner() -> Optional[str]:
+            url = await generate()
+            if url:
+                await _cache_set(cache_key, url)
+            return url
+
+        try:
+            job = await media_job_service.run_tracked(
+                provider,
+                job_type,
+                runner,
+                startup_id=character.startup_id,
+                request_payload={"character_id": str(character.id)},
+                callback="character_content",
+                callback_context={"field": field},
+            )
+            return {"job_id": str(job.id)}
+        except Exception as e:
+            logger.warning("Media job submission failed, continuing pipeline", job_type=job_type, error=str(e))
+            return {}
+
     # ─── Video Generation (PiAPI / Kling) ─────────────────────────────────────
 
     async def _generate_video(
@@ -330,8 +530,15 @@ Return ONLY valid JSON."""
         script: str,
         platform: str,
     ) -> Optional[str]:
-        """Generate talking-head video using PiAPI (Kling AI)."""
-        from app.agents.design_agent import design_agent
+        """
+        Submit a talking-head video job to PiAPI (Kling AI).
+        Returns the media job id; the render completes asynchronously.
+        """
+        from app.services.media_jobs import media_job_service
+
+        if not settings.piapi_api_key:
+            logger.warning("Video generation skipped, PiAPI key missing")
+            return None
 
         style = character.visual_identity.get("style_guide", "modern, aesthetic")
         persona = character.persona or {}
@@ -346,11 +553,14 @@ Return ONLY valid JSON."""
         )
 
         try:
-            url = await design_agent.generate_video(
-                prompt=video_prompt,
-                model="kling",
+            job = await media_job_service.submit_kling(
+                job_type="video_generation",
+                task_input={"prompt": video_prompt, "negative_prompt": "blurry, low quality"},
+                startup_id=character.startup_id,
+                callback="character_content",
+                callback_context={"field": "video_url"},
             )
-            return url
+            return str(job.id) if job else None
         except Exception as e:
             logger.warning("Video generation failed, continuing pipeline", error=str(e))
             return None
@@ -1,16 +1,58 @@
+"""
+War Room Engine
+Debates a strategic escalation between the YC Partner and Elon Musk personas
+and synthesizes a single directive for the founder.
+
+- "independent" mode (default) runs both opening statements concurrently,
+  optionally followed by a concurrent rebuttal round; "sequential" keeps the
+  original flow where Musk answers YC's opening
+- All engines share one ChatOpenAI client (and its connection pool)
+- Conclusions are memoized in Redis per topic + context hash for
+  DEBATE_CACHE_TTL_SECONDS, and concurrent escalations of the same issue in
+  a worker share one debate
+- Per-round latency and token usage in app.core.metrics
+"""
+
+import asyncio
+import hashlib
+import json
+import time
 import uuid
 import structlog
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import BaseModel, Field
 
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
 
 logger = structlog.get_logger(__name__)
 
+DEBATE_MODEL = "gpt-4o"  # Prefer Opus or GPT-4o for complex debates
+DEBATE_CACHE_TTL_SECONDS = 15 * 60
+DEBATE_MODES = ("independent", "sequential")
+
+SYNTHESIS_PROMPT = "You are the ultimate arbiter. Read the debate between the YC Partner and Elon Musk. Extract their core stances and synthesize a final, actionable directive for the founder."
+
+_shared_llm: Optional[ChatOpenAI] = None
+
+
+def get_debate_llm() -> ChatOpenAI:
+    """Process-wide debate client, created on first use."""
+    global _shared_llm
+    if _shared_llm is None:
+        _shared_llm = ChatOpenAI(model=DEBATE_MODEL, temperature=0.7, max_retries=2)
+    return _shared_llm
+
+
+def _usage(message: Any) -> Dict[str, int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+
 # To be implemented: The concrete prompt templates for the two personas
 YC_ADVISOR_PROMPT = """You are a ruthless Y Combinator partner. Your job is to analyze this startup's current situation and force them to dramatically simplify their approach.
 Your core philosophies are:
@@ -41,15 +83,73 @@ class WarRoomEngine:
     """
     Orchestrates a debate between multiple agent personas to synthesize a strategic recommendation.
     """
-    def __init__(self):
-        # Prefer Opus or GPT-4o for complex debates
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0.7)
+    # Debates in flight in this worker, by cache key
+    _in_flight: Dict[str, "asyncio.Future[DebateConclusion]"] = {}
+
+    def __init__(self, llm: Optional[Any] = None):
+        self._llm = llm
+
+    @property
+    def llm(self):
+        return self._llm or get_debate_llm()
     
-    async def trigger_debate(self, escalation_topic: str, context: Dict[str, Any]) -> DebateConclusion:
+    async def trigger_debate(
+        self,
+        escalation_topic: str,
+        context: Dict[str, Any],
+        mode: str = "independent",
+        rebuttal: bool = False,
+    ) -> DebateConclusion:
         """
-        Runs a 2-round debate between YC Partner and Elon Musk.
+        Runs a debate between YC Partner and Elon Musk and synthesizes a
+        conclusion, reusing a recent conclusion for the same topic and context.
         """
-        logger.info(f"Initiating War Room Debate on: {escalation_topic}")
+        if mode not in DEBATE_MODES:
+            raise ValueError(f"Unknown debate mode: {mode}")
+        key = self._cache_key(escalation_topic, context, mode, rebuttal)
+
+        cached = await self._cached(key)
+        if cached is not None:
+            metrics.inc("war_room_cache_total", result="hit")
+            logger.info("War Room Debate reused", topic=escalation_topic)
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            metrics.inc("war_room_cache_total", result="joined")
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # the caller that owned the debate was cancelled
+                return await self.trigger_debate(escalation_topic, context, mode, rebuttal)
+
+        metrics.inc("war_room_cache_total", result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            conclusion = await self._debate(escalation_topic, context, mode, rebuttal)
+            future.set_result(conclusion)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: joiners re-raise it, nobody else has to
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+        try:
+            await redis_client.set(key, conclusion.model_dump_json(), ex=DEBATE_CACHE_TTL_SECONDS)
+        except Exception as e:
+            logger.warning("War Room cache write failed", error=str(e))
+        return conclusion
+
+    async def _debate(self, escalation_topic: str, context: Dict[str, Any], mode: str, rebuttal: bool) -> DebateConclusion:
+        logger.info(f"Initiating War Room Debate on: {escalation_topic}", mode=mode, rebuttal=rebuttal)
+        rounds: Dict[str, Dict[str, Any]] = {}
         
         # Format the battleground context
         battleground_prep = f"Topic: {escalation_topic}\n\nCurrent Context:\n"
@@ -61,31 +161,47 @@ class WarRoomEngine:
             SystemMessage(content=YC_ADVISOR_PROMPT),
             HumanMessage(content=f"Analyze this situation and provide your ruthless recommendation:\n\n{battleground_prep}")
         ]
-        logger.info("WarRoomEngine: Calling YC Advisor LLM...")
-        yc_response = await self.llm.ainvoke(yc_messages)
-        yc_argument = yc_response.content
-        logger.info("WarRoomEngine: YC Advisor responded.", response_preview=yc_argument[:50])
-        
-        # Round 1: Musk takes the floor, but can see YC's argument
-        musk_messages = [
-            SystemMessage(content=MUSK_ENFORCER_PROMPT),
-            HumanMessage(content=f"Analyze this situation:\n\n{battleground_prep}\n\nThe YC Partner argued:\n{yc_argument}\n\nProvide your first-principles counter-argument and recommendation:")
-        ]
-        logger.info("WarRoomEngine: Calling Musk Enforcer LLM...")
-        musk_response = await self.llm.ainvoke(musk_messages)
-        musk_argument = musk_response.content
-        logger.info("WarRoomEngine: Musk Enforcer responded.", response_preview=musk_argument[:50])
+        if mode == "independent":
+            # Opening statements are independent, so both advocates speak at once
+            musk_messages = [
+                SystemMessage(content=MUSK_ENFORCER_PROMPT),
+                HumanMessage(content=f"Analyze this situation and provide your first-principles recommendation:\n\n{battleground_prep}")
+            ]
+            yc_argument, musk_argument = await self._round("opening", rounds, yc_messages, musk_messages)
+        else:
+            (yc_argument,) = await self._round("opening_yc", rounds, yc_messages)
+            # Round 1: Musk takes the floor, but can see YC's argument
+            musk_messages = [
+                SystemMessage(content=MUSK_ENFORCER_PROMPT),
+                HumanMessage(content=f"Analyze this situation:\n\n{battleground_prep}\n\nThe YC Partner argued:\n{yc_argument}\n\nProvide your first-principles counter-argument and recommendation:")
+            ]
+            (musk_argument,) = await self._round("opening_musk", rounds, musk_messages)
+
+        yc_stance, musk_stance = yc_argument, musk_argument
+        if rebuttal:
+            # Round 2: each advocate answers the other's opening, concurrently
+            yc_rebuttal, musk_rebuttal = await self._round(
+                "rebuttal", rounds,
+                yc_messages + [AIMessage(content=yc_argument), HumanMessage(content=f"Elon Musk argued:\n{musk_argument}\n\nRebut his argument and sharpen your recommendation:")],
+                musk_messages + [AIMessage(content=musk_argument), HumanMessage(content=f"The YC Partner argued:\n{yc_argument}\n\nRebut their argument and sharpen your recommendation:")],
+            )
+            yc_stance = f"{yc_argument}\n\nRebuttal:\n{yc_rebuttal}"
+            musk_stance = f"{musk_argument}\n\nRebuttal:\n{musk_rebuttal}"
         
         # Synthesis Round: The Moderator (Base LLM) synthesizes
         synthesis_messages = [
-            SystemMessage(content="You are the ultimate arbiter. Read the debate between the YC Partner and Elon Musk. Extract their core stances and synthesize a final, actionable directive for the founder."),
-            HumanMessage(content=f"Topic:\n{escalation_topic}\n\nYC Partner Stance:\n{yc_argument}\n\nElon Musk Stance:\n{musk_argument}\n\nOutput a JSON object matching the DebateConclusion schema.")
+            SystemMessage(content=SYNTHESIS_PROMPT),
+            HumanMessage(content=f"Topic:\n{escalation_topic}\n\nYC Partner Stance:\n{yc_stance}\n\nElon Musk Stance:\n{musk_stance}\n\nOutput a JSON object matching the DebateConclusion schema.")
         ]
         
-        synth_llm = self.llm.with_structured_output(DebateConclusion)
+        synth_llm = self.llm.with_structured_output(DebateConclusion, include_raw=True)
+        started = time.perf_counter()
         logger.info("WarRoomEngine: Calling Synthesis LLM...")
-        conclusion_raw = await synth_llm.ainvoke(synthesis_messages)
-        logger.info("WarRoomEngine: Synthesis LLM responded successfully.")
+        result = await synth_llm.ainvoke(synthesis_messages)
+        self._record("synthesis", rounds, time.perf_counter() - started, [result.get("raw")])
+        if result.get("parsing_error"):
+            raise ValueError(f"Synthesis output did not match DebateConclusion: {result['parsing_error']}")
+        conclusion_raw = result["parsed"]
         
         # Depending on Langchain version, with_structured_output may return a dict or the BaseModel
         if isinstance(conclusion_raw, dict):
@@ -93,5 +209,38 @@ class WarRoomEngine:
         else:
             conclusion = conclusion_raw
             
-        logger.info("War Room Debate Concluded.", recommendation=conclusion.unified_recommendation)
+        logger.info("War Room Debate Concluded.", recommendation=conclusion.unified_recommendation, rounds=rounds)
         return conclusion
+
+    async def _round(self, name: str, rounds: Dict[str, Dict[str, Any]], *conversations: List[Any]) -> Tuple[str, ...]:
+        """Run one call per conversation concurrently; returns their contents in order."""
+        started = time.perf_counter()
+        logger.info("WarRoomEngine: Round started", round=name, speakers=len(conversations))
+        responses = await asyncio.gather(*(self.llm.ainvoke(messages) for messages in conversations))
+        self._record(name, rounds, time.perf_counter() - started, responses)
+        return tuple(response.content for response in responses)
+
+    @staticmethod
+    def _record(name: str, rounds: Dict[str, Dict[str, Any]], elapsed: float, responses: List[Any]) -> None:
+        input_tokens = sum(_usage(r)["input_tokens"] for r in responses)
+        output_tokens = sum(_usage(r)["output_tokens"] for r in responses)
+        metrics.observe("war_room_round_seconds", elapsed, round=name)
+        metrics.inc("war_room_tokens_total", amount=input_tokens, round=name, kind="input")
+        metrics.inc("war_room_tokens_total", amount=output_tokens, round=name, kind="output")
+        rounds[name] = {"seconds": round(elapsed, 2), "input_tokens": input_tokens, "output_tokens": output_tokens}
+
+    # ─── Memoization ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _cache_key(escalation_topic: str, context: Dict[str, Any], mode: str, rebuttal: bool) -> str:
+        payload = json.dumps([escalation_topic, context, mode, rebuttal], sort_keys=True, default=str)
+        return f"war_room_debate:{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    @staticmethod
+    async def _cached(key: str) -> Optional[DebateConclusion]:
+        try:
+            raw = await redis_client.get(key)
+        except Exception as e:
+            logger.warning("War Room cache unavailable", error=str(e))
+            return None
+        return DebateConclusion.model_validate_json(raw) if raw else None
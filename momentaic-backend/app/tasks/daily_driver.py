@@ -260,12 +260,11 @@ async def send_founder_notifications(startup_id: str, message: str) -> bool:
             lines = message.strip().split('\n')
             subject = lines[0].replace('**', '').strip()  # Use first line as subject
             
-            await notification_service.notify_user(
+            await notification_service.enqueue(
                 user=user,
                 subject=subject,
                 body=message,
-                action_url=f"https://app.momentaic.com/startups/{startup_id}/dashboard",
-                db=db
+                action_url=f"https://app.momentaic.com/startups/{startup_id}/dashboard"
             )
             
             logger.info("Notification sent", user_email=user.email)
@@ -221,38 +221,15 @@ async def execute_notification_node(config: Dict[str, Any], context: Dict[str, A
 def calculate_all_signals() -> Dict[str, Any]:
     """
     Calculate signals for all active startups.
-    Runs daily via Celery Beat.
+    Runs daily via Celery Beat. Scores every startup in one vectorized
+    batch (see app.services.signal_batch) and bulk-inserts the Signal rows.
     """
     logger.info("Starting daily signal calculation")
     
     async def _calculate():
-        from app.core.database import async_session_maker
-        from sqlalchemy import select
-        from app.models.startup import Startup
-        from app.api.v1.endpoints.signals import calculate_signals
+        from app.services.signal_batch import batch_signal_engine
         
-        async with async_session_maker() as db:
-            result = await db.execute(select(Startup))
-            startups = result.scalars().all()
-            
-            calculated = 0
-            errors = 0
-            
-            for startup in startups:
-                try:
-                    await calculate_signals(startup, db)
-                    calculated += 1
-                except Exception as e:
-                    logger.error(
-                        "Signal calculation error",
-                        startup_id=str(startup.id),
-                        error=str(e)
-                    )
-                    errors += 1
-            
-            await db.commit()
-            
-            return {"calculated": calculated, "errors": errors}
+        return await batch_signal_engine.run()
     
     return run_async(_calculate())
 
@@ -0,0 +1,171 @@
+"""
+Dashboard benchmark: queries per request and latency percentiles.
+
+Seeds a throwaway tenant (default 100k leads) into DATABASE_URL, then times
+  - legacy:  the previous sequential endpoint (one COUNT per lead status)
+  - cold:    DashboardReadModel.build (grouped counts, concurrent lanes)
+  - cached:  DashboardReadModel.get with a warm Redis entry
+
+Usage:
+    python scripts/bench_dashboard.py [--leads 100000] [--iterations 50] [--keep]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event, func, insert, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.models.growth import ContentItem, ContentPlatform, ContentStatus, Lead, LeadStatus
+from app.models.startup import Signal, Sprint, Startup
+from app.models.user import User
+from app.models.workflow import LogLevel, Workflow, WorkflowLog, WorkflowRun
+from app.services.dashboard_read_model import dashboard_read_model
+
+STATUSES = list(LeadStatus)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+async def seed(lead_count: int):
+    now = datetime.utcnow()
+    user_id, startup_id = uuid4(), uuid4()
+    async with AsyncSessionLocal() as db:
+        db.add(User(id=user_id, email=f"bench-{user_id}@example.com", hashed_password="x", full_name="Bench"))
+        await db.flush()
+        db.add(Startup(id=startup_id, owner_id=user_id, name="Bench Co", industry="SaaS"))
+        await db.flush()
+
+        for offset in range(0, lead_count, 5000):
+            await db.execute(insert(Lead), [
+                {
+                    "startup_id": startup_id,
+                    "company_name": f"Company {i}",
+                    "contact_name": f"Contact {i}",
+                    "status": STATUSES[i % len(STATUSES)],
+                    "created_at": now - timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + 5000, lead_count))
+            ])
+
+        await db.execute(insert(ContentItem), [
+            {
+                "startup_id": startup_id,
+                "title": f"Post {i}",
+                "platform": ContentPlatform.LINKEDIN,
+                "content_type": "post",
+                "body": "Benchmark content",
+                "status": ContentStatus.SCHEDULED if i % 3 == 0 else ContentStatus.DRAFTING,
+                "updated_at": now - timedelta(hours=i),
+            }
+            for i in range(500)
+        ])
+        workflow = Workflow(startup_id=startup_id, name="Bench Workflow")
+        db.add(workflow)
+        await db.flush()
+        run = WorkflowRun(workflow_id=workflow.id)
+        db.add(run)
+        await db.flush()
+        await db.execute(insert(WorkflowLog), [
+            {"run_id": run.id, "level": LogLevel.SUCCESS, "message": f"Step {i} done", "timestamp": now - timedelta(minutes=i)}
+            for i in range(200)
+        ])
+        await db.commit()
+    return user_id, startup_id
+
+
+async def cleanup(user_id):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.commit()
+
+
+async def legacy_dashboard(startup_id):
+    """The pre-read-model endpoint body: sequential queries on one session."""
+    async with AsyncSessionLocal() as db:
+        (await db.execute(select(Startup).where(Startup.id == startup_id))).scalar_one()
+        await db.execute(
+            select(Signal).where(Signal.startup_id == startup_id).order_by(Signal.calculated_at.desc()).limit(1)
+        )
+        await db.execute(
+            select(Sprint).where(Sprint.startup_id == startup_id, Sprint.status == "active")
+            .order_by(Sprint.created_at.desc()).limit(1)
+        )
+        for status in LeadStatus:
+            await db.execute(
+                select(func.count(Lead.id)).where(Lead.startup_id == startup_id, Lead.status == status)
+            )
+        await db.execute(
+            select(func.count(ContentItem.id))
+            .where(ContentItem.startup_id == startup_id, ContentItem.status == ContentStatus.SCHEDULED)
+        )
+        await db.execute(select(Lead).where(Lead.startup_id == startup_id).order_by(Lead.created_at.desc()).limit(5))
+        await db.execute(
+            select(ContentItem).where(ContentItem.startup_id == startup_id)
+            .order_by(ContentItem.updated_at.desc()).limit(5)
+        )
+        await db.execute(
+            select(WorkflowLog, Workflow.name)
+            .join(WorkflowRun, WorkflowLog.run_id == WorkflowRun.id)
+            .join(Workflow, WorkflowRun.workflow_id == Workflow.id)
+            .where(Workflow.startup_id == startup_id, WorkflowLog.level == LogLevel.SUCCESS)
+            .order_by(WorkflowLog.timestamp.desc()).limit(10)
+        )
+
+
+async def measure(name, fn, iterations, counter):
+    await fn()  # warm-up (pool connections, statement cache)
+    timings, queries = [], []
+    for _ in range(iterations):
+        before = counter.count
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count - before)
+
+    timings.sort()
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(
+        f"{name:<8} queries/request={statistics.mean(queries):>5.1f}  "
+        f"p50={statistics.median(timings):>8.2f}ms  p95={p95:>8.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leads", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded tenant")
+    args = parser.parse_args()
+
+    print(f"Seeding {args.leads} leads...")
+    user_id, startup_id = await seed(args.leads)
+    counter = QueryCounter()
+    try:
+        await measure("legacy", lambda: legacy_dashboard(startup_id), args.iterations, counter)
+        await measure("cold", lambda: dashboard_read_model.build(startup_id), args.iterations, counter)
+        await dashboard_read_model.invalidate(startup_id)
+        await measure("cached", lambda: dashboard_read_model.get(startup_id), args.iterations, counter)
+    finally:
+        if not args.keep:
+            await cleanup(user_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
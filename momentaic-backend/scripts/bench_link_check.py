@@ -0,0 +1,135 @@
+"""
+QA link validation benchmark: serial HEADs vs LinkChecker.
+
+Serves a local Starlette fixture site on two host names (127.0.0.1 and
+localhost) with fast, slow (--slow-ms), broken (404) and HEAD-rejecting (405)
+links, then audits --pages pages of 30 links each, where the nav/footer links
+repeat on every page:
+  - legacy:  the previous _validate_links (fresh client per page, serial HEAD)
+  - cold:    LinkChecker with an empty cache (concurrent, per-host limits)
+  - warm:    the same audit again on the same LinkChecker (cache shared
+             across audits and pages)
+
+Usage:
+    python scripts/bench_link_check.py [--pages 6] [--slow-ms 400]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.services.link_checker import LinkChecker
+
+REQUESTS = {"count": 0}
+
+
+def fixture_site(slow_ms: int) -> Starlette:
+    async def ok(request):
+        REQUESTS["count"] += 1
+        await asyncio.sleep(0.02)
+        return PlainTextResponse("ok")
+
+    async def slow(request):
+        REQUESTS["count"] += 1
+        await asyncio.sleep(slow_ms / 1000)
+        return PlainTextResponse("slow")
+
+    async def broken(request):
+        REQUESTS["count"] += 1
+        return PlainTextResponse("gone", status_code=404)
+
+    async def no_head(request):
+        REQUESTS["count"] += 1
+        if request.method == "HEAD":
+            return PlainTextResponse("", status_code=405)
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[
+        Route("/ok/{n}", ok, methods=["GET", "HEAD"]),
+        Route("/slow/{n}", slow, methods=["GET", "HEAD"]),
+        Route("/broken/{n}", broken, methods=["GET", "HEAD"]),
+        Route("/nohead/{n}", no_head, methods=["GET", "HEAD"]),
+    ])
+
+
+def page_links(base_urls, page: int):
+    """30 links: 12 shared nav/footer links plus 18 page-specific ones."""
+    shared = [f"{base_urls[i % 2]}/ok/nav{i}" for i in range(10)] + [
+        f"{base_urls[0]}/nohead/nav", f"{base_urls[1]}/broken/nav",
+    ]
+    own = []
+    for i in range(18):
+        kind = ("ok", "ok", "ok", "slow", "broken", "nohead")[i % 6]
+        own.append(f"{base_urls[i % 2]}/{kind}/p{page}-{i}")
+    return shared + own
+
+
+async def legacy_validate(links):
+    broken = 0
+    async with httpx.AsyncClient(timeout=5.0, follow_redirects=True) as client:
+        for href in links:
+            try:
+                resp = await client.head(href)
+                broken += resp.status_code >= 400
+            except Exception:
+                broken += 1
+    return broken
+
+
+async def checker_validate(checker, links):
+    statuses = await checker.check_many(links)
+    return sum(statuses[href].broken for href in links)
+
+
+async def timed(label, pages, validate):
+    REQUESTS["count"] = 0
+    started = time.perf_counter()
+    broken = 0
+    for links in pages:
+        broken += await validate(links)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<8}{elapsed:>10.2f}s{REQUESTS['count']:>10}{broken:>8}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--slow-ms", type=int, default=400)
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fixture_site(args.slow_ms), host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_urls = [f"http://127.0.0.1:{port}", f"http://localhost:{port}"]
+    pages = [page_links(base_urls, page) for page in range(args.pages)]
+    print(f"pages={args.pages} links/page=30 slow={args.slow_ms}ms")
+    print(f"{'mode':<8}{'total':>11}{'requests':>10}{'broken':>8}")
+
+    await timed("legacy", pages, legacy_validate)
+    checker = LinkChecker()
+    await timed("cold", pages, lambda links: checker_validate(checker, links))
+    await timed("warm", pages, lambda links: checker_validate(checker, links))
+    await checker.close()
+
+    server.should_exit = True
+    await serving
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+MCP bootstrap benchmark: sequential vs concurrent vs background vs lazy startup.
+
+Spawns dummy stdio MCP servers (scripts/mcp_echo_server.py) with simulated
+boot delays standing in for the lifespan's browser/google (python) and
+postgres/filesystem (npx) servers, and reports for each mode:
+  - blocking:      time the lifespan waits before the worker accepts traffic
+  - first request: blocking time + latency of a first echo call on "browser"
+  - all ready:     until every eagerly started server is ready
+
+Modes:
+  - sequential:  connect_stdio_server one after another (the old lifespan)
+  - concurrent:  register + await start_all()
+  - background:  register + start_all() as a task (what the lifespan does now)
+  - lazy:        register(lazy=True); servers start on first use
+
+Usage:
+    python scripts/bench_mcp_startup.py [--delays 0.3 0.3 1.5 1.5] [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.mcp_client import MCPClientService
+
+ECHO_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_echo_server.py")
+NAMES = ["browser", "google", "postgres", "filesystem"]
+
+
+def _args(delay: float):
+    return [ECHO_SERVER, "--startup-delay", str(delay)]
+
+
+async def run_mode(mode: str, delays):
+    service = MCPClientService()
+    servers = list(zip(NAMES, delays, strict=True))
+    started = time.perf_counter()
+    bootstrap = None
+
+    if mode == "sequential":
+        for name, delay in servers:
+            await service.connect_stdio_server(name, sys.executable, _args(delay))
+    else:
+        for name, delay in servers:
+            service.register_server(name, sys.executable, _args(delay), lazy=(mode == "lazy"))
+        if mode == "concurrent":
+            await service.start_all()
+        elif mode == "background":
+            bootstrap = asyncio.create_task(service.start_all())
+    blocking = time.perf_counter() - started
+
+    await service.call_tool("browser", "echo", {"ping": 1})
+    first_request = time.perf_counter() - started
+
+    if bootstrap is not None:
+        await bootstrap
+    all_ready = time.perf_counter() - started
+
+    await service.cleanup()
+    return blocking, first_request, all_ready
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delays", type=float, nargs=4, default=[0.3, 0.3, 1.5, 1.5],
+                        help="simulated boot seconds for browser, google, postgres, filesystem")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"servers: {dict(zip(NAMES, args.delays, strict=True))}  repeat={args.repeat}")
+    print(f"{'mode':<12}{'blocking':>12}{'first req':>12}{'all ready':>12}")
+    for mode in ("sequential", "concurrent", "background", "lazy"):
+        runs = [await run_mode(mode, args.delays) for _ in range(args.repeat)]
+        blocking, first, ready = (statistics.median(col) for col in zip(*runs, strict=True))
+        ready = "-" if mode == "lazy" else f"{ready:.3f}s"
+        print(f"{mode:<12}{blocking:>11.3f}s{first:>11.3f}s{ready:>12}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
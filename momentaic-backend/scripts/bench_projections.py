@@ -0,0 +1,79 @@
+"""
+FinanceCFOAgent projection benchmark: Python loop vs vectorized Monte Carlo.
+
+Times --paths x --months (default 10k x 60):
+  - legacy:  the same simulation as a per-path, per-month Python loop
+  - engine:  simulate_projections() in one vectorized pass
+  - cached:  project_metrics() on metrics it has already simulated
+and exits non-zero if the engine misses --budget-ms.
+
+Usage:
+    python scripts/bench_projections.py [--paths 10000] [--months 60] [--budget-ms 150]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.projection_engine import project_metrics, simulate_projections
+
+METRICS = {"mrr": 20_000, "burn_rate": 80_000, "cash": 900_000, "growth_rate": 9, "churn_rate": 2.5}
+
+
+def legacy_simulation(paths, months):
+    rng = random.Random(0)
+    runways = []
+    for _ in range(paths):
+        mrr, burn, cash, runway = 20_000.0, 80_000.0, 900_000.0, months + 1
+        for month in range(1, months + 1):
+            mrr *= max(1 + rng.gauss(0.065, 0.0456), 0)
+            burn *= max(1 + rng.gauss(0, 0.05), 0)
+            cash += mrr - burn
+            if cash < 0 and runway > months:
+                runway = month
+        runways.append(runway)
+    return statistics.median(runways)
+
+
+def timed(label, fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    elapsed = statistics.median(runs) * 1000
+    print(f"{label:<8}{elapsed:>12.2f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    print(f"paths={args.paths:,} months={args.months} budget={args.budget_ms:.0f}ms")
+    timed("legacy", lambda: legacy_simulation(args.paths, args.months), 1)
+    engine = timed("engine", lambda: simulate_projections(
+        mrr=20_000, burn=80_000, cash=900_000, growth=0.09, churn=0.025,
+        months=args.months, paths=args.paths, seed=0), args.repeat)
+    project_metrics(METRICS, months=args.months, paths=args.paths)
+    timed("cached", lambda: project_metrics(METRICS, months=args.months, paths=args.paths), args.repeat)
+
+    runway = project_metrics(METRICS, months=args.months, paths=args.paths)["runway"]
+    print(f"runway P10/P50/P90: {runway['p10']} / {runway['p50']} / {runway['p90']} months, "
+          f"P(out of cash) {runway['prob_out_of_cash']:.1%}")
+    if engine > args.budget_ms:
+        print(f"engine over budget ({engine:.1f}ms > {args.budget_ms:.0f}ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Batch signal scoring benchmark: vectorized engine vs the per-startup loop.
+
+Generates synthetic metric snapshots in memory (no database or network) and
+times, at each size:
+  - scalar:  calculate_signal(include_github=False) + TractionScoreEngine.calculate_score per startup
+  - batch:   MetricColumns.from_rows + BatchSignalEngine.score + build_rows
+
+Usage:
+    python scripts/bench_signals.py [--sizes 10000 100000] [--seed 1]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1.endpoints.signals import calculate_signal
+from app.services.signal_batch import BatchSignalEngine, MetricColumns
+from app.services.traction_score import get_traction_engine
+
+
+def synthetic_rows(n: int, rng: random.Random):
+    rows = []
+    for i in range(n):
+        metrics = {
+            "mrr": rng.uniform(0, 150000), "mrr_prev_month": rng.uniform(0, 150000),
+            "dau": rng.randint(0, 5000), "mau": rng.randint(0, 20000), "nps": rng.randint(-100, 100),
+            "runway_months": rng.uniform(0, 30), "burn_rate": rng.uniform(0, 80000),
+            "mrr_growth": rng.uniform(-10, 50), "ltv": rng.uniform(0, 4000), "cac": rng.uniform(1, 800),
+            "retention_d30": rng.uniform(0, 45), "waitlist": rng.randint(0, 15000),
+            "mrr_wow": rng.uniform(-20, 30),
+        } if rng.random() > 0.1 else {}
+        repo = f"org/repo{i}" if rng.random() < 0.4 else None
+        rows.append((uuid4(), f"Startup {i}", repo, metrics))
+    return rows
+
+
+async def scalar_pass(rows):
+    engine = get_traction_engine()
+    for startup_id, name, repo, metrics in rows:
+        startup = SimpleNamespace(id=startup_id, name=name, github_repo=repo, metrics=metrics)
+        await calculate_signal(startup, db=None, include_github=False)
+        engine.calculate_score(metrics)
+
+
+def batch_pass(rows):
+    engine = BatchSignalEngine()
+    timings = {}
+    started = time.perf_counter()
+    columns = MetricColumns.from_rows(rows)
+    timings["columns"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    zeros = np.zeros(len(columns))
+    scores = engine.score(columns, zeros, zeros)
+    timings["score"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    engine.build_rows(columns, scores, zeros, zeros)
+    timings["rows"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - started
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for n in args.sizes:
+        rows = synthetic_rows(n, rng)
+
+        started = time.perf_counter()
+        await scalar_pass(rows)
+        scalar = time.perf_counter() - started
+
+        batch = batch_pass(rows)
+        print(
+            f"n={n:>7}  scalar={scalar * 1000:>9.1f}ms  batch={batch['total'] * 1000:>8.1f}ms "
+            f"(columns {batch['columns'] * 1000:.1f} / score {batch['score'] * 1000:.1f} / "
+            f"rows {batch['rows'] * 1000:.1f})  speedup(score only)={scalar / batch['score']:.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
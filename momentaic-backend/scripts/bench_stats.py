@@ -0,0 +1,91 @@
+"""
+Stats engine micro-benchmarks on long metric series.
+
+Times, on an --n point series (default 1M) with injected spikes:
+  - legacy:   the previous pure-Python mean/std z > 2 loop
+  - robust:   global median/MAD modified z-scores
+  - rolling:  trailing-window (--window) median/MAD z-scores, in blocks
+and, for experiments:
+  - ztest:      --tests two-proportion z-tests in one vectorized call
+  - sequential: mSPRT p-values over --n cumulative looks
+  - bootstrap:  mean CI from 10k resamples of a 10k-point sample
+
+Usage:
+    python scripts/bench_stats.py [--n 1000000] [--window 30] [--tests 1000000] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.services.stats_engine import (
+    bootstrap_ci,
+    find_anomalies,
+    robust_zscores,
+    rolling_robust_zscores,
+    sequential_test,
+    two_proportion_ztest,
+)
+
+
+def legacy_anomalies(values):
+    mean = sum(values) / len(values)
+    std = (sum((x - mean) ** 2 for x in values) / len(values)) ** 0.5
+    return [i for i, v in enumerate(values) if std > 0 and abs((v - mean) / std) > 2]
+
+
+def timed(label, fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        runs.append(time.perf_counter() - started)
+    print(f"{label:<12}{statistics.median(runs) * 1000:>12.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--window", type=int, default=30)
+    parser.add_argument("--tests", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    t = np.arange(args.n)
+    shifts = np.repeat(rng.normal(0, 100, args.n // 100_000 + 1), 100_000)[:args.n]
+    series = 1000 + 0.001 * t + shifts + rng.normal(0, 5, args.n)   # trend + level shifts + noise
+    spikes = rng.choice(args.n, 100, replace=False)
+    series[spikes] += rng.choice([-40, 40], 100)
+    as_list = series.tolist()
+
+    print(f"series n={args.n:,} window={args.window}")
+    legacy = timed("legacy", lambda: legacy_anomalies(as_list), 1)
+    timed("robust", lambda: robust_zscores(series), args.repeat)
+    timed("rolling", lambda: rolling_robust_zscores(series, args.window), args.repeat)
+    found = timed("anomalies", lambda: find_anomalies(series, window=args.window), args.repeat)
+    recalled = len(set(spikes) & {a["index"] for a in found})
+    print(f"spikes found: rolling {recalled}/100 (flagged {len(found)}), "
+          f"legacy {len(set(spikes) & set(legacy))}/100 (flagged {len(legacy)})")
+
+    visitors = rng.integers(1000, 5000, args.tests)
+    c_conv = rng.binomial(visitors, 0.1)
+    v_conv = rng.binomial(visitors, 0.11)
+    print(f"\nexperiments tests={args.tests:,}")
+    timed("ztest", lambda: two_proportion_ztest(c_conv, visitors, v_conv, visitors), args.repeat)
+    looks = np.arange(1, args.n + 1) * 10
+    timed("sequential", lambda: sequential_test(rng.binomial(10, 0.1, args.n).cumsum(), looks,
+                                                rng.binomial(10, 0.1, args.n).cumsum(), looks), args.repeat)
+    sample = rng.normal(0, 1, 10_000)
+    timed("bootstrap", lambda: bootstrap_ci(sample, seed=0), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
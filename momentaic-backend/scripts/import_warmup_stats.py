@@ -0,0 +1,35 @@
+"""
+One-time import of the legacy domain warm-up stats file into Redis.
+
+Run once per environment after deploying the Redis-backed DomainWarmUpScheduler.
+Counts from the file are added to anything already recorded in Redis, and
+the file is renamed to *.imported, so running it a second time is a no-op.
+
+Usage:
+    python scripts/import_warmup_stats.py [--file /app/data/domain_stats.json]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.domain_warmup import LEGACY_STATS_FILE, domain_warmup_service
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=str(LEGACY_STATS_FILE))
+    args = parser.parse_args()
+
+    imported = await domain_warmup_service.import_json_stats(args.file)
+    if imported:
+        print(f"Imported warm-up stats for {imported} domain(s) from {args.file}")
+    else:
+        print(f"Nothing to import from {args.file}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
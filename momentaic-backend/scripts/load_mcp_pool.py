@@ -0,0 +1,76 @@
+"""
+MCP session pool load test.
+
+Drives many concurrent call_tool invocations against the local stub server
+(scripts/mcp_echo_server.py, which handles one request at a time with a fixed
+per-call delay) for several pool sizes, and reports throughput and latency
+percentiles. A pool size of 1 is the old single-session-per-server behaviour.
+
+Usage:
+    python scripts/load_mcp_pool.py [--calls 400] [--concurrency 64] [--call-delay 0.01] [--pools 1 2 4 8]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.metrics import metrics
+from app.services.mcp_client import MCPClientService
+
+ECHO_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_echo_server.py")
+
+
+async def run(pool_size: int, calls: int, concurrency: int, call_delay: float):
+    service = MCPClientService()
+    name = f"echo-{pool_size}"
+    service.register_server(name, sys.executable, [ECHO_SERVER, "--call-delay", str(call_delay)], pool_size=pool_size)
+    await service.start_all()
+    while service.pool_stats()[name]["alive"] < pool_size:
+        await asyncio.sleep(0.05)
+
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with gate:
+            started = time.perf_counter()
+            await service.call_tool(name, "echo", {"i": i})
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+    await service.cleanup()
+
+    latencies.sort()
+    errors = metrics.counter("mcp_tool_calls_total", server=name, tool="echo", outcome="error")
+    return {
+        "rps": calls / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(0.95 * (len(latencies) - 1))],
+        "errors": int(errors),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--call-delay", type=float, default=0.01)
+    parser.add_argument("--pools", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"calls={args.calls} concurrency={args.concurrency} call_delay={args.call_delay}s")
+    print(f"{'pool':<6}{'req/s':>10}{'p50':>10}{'p95':>10}{'errors':>8}")
+    for pool_size in args.pools:
+        r = await run(pool_size, args.calls, args.concurrency, args.call_delay)
+        print(f"{pool_size:<6}{r['rps']:>10.1f}{r['p50'] * 1000:>8.1f}ms{r['p95'] * 1000:>8.1f}ms{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Minimal stdio MCP server used by the MCP benchmarks, load test and tests.
+
+Speaks just enough JSON-RPC (initialize, tools/list, tools/call, ping) to be
+driven by mcp.ClientSession, with no dependency on the mcp server API. Tools:
+  - echo:  returns its arguments as JSON text
+  - crash: exits the process without replying (simulates a dead child)
+
+Usage:
+    python scripts/mcp_echo_server.py [--startup-delay 1.5] [--call-delay 0.05]
+
+--startup-delay simulates a slow boot (e.g. `npx -y` resolving a package)
+before the server reads its first message. --call-delay makes every tool call
+take that long; requests are handled one at a time, like a real stdio server
+doing blocking work.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+TOOLS = [
+    {
+        "name": "echo",
+        "description": "Echo the call arguments back as JSON text",
+        "inputSchema": {"type": "object", "additionalProperties": True},
+    },
+    {
+        "name": "crash",
+        "description": "Exit the server process immediately",
+        "inputSchema": {"type": "object"},
+    },
+]
+
+
+def handle(message, call_delay=0.0):
+    method, params = message.get("method"), message.get("params") or {}
+    if method == "initialize":
+        return {
+            "protocolVersion": params.get("protocolVersion", "2024-11-05"),
+            "capabilities": {"tools": {}},
+            "serverInfo": {"name": "echo", "version": "1.0.0"},
+        }
+    if method == "tools/list":
+        return {"tools": TOOLS}
+    if method == "tools/call":
+        if params.get("name") == "crash":
+            sys.exit(1)
+        time.sleep(call_delay)
+        text = json.dumps(params.get("arguments") or {}, sort_keys=True)
+        return {"content": [{"type": "text", "text": text}], "isError": False}
+    if method == "ping":
+        return {}
+    raise KeyError(method)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--startup-delay", type=float, default=0.0)
+    parser.add_argument("--call-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    time.sleep(args.startup_delay)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        message = json.loads(line)
+        if "id" not in message:
+            continue  # notification (e.g. notifications/initialized)
+        try:
+            reply = {"jsonrpc": "2.0", "id": message["id"], "result": handle(message, args.call_delay)}
+        except KeyError as e:
+            reply = {"jsonrpc": "2.0", "id": message["id"],
+                     "error": {"code": -32601, "message": f"Method not found: {e}"}}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -77,7 +77,7 @@ class SymbiotaskCampaignManager:
         
         for target in targets:
             # 1. Check Domain Warmup Throttle Rate FIRST
-            if not domain_warmup_service.log_dispatch(domain):
+            if not await domain_warmup_service.log_dispatch(domain):
                 logger.warning("algorithmic_throttle_hit", 
                                reason="Daily warmup limit reached or domain health halted.", 
                                dispatched_so_far=dispatched_count)
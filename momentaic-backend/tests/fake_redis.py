@@ -0,0 +1,319 @@
+"""
+In-memory stand-in for the subset of redis.asyncio used by the services.
+
+Strings, hashes and sorted sets with redis semantics (decode_responses=True:
+everything comes back as str), plus pipelines that queue commands and run
+them on execute(). TTLs are recorded but never expire. Lua scripts cannot run
+here: register_script() dispatches to a Python port registered in SCRIPTS.
+"""
+
+import fnmatch
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Lua source -> async python equivalent taking (redis, keys, args)
+SCRIPTS: Dict[str, Callable[..., Awaitable[Any]]] = {}
+
+
+def _bound(value, inclusive_default=True):
+    """Parse a ZSET score bound: "-inf", "+inf", "(1.5" (exclusive) or a number."""
+    if isinstance(value, str):
+        if value in ("-inf", "+inf", "inf"):
+            return float(value), True
+        if value.startswith("("):
+            return float(value[1:]), False
+        return float(value), True
+    return float(value), inclusive_default
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.ttls: Dict[str, float] = {}
+
+    # ─── Keys ────────────────────────────────────────────────────────────────
+
+    async def exists(self, *keys):
+        return sum(1 for k in keys if k in self.data)
+
+    async def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += self.data.pop(key, None) is not None
+            self.ttls.pop(key, None)
+        return removed
+
+    async def expire(self, key, seconds):
+        if key not in self.data:
+            return False
+        self.ttls[key] = seconds.total_seconds() if hasattr(seconds, "total_seconds") else seconds
+        return True
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    # ─── Strings ─────────────────────────────────────────────────────────────
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value)
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    async def incrby(self, key, amount=1):
+        value = int(self.data.get(key, 0)) + amount
+        self.data[key] = str(value)
+        return value
+
+    async def incr(self, key, amount=1):
+        return await self.incrby(key, amount)
+
+    # ─── Hashes ──────────────────────────────────────────────────────────────
+
+    def _hash(self, key) -> Dict[str, str]:
+        return self.data.setdefault(key, {})
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(str(field))
+
+    async def hset(self, key, field=None, value=None, mapping=None):
+        h = self._hash(key)
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(1 for f in items if str(f) not in h)
+        h.update({str(f): str(v) for f, v in items.items()})
+        return added
+
+    async def hsetnx(self, key, field, value):
+        h = self._hash(key)
+        if str(field) in h:
+            return 0
+        h[str(field)] = str(value)
+        return 1
+
+    async def hmget(self, key, fields, *more):
+        fields = list(fields) + list(more) if isinstance(fields, (list, tuple)) else [fields, *more]
+        h = self.data.get(key, {})
+        return [h.get(str(f)) for f in fields]
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def hlen(self, key):
+        return len(self.data.get(key, {}))
+
+    async def hexists(self, key, field):
+        return str(field) in self.data.get(key, {})
+
+    async def hkeys(self, key):
+        return list(self.data.get(key, {}))
+
+    async def hdel(self, key, *fields):
+        h = self.data.get(key, {})
+        return sum(h.pop(str(f), None) is not None for f in fields)
+
+    async def hincrby(self, key, field, amount=1):
+        h = self._hash(key)
+        h[str(field)] = str(int(h.get(str(field), 0)) + amount)
+        return int(h[str(field)])
+
+    # ─── Lists ───────────────────────────────────────────────────────────────
+
+    async def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(str(v) for v in values)
+        return len(items)
+
+    async def lrange(self, key, start, end):
+        return self._slice(self.data.get(key, []), start, end)
+
+    async def ltrim(self, key, start, end):
+        if key in self.data:
+            self.data[key] = self._slice(self.data[key], start, end)
+            if not self.data[key]:
+                del self.data[key]
+        return True
+
+    # ─── Sorted sets ─────────────────────────────────────────────────────────
+
+    def _zset(self, key) -> Dict[str, float]:
+        return self.data.setdefault(key, {})
+
+    def _sorted(self, key, reverse=False) -> List[tuple]:
+        items = self.data.get(key, {}).items()
+        ordered = sorted(items, key=lambda kv: (kv[1], kv[0]))
+        return ordered[::-1] if reverse else ordered
+
+    async def zadd(self, key, mapping, nx=False):
+        z = self._zset(key)
+        added = 0
+        for member, score in mapping.items():
+            if nx and str(member) in z:
+                continue
+            added += str(member) not in z
+            z[str(member)] = float(score)
+        return added
+
+    async def zrem(self, key, *members):
+        z = self.data.get(key, {})
+        removed = sum(z.pop(str(m), None) is not None for m in members)
+        if key in self.data and not z:
+            del self.data[key]
+        return removed
+
+    async def zscore(self, key, member):
+        return self.data.get(key, {}).get(str(member))
+
+    async def zcard(self, key):
+        return len(self.data.get(key, {}))
+
+    async def zrank(self, key, member):
+        members = [m for m, _ in self._sorted(key)]
+        return members.index(str(member)) if str(member) in members else None
+
+    async def zrevrank(self, key, member):
+        members = [m for m, _ in self._sorted(key, reverse=True)]
+        return members.index(str(member)) if str(member) in members else None
+
+    def _in_range(self, score, low, high):
+        (lo, lo_inc), (hi, hi_inc) = _bound(low), _bound(high)
+        return (score > lo or (lo_inc and score == lo)) and (score < hi or (hi_inc and score == hi))
+
+    async def zcount(self, key, low, high):
+        return sum(1 for s in self.data.get(key, {}).values() if self._in_range(s, low, high))
+
+    @staticmethod
+    def _slice(items, start, end):
+        end = len(items) if end == -1 else end + 1
+        return items[start:end]
+
+    async def zrange(self, key, start, end, withscores=False):
+        items = self._slice(self._sorted(key), start, end)
+        return items if withscores else [m for m, _ in items]
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        items = self._slice(self._sorted(key, reverse=True), start, end)
+        return items if withscores else [m for m, _ in items]
+
+    async def zrangebyscore(self, key, low, high, start=None, num=None, withscores=False):
+        items = [(m, s) for m, s in self._sorted(key) if self._in_range(s, low, high)]
+        if start is not None:
+            items = items[start:start + num]
+        return items if withscores else [m for m, _ in items]
+
+    async def zremrangebyscore(self, key, low, high):
+        doomed = [m for m, s in self.data.get(key, {}).items() if self._in_range(s, low, high)]
+        return await self.zrem(key, *doomed) if doomed else 0
+
+    def _combine(self, keys, aggregate):
+        weights = keys if isinstance(keys, dict) else {k: 1 for k in keys}
+        sets = [({m: s * w for m, s in self.data.get(k, {}).items()}) for k, w in weights.items()]
+        return sets
+
+    async def zunionstore(self, dest, keys, aggregate=None):
+        result: Dict[str, float] = {}
+        for z in self._combine(keys, aggregate):
+            for member, score in z.items():
+                result[member] = result.get(member, 0.0) + score
+        self.data[dest] = result
+        return len(result)
+
+    async def zinterstore(self, dest, keys, aggregate=None):
+        sets = self._combine(keys, aggregate)
+        common = set(sets[0]).intersection(*sets[1:]) if sets else set()
+        self.data[dest] = {m: sum(z[m] for z in sets) for m in common}
+        return len(common)
+
+    # ─── Pipelines & scripts ─────────────────────────────────────────────────
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        port = SCRIPTS[script]
+
+        async def run(keys=(), args=()):
+            return await port(self, list(keys), list(args))
+
+        return run
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        commands, self._commands = self._commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+# ─── Script ports ────────────────────────────────────────────────────────────
+
+def _register_delayed_job_scripts():
+    from app.services import delayed_jobs
+
+    async def claim(redis, keys, args):
+        due_key, claimed_key, jobs_key, attempts_key = keys
+        now, limit, lease_until = float(args[0]), int(args[1]), float(args[2])
+        ids = await redis.zrangebyscore(claimed_key, "-inf", now, start=0, num=limit)
+        if len(ids) < limit:
+            due = await redis.zrangebyscore(due_key, "-inf", now, start=0, num=limit - len(ids))
+            for job_id in due:
+                await redis.zrem(due_key, job_id)
+            ids += due
+        out = []
+        for job_id in ids:
+            await redis.zadd(claimed_key, {job_id: lease_until})
+            out += [job_id, await redis.hget(jobs_key, job_id) or "", await redis.hincrby(attempts_key, job_id, 1)]
+        return out
+
+    async def ack(redis, keys, args):
+        claimed_key, jobs_key, attempts_key = keys
+        done = 0
+        for job_id in args:
+            if await redis.zrem(claimed_key, job_id):
+                await redis.hdel(jobs_key, job_id)
+                await redis.hdel(attempts_key, job_id)
+                done += 1
+        return done
+
+    SCRIPTS[delayed_jobs._CLAIM_SCRIPT] = claim
+    SCRIPTS[delayed_jobs._ACK_SCRIPT] = ack
+
+
+def _register_morning_brief_scripts():
+    from app.services import morning_brief
+
+    async def release(redis, keys, args):
+        if await redis.get(keys[0]) == args[0]:
+            return await redis.delete(keys[0])
+        return 0
+
+    SCRIPTS[morning_brief._RELEASE_LOCK_SCRIPT] = release
+
+
+_register_delayed_job_scripts()
+_register_morning_brief_scripts()
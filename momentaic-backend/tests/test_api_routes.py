@@ -50,3 +50,50 @@ def test_rate_limit_headers():
     assert response.status_code == 200
     # Rate limit headers check - TestClient bypasses some networking layers but good to sanity check
 
+
+def test_metrics_endpoint_requires_admin_or_scrape_token(monkeypatch):
+    """Per-tenant operational counters are not public"""
+    url = f"{settings.api_v1_prefix}/metrics"
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers={"Authorization": "Bearer not-a-jwt"}).status_code == 401
+
+    monkeypatch.setattr(settings, "metrics_scrape_token", "scrape-secret")
+    response = client.get(url, headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
+
+
+def test_stripe_webhook_requires_a_signature_and_updates_revenue(monkeypatch):
+    """The one /webhooks/stripe route verifies the signature and feeds the revenue engine"""
+    import hashlib
+    import hmac
+    import json
+    import time
+    from unittest.mock import AsyncMock, MagicMock
+    from uuid import uuid4
+
+    from app.core.database import get_db
+    from app.services.stripe_revenue import stripe_revenue_engine
+
+    url = f"{settings.api_v1_prefix}/webhooks/stripe"
+    monkeypatch.setattr(settings, "stripe_webhook_secret", "whsec_test")
+    monkeypatch.setattr(settings, "stripe_secret_key", "sk_test_123")
+    startup_id = uuid4()
+    monkeypatch.setattr(stripe_revenue_engine, "resolve_startup", AsyncMock(return_value=startup_id))
+    monkeypatch.setattr(stripe_revenue_engine, "apply_event", AsyncMock(return_value=1))
+    db = MagicMock(commit=AsyncMock(), rollback=AsyncMock())
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        payload = json.dumps({"id": "evt_1", "object": "event", "type": "customer.created",
+                              "data": {"object": {"object": "customer", "id": "cus_A"}}})
+        assert client.post(url, content=payload).status_code == 400       # unsigned: no forged MRR
+
+        timestamp = int(time.time())
+        signature = hmac.new(b"whsec_test", f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+        response = client.post(url, content=payload, headers={"Stripe-Signature": f"t={timestamp},v1={signature}"})
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+    assert response.json()["status"] == "accepted"                       # webhooks.stripe_webhook served it
+    assert stripe_revenue_engine.apply_event.await_args.args[1:] == (startup_id, json.loads(payload))
+    db.commit.assert_awaited_once()
@@ -0,0 +1,137 @@
+"""
+Tests for the sketch-backed industry benchmarks
+"""
+
+import json
+import random
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.services import benchmark_service as benchmark_module
+from app.services.benchmark_service import BenchmarkService
+from app.services.quantile_sketch import TDigest
+from tests.fake_redis import FakeRedis
+
+
+def _startup(mrr, industry="SaaS", **extra):
+    return SimpleNamespace(id=uuid4(), industry=industry, metrics={"mrr": mrr, **extra})
+
+
+def _db_returning(startup):
+    db = MagicMock()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = startup
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(benchmark_module, "redis_client", fake):
+        yield fake
+
+
+def test_tdigest_is_exact_for_small_samples_and_close_for_large():
+    small = [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0]
+    digest = TDigest.of(small)
+    for q in (0.5, 0.75, 0.9):
+        assert digest.quantile(q) == pytest.approx(np.percentile(small, q * 100))
+
+    rng = random.Random(7)
+    large = [rng.lognormvariate(8, 1.2) for _ in range(20000)]
+    digest = TDigest.from_dict(json.loads(json.dumps(TDigest.of(large).to_dict())))
+    assert len(digest.means) < 200
+    for q in (0.5, 0.75, 0.9):
+        assert digest.quantile(q) == pytest.approx(np.percentile(large, q * 100), rel=0.02)
+
+
+@pytest.mark.asyncio
+async def test_reads_precomputed_summary_without_scanning_peers(redis):
+    service = BenchmarkService()
+    peers = [_startup(mrr) for mrr in (1000, 2000, 3000, 4000)]
+    for peer in peers:
+        await service.record(peer)
+
+    db = _db_returning(peers[0])
+    result = await service.get_industry_benchmarks(db, str(peers[0].id))
+
+    assert db.execute.await_count == 1  # only the startup lookup
+    assert result["peer_count"] == 3
+    assert result["benchmarks"]["mrr"] == {
+        "median": 2500.0, "top_25": 3250.0, "top_10": 3700.0, "count": 4,
+    }
+
+
+@pytest.mark.asyncio
+async def test_changed_and_removed_values_are_retired(redis):
+    service = BenchmarkService()
+    peers = [_startup(mrr) for mrr in (100, 200, 300, 400)]
+    for peer in peers:
+        await service.record(peer)
+
+    peers[0].metrics = {"mrr": 900}
+    await service.record(peers[0])
+    await service.remove(str(peers[1].id))
+    peers[2].industry = "Fintech"
+    await service.record(peers[2])
+
+    summary = json.loads(await redis.hget("benchmarks:summary:saas", "mrr"))
+    assert summary["count"] == 2
+    assert summary["median"] == pytest.approx(np.percentile([900, 400], 50))
+    assert await redis.hlen("benchmarks:members:saas") == 2
+    assert await redis.hget("benchmarks:industry", str(peers[2].id)) == "fintech"
+
+
+@pytest.mark.asyncio
+async def test_unknown_industry_falls_back_to_exact_scan(redis):
+    service = BenchmarkService()
+    current = _startup(500)
+    peers = [_startup(mrr) for mrr in (100, 200, 300)]
+    db = _db_returning(current)
+    with patch.object(service, "_exact_benchmarks", AsyncMock(return_value={"exact": True})) as exact:
+        assert await service.get_industry_benchmarks(db, str(current.id)) == {"exact": True}
+    exact.assert_awaited_once_with(db, current)
+
+    peers_result = MagicMock()
+    peers_result.scalars.return_value.all.return_value = peers
+    db.execute = AsyncMock(return_value=peers_result)
+    result = await BenchmarkService()._exact_benchmarks(db, current)
+    assert result["peer_count"] == 3
+    assert result["benchmarks"]["mrr"]["median"] == 200.0
+
+
+@pytest.mark.asyncio
+async def test_nightly_recompute_rebuilds_and_reports_drift(redis):
+    service = BenchmarkService()
+    rows = [(uuid4(), "SaaS", {"mrr": mrr}) for mrr in (100, 200, 300, 400, 500)]
+    deleted = _startup(50, industry="Biotech")
+    await service.record(deleted)
+    # A served summary that has drifted from the truth
+    await redis.hset("benchmarks:summary:saas", "mrr", json.dumps(
+        {"median": 330.0, "top_25": 400.0, "top_10": 460.0, "count": 5}
+    ))
+
+    async def partitions(size):
+        yield rows
+
+    stream = MagicMock()
+    stream.partitions = partitions
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.stream = AsyncMock(return_value=stream)
+    with patch.object(benchmark_module, "AsyncSessionLocal", return_value=session):
+        report = await service.recompute_all()
+
+    assert report["industries"] == 1
+    assert report["drifted"] == 1
+    assert report["worst"][0]["stat"] == "median"
+    assert report["worst"][0]["drift"] == pytest.approx(0.1)
+    assert json.loads(await redis.hget("benchmarks:summary:saas", "mrr"))["median"] == 300.0
+    assert not await redis.exists("benchmarks:summary:biotech")
+    assert await redis.hget("benchmarks:industry", str(deleted.id)) is None
+    assert (await service.last_drift_report())["drifted"] == 1
@@ -0,0 +1,121 @@
+"""
+Tests for the cached, generation-invalidated Company DNA document
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.cache_invalidation import CommitInvalidationHooks
+from app.core.metrics import metrics
+from app.models.agent_memory import AgentMemoryEntry, MemoryType
+from app.models.startup import Startup
+from app.services import company_dna as dna_module
+from app.services.company_dna import CompanyDNAService, touched_startups
+from tests.fake_redis import FakeRedis
+
+
+def _db(startup, memories):
+    """AsyncSession stand-in answering the startup query, then the memory query."""
+    startup_result = MagicMock()
+    startup_result.scalar_one_or_none.return_value = startup
+    memory_result = MagicMock()
+    memory_result.scalars.return_value.all.side_effect = lambda: list(memories)
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=lambda statement: (
+        startup_result if "agent_memory_store" not in str(statement) else memory_result
+    ))
+    return db
+
+
+def _loaded_memory(startup_id, **fields):
+    """A memory entry in 'loaded from the database' state (no pending history)."""
+    entry = AgentMemoryEntry()
+    values = {"startup_id": startup_id, "agent_name": "*", "memory_type": MemoryType.strategy,
+              "key": "focus", "value": "Nursing homes first", "importance": 7, "access_count": 0, **fields}
+    for name, value in values.items():
+        set_committed_value(entry, name, value)
+    return entry
+
+
+@pytest.mark.asyncio
+async def test_memory_write_invalidates_cached_dna():
+    metrics.reset()
+    service = CompanyDNAService()
+    startup_id = uuid4()
+    startup = SimpleNamespace(name="Acme", stage=SimpleNamespace(value="mvp"), industry="Care", metrics={"mrr": 100})
+    memories = [_loaded_memory(startup_id)]
+    db = _db(startup, memories)
+
+    hooks = CommitInvalidationHooks("company_dna", touched_startups, service.invalidate)
+    with patch.object(dna_module, "redis_client", FakeRedis()):
+        first = await service.get_dna(db, str(startup_id))
+        assert await service.get_dna(db, str(startup_id)) == first
+        assert db.execute.await_count == 2                     # second read served from Redis
+
+        # update_dna_entry() flushes on the caller's session; the commit bumps the generation
+        session = SimpleNamespace(info={}, dirty=[], deleted=[], new=[AgentMemoryEntry(
+            startup_id=startup_id, agent_name="*", memory_type=MemoryType.warning,
+            key="rival", value="Competitor raised $10M", importance=9,
+        )])
+        memories.append(session.new[0])
+        hooks.after_flush(session, None)
+        hooks.after_commit(session)
+        await asyncio.gather(*hooks._pending_tasks)
+
+        refreshed = await service.get_dna(db, str(startup_id))
+        assert "Competitor raised $10M" in refreshed and "Competitor raised $10M" not in first
+        assert db.execute.await_count == 4
+        assert await service.get_dna(db, str(startup_id)) == refreshed
+
+    assert metrics.counter("company_dna_cache_total", result="hit") == 2
+    assert metrics.counter("company_dna_cache_total", result="miss") == 2
+    assert metrics.counter("company_dna_invalidations_total") == 1
+
+
+def test_only_rendered_global_writes_touch_the_document():
+    startup_id, other_id = uuid4(), uuid4()
+
+    recalled = _loaded_memory(startup_id)
+    recalled.access_count += 1                                 # recall() bookkeeping only
+    agent_scoped = AgentMemoryEntry(startup_id=other_id, agent_name="SalesAgent", key="k", value="v")
+    session = SimpleNamespace(new=[agent_scoped], dirty=[recalled], deleted=[])
+    assert touched_startups(session) == set()
+
+    edited = _loaded_memory(startup_id)
+    edited.value = "Hospitals first"
+    moved = _loaded_memory(other_id)
+    moved.agent_name = "SalesAgent"                            # leaves the global scope
+    renamed = Startup()
+    set_committed_value(renamed, "id", uuid4())
+    set_committed_value(renamed, "name", "Acme")
+    renamed.name = "Acme Health"
+    session = SimpleNamespace(new=[], dirty=[edited, moved, renamed], deleted=[])
+    assert touched_startups(session) == {startup_id, other_id, renamed.id}
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_pending_invalidation_and_redis_outage_rebuilds():
+    service = CompanyDNAService()
+    startup_id = uuid4()
+    session = SimpleNamespace(info={}, dirty=[], deleted=[],
+                              new=[AgentMemoryEntry(startup_id=startup_id, agent_name="*", key="k", value="v")])
+
+    with patch.object(dna_module.invalidation_hooks, "invalidate", new_callable=AsyncMock) as invalidate:
+        dna_module.invalidation_hooks.after_flush(session, None)
+        dna_module.invalidation_hooks.after_rollback(session)
+        dna_module.invalidation_hooks.after_commit(session)
+        await asyncio.sleep(0)
+        invalidate.assert_not_awaited()
+
+    broken = MagicMock()
+    broken.get = AsyncMock(side_effect=ConnectionError("down"))
+    broken.set = AsyncMock(side_effect=ConnectionError("down"))
+    startup = SimpleNamespace(name="Acme", stage=SimpleNamespace(value="mvp"), industry="Care", metrics={})
+    with patch.object(dna_module, "redis_client", broken):
+        assert "# Company DNA — Acme" in await service.get_dna(_db(startup, []), str(startup_id))
+    assert await service.get_dna(MagicMock(), "not-a-uuid") is None
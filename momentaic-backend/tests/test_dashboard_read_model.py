@@ -0,0 +1,139 @@
+"""
+Tests for the cached startup dashboard read model
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.metrics import metrics
+from app.models.growth import ContentItem, ContentStatus, Lead, LeadStatus
+from app.models.workflow import LogLevel, WorkflowLog
+from app.services import dashboard_read_model as read_model_module
+from app.services.dashboard_read_model import DashboardReadModel, touched_startups
+from tests.fake_redis import FakeRedis
+
+
+@pytest.mark.asyncio
+async def test_lead_summary_is_one_grouped_query_with_zero_fill():
+    result = MagicMock()
+    result.all.return_value = [(LeadStatus.NEW, 70_000), (LeadStatus.WON, 12)]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    counts = await DashboardReadModel.lead_counts(db, uuid4())
+
+    db.execute.assert_awaited_once()
+    assert "GROUP BY" in str(db.execute.await_args.args[0])
+    assert counts[LeadStatus.NEW.value] == 70_000
+    assert counts[LeadStatus.WON.value] == 12
+    assert set(counts) == {s.value for s in LeadStatus}
+    assert sum(counts.values()) == 70_012
+
+
+@pytest.mark.asyncio
+async def test_query_lanes_run_concurrently():
+    model = DashboardReadModel()
+    startup = SimpleNamespace(name="Acme", created_at=datetime(2026, 1, 1))
+
+    def slow(value):
+        async def loader(db, startup_id):
+            await asyncio.sleep(0.05)
+            return value
+        return loader
+
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+
+    with patch.object(read_model_module, "AsyncSessionLocal", return_value=session) as session_factory, \
+         patch.object(model, "_load_entities", slow((startup, None, None))), \
+         patch.object(model, "_load_counts", slow(({"new": 1}, 2))), \
+         patch.object(model, "_load_recent_items", slow(([], []))), \
+         patch.object(model, "_load_recent_logs", slow([])), \
+         patch("app.schemas.startup.StartupResponse.model_validate", return_value=MagicMock()), \
+         patch("app.schemas.startup.StartupDashboard") as dashboard_cls:
+        dashboard_cls.return_value.model_dump.return_value = {"content_scheduled": 2}
+        started = time.perf_counter()
+        payload = await model.build(uuid4())
+
+    assert session_factory.call_count == 4  # one session per lane
+    assert time.perf_counter() - started < 0.15  # four 50ms lanes overlap
+    assert payload == {"content_scheduled": 2}
+    assert dashboard_cls.call_args.kwargs["lead_summary"] == {"new": 1}
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_build_and_invalidation_forces_rebuild():
+    metrics.reset()
+    model = DashboardReadModel()
+    startup_id = uuid4()
+    fake_redis = FakeRedis()
+
+    with patch.object(read_model_module, "redis_client", fake_redis), \
+         patch.object(model, "build", new_callable=AsyncMock, side_effect=[{"v": 1}, {"v": 2}]) as build:
+        assert await model.get(startup_id) == {"v": 1}
+        assert await model.get(startup_id) == {"v": 1}
+        assert build.await_count == 1
+
+        await model.invalidate(startup_id)
+        assert await model.get(startup_id) == {"v": 2}
+        assert build.await_count == 2
+
+    assert json.loads(fake_redis.data[f"dashboard:{startup_id}:g1"]) == {"v": 2}
+    assert metrics.counter("dashboard_cache_total", result="hit") == 1
+    assert metrics.counter("dashboard_cache_total", result="miss") == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_falls_back_to_build():
+    model = DashboardReadModel()
+    broken = MagicMock()
+    broken.get = AsyncMock(side_effect=ConnectionError("down"))
+    broken.set = AsyncMock(side_effect=ConnectionError("down"))
+
+    with patch.object(read_model_module, "redis_client", broken), \
+         patch.object(model, "build", new_callable=AsyncMock, return_value={"v": 1}):
+        assert await model.get(uuid4()) == {"v": 1}
+
+
+def test_flush_hook_collects_touched_startups():
+    lead_startup, content_startup, log_startup = uuid4(), uuid4(), uuid4()
+    lead = Lead(startup_id=lead_startup, company_name="A", contact_name="B")
+    content = ContentItem(startup_id=content_startup, title="t", content_type="post", body="b", status=ContentStatus.SCHEDULED)
+    log = WorkflowLog(run_id=uuid4(), level=LogLevel.SUCCESS, message="done")
+    info_log = WorkflowLog(run_id=uuid4(), level=LogLevel.INFO, message="noise")
+
+    session = MagicMock()
+    session.new, session.dirty, session.deleted = [lead, log, info_log], [content], []
+    session.execute.return_value.scalars.return_value = [log_startup]
+
+    assert touched_startups(session) == {lead_startup, content_startup, log_startup}
+    # Only SUCCESS logs appear on the dashboard, so only their run is resolved
+    statement = session.execute.call_args.args[0]
+    assert "workflow_runs" in str(statement)
+
+
+@pytest.mark.asyncio
+async def test_commit_schedules_invalidation_and_rollback_discards_it():
+    startup_id = uuid4()
+    session = SimpleNamespace(info={}, new=[Lead(startup_id=startup_id)], dirty=[], deleted=[])
+
+    hooks = read_model_module.invalidation_hooks
+    with patch.object(hooks, "invalidate", new_callable=AsyncMock) as invalidate:
+        hooks.after_flush(session, None)
+        hooks.after_rollback(session)
+        hooks.after_commit(session)
+        await asyncio.sleep(0)
+        invalidate.assert_not_awaited()
+
+        hooks.after_flush(session, None)
+        hooks.after_commit(session)
+        await asyncio.sleep(0)
+        invalidate.assert_awaited_once_with(startup_id)
@@ -0,0 +1,123 @@
+"""
+Tests for concurrent, cached source fetching and token-budgeted synthesis in DeepResearchAgent
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.agents.deep_research_agent import DeepResearchAgent
+from app.core.token_budget import count_tokens, fit_to_budget
+from app.services import source_fetcher as fetcher_module
+from app.services.source_fetcher import Source, SourceFetcher, extract_text
+from tests.fake_redis import FakeRedis
+
+BODY = "<p>" + "Market insight sentence. " * 40 + "</p>"
+
+
+def _page(title, body=BODY):
+    return f"<html><head><title>{title}</title><style>p {{}}</style></head><body>{body}<script>x()</script></body></html>"
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(fetcher_module, "redis_client", fake), \
+            patch.object(fetcher_module, "PER_HOST_INTERVAL_SECONDS", 0.2):
+        yield fake
+
+
+def _fetcher(handler):
+    fetcher = SourceFetcher()
+    fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher._fetch_browser = AsyncMock(return_value=None)
+    return fetcher
+
+
+def test_extract_text_drops_markup_scripts_and_styles():
+    title, text = extract_text(_page("Report  2025", "<h1>Intro</h1><p>Hello <b>world</b></p>"))
+    assert title == "Report 2025"
+    assert text == "Intro\nHello world"
+
+
+@pytest.mark.asyncio
+async def test_fetch_many_is_concurrent_polite_per_host_and_bounded(redis):
+    starts = {}
+
+    async def handler(request):
+        starts[str(request.url)] = time.monotonic()
+        await asyncio.sleep(5 if request.url.host == "slow.example" else 0.2)
+        return httpx.Response(200, html=_page(request.url.host))
+
+    fetcher = _fetcher(handler)
+    urls = [f"https://site{i}.example/r" for i in range(4)] + [
+        "https://site0.example/other", "https://slow.example/r", "https://site1.example/r",
+    ]
+    started = time.monotonic()
+    sources = await fetcher.fetch_many(urls, deadline=1.0)
+    elapsed = time.monotonic() - started
+    await fetcher.close()
+
+    assert [s.url for s in sources] == urls[:5]  # input order, duplicate read once, slow one dropped
+    assert sources[0].title == "site0.example" and "Market insight" in sources[0].text
+    assert elapsed < 1.5  # sequential reads with 1s sleeps took > 6s
+    assert max(starts[u] for u in urls[:4]) - started < 0.1  # distinct hosts start together
+    assert starts["https://site0.example/other"] - starts["https://site0.example/r"] >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_page_cache_serves_fresh_hits_and_revalidates_stale_entries(redis):
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, html=_page("Cached"), headers={"ETag": '"v1"'})
+
+    fetcher = _fetcher(handler)
+    first = await fetcher.fetch("https://a.example/report")
+    again = await fetcher.fetch("https://a.example/report")
+    assert not first.cached and again.cached and again.text == first.text
+    assert len(requests) == 1
+
+    with patch.object(fetcher_module, "PAGE_FRESH_SECONDS", 0):
+        revalidated = await fetcher.fetch("https://a.example/report")
+    assert len(requests) == 2 and requests[1].headers["if-none-match"] == '"v1"'
+    assert revalidated.cached and revalidated.title == "Cached"
+
+    await fetcher.fetch("https://mirror.example/report")  # same content, different URL
+    await fetcher.close()
+    assert len([k for k in redis.data if k.startswith("research:content:")]) == 1
+
+
+def test_fit_to_budget_shares_budget_fairly():
+    short, long_a, long_b = "short source", "alpha " * 3000, "beta " * 6000
+    fitted = fit_to_budget([short, long_a, long_b], 1000)
+    assert fitted[0] == short
+    assert count_tokens("\n\n".join(fitted)) <= 1000
+    assert abs(count_tokens(fitted[1]) - count_tokens(fitted[2])) < 10
+    assert fitted[2].endswith("[... truncated ...]")
+    assert fit_to_budget([short], 1000) == [short]
+
+
+@pytest.mark.asyncio
+async def test_research_topic_keeps_synthesis_prompt_within_budget():
+    agent = DeepResearchAgent()
+    huge = [Source(url=f"https://s{i}.example", title=f"S{i}", text="data point " * 60000) for i in range(3)]
+    llm = SimpleNamespace(ainvoke=AsyncMock(return_value=SimpleNamespace(content="# Report")))
+
+    with patch("app.agents.deep_research_agent.web_search", SimpleNamespace(ainvoke=AsyncMock(return_value="results"))), \
+            patch.object(agent, "structured_llm_call", AsyncMock(return_value=SimpleNamespace(urls=[s.url for s in huge]))), \
+            patch.object(fetcher_module.source_fetcher, "fetch_many", AsyncMock(return_value=huge)), \
+            patch.object(DeepResearchAgent, "llm", llm):
+        result = await agent.research_topic("AI agents", depth=3)
+
+    assert result["report"] == "# Report" and result["sources_read"] == 3
+    system, human = llm.ainvoke.call_args.args[0]
+    assert count_tokens(system.content + human.content) <= 64_000 - 8192
+    assert human.content.count("[... truncated ...]") == 3
@@ -0,0 +1,133 @@
+"""
+Tests for the Redis ZSET delayed-job queue and its SMS escalation consumer
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.services import delayed_jobs as delayed_jobs_module
+from app.services.delayed_jobs import DelayedJobQueue
+from tests.fake_redis import FakeRedis
+
+
+@pytest.fixture(params=["python_ports", "lua"])
+def redis(request):
+    """
+    Queue tests run twice: against the Python ports of the claim/ack scripts,
+    and against the real Lua scripts on fakeredis (needs the fakeredis[lua] dev extra).
+    """
+    if request.param == "lua":
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        fake = fakeredis.FakeAsyncRedis(decode_responses=True)
+    else:
+        fake = FakeRedis()
+    with patch.object(delayed_jobs_module, "redis_client", fake):
+        yield fake
+
+
+@pytest.mark.asyncio
+async def test_only_due_jobs_are_claimed_and_only_once(redis):
+    queue = DelayedJobQueue("test")
+    await queue.schedule("soon", {"n": 1}, delay_seconds=-5)
+    await queue.schedule("later", {"n": 2}, delay_seconds=3600)
+
+    jobs = await queue.claim_due()
+    assert [(j.id, j.payload, j.attempts) for j in jobs] == [("soon", {"n": 1}, 1)]
+    assert await queue.claim_due() == []  # claimed, lease still valid
+    assert await queue.depth() == 1
+
+    # Worker died: the job comes back once its lease lapses
+    redelivered = await queue.claim_due(now=time.time() + queue.lease_seconds + 1)
+    assert [(j.id, j.attempts) for j in redelivered] == [("soon", 2)]
+
+
+@pytest.mark.asyncio
+async def test_run_due_acks_retries_and_drops_exhausted_jobs(redis):
+    queue = DelayedJobQueue("test", max_attempts=2)
+    for i in range(5):
+        await queue.schedule(f"job{i}", {"i": i}, delay_seconds=-1)
+
+    batches = []
+
+    async def handler(jobs):
+        batches.append([j.id for j in jobs])
+        return {"job3": 60} if "job3" in batches[-1] else {}
+
+    summary = await queue.run_due(handler, batch_size=2)
+    assert batches == [["job0", "job1"], ["job2", "job3"], ["job4"]]
+    assert summary == {"claimed": 5, "completed": 4, "retried": 1, "dropped": 0}
+    assert await redis.hkeys("delayed:test:jobs") == ["job3"]
+
+    # job3 keeps failing: second delivery retried again, third dropped
+    for hours in (1, 2):
+        with patch.object(delayed_jobs_module.time, "time", return_value=time.time() + hours * 3600):
+            summary = await queue.run_due(handler)
+    assert batches[-1] == ["job3"] and len(batches) == 4
+    assert summary["dropped"] == 1
+    assert await redis.hkeys("delayed:test:jobs") == []
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_stays_claimed_and_rescheduled_job_survives_ack(redis):
+    queue = DelayedJobQueue("test")
+    await queue.schedule("boom", {}, delay_seconds=-1)
+    await queue.schedule("recurring", {"k": "v"}, delay_seconds=-1)
+
+    async def failing(jobs):
+        raise RuntimeError("db down")
+
+    summary = await queue.run_due(failing)
+    assert summary["completed"] == 0
+    assert await redis.zcard("delayed:test:claimed") == 2
+
+    async def recurring(jobs):
+        await queue.schedule("recurring", {"k": "v"}, delay_seconds=86400)
+
+    later = time.time() + queue.lease_seconds + 1
+    with patch.object(delayed_jobs_module.time, "time", return_value=later):
+        await queue.run_due(recurring)
+
+    assert await redis.hkeys("delayed:test:jobs") == ["recurring"]
+    assert await redis.zscore("delayed:test:due", "recurring") == pytest.approx(later + 86400)
+
+
+@pytest.mark.asyncio
+async def test_sms_escalations_batch_lookups_into_one_query(redis):
+    from app.models.action_item import ActionStatus
+    from app.services import notification_service as notification_module
+    from app.services.notification_service import NotificationService
+
+    service = NotificationService()
+    owner = SimpleNamespace(phone="+15550100")
+    startup = SimpleNamespace(name="Acme", settings={})
+    pending = SimpleNamespace(id=uuid4(), status=ActionStatus.pending, source_agent="SalesAgent",
+                              title="Approve deal", description="Big one")
+    resolved = SimpleNamespace(id=uuid4(), status=ActionStatus.approved, source_agent="SalesAgent",
+                               title="Old", description="Done")
+    for action in (pending, resolved):
+        await service.schedule_sms_escalation(str(action.id), str(uuid4()), delay_minutes=0)
+
+    result = MagicMock()
+    result.all.return_value = [(pending, startup, owner), (resolved, startup, owner)]
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.execute = AsyncMock(return_value=result)
+    twilio = SimpleNamespace(send_sms=AsyncMock(return_value=True))
+
+    # The module-level queue caches scripts registered on whichever client ran first
+    with patch.object(notification_module.sms_escalations, "_claim", None), \
+            patch.object(notification_module.sms_escalations, "_ack", None), \
+            patch.object(notification_module, "async_session_maker", return_value=session), \
+            patch("app.services.twilio_service.twilio_service", twilio):
+        await service.check_sms_escalations()
+
+    session.execute.assert_awaited_once()
+    twilio.send_sms.assert_awaited_once()
+    assert twilio.send_sms.await_args.kwargs["to_phone"] == "+15550100"
+    assert await redis.zcard("delayed:sms_escalation:due") == 0
+    assert await redis.hkeys("delayed:sms_escalation:jobs") == []
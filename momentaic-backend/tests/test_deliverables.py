@@ -0,0 +1,149 @@
+"""
+Tests for off-loop deliverable rendering, artifact caching and ranged vault downloads
+"""
+
+import asyncio
+import csv
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import vault as vault_endpoint
+from app.services import deliverable_service as deliverable_module
+from app.services.deliverable_service import DeliverableService
+
+
+@pytest.fixture
+def vault_dir(tmp_path):
+    with patch.object(deliverable_module, "VAULT_DIR", str(tmp_path)), \
+            patch.object(vault_endpoint, "VAULT_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+@pytest.mark.asyncio
+async def test_renders_in_process_pool_and_caches_by_content(vault_dir):
+    service = DeliverableService(workers=1)
+    metrics = {"monthly_revenue": 1000, "monthly_burn": 2000, "growth_rate_percent": 10}
+    try:
+        first, concurrent_twin = await asyncio.gather(
+            service.generate_financial_model_csv(metrics, "Acme Inc"),
+            service.generate_financial_model_csv(dict(metrics), "Acme Inc"),
+        )
+        path = vault_dir / os.path.basename(first["url"])
+        mtime = path.stat().st_mtime_ns
+        again = await service.generate_financial_model_csv(dict(metrics), "Acme Inc")
+        changed = await service.generate_financial_model_csv({**metrics, "monthly_burn": 3000}, "Acme Inc")
+    finally:
+        await service.close()
+
+    assert first["url"] == concurrent_twin["url"] == again["url"] != changed["url"]
+    assert first["download_url"].endswith(f"/vault/files/{path.name}")
+    assert path.name.startswith("Acme_Inc_Financial_Model_")
+    assert path.stat().st_mtime_ns == mtime  # cache hit, not re-rendered
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[3][:3] == ["Revenue ($)", "1000", "1100.0"]
+    assert sorted(os.listdir(vault_dir)) == sorted([path.name, os.path.basename(changed["url"])])
+
+
+def _gated_render(filepath, gate):
+    gate.wait(5)
+    with open(filepath, "w") as f:
+        f.write("rendered")
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_first_caller_does_not_fail_joined_renders(vault_dir):
+    service = DeliverableService()
+    gate = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as pool, patch.object(service, "_pool", return_value=pool):
+        owner = asyncio.create_task(service._render("business_plan", "plan", "txt", {"v": 1}, _gated_render, gate))
+        await asyncio.sleep(0.01)
+        joiner = asyncio.create_task(service._render("business_plan", "plan", "txt", {"v": 1}, _gated_render, gate))
+        await asyncio.sleep(0.01)
+
+        owner.cancel()
+        await asyncio.sleep(0.01)
+        gate.set()
+        filename = await joiner
+
+    assert owner.cancelled()
+    assert (vault_dir / filename).read_text() == "rendered"
+    assert service._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_template_version_bump_invalidates_cache():
+    payload = {"metrics": {"a": 1}, "company_name": "Acme"}
+    before = deliverable_module.artifact_key("financial_model", payload)
+    with patch.dict(deliverable_module.TEMPLATE_VERSIONS, {"financial_model": 2}):
+        assert deliverable_module.artifact_key("financial_model", payload) != before
+
+
+@pytest.mark.asyncio
+async def test_day_one_pack_renders_documents_in_parallel():
+    service = DeliverableService()
+    running, peak = 0, 0
+
+    async def render(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"title": "doc"}
+
+    live = SimpleNamespace(
+        get_saas_multiples=AsyncMock(return_value={"median_arr_multiple": 7}),
+        get_retention_benchmarks=AsyncMock(side_effect=RuntimeError("feed down")),
+    )
+    with patch("app.services.live_data_service.live_data_service", live), \
+            patch.object(service, "generate_business_plan_pdf", side_effect=render), \
+            patch.object(service, "generate_financial_model_csv", side_effect=render) as financial, \
+            patch.object(service, "generate_cohort_analysis_csv", side_effect=render) as cohort, \
+            patch.object(service, "generate_legal_contract", side_effect=render):
+        pack = await service.generate_day_one_pack("Acme", "SaaS")
+
+    assert len(pack) == 3  # cohort skipped: benchmarks unavailable
+    assert peak == 3
+    cohort.assert_not_called()
+    assert financial.call_args.args[0]["valuation_multiple"] == 7
+
+
+async def _download(filename, range_header=None):
+    response = await vault_endpoint.download_vault_file(filename, range_header=range_header, current_user=None)
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    return response, body
+
+
+@pytest.mark.asyncio
+async def test_ranged_download_streams_requested_bytes(vault_dir):
+    data = bytes(range(256)) * 1024  # 256 KiB, several chunks
+    (vault_dir / "Acme_Plan.pdf").write_bytes(data)
+
+    response, body = await _download("Acme_Plan.pdf")
+    assert response.status_code == 200 and body == data
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.media_type == "application/pdf"
+
+    response, body = await _download("Acme_Plan.pdf", "bytes=100000-170000")
+    assert response.status_code == 206
+    assert body == data[100000:170001]
+    assert response.headers["content-range"] == f"bytes 100000-170000/{len(data)}"
+    assert response.headers["content-length"] == "70001"
+
+    _, body = await _download("Acme_Plan.pdf", "bytes=-10")
+    assert body == data[-10:]
+
+    with pytest.raises(HTTPException) as exc:
+        await _download("Acme_Plan.pdf", f"bytes={len(data)}-")
+    assert exc.value.status_code == 416
+    for name in ("../secrets.env", ".Acme_Plan.pdf.1.tmp", "missing.pdf"):
+        with pytest.raises(HTTPException) as exc:
+            await _download(name)
+        assert exc.value.status_code == 404
@@ -0,0 +1,130 @@
+"""
+Tests for the Redis-backed domain warm-up counters
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.services import domain_warmup as warmup_module
+from app.services.domain_warmup import DAY_TTL_SECONDS, DomainWarmUpScheduler
+from tests.fake_redis import FakeRedis
+
+NOW = datetime(2026, 10, 18, 9, 30)
+
+
+class InterleavingRedis(FakeRedis):
+    """FakeRedis that yields to the event loop before every command, like a real round trip."""
+
+    async def hget(self, *args):
+        await asyncio.sleep(0)
+        return await super().hget(*args)
+
+    async def hset(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return await super().hset(*args, **kwargs)
+
+    async def hgetall(self, *args):
+        await asyncio.sleep(0)
+        return await super().hgetall(*args)
+
+    async def hincrby(self, *args):
+        await asyncio.sleep(0)
+        return await super().hincrby(*args)
+
+
+@pytest.mark.asyncio
+async def test_parallel_senders_never_lose_increments_or_exceed_the_limit():
+    fake_redis = InterleavingRedis()
+    scheduler = DomainWarmUpScheduler()
+    with patch.object(warmup_module, "redis_client", fake_redis), \
+         patch.object(warmup_module, "_utcnow", return_value=NOW):
+        await scheduler.register_domain("roomy.io")
+        await fake_redis.hset("warmup:domain:roomy.io", mapping={"status": "warming_up", "current_limit": 500})
+        assert all(await asyncio.gather(*(scheduler.log_dispatch("roomy.io") for _ in range(200))))
+
+        await scheduler.register_domain("tight.io")
+        await fake_redis.hset("warmup:domain:tight.io", mapping={"status": "warming_up", "current_limit": 40})
+        accepted = await asyncio.gather(*(scheduler.log_dispatch("tight.io", count=3) for _ in range(50)))
+        assert await scheduler.get_daily_allowance("tight.io") == 40 - 3 * sum(accepted)
+
+    assert fake_redis.data["warmup:day:roomy.io:2026-10-18"]["sent"] == "200"
+    assert sum(accepted) == 13                                        # 39 of 40, never over
+    assert fake_redis.data["warmup:day:tight.io:2026-10-18"]["sent"] == "39"
+
+    # The read-modify-write the JSON file did loses increments under the same interleaving
+    naive = InterleavingRedis()
+
+    async def read_modify_write():
+        sent = int(await naive.hget("counter", "sent") or 0)
+        await naive.hset("counter", "sent", sent + 1)
+
+    await asyncio.gather(*(read_modify_write() for _ in range(200)))
+    assert int(naive.data["counter"]["sent"]) < 200
+
+
+@pytest.mark.asyncio
+async def test_first_send_leaves_dormancy_and_counters_roll_over_daily():
+    fake_redis = FakeRedis()
+    scheduler = DomainWarmUpScheduler()
+    with patch.object(warmup_module, "redis_client", fake_redis), \
+         patch.object(warmup_module, "_utcnow", return_value=NOW):
+        assert await scheduler.get_daily_allowance("new.io") == 10      # auto-registered
+        assert not await scheduler.register_domain("new.io")
+        assert await scheduler.log_dispatch("new.io", count=10)
+        assert not await scheduler.log_dispatch("new.io")
+        assert fake_redis.data["warmup:domain:new.io"]["status"] == "warming_up"
+        await scheduler.report_bounce("new.io")
+        await scheduler.report_bounce("unknown.io")                    # ignored
+
+    day_key = "warmup:day:new.io:2026-10-18"
+    assert fake_redis.data[day_key] == {"sent": "10", "bounces": "1"}
+    assert fake_redis.ttls[day_key] == DAY_TTL_SECONDS
+    assert "warmup:domain:unknown.io" not in fake_redis.data
+
+    with patch.object(warmup_module, "redis_client", fake_redis), \
+         patch.object(warmup_module, "_utcnow", return_value=NOW + timedelta(days=1)):
+        assert await scheduler.get_daily_allowance("new.io") == 10
+        for _ in range(5):
+            await scheduler.report_bounce("new.io")
+        assert await scheduler.get_daily_allowance("new.io") == 0      # health halt: 6 bounces
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_import_merges_into_live_counters(tmp_path):
+    stats_file = tmp_path / "domain_stats.json"
+    stats_file.write_text(json.dumps({
+        "old.io": {
+            "registered_at": "2026-09-01T00:00:00",
+            "status": "warming_up",
+            "current_limit": 25,
+            "spam_score": 0.5,
+            "bounces": 2,
+            "history": {
+                "2026-10-18": {"sent": 7, "bounces": 1},
+                "2026-10-15": {"sent": 20, "bounces": 0},
+                "2026-09-20": {"sent": 12, "bounces": 1},
+            },
+        },
+    }))
+    fake_redis = FakeRedis()
+    scheduler = DomainWarmUpScheduler()
+    with patch.object(warmup_module, "redis_client", fake_redis), \
+         patch.object(warmup_module, "_utcnow", return_value=NOW):
+        assert await scheduler.log_dispatch("old.io", count=3)         # a live send before the import
+        await fake_redis.hset("warmup:domain:old.io", "current_limit", 30)
+
+        assert await scheduler.import_json_stats(stats_file) == 1
+        assert await scheduler.import_json_stats(stats_file) == 0      # renamed, never imported twice
+        assert await scheduler.get_daily_allowance("old.io") == 30 - 10
+
+    assert stats_file.with_name("domain_stats.json.imported").exists()
+    assert fake_redis.data["warmup:domains"]["old.io"] == "2026-09-01T00:00:00"
+    assert fake_redis.data["warmup:domain:old.io"]["current_limit"] == "30"   # live value wins
+    assert fake_redis.data["warmup:domain:old.io"]["bounces"] == "2"
+    assert fake_redis.data["warmup:day:old.io:2026-10-18"] == {"sent": "10", "bounces": "1"}
+    assert fake_redis.ttls["warmup:day:old.io:2026-10-15"] == DAY_TTL_SECONDS - 3 * 24 * 3600
+    assert "warmup:day:old.io:2026-09-20" not in fake_redis.data      # past the retention window
@@ -0,0 +1,154 @@
+"""
+Tests for the multiplexed SSE event hub: tenant filtering, bounded client
+queues, Last-Event-ID resume and a single shared Redis subscription.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core import events
+from app.core.events import EventMultiplexer, EventSubscription, publish_event
+
+
+class FakePubSub:
+    """Pub/sub whose listen() yields whatever the test pushes onto `inbox`."""
+
+    def __init__(self):
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.subscribe = AsyncMock()
+        self.unsubscribe = AsyncMock()
+        self.close = AsyncMock()
+
+    async def listen(self):
+        while True:
+            yield await self.inbox.get()
+
+    def push(self, event):
+        self.inbox.put_nowait({"type": "message", "data": json.dumps(event)})
+
+
+def _client(pubsub=None, backlog=()):
+    client = MagicMock()
+    client.pubsub.return_value = pubsub or FakePubSub()
+    client.xrange = AsyncMock(return_value=list(backlog))
+    client.eval = AsyncMock(return_value="1700000000000-0")
+    return client
+
+
+async def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_dispatch_filters_by_startup_and_user():
+    hub = EventMultiplexer()
+    with patch.object(hub, "_ensure_listener"):
+        owner_a = EventSubscription("u1", ["s1"])
+        owner_b = EventSubscription("u2", ["s2"])
+        hub.register(owner_a)
+        hub.register(owner_b)
+
+    assert hub.dispatch({"type": "broadcast", "startup_id": None, "user_id": None}) == 2
+    assert hub.dispatch({"type": "lead", "startup_id": "s1", "user_id": None}) == 1
+    assert hub.dispatch({"type": "dm", "startup_id": None, "user_id": "u2"}) == 1
+    assert hub.dispatch({"type": "other", "startup_id": "s9", "user_id": None}) == 0
+
+    assert [e["type"] for e in owner_a.queue._queue] == ["broadcast", "lead"]
+    assert [e["type"] for e in owner_b.queue._queue] == ["broadcast", "dm"]
+
+    hub.unregister(owner_a)
+    assert hub.client_count == 1
+    assert "s1" not in hub._by_startup
+
+
+def test_slow_client_drops_oldest_events():
+    subscription = EventSubscription("u1", [], maxsize=3)
+    for i in range(5):
+        subscription.offer({"n": i})
+
+    assert subscription.dropped == 2
+    assert [e["n"] for e in subscription.queue._queue] == [2, 3, 4]
+
+
+async def test_publish_scopes_event_and_appends_backlog():
+    client = _client()
+    with patch.object(events, "get_redis_client", AsyncMock(return_value=client)):
+        event_id = await publish_event("campaign_sent", {"startup_id": "s1", "count": 3})
+
+    assert event_id == "1700000000000-0"
+    _, numkeys, stream, channel, payload, maxlen = client.eval.await_args.args
+    assert (numkeys, stream, channel) == (2, "momentaic:events:backlog", "momentaic:events")
+    message = json.loads(payload)
+    assert message["startup_id"] == "s1" and message["user_id"] is None
+    assert message["data"]["count"] == 3
+
+
+async def test_many_clients_share_one_subscription():
+    pubsub = FakePubSub()
+    client = _client(pubsub)
+    hub = EventMultiplexer()
+    with patch.object(events, "get_redis_client", AsyncMock(return_value=client)):
+        streams = [hub.stream(f"u{i}", ["s1"]) for i in range(5)]
+        nexts = [asyncio.ensure_future(s.__anext__()) for s in streams]
+        await asyncio.sleep(0.01)
+
+        pubsub.push({"id": "1-0", "type": "ping", "startup_id": "s1", "user_id": None})
+        received = await asyncio.wait_for(asyncio.gather(*nexts), timeout=1)
+
+        assert [e["type"] for e in received] == ["ping"] * 5
+        assert client.pubsub.call_count == 1
+        pubsub.subscribe.assert_awaited_once_with("momentaic:events")
+
+        for s in streams:
+            await s.aclose()
+        assert hub.client_count == 0
+        await hub.close()
+
+
+async def test_resume_replays_backlog_without_duplicates():
+    pubsub = FakePubSub()
+    backlog = [
+        ("5-0", {"event": json.dumps({"type": "a", "startup_id": "s1", "user_id": None})}),
+        ("6-0", {"event": json.dumps({"type": "hidden", "startup_id": "s2", "user_id": None})}),
+        ("7-0", {"event": json.dumps({"type": "b", "startup_id": None, "user_id": None})}),
+    ]
+    client = _client(pubsub, backlog)
+    hub = EventMultiplexer()
+    with patch.object(events, "get_redis_client", AsyncMock(return_value=client)):
+        stream = hub.stream("u1", ["s1"], last_event_id="4-0")
+        first = await stream.__anext__()
+        second = await stream.__anext__()
+        assert [(first["id"], first["type"]), (second["id"], second["type"])] == [("5-0", "a"), ("7-0", "b")]
+        assert client.xrange.await_args.kwargs["min"] == "(4-0"
+
+        # Published while the backlog was read: already replayed, then a new one
+        pubsub.push({"id": "7-0", "type": "b", "startup_id": None, "user_id": None})
+        pubsub.push({"id": "8-0", "type": "c", "startup_id": "s1", "user_id": None})
+        live = await asyncio.wait_for(stream.__anext__(), timeout=1)
+        assert (live["id"], live["type"]) == ("8-0", "c")
+
+        await stream.aclose()
+        await hub.close()
+
+
+async def test_listener_reconnects_after_redis_error():
+    pubsub = FakePubSub()
+    failing = MagicMock()
+    failing.pubsub.side_effect = ConnectionError("redis down")
+    healthy = _client(pubsub)
+    hub = EventMultiplexer()
+    with patch.object(events, "get_redis_client", AsyncMock(side_effect=[failing, healthy])), \
+            patch.object(events, "RECONNECT_DELAY_SECONDS", 0):
+        stream = hub.stream("u1", [])
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+
+        pubsub.push({"id": "1-0", "type": "after_reconnect", "startup_id": None, "user_id": None})
+        event = await asyncio.wait_for(pending, timeout=1)
+        assert event["type"] == "after_reconnect"
+
+        await stream.aclose()
+        await hub.close()
@@ -0,0 +1,149 @@
+"""
+Tests for the Postgres-backed GoalTracker and the overdue-goal sweep
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.goal import GoalPriority, GoalStatus
+from app.services import goal_tracker as goal_tracker_module
+from app.services.goal_tracker import GoalTracker
+
+
+def _row(startup_id, name, metric, target, current=0.0, deadline=None):
+    now = datetime.now(timezone.utc)
+    return SimpleNamespace(
+        id=uuid4(), startup_id=startup_id, name=name, description="", target_metric=metric,
+        target_value=target, current_value=current, status=GoalStatus.IN_PROGRESS,
+        priority=GoalPriority.HIGH, phase="traction", assigned_agent_chain=[], notes=[],
+        deadline=deadline, created_at=now, updated_at=now, completed_at=None,
+    )
+
+
+def _sessions(*results):
+    """async_session_maker replacement: each call opens a session returning the next results."""
+    opened = []
+    queue = list(results)
+
+    def factory():
+        session = MagicMock()
+        session.__aenter__.return_value = session
+        session.execute = AsyncMock(side_effect=queue.pop(0) if queue else [MagicMock()])
+        session.commit = AsyncMock()
+        opened.append(session)
+        return session
+
+    return factory, opened
+
+
+def _scalars(items):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = items
+    return result
+
+
+@pytest.mark.asyncio
+async def test_metric_update_writes_all_tracking_goals_in_one_transaction():
+    startup_id = uuid4()
+    users = _row(startup_id, "100 users", "users", 100, current=40)
+    signups = _row(startup_id, "50 users", "users", 50, current=40)
+    revenue = _row(startup_id, "First $1k", "mrr", 1000)
+    factory, opened = _sessions([_scalars([users, signups, revenue])], [_scalars([users, signups])])
+
+    tracker = GoalTracker()
+    with patch.object(goal_tracker_module, "async_session_maker", side_effect=factory):
+        await tracker.update_metric(str(startup_id), "users", 60)
+        summary = await tracker.get_progress_summary(str(startup_id))
+
+    # One load, one locked re-read + write; the summary is served from the write-through cache
+    assert len(opened) == 2
+    sql = str(opened[1].execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE" in sql
+    assert (users.current_value, signups.current_value, revenue.current_value) == (60, 60, 0)
+    assert signups.status == GoalStatus.COMPLETED and users.status == GoalStatus.IN_PROGRESS
+    opened[1].commit.assert_awaited_once()
+
+    assert summary["stats"]["completed_goals"] == 1
+    assert {g["name"]: g["current_value"] for g in summary["active_goals"]} == {"100 users": 60, "First $1k": 0}
+    assert summary["recent_milestones"][0]["name"] == "Completed: 50 users"
+
+
+@pytest.mark.asyncio
+async def test_writes_apply_to_the_locked_row_not_the_cached_goal():
+    startup_id = uuid4()
+    cached = _row(startup_id, "Launch", "users", 100, current=10)
+    tracker = GoalTracker()
+    factory, _ = _sessions([_scalars([cached])])
+    with patch.object(goal_tracker_module, "async_session_maker", side_effect=factory):
+        await tracker.get_active_goals(str(startup_id))
+
+    # Another worker blocked the goal after this one cached it
+    fresh = _row(startup_id, "Launch", "users", 100, current=10)
+    fresh.id, fresh.status = cached.id, GoalStatus.BLOCKED
+    fresh.notes = ["[earlier] from another worker"]
+    factory, _ = _sessions([_scalars([fresh])])
+    with patch.object(goal_tracker_module, "async_session_maker", side_effect=factory):
+        goal = await tracker.update_goal_progress(str(startup_id), str(cached.id), 30, note="synced")
+
+    assert fresh.status == GoalStatus.BLOCKED and fresh.current_value == 30
+    assert fresh.notes[0] == "[earlier] from another worker" and fresh.notes[1].endswith("synced")
+    assert goal.status == GoalStatus.BLOCKED
+    assert (await tracker.get_goal(str(startup_id), str(cached.id))).status == GoalStatus.BLOCKED
+
+    # And a status change keeps the progress another worker just wrote
+    fresh.current_value = 55
+    factory, _ = _sessions([_scalars([fresh])])
+    with patch.object(goal_tracker_module, "async_session_maker", side_effect=factory):
+        goal = await tracker.set_goal_status(str(startup_id), str(cached.id), GoalStatus.IN_PROGRESS)
+    assert fresh.status == GoalStatus.IN_PROGRESS and fresh.current_value == 55
+    assert goal.current_value == 55
+
+
+@pytest.mark.asyncio
+async def test_cache_is_reloaded_after_ttl():
+    startup_id = uuid4()
+    factory, opened = _sessions([_scalars([])], [_scalars([_row(startup_id, "g", "users", 10)])])
+    tracker = GoalTracker()
+    with patch.object(goal_tracker_module, "async_session_maker", side_effect=factory):
+        assert await tracker.get_active_goals(str(startup_id)) == []
+        assert await tracker.get_active_goals(str(startup_id)) == []
+        tracker._goals_loaded_at[str(startup_id)] -= goal_tracker_module.GOAL_CACHE_TTL_SECONDS
+        assert [g.name for g in await tracker.get_active_goals(str(startup_id))] == ["g"]
+    assert len(opened) == 2
+
+
+@pytest.mark.asyncio
+async def test_overdue_sweep_is_one_joined_query_and_one_nag_per_startup():
+    from app.services import notification_service as notification_module
+    from app.services.scheduler import SchedulerService
+
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    acme = SimpleNamespace(id=uuid4(), name="Acme")
+    beta = SimpleNamespace(id=uuid4(), name="Beta")
+    owner_a, owner_b = SimpleNamespace(email="a@x.io"), SimpleNamespace(email="b@x.io")
+    rows = MagicMock()
+    rows.all.return_value = [
+        (_row(acme.id, "Launch", "users", 10, deadline=yesterday), acme, owner_a),
+        (_row(beta.id, "Raise", "funding", 1e6, deadline=yesterday), beta, owner_b),
+        (_row(acme.id, "Hire", "hires", 2, deadline=yesterday), acme, owner_a),
+    ]
+    factory, opened = _sessions([rows])
+
+    with patch.object(goal_tracker_module, "async_session_maker", side_effect=factory), \
+            patch.object(notification_module.notification_service, "enqueue", AsyncMock()) as enqueue:
+        await SchedulerService()._run_overdue_goals_nag()
+
+    sql = str(opened[0].execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "JOIN startups" in sql and "JOIN users" in sql
+    assert "startup_goals.deadline <" in sql and "startup_goals.last_nagged_at" in sql
+
+    assert enqueue.await_count == 2
+    acme_nag = next(c.kwargs for c in enqueue.await_args_list if c.kwargs["user"] is owner_a)
+    assert acme_nag["subject"] == "⚠️ 2 Overdue Goals for Acme"
+    mark = opened[1].execute.await_args.args[0]
+    assert "UPDATE startup_goals SET last_nagged_at" in str(mark.compile(dialect=postgresql.dialect()))
@@ -0,0 +1,106 @@
+"""
+Tests for the SQL-side engagement analytics in GrowthLoopEngine
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import growth_loop as growth_loop_module
+from app.services.growth_loop import GrowthLoopEngine
+
+
+def _session(*row_sets):
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    results = []
+    for rows in row_sets:
+        result = MagicMock()
+        result.all.return_value = rows
+        results.append(result)
+    session.execute = AsyncMock(side_effect=results)
+    session.commit = AsyncMock()
+    return session
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.mark.asyncio
+async def test_analysis_is_aggregated_in_sql_and_assembled_from_buckets():
+    # (dow, hour, posts, avg) rows from GROUPING SETS ((dow), (hour), ())
+    buckets = [
+        (1, None, 4, 12.5), (4, None, 2, 30.0),
+        (None, 9, 3, 8.0), (None, 17, 3, 25.0),
+        (None, None, 6, 18.3),
+    ]
+    platforms = [("twitter", 70), ("linkedin", 40)]
+    session = _session(buckets, platforms)
+
+    with patch.object(growth_loop_module, "AsyncSessionLocal", return_value=session):
+        result = await GrowthLoopEngine().analyze_past_performance(str(uuid4()), days=365)
+
+    assert result["posts_analyzed"] == 6
+    assert result["best_day"] == "Friday"
+    assert result["best_hour"] == 17
+    assert result["best_platform"] == "twitter"
+    assert result["performance_by_day"]["Tuesday"] == 12.5
+    assert result["performance_by_platform"] == {"twitter": 70, "linkedin": 40}
+
+    sql = _sql(session.execute.await_args_list[0].args[0])
+    assert "GROUPING SETS" in sql and "EXTRACT(isodow FROM post_engagement.published_at)" in sql
+    assert "social_posts" not in sql
+
+
+@pytest.mark.asyncio
+async def test_best_slot_ignores_empty_buckets_and_falls_back_to_post_volume():
+    # Engagement not synced yet: every bucket averages 0, so volume decides
+    buckets = [
+        (2, None, 1, 0.0), (5, None, 3, 0.0),
+        (None, 14, 4, 0.0),
+        (None, None, 4, 0.0),
+    ]
+    session = _session(buckets, [])
+    with patch.object(growth_loop_module, "AsyncSessionLocal", return_value=session):
+        result = await GrowthLoopEngine().analyze_past_performance(str(uuid4()))
+
+    assert result["best_day"] == "Saturday"
+    assert result["best_hour"] == 14
+    assert result["performance_by_day"]["Monday"] == 0
+
+
+@pytest.mark.asyncio
+async def test_no_posts_in_window():
+    session = _session([(None, None, 0, None)], [])
+    with patch.object(growth_loop_module, "AsyncSessionLocal", return_value=session):
+        result = await GrowthLoopEngine().analyze_past_performance(str(uuid4()), days=90)
+    assert result["posts_analyzed"] == 0
+    assert "last 90 days" in result["insights"][0]
+
+
+@pytest.mark.asyncio
+async def test_engagement_upsert_is_one_statement():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    await GrowthLoopEngine().record_engagement(str(uuid4()), "twitter", {"likes": 5, "retweets": 2}, db=db)
+
+    sql = _sql(db.execute.await_args.args[0])
+    assert sql.startswith("INSERT INTO post_engagement")
+    assert "FROM social_posts" in sql
+    assert "ON CONFLICT (post_id, platform) DO UPDATE SET likes = excluded.likes" in sql
+    assert "5 AS anon_2, 2 AS anon_3, 0 AS anon_4, 7 AS anon_5" in sql
+
+
+@pytest.mark.asyncio
+async def test_optimize_schedule_reuses_given_analysis():
+    performance = {
+        "posts_analyzed": 12, "best_day": "Thursday", "best_hour": 10,
+        "performance_by_day": {"Thursday": 30, "Monday": 20, "Sunday": 10, "Friday": 5},
+    }
+    with patch.object(GrowthLoopEngine, "analyze_past_performance", AsyncMock()) as analyze:
+        result = await GrowthLoopEngine().optimize_schedule("s1", performance=performance)
+    analyze.assert_not_awaited()
+    assert result["schedule"] == {"thursday": "10:00", "monday": "10:00", "sunday": "10:00"}
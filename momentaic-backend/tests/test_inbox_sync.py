@@ -0,0 +1,191 @@
+"""
+Tests for the incremental IMAP inbox sync (UID checkpoints, consumer de-dup)
+"""
+
+import socket
+import threading
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.integrations.gmail import GmailIntegration
+from app.services import inbox_sync as inbox_module
+from app.services.inbox_sync import InboxSyncEngine
+from tests.fake_redis import FakeRedis as ClaimStore
+
+
+def _header_part(uid: int, subject: str, in_reply_to: str = "") -> tuple:
+    headers = f"Subject: {subject}\r\nFrom: lead@acme.com\r\nMessage-ID: <m{uid}@acme.com>\r\n"
+    if in_reply_to:
+        headers += f"In-Reply-To: {in_reply_to}\r\n"
+    return (f"{uid} (UID {uid} FLAGS () BODY[HEADER.FIELDS (...)] {{100}}".encode(), headers.encode())
+
+
+def _imap_conn(search_result: bytes, parts: list) -> MagicMock:
+    conn = MagicMock()
+    conn.select.return_value = ("OK", [b"3"])
+    conn.response.return_value = ("UIDVALIDITY", [b"777"])
+
+    def uid(command, *args):
+        if command == "SEARCH":
+            return "OK", [search_result]
+        return "OK", parts
+
+    conn.uid.side_effect = uid
+    return conn
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys = set()
+
+    def pipeline(self):
+        pipe = MagicMock()
+        calls = []
+        pipe.set.side_effect = lambda key, *a, **kw: calls.append(key)
+
+        async def execute():
+            results = [key not in self.keys for key in calls]
+            self.keys.update(calls)
+            return results
+
+        pipe.execute = execute
+        return pipe
+
+
+@pytest.fixture
+def engine():
+    instance = InboxSyncEngine()
+    instance._credentials = lambda: ("founder@example.com", "app-password")
+    return instance
+
+
+def test_incremental_sync_searches_above_checkpoint(engine):
+    conn = _imap_conn(b"41 42", [_header_part(41, "Re: Intro"), b")", _header_part(42, "Hello"), b")"])
+
+    with patch.object(engine, "_connect", return_value=conn):
+        messages, checkpoint = engine._sync_blocking("INBOX", {"uidvalidity": 777, "last_uid": 40})
+
+    search_call = conn.uid.call_args_list[0]
+    assert search_call.args == ("SEARCH", None, "UID 41:*")
+    fetch_call = conn.uid.call_args_list[1]
+    assert fetch_call.args[1] == "41,42"
+    assert "BODY.PEEK[HEADER.FIELDS" in fetch_call.args[2]
+    assert [m["uid"] for m in messages] == [41, 42]
+    assert messages[0]["message_id"] == "<m41@acme.com>"
+    assert checkpoint == {"uidvalidity": 777, "last_uid": 42}
+
+
+def test_no_new_mail_returns_only_the_checkpoint_uid(engine):
+    # "UID 41:*" matches the newest message (40) even when nothing is newer
+    conn = _imap_conn(b"40", [])
+
+    with patch.object(engine, "_connect", return_value=conn):
+        messages, checkpoint = engine._sync_blocking("INBOX", {"uidvalidity": 777, "last_uid": 40})
+
+    assert messages == []
+    assert checkpoint["last_uid"] == 40
+    assert all(call.args[0] == "SEARCH" for call in conn.uid.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_consumers_receive_each_message_once(engine):
+    redis = FakeRedis()
+    handler = AsyncMock()
+    engine.register_consumer("reply_listener", handler)
+    messages = [{"message_id": "<a@x>", "subject": "Re: hi"}, {"message_id": "<b@x>", "subject": "hi"}]
+
+    with patch("app.core.redis_client.redis_client", redis):
+        await engine._dispatch(messages)
+        await engine._dispatch(messages + [{"message_id": "<c@x>", "subject": "new"}])
+
+    assert handler.await_count == 2
+    assert [m["message_id"] for m in handler.await_args_list[1].args[0]] == ["<c@x>"]
+
+
+@pytest.mark.asyncio
+async def test_handle_replies_publishes_only_replies():
+    gmail = GmailIntegration.__new__(GmailIntegration)
+    bus = MagicMock()
+    bus.publish = AsyncMock()
+
+    with patch("app.services.message_bus.MessageBus", return_value=bus):
+        replies = await gmail.handle_replies([
+            {"uid": 1, "subject": "Re: Intro", "sender": "a@x", "message_id": "<1@x>"},
+            {"uid": 2, "subject": "Pricing", "sender": "b@x", "message_id": "<2@x>", "in_reply_to": "<out@us>"},
+            {"uid": 3, "subject": "Newsletter", "sender": "c@x", "message_id": "<3@x>"},
+        ], db=MagicMock())
+
+    assert [r["email_id"] for r in replies] == [1, 2]
+    assert bus.publish.await_count == 2
+    assert bus.publish.await_args.kwargs["topic"] == "email.reply_received"
+
+
+class SocketIMAP:
+    """imaplib stand-in over a socketpair, with a scripted server on the other end."""
+
+    def __init__(self, server_lines):
+        self.sock, server = socket.socketpair()
+        self.file = self.sock.makefile("rb")
+        self.received = []
+
+        def serve():
+            reader = server.makefile("rb")
+            self.received.append(reader.readline())          # A001 IDLE
+            server.sendall(b"+ idling\r\n" + server_lines)
+            self.received.append(reader.readline())          # DONE
+            server.sendall(b"A001 OK IDLE terminated\r\n")
+            reader.close()
+            server.close()
+
+        self.server = threading.Thread(target=serve, daemon=True)
+        self.server.start()
+
+    def select(self, mailbox, readonly=False):
+        return "OK", [b"1"]
+
+    def _new_tag(self):
+        return b"A001"
+
+    def send(self, data):
+        self.sock.sendall(data)
+
+    def readline(self):
+        return self.file.readline()
+
+    def logout(self):
+        self.file.close()
+        self.sock.close()
+
+
+@pytest.mark.parametrize("server_lines, expected", [
+    (b"", False),                                   # renew timer fires with no news
+    (b"* 2 EXPUNGE\r\n* 4 EXISTS\r\n", True),
+])
+def test_idle_renewal_completes_the_done_handshake(engine, server_lines, expected):
+    conn = SocketIMAP(server_lines)
+    engine._connect = lambda: conn
+    with patch.object(inbox_module, "IDLE_RENEW_SECONDS", 0.2):
+        assert engine._idle_wait_blocking("INBOX") is expected
+    conn.server.join(timeout=2)
+    assert conn.received == [b"A001 IDLE\r\n", b"DONE\r\n"]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_only_advances_after_consumers_succeed(engine):
+    store = ClaimStore()
+    flaky = AsyncMock(side_effect=[RuntimeError("CRM down"), None])
+    steady = AsyncMock()
+    engine.register_consumer("reply_listener", flaky)
+    engine.register_consumer("assistant", steady)
+    messages = [{"message_id": "<a@x>", "subject": "Re: hi"}]
+    checkpoint = {"uidvalidity": 777, "last_uid": 41}
+
+    with patch("app.core.redis_client.redis_client", store), \
+         patch.object(engine, "_sync_blocking", return_value=(messages, checkpoint)):
+        await engine.sync()
+        assert store.data.get(engine._checkpoint_key("INBOX")) is None
+        await engine.sync()
+
+    assert flaky.await_count == 2 and steady.await_count == 1
+    assert store.data[engine._checkpoint_key("INBOX")] == {"uidvalidity": "777", "last_uid": "41"}
@@ -0,0 +1,151 @@
+"""
+Tests for the concurrent integration sync orchestrator
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.metrics import Histogram, metrics
+from app.integrations.base import SyncResult
+from app.integrations.github import GitHubIntegration
+from app.models.integration import DataCategory
+from app.services import integration_sync as sync_module
+from app.services.integration_sync import IntegrationSyncOrchestrator, ProviderQuota
+
+
+def _integration(provider="github", last_sync_at=None, config=None):
+    return SimpleNamespace(
+        id=uuid4(), startup_id=uuid4(), provider=SimpleNamespace(value=provider),
+        last_sync_at=last_sync_at, config=config or {},
+        access_token="tok", api_key=None, api_secret=None,
+    )
+
+
+class FakeSession:
+    def __init__(self, integrations=()):
+        self.integrations = list(integrations)
+        self.executed = []
+        self.commit = AsyncMock()
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = self.integrations
+        return result
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_freshness_window_skips_recent_syncs():
+    orchestrator = IntegrationSyncOrchestrator()
+    now = datetime.utcnow()
+
+    assert orchestrator.is_due(_integration(last_sync_at=None), now)
+    assert not orchestrator.is_due(_integration(last_sync_at=now - timedelta(minutes=10)), now)
+    assert orchestrator.is_due(_integration(last_sync_at=now - timedelta(hours=2)), now)
+    # Per-integration override via config
+    assert orchestrator.is_due(
+        _integration(last_sync_at=now - timedelta(minutes=10), config={"sync_freshness_minutes": 5}), now
+    )
+
+
+@pytest.mark.asyncio
+async def test_provider_concurrency_is_bounded_and_providers_run_in_parallel():
+    orchestrator = IntegrationSyncOrchestrator()
+    in_flight = {"github": 0, "stripe": 0}
+    peak = {"github": 0, "stripe": 0}
+
+    async def fake_sync(integration, provider):
+        in_flight[provider] += 1
+        peak[provider] = max(peak[provider], in_flight[provider])
+        await asyncio.sleep(0.05)
+        in_flight[provider] -= 1
+        return SyncResult(success=True, data={"commits": 3})
+
+    quotas = {
+        "github": ProviderQuota(concurrency=2, syncs_per_minute=6000),
+        "stripe": ProviderQuota(concurrency=3, syncs_per_minute=6000),
+    }
+    rows = [_integration("github") for _ in range(6)] + [_integration("stripe") for _ in range(6)]
+    session = FakeSession(rows)
+
+    with patch.dict(sync_module.PROVIDER_QUOTAS, quotas, clear=True), \
+         patch.object(sync_module, "AsyncSessionLocal", return_value=session), \
+         patch.object(orchestrator, "_run_provider_sync", side_effect=fake_sync):
+        summary = await orchestrator.sync_all()
+
+    assert peak == {"github": 2, "stripe": 3}
+    assert summary["succeeded"] == 12
+    # github: 3 waves of 0.05s; stripe overlaps with it instead of running after it
+    assert summary["duration_ms"] < 250
+
+
+@pytest.mark.asyncio
+async def test_results_are_written_in_bulk():
+    orchestrator = IntegrationSyncOrchestrator()
+    ok, failed = _integration("stripe"), _integration("github")
+    outcomes = [
+        sync_module._Outcome(ok.id, ok.startup_id, "stripe", SyncResult(success=True, data={"mrr": 150.5, "customers": {"total": 2}}), 0.1),
+        sync_module._Outcome(failed.id, failed.startup_id, "github", SyncResult(success=False, errors=["401"]), 0.1),
+    ]
+    session = FakeSession()
+
+    with patch.object(sync_module, "AsyncSessionLocal", return_value=session):
+        await orchestrator._persist(outcomes)
+
+    assert len(session.executed) == 3  # success UPDATE, failure UPDATE, one INSERT
+    data_rows = session.executed[2][1]
+    assert [r["data_type"] for r in data_rows] == ["mrr", "customers"]
+    assert data_rows[0]["category"] == DataCategory.REVENUE
+    assert data_rows[0]["metric_value"] == 150
+    assert session.executed[1][1] == [{"id": failed.id, "last_error": "401"}]
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_integrations_share_one_pooled_client_per_provider():
+    orchestrator = IntegrationSyncOrchestrator()
+    pool = orchestrator._http_client("github")
+    assert orchestrator._http_client("github") is pool
+    assert orchestrator._http_client("stripe") is not pool
+
+    client = GitHubIntegration()
+    client.use_shared_http_client(pool)
+    await client.close()
+    assert not pool.is_closed
+
+    await orchestrator.close()
+    assert pool.is_closed
+
+
+@pytest.mark.asyncio
+async def test_latency_and_errors_recorded_per_provider():
+    metrics.reset()
+    orchestrator = IntegrationSyncOrchestrator()
+
+    with patch.object(orchestrator, "_run_provider_sync", new_callable=AsyncMock, side_effect=RuntimeError("boom")):
+        outcome = await orchestrator._sync_one(_integration("github"))
+
+    assert outcome.result.success is False
+    assert metrics.histogram("integration_sync_seconds", provider="github").count == 1
+    assert metrics.counter("integration_sync_errors_total", provider="github") == 1
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = Histogram(buckets=(0.1, 0.5, 1.0))
+    for value in [0.05] * 90 + [0.4] * 9 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.95) == 0.5
+    assert histogram.quantile(1.0) == 3.0
+    assert histogram.snapshot()["buckets"]["+Inf"] == 100
@@ -0,0 +1,145 @@
+"""
+Tests for the Redis sorted-set traction leaderboard
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.services import leaderboard as leaderboard_module
+from app.services.leaderboard import LeaderboardService
+from app.services.traction_score import TractionScoreEngine
+from tests.fake_redis import FakeRedis
+
+
+def _startup(name, metrics=None, industry="SaaS"):
+    return SimpleNamespace(
+        id=uuid4(), name=name, tagline=f"{name} tagline", description=None,
+        industry=industry, metrics=metrics or {},
+    )
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(leaderboard_module, "redis_client", fake):
+        yield fake
+
+
+@pytest.mark.asyncio
+async def test_only_changed_startups_are_rescored(redis):
+    service = LeaderboardService()
+    acme = _startup("Acme", {"mrr": 2000})
+
+    with patch.object(service, "build_entry", wraps=service.build_entry) as build:
+        assert await service.record_many([acme]) == 1
+        assert await service.record_many([acme]) == 0
+        acme.metrics = {"mrr": 200000}
+        assert await service.record_many([acme]) == 1
+
+    assert build.call_count == 2
+    assert await redis.zscore("leaderboard:rank:global", str(acme.id)) == 20.0
+
+
+@pytest.mark.asyncio
+async def test_top_n_is_global_and_per_category(redis):
+    service = LeaderboardService()
+    big = _startup("Big", {"mrr": 200000, "mrr_growth": 40})
+    mid = _startup("Mid", {"mrr": 200000}, industry="Fintech")
+    small = _startup("Small", {"mrr": 2000})
+    await service.record_many([small, big, mid])
+
+    overall = await service.top(limit=2)
+    assert [e["name"] for e in overall["leaderboard"]] == ["Big", "Mid"]
+    assert [e["rank"] for e in overall["leaderboard"]] == [1, 2]
+    assert overall["total"] == 3
+
+    saas = await service.top(category="saas")
+    assert [e["name"] for e in saas["leaderboard"]] == ["Big", "Small"]
+
+    # Moving category re-files the startup
+    mid.industry = "SaaS"
+    await service.record_many([mid])
+    assert await redis.zcard("leaderboard:rank:cat:fintech") == 0
+    assert (await service.top(category="SaaS"))["total"] == 3
+
+
+@pytest.mark.asyncio
+async def test_rank_and_real_percentile(redis):
+    service = LeaderboardService()
+    startups = [
+        _startup("A", {"mrr": 200000, "mrr_growth": 40}),    # 30.5
+        _startup("B", {"mrr": 200000}),                        # 20
+        _startup("C", {"mrr": 200000}, industry="Fintech"),    # 20 (tie with B)
+        _startup("D", {}),                                     # 6
+    ]
+    await service.record_many(startups)
+
+    a = await service.rank_of(str(startups[0].id))
+    assert a["global"] == {"rank": 1, "total": 4, "percentile": 75.0}
+    assert a["category_rank"] == {"rank": 1, "total": 3, "percentile": 66.7}
+
+    b, c = await service.rank_of(str(startups[1].id)), await service.rank_of(str(startups[2].id))
+    # Ties share a percentile: only D scores strictly lower
+    assert b["global"]["percentile"] == c["global"]["percentile"] == 25.0
+    assert (await service.rank_of(str(startups[3].id)))["global"]["percentile"] == 0.0
+    assert await service.rank_of(str(uuid4())) is None
+
+    assert await service.percentile_for_score(25.0) == 75.0
+
+
+def test_engine_no_longer_invents_a_percentile():
+    engine = TractionScoreEngine()
+    assert engine.calculate_score({"mrr": 200000}).percentile is None
+    assert engine.calculate_score({"mrr": 200000}, percentile=42.04).percentile == 42.0
+
+
+@pytest.mark.asyncio
+async def test_time_windows_rank_by_score_gained_since_snapshot(redis):
+    service = LeaderboardService()
+    leader = _startup("Leader", {"mrr": 200000, "mrr_growth": 40})
+    climber = _startup("Climber", {})
+    await service.record_many([leader, climber])
+    await service.snapshot(day=datetime.utcnow().date() - timedelta(days=7))
+
+    climber.metrics = {"mrr": 200000}
+    await service.record_many([climber])
+
+    weekly = await service.top(time_period="week")
+    assert weekly["time_period"] == "week"
+    assert [e["name"] for e in weekly["leaderboard"]] == ["Climber", "Leader"]
+    assert weekly["leaderboard"][0]["score_change"] == 14.0
+
+    # No snapshot 30 days back yet: falls back to the all-time ranking
+    monthly = await service.top(time_period="month")
+    assert monthly["time_period"] == "all"
+    assert monthly["leaderboard"][0]["name"] == "Leader"
+
+
+@pytest.mark.asyncio
+async def test_refresh_streams_startups_and_drops_deleted_ones(redis):
+    service = LeaderboardService()
+    kept, deleted = _startup("Kept", {"mrr": 2000}), _startup("Deleted")
+    await service.record_many([kept, deleted])
+    kept.metrics = {"mrr": 200000}
+
+    async def partitions(size):
+        yield [kept]
+
+    stream = MagicMock()
+    stream.scalars.return_value.partitions = partitions
+    session = MagicMock()
+    session.__aenter__.return_value = session
+
+    async def fake_stream(statement):
+        return stream
+
+    session.stream = fake_stream
+    with patch.object(leaderboard_module, "AsyncSessionLocal", return_value=session):
+        summary = await service.refresh_all()
+
+    assert summary == {"startups": 1, "rescored": 1, "removed": 1}
+    assert await redis.zrevrange("leaderboard:rank:global", 0, -1) == [str(kept.id)]
@@ -0,0 +1,155 @@
+"""
+Tests for MCP server bootstrap and session pooling, driven by the dummy stdio echo server
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services.mcp_client import MCPClientService, ServerState, _Connection
+
+ECHO_SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "mcp_echo_server.py")
+
+
+def _echo(delay=0.0, call_delay=0.0):
+    return [ECHO_SERVER, "--startup-delay", str(delay), "--call-delay", str(call_delay)]
+
+
+@pytest.fixture
+async def service():
+    svc = MCPClientService()
+    yield svc
+    await svc.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_servers_start_concurrently(service):
+    for name in ("a", "b", "c"):
+        service.register_server(name, sys.executable, _echo(0.6))
+    assert not service.ready
+
+    started = time.perf_counter()
+    status = await service.start_all()
+    elapsed = time.perf_counter() - started
+
+    assert status == {"a": "ready", "b": "ready", "c": "ready"}
+    assert elapsed < 1.5  # sequential would take > 1.8s
+    assert service.ready
+    result = await service.call_tool("b", "echo", {"x": 1})
+    assert result.content[0].text == '{"x": 1}'
+
+
+@pytest.mark.asyncio
+async def test_lazy_server_starts_once_on_first_use(service):
+    service.register_server("lazy", sys.executable, _echo(0.3), lazy=True)
+    await service.start_all()
+    assert service.status() == {"lazy": "idle"}
+    assert service.ready  # nothing eager left to wait for
+
+    tools, result = await asyncio.gather(
+        service.list_tools("lazy"),
+        service.call_tool("lazy", "echo", {"y": 2}),
+    )
+    tasks = [conn.task for conn in service._servers["lazy"].connections]
+    assert [t.name for t in tools] == ["echo", "crash"]
+    assert result.content[0].text == '{"y": 2}'
+    await service.list_tools("lazy")
+    assert [conn.task for conn in service._servers["lazy"].connections] == tasks  # both calls joined the same start
+    assert service.connected_servers() == ["lazy"]
+
+
+@pytest.mark.asyncio
+async def test_slow_or_broken_servers_fail_without_blocking_others(service):
+    service.register_server("slow", sys.executable, _echo(10), timeout=0.5)
+    service.register_server("broken", "/nonexistent/mcp-server", [])
+    service.register_server("ok", sys.executable, _echo())
+
+    started = time.perf_counter()
+    status = await service.start_all()
+    assert time.perf_counter() - started < 3
+
+    assert status["ok"] == "ready"
+    assert status["slow"] == "failed: timed out after 0.5s"
+    assert status["broken"].startswith("failed:")
+    assert service._servers["slow"].state == ServerState.FAILED
+    # The health endpoint is unauthenticated: states only, no raw errors
+    assert service.states() == {"slow": "failed", "broken": "failed", "ok": "ready"}
+    assert service.ready
+
+    with pytest.raises(ValueError):
+        await service.call_tool("unknown", "echo", {})
+
+
+@pytest.mark.asyncio
+async def test_pool_spreads_concurrent_calls_across_sessions(service):
+    service.register_server("loaded", sys.executable, _echo(call_delay=0.05), pool_size=4)
+    await service.start_all()
+    await asyncio.sleep(0.5)  # let every member finish connecting
+    assert service.pool_stats()["loaded"]["alive"] == 4
+    before = metrics.histogram("mcp_tool_call_seconds", server="loaded", tool="echo")
+    before = before.count if before else 0
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(service.call_tool("loaded", "echo", {"i": i}) for i in range(40)))
+    elapsed = time.perf_counter() - started
+
+    assert [r.content[0].text for r in results] == [f'{{"i": {i}}}' for i in range(40)]
+    assert elapsed < 1.2  # one pipe would serialize 40 x 50ms = 2s
+    assert metrics.histogram("mcp_tool_call_seconds", server="loaded", tool="echo").count == before + 40
+    assert service.pool_stats()["loaded"]["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_dead_child_is_restarted_and_tool_catalog_refreshed(service):
+    service.register_server("flaky", sys.executable, _echo(), pool_size=2, probe_interval=0.1)
+    await service.start_all()
+    await asyncio.sleep(0.3)
+    handle = service._servers["flaky"]
+    tools = await service.list_tools("flaky")
+    assert await service.list_tools("flaky") is tools  # served from the catalog cache
+    errors = metrics.counter("mcp_tool_calls_total", server="flaky", tool="crash", outcome="error")
+
+    with pytest.raises(Exception, match="Connection closed"):
+        await service.call_tool("flaky", "crash", {})
+    assert handle.reconnects == 1  # the failed call probed and replaced its member at once
+    assert handle.tools is None
+    assert metrics.counter("mcp_tool_calls_total", server="flaky", tool="crash", outcome="error") == errors + 1
+
+    result = await service.call_tool("flaky", "echo", {"after": "crash"})
+    assert result.content[0].text == '{"after": "crash"}'
+    await asyncio.sleep(0.5)
+    assert service.pool_stats()["flaky"]["alive"] == 2
+    assert await service.list_tools("flaky") is not tools
+    assert service.status()["flaky"] == "ready"
+
+
+@pytest.mark.asyncio
+async def test_child_exiting_right_after_ready_is_relaunched_for_the_waiter(service):
+    service.register_server("blip", sys.executable, _echo(), lazy=True)
+    handle = service._servers["blip"]
+    spawn = service._spawn
+
+    def exits_once(handle, slot):
+        if handle.reconnects:
+            return spawn(handle, slot)
+        conn = _Connection(slot)
+
+        async def connect_then_exit():
+            handle.state = ServerState.READY
+            handle.ready.set_result(None)  # ready fires, then the child is gone before the waiter runs
+
+        conn.task = asyncio.create_task(connect_then_exit())
+        return conn
+
+    service._spawn = exits_once
+    result = await service.call_tool("blip", "echo", {"z": 3})
+    assert result.content[0].text == '{"z": 3}'
+    assert handle.reconnects == 1
+
+    handle.connections[0].session = None
+    with pytest.raises(ConnectionError, match="no live session"):
+        service._pick(handle)
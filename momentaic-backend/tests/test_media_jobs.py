@@ -0,0 +1,156 @@
+"""
+Tests for the durable Media Job tracker (Kling / Imagen / TTS)
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from app.models.character import CharacterContentStatus
+from app.models.media_job import MediaJob, MediaJobProvider, MediaJobStatus
+from app.services.kling_service import KlingService
+from app.services.media_jobs import MediaJobService, _apply_to_character_content
+
+
+def _job(**overrides) -> MediaJob:
+    job = MediaJob(
+        id=uuid4(),
+        provider=MediaJobProvider.KLING,
+        job_type="video_generation",
+        external_task_id="task_123",
+        status=MediaJobStatus.PROCESSING,
+        poll_attempts=0,
+        callback="character_content",
+        callback_context={"field": "video_url"},
+    )
+    for key, value in overrides.items():
+        setattr(job, key, value)
+    return job
+
+
+def test_parse_task_result_avatar_works():
+    status, url = KlingService.parse_task_result({
+        "data": {"status": "completed", "output": {"works": [{"video": {"resource": "https://cdn/v.mp4"}}]}}
+    })
+    assert status == "completed"
+    assert url == "https://cdn/v.mp4"
+
+
+def test_parse_task_result_video_generation_and_pending():
+    assert KlingService.parse_task_result(
+        {"data": {"status": "completed", "output": {"video_url": "https://cdn/x.mp4"}}}
+    ) == ("completed", "https://cdn/x.mp4")
+    assert KlingService.parse_task_result({"data": {"status": "failed"}}) == ("failed", None)
+    assert KlingService.parse_task_result({"data": {"status": "processing"}}) == ("processing", None)
+
+
+def test_backoff_is_capped():
+    service = MediaJobService()
+    assert service._backoff(0) <= service._backoff(8)
+    assert service._backoff(100) == service.MAX_POLL_BACKOFF_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_callback_patches_character_content():
+    job = _job(status=MediaJobStatus.COMPLETED, result_url="https://cdn/final.mp4")
+    job.character_content_id = uuid4()
+
+    content = SimpleNamespace(
+        content_data={"media_urls": ["https://cdn/thumb.png"], "pending_media_jobs": [str(job.id)]},
+        generation_pipeline={"steps": [{"tool": "kling", "job_id": str(job.id), "status": "processing"}]},
+        status=CharacterContentStatus.GENERATING,
+    )
+    db = MagicMock()
+    db.get = AsyncMock(return_value=content)
+
+    await _apply_to_character_content(db, job)
+
+    assert content.content_data["video_url"] == "https://cdn/final.mp4"
+    assert content.content_data["media_urls"] == ["https://cdn/thumb.png", "https://cdn/final.mp4"]
+    assert content.content_data["pending_media_jobs"] == []
+    assert content.generation_pipeline["steps"][0]["status"] == "completed"
+    assert content.status == CharacterContentStatus.REVIEW
+
+
+@pytest.mark.asyncio
+async def test_kling_webhook_resolves_job_and_runs_callback():
+    service = MediaJobService()
+    handler = AsyncMock()
+    service.register_callback("character_content", handler)
+
+    job = _job()
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = job
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    with patch.object(service, "_broadcast", new_callable=AsyncMock) as mock_broadcast:
+        resolved = await service.handle_kling_webhook(db, {
+            "data": {
+                "task_id": "task_123",
+                "status": "completed",
+                "output": {"video_url": "https://cdn/hook.mp4"},
+            }
+        })
+
+    assert resolved is job
+    assert job.status == MediaJobStatus.COMPLETED
+    assert job.result_url == "https://cdn/hook.mp4"
+    assert job.next_poll_at is None
+    handler.assert_awaited_once_with(db, job)
+    mock_broadcast.assert_awaited_once_with(job)
+
+
+@pytest.mark.asyncio
+async def test_kling_webhook_ignores_finished_jobs():
+    service = MediaJobService()
+    job = _job(status=MediaJobStatus.COMPLETED, result_url="https://cdn/first.mp4")
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = job
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+
+    await service.handle_kling_webhook(db, {"data": {"task_id": "task_123", "status": "failed"}})
+
+    assert job.status == MediaJobStatus.COMPLETED
+    assert job.result_url == "https://cdn/first.mp4"
+
+
+@pytest.mark.asyncio
+async def test_attach_locks_rows_and_replays_finished_callbacks():
+    service = MediaJobService()
+    handler = AsyncMock()
+    service.register_callback("character_content", handler)
+    job = _job(status=MediaJobStatus.COMPLETED, result_url="https://cdn/final.mp4")
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = [job]
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    db.flush = AsyncMock()
+    content_id = uuid4()
+
+    await service.attach_to_content(db, [str(job.id)], content_id)
+
+    assert "FOR UPDATE" in str(db.execute.await_args.args[0])
+    assert job.character_content_id == content_id
+    handler.assert_awaited_once_with(db, job)
+
+
+@pytest.mark.asyncio
+async def test_media_webhook_requires_a_configured_secret():
+    from fastapi import HTTPException
+
+    from app.api.v1.endpoints.webhooks import media_job_webhook
+
+    request = MagicMock()
+    request.json = AsyncMock(return_value={"data": {"task_id": "task_123", "status": "completed"}})
+    with patch("app.api.v1.endpoints.webhooks.settings", SimpleNamespace(piapi_webhook_secret=None)):
+        with pytest.raises(HTTPException) as unset:
+            await media_job_webhook("kling", request, x_webhook_secret="", db=MagicMock())
+    with patch("app.api.v1.endpoints.webhooks.settings", SimpleNamespace(piapi_webhook_secret="s3cret")):
+        with pytest.raises(HTTPException) as wrong:
+            await media_job_webhook("kling", request, x_webhook_secret="guess", db=MagicMock())
+
+    assert unset.value.status_code == wrong.value.status_code == 401
+    request.json.assert_not_awaited()
@@ -0,0 +1,190 @@
+"""
+Tests for concurrent, checkpointed MorningBrief generation
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+
+from app.core.metrics import metrics
+from app.services import morning_brief as brief_module
+from app.services.morning_brief import MorningBriefService
+from tests.fake_redis import FakeRedis
+
+RUN = "2026-10-18"
+
+
+def _sessions(committed=False):
+    """async_session_maker stand-in handing out a fresh session per call."""
+    created = []
+
+    def factory():
+        session = MagicMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=False)
+        session.get = AsyncMock(side_effect=lambda model, startup_id: SimpleNamespace(id=startup_id, owner_id=None, name="S"))
+        session.commit = AsyncMock()
+        session.execute = AsyncMock(return_value=MagicMock(scalar=MagicMock(return_value=committed)))
+        created.append(session)
+        return session
+
+    return factory, created
+
+
+@pytest.mark.asyncio
+async def test_startups_are_briefed_concurrently_on_their_own_sessions():
+    startup_ids = [uuid4() for _ in range(6)]
+    running, peak, sessions_used = [0], [0], set()
+
+    async def process(db, startup):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        sessions_used.add(id(db))
+        await asyncio.sleep(0.1)
+        running[0] -= 1
+        return {"subject": f"brief {startup.id}", "body": "b"}
+
+    service = MorningBriefService(concurrency=3, startup_timeout=5)
+    factory, created = _sessions()
+    notify = AsyncMock(return_value=True)
+    with patch.object(brief_module, "redis_client", FakeRedis()), \
+         patch.object(brief_module, "async_session_maker", factory), \
+         patch.object(service, "_eligible_startups", AsyncMock(return_value=startup_ids)), \
+         patch.object(service, "process_startup", side_effect=process), \
+         patch.object(service, "_notify", notify):
+        started = time.perf_counter()
+        summary = await service.generate_daily_brief(RUN)
+        elapsed = time.perf_counter() - started
+
+    assert summary["generated"] == 6 and summary["failed"] == summary["timeout"] == 0
+    assert peak[0] == 3 and elapsed < 0.35        # serial: 0.6s
+    assert len(sessions_used) == 6 and len(created) == 6
+    assert notify.await_count == 6
+
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_startup_only_affects_its_own_brief():
+    metrics.reset()
+    slow, broken, fine = uuid4(), uuid4(), uuid4()
+
+    async def process(db, startup):
+        if startup.id == slow:
+            await asyncio.sleep(10)
+        if startup.id == broken:
+            raise RuntimeError("LLM quota exceeded")
+        return None
+
+    service = MorningBriefService(concurrency=3, startup_timeout=0.1)
+    fake_redis = FakeRedis()
+    factory, _ = _sessions()
+    with patch.object(brief_module, "redis_client", fake_redis), \
+         patch.object(brief_module, "async_session_maker", factory), \
+         patch.object(service, "_eligible_startups", AsyncMock(return_value=[slow, broken, fine])), \
+         patch.object(service, "process_startup", side_effect=process):
+        summary = await service.generate_daily_brief(RUN)
+
+    assert (summary["generated"], summary["failed"], summary["timeout"]) == (1, 1, 1)
+    assert summary["duration_seconds"] < 1
+    assert set(fake_redis.data[f"morning_brief:{RUN}"]) == {str(fine)}   # failures are retried next run
+    assert metrics.counter("morning_brief_startups_total", result="timeout") == 1
+    assert metrics.counter("morning_brief_startups_total", result="failed") == 1
+    assert metrics.histogram("morning_brief_run_seconds").count == 1
+    assert metrics.histogram("morning_brief_startup_seconds").count == 3
+
+
+@pytest.mark.asyncio
+async def test_resumed_run_skips_committed_briefs_and_only_resends_notifications():
+    done, generated, crashed = uuid4(), uuid4(), uuid4()
+    fake_redis = FakeRedis()
+    key = f"morning_brief:{RUN}"
+    await fake_redis.hset(key, str(done), json.dumps({"state": "notified"}))
+    await fake_redis.hset(key, str(generated), json.dumps(
+        {"state": "generated", "notification": {"subject": "pending", "body": "b"}}
+    ))
+
+    service = MorningBriefService(concurrency=4, startup_timeout=5)
+    factory, _ = _sessions()
+    process = AsyncMock(return_value={"subject": "fresh", "body": "b"})
+    notify = AsyncMock(return_value=True)
+    with patch.object(brief_module, "redis_client", fake_redis), \
+         patch.object(brief_module, "async_session_maker", factory), \
+         patch.object(service, "_eligible_startups", AsyncMock(return_value=[done, generated, crashed])), \
+         patch.object(service, "process_startup", process), \
+         patch.object(service, "_notify", notify):
+        summary = await service.generate_daily_brief(RUN)
+        assert (summary["skipped"], summary["resumed"], summary["generated"]) == (1, 1, 1)
+        assert [call.args[1].id for call in process.await_args_list] == [crashed]
+        assert sorted(call.args[2]["subject"] for call in notify.await_args_list) == ["fresh", "pending"]
+
+        again = await service.generate_daily_brief(RUN)
+        assert again["skipped"] == 3 and process.await_count == 1
+
+    assert all(json.loads(v) == {"state": "notified"} for v in fake_redis.data[key].values())
+
+
+@pytest.mark.asyncio
+async def test_overlapping_runs_for_the_same_day_do_not_both_generate():
+    startup_id = uuid4()
+    gate = asyncio.Event()
+
+    async def process(db, startup):
+        await gate.wait()
+        return {"subject": "brief", "body": "b"}
+
+    service = MorningBriefService(concurrency=2, startup_timeout=5)
+    fake_redis = FakeRedis()
+    factory, _ = _sessions()
+    process_mock = AsyncMock(side_effect=process)
+    with patch.object(brief_module, "redis_client", fake_redis), \
+         patch.object(brief_module, "async_session_maker", factory), \
+         patch.object(service, "_eligible_startups", AsyncMock(return_value=[startup_id])), \
+         patch.object(service, "process_startup", process_mock), \
+         patch.object(service, "_notify", AsyncMock(return_value=True)):
+        first = asyncio.create_task(service.generate_daily_brief(RUN))
+        await asyncio.sleep(0.01)
+        assert fake_redis.ttls[f"morning_brief:{RUN}:lock"] == brief_module.RUN_LOCK_TTL_SECONDS
+        assert await service.generate_daily_brief(RUN) == {"run": RUN, "in_progress": True}
+        gate.set()
+        assert (await first)["generated"] == 1
+
+        assert f"morning_brief:{RUN}:lock" not in fake_redis.data        # released by its owner
+        assert (await service.generate_daily_brief(RUN))["skipped"] == 1
+    assert process_mock.await_count == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("committed", [True, False])
+async def test_run_cut_off_between_commit_and_checkpoint_checks_the_database(committed):
+    startup_id = uuid4()
+    fake_redis = FakeRedis()
+    key = f"morning_brief:{RUN}"
+    await fake_redis.hset(key, str(startup_id), json.dumps(
+        {"state": "committing", "since": "2026-10-18T06:00:00", "notification": {"subject": "cut off", "body": "b"}}
+    ))
+
+    service = MorningBriefService(concurrency=1, startup_timeout=5)
+    factory, created = _sessions(committed=committed)
+    process = AsyncMock(return_value={"subject": "fresh", "body": "b"})
+    notify = AsyncMock(return_value=True)
+    with patch.object(brief_module, "redis_client", fake_redis), \
+         patch.object(brief_module, "async_session_maker", factory), \
+         patch.object(service, "_eligible_startups", AsyncMock(return_value=[startup_id])), \
+         patch.object(service, "process_startup", process), \
+         patch.object(service, "_notify", notify):
+        summary = await service.generate_daily_brief(RUN)
+
+    sql = str(created[0].execute.await_args.args[0])
+    assert "action_items.source_agent IN" in sql and "action_items.created_at >=" in sql
+    if committed:
+        assert summary["resumed"] == 1 and process.await_count == 0
+        assert notify.await_args.args[2]["subject"] == "cut off"
+    else:
+        assert summary["generated"] == 1 and process.await_count == 1
+        assert created[0].commit.await_count == 1
+        assert notify.await_args.args[2]["subject"] == "fresh"
+    assert json.loads(fake_redis.data[key][str(startup_id)]) == {"state": "notified"}
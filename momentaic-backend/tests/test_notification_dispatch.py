@@ -0,0 +1,130 @@
+"""
+Tests for queued, coalesced notification delivery and the async Web Push sender
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.services import delayed_jobs as delayed_jobs_module
+from app.services import notification_dispatch as dispatch_module
+from app.services.notification_dispatch import NotificationDispatcher, WebPushSender
+from tests.fake_redis import FakeRedis
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with patch.object(dispatch_module, "redis_client", fake), \
+            patch.object(delayed_jobs_module, "redis_client", fake):
+        yield fake
+
+
+def _session(*results):
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.execute = AsyncMock(side_effect=list(results))
+    session.commit = AsyncMock()
+    return session
+
+
+def _scalars(items):
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = items
+    return result
+
+
+@pytest.mark.asyncio
+async def test_notifications_in_one_window_go_out_as_one_digest(redis):
+    user = SimpleNamespace(id=uuid4(), email="founder@example.com")
+    live = SimpleNamespace(id="sub-live", user_id=user.id, endpoint="https://push.example/a", p256dh="k", auth="a")
+    gone = SimpleNamespace(id="sub-gone", user_id=user.id, endpoint="https://push.example/b", p256dh="k", auth="a")
+
+    sender = MagicMock()
+    sender.send_many = AsyncMock(return_value={"sub-live": 201, "sub-gone": 410})
+    dispatcher = NotificationDispatcher(sender)
+    for i in range(3):
+        await dispatcher.enqueue(str(user.id), f"Update {i}", f"Body {i}\nmore")
+
+    assert await redis.zcard("delayed:notification_flush:due") == 1
+    assert await dispatcher.flush_due() == {"claimed": 0, "completed": 0, "retried": 0, "dropped": 0}
+
+    reads = _session(_scalars([user]), _scalars([live, gone]))
+    prune = _session(MagicMock())
+    send_email = AsyncMock(return_value=True)
+    later = time.time() + dispatch_module.DIGEST_WINDOW_SECONDS + 1
+    with patch.object(dispatch_module, "async_session_maker", side_effect=[reads, prune]), \
+            patch.object(dispatch_module.email_service, "send_email", send_email), \
+            patch.object(delayed_jobs_module.time, "time", return_value=later):
+        summary = await dispatcher.flush_due()
+
+    assert summary["completed"] == 1
+    send_email.assert_awaited_once()
+    assert send_email.await_args.kwargs["subject"] == "3 new updates"
+    assert "• Update 2: Body 2" in send_email.await_args.kwargs["body"]
+    pushes = sender.send_many.await_args.args[0]
+    assert [key for key, _, _ in pushes] == ["sub-live", "sub-gone"]
+    prune.execute.assert_awaited_once()  # one bulk DELETE for the 410
+    prune.commit.assert_awaited_once()
+    assert await redis.lrange(f"notify:pending:{user.id}", 0, -1) == []
+
+
+def test_single_notification_is_sent_unchanged():
+    items = [{"subject": "Found 3 New Leads", "body": "Details", "url": "https://x/growth"}]
+    assert NotificationDispatcher.compose(items) == ("Found 3 New Leads", "Details", "https://x/growth")
+
+
+@pytest.mark.asyncio
+async def test_web_push_sender_caches_vapid_and_encrypts_off_loop():
+    sender = WebPushSender(private_key="unused", claims={"sub": "mailto:ops@example.com"})
+    signer = MagicMock()
+    signer.sign.side_effect = lambda claims: {"Authorization": f"vapid aud={claims['aud']}"}
+    sender._vapid = signer
+
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(410 if request.url.path == "/gone" else 201)
+
+    sender._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    pushes = [
+        ("a", {"endpoint": "https://fcm.example/one"}, "{}"),
+        ("b", {"endpoint": "https://fcm.example/gone"}, "{}"),
+        ("c", {"endpoint": "https://mozilla.example/two"}, "{}"),
+    ]
+    with patch.object(dispatch_module, "_encrypt", return_value={"body": b"cipher"}) as encrypt, \
+            patch.object(dispatch_module.asyncio, "to_thread", wraps=dispatch_module.asyncio.to_thread) as to_thread:
+        statuses = await sender.send_many(pushes)
+        await sender.send_many(pushes[:1])
+
+    assert statuses == {"a": 201, "b": 410, "c": 201}
+    assert signer.sign.call_count == 2  # one per push-service origin
+    assert to_thread.call_count == encrypt.call_count == 4
+    assert seen[0].headers["authorization"] == "vapid aud=https://fcm.example"
+    assert seen[0].headers["content-encoding"] == "aes128gcm"
+    await sender.close()
+
+
+@pytest.mark.asyncio
+async def test_notify_user_sends_concurrently_and_prunes_expired():
+    from app.services import notification_service as notification_module
+    from app.services.notification_service import NotificationService
+
+    user = SimpleNamespace(id=uuid4(), email="founder@example.com")
+    subs = [SimpleNamespace(id=f"s{i}", endpoint=f"https://push.example/{i}", p256dh="k", auth="a") for i in range(3)]
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[_scalars(subs), MagicMock()])
+    sender = MagicMock()
+    sender.send_many = AsyncMock(return_value={"s0": 201, "s1": 404, "s2": 0})
+
+    with patch.object(notification_module, "web_push_sender", sender), \
+            patch.object(notification_module.email_service, "send_email", AsyncMock(return_value=True)):
+        results = await NotificationService().notify_user(user, "Hi", "Body", db=db)
+
+    assert results == {"email": True, "push": 1}
+    assert db.execute.await_count == 2  # subscriptions + one DELETE
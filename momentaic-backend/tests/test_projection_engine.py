@@ -0,0 +1,110 @@
+"""
+Tests for the Monte Carlo projection engine behind FinanceCFOAgent
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from app.agents.finance_cfo_agent import FinanceCFOAgent
+from app.services import projection_engine
+from app.services.projection_engine import project_metrics, simulate_projections, starting_cash
+
+
+def test_zero_volatility_matches_closed_form():
+    result = simulate_projections(mrr=10_000, burn=50_000, cash=200_000, growth=0.10, months=12,
+                                  paths=50, growth_sd=0, burn_sd=0, seed=0)
+    expected_mrr = 10_000 * 1.1 ** np.arange(1, 13)
+    assert result["mrr"]["p10"] == result["mrr"]["p90"]
+    assert result["mrr"]["p50"] == pytest.approx(expected_mrr, abs=0.01)
+
+    # Cash after m months: 200k + sum(mrr) - 50k * m; goes negative in month 6
+    expected_cash = 200_000 + np.cumsum(expected_mrr) - 50_000 * np.arange(1, 13)
+    assert result["cash"]["p50"] == pytest.approx(expected_cash, abs=0.01)
+    assert result["runway"]["p50"] == int(np.argmax(expected_cash < 0)) + 1 == 6
+    assert result["runway"]["histogram"][5] == 50 and result["runway"]["prob_out_of_cash"] == 1.0
+
+
+def test_bands_are_ordered_and_runway_distribution_is_complete():
+    result = simulate_projections(mrr=20_000, burn=60_000, cash=500_000, growth=0.08, churn=0.03,
+                                  months=36, paths=5000, seed=1)
+    for series in ("mrr", "burn", "cash"):
+        bands = result[series]
+        assert all(lo <= mid <= hi for lo, mid, hi in zip(bands["p10"], bands["p50"], bands["p90"], strict=True))
+    runway = result["runway"]
+    assert sum(runway["histogram"]) + runway["beyond_horizon"] == 5000
+    assert runway["p10"] <= runway["p50"]
+    assert 0 < runway["prob_out_of_cash"] < 1
+    assert "runway" not in simulate_projections(mrr=1, burn=1, cash=None, growth=0.1, paths=10)
+
+    # Same seed, same paths
+    again = simulate_projections(mrr=20_000, burn=60_000, cash=500_000, growth=0.08, churn=0.03,
+                                 months=36, paths=5000, seed=1)
+    assert again["cash"] == result["cash"]
+
+
+def test_project_metrics_caches_per_metrics_hash(monkeypatch):
+    monkeypatch.setattr(projection_engine, "_cache", projection_engine.OrderedDict())
+    metrics = {"mrr": 15_000, "burn_rate": 40_000, "runway_months": 10, "growth_rate": 12, "churn_rate": 2}
+    assert starting_cash(metrics) == 250_000
+
+    first = project_metrics(metrics, months=24, paths=2000)
+    assert project_metrics(dict(metrics), months=24, paths=2000) is first       # cache hit
+    projection_engine._cache.clear()
+    assert project_metrics(metrics, months=24, paths=2000)["mrr"] == first["mrr"]  # seed derived from the hash
+
+    optimistic = project_metrics(metrics, months=24, scenario="optimistic", paths=2000)
+    assert optimistic is not first and optimistic["mrr"]["p50"][-1] > first["mrr"]["p50"][-1]
+    assert project_metrics(metrics, months=24, paths=2000, seed=7) is not first
+
+    # Same inputs, different scenario label: separate entries, same seeded bands
+    no_growth = dict(metrics, growth_rate=0)
+    base = project_metrics(no_growth, months=12, paths=500)
+    pessimistic = project_metrics(no_growth, months=12, scenario="pessimistic", paths=500)
+    assert (base["scenario"], pessimistic["scenario"]) == ("base", "pessimistic")
+    assert pessimistic["mrr"] == base["mrr"]
+
+
+def test_project_metrics_cache_is_safe_across_threads(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    monkeypatch.setattr(projection_engine, "_cache", projection_engine.OrderedDict())
+    monkeypatch.setattr(projection_engine, "PROJECTION_CACHE_MAX_ENTRIES", 8)
+    runs = [({"mrr": 1000 + i % 12, "burn_rate": 5000, "cash": 50_000}, scenario)
+            for i in range(96) for scenario in ("base", "optimistic")]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda run: project_metrics(run[0], months=6, scenario=run[1], paths=200), runs))
+
+    assert [r["scenario"] for r in results] == [scenario for _, scenario in runs]
+    assert len(projection_engine._cache) == 8
+
+
+@pytest.mark.asyncio
+async def test_create_projection_returns_bands_and_prompts_with_runway():
+    agent = FinanceCFOAgent.__new__(FinanceCFOAgent)  # skip LLM construction
+    agent.config = {"system_prompt": "cfo"}
+    agent.llm = SimpleNamespace(ainvoke=AsyncMock(return_value=SimpleNamespace(content="narrative")))
+
+    result = await agent.create_projection({"mrr": 10_000, "burn_rate": 45_000, "cash": 300_000}, months=18)
+
+    prompt = agent.llm.ainvoke.call_args.args[0][1].content
+    assert "Monte Carlo simulation (10,000 paths)" in prompt and "Runway: P10" in prompt
+    assert len(result["projections"]) == 18
+    row = result["projections"][-1]
+    assert row["mrr_p10"] <= row["mrr"] <= row["mrr_p90"] and row["arr"] == pytest.approx(row["mrr"] * 12)
+    assert result["simulation"]["runway"]["beyond_horizon"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_create_projection_returns_error_dict_for_unusable_metrics():
+    agent = FinanceCFOAgent.__new__(FinanceCFOAgent)
+    agent.config = {"system_prompt": "cfo"}
+    agent.llm = SimpleNamespace(ainvoke=AsyncMock())
+
+    result = await agent.create_projection({"mrr": "n/a"})
+
+    assert result["error"] is True and result["projections"] == []
+    agent.llm.ainvoke.assert_not_awaited()
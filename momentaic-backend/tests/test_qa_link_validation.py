@@ -0,0 +1,111 @@
+"""
+Tests for concurrent, cached link validation in QATesterAgent
+"""
+
+import asyncio
+import time
+from collections import Counter
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.agents.qa_tester_agent import QAReport, QATesterAgent
+from app.services import link_checker as checker_module
+from app.services.link_checker import LinkChecker, LinkStatus
+
+
+def _checker(handler, **kwargs):
+    checker = LinkChecker(**kwargs)
+    checker._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return checker
+
+
+@pytest.mark.asyncio
+async def test_links_are_checked_concurrently_within_per_host_limits():
+    running, peak, seen = Counter(), Counter(), Counter()
+
+    async def handler(request):
+        host = request.url.host
+        running[host] += 1
+        peak[host] = max(peak[host], running[host])
+        seen[(request.method, str(request.url))] += 1
+        await asyncio.sleep(0.1)
+        running[host] -= 1
+        return httpx.Response(200)
+
+    checker = _checker(handler, per_host=3)
+    urls = [f"https://{host}.example/p{i}" for host in ("a", "b") for i in range(9)]
+    started = time.perf_counter()
+    statuses = await checker.check_many(urls + urls[:4])
+    elapsed = time.perf_counter() - started
+    await checker.close()
+
+    assert set(statuses) == set(urls) and not any(s.broken for s in statuses.values())
+    assert peak == {"a.example": 3, "b.example": 3}
+    assert elapsed < 0.6  # serial HEADs would take 1.8s
+    assert len(seen) == len(urls) and all(count == 1 for count in seen.values())
+
+
+@pytest.mark.asyncio
+async def test_get_fallback_and_ttl_cache_shared_across_pages():
+    calls = []
+
+    def handler(request):
+        calls.append((request.method, request.url.path))
+        if request.url.path == "/no-head":
+            return httpx.Response(405 if request.method == "HEAD" else 200)
+        if request.url.path == "/gone":
+            return httpx.Response(404)
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200)
+
+    checker = _checker(handler)
+    page_one = ["https://s.example/no-head", "https://s.example/gone", "https://s.example/down", "https://s.example/ok"]
+    first = await checker.check_many(page_one)
+    assert first["https://s.example/no-head"] == LinkStatus(200)
+    assert first["https://s.example/gone"].status_code == 404
+    assert first["https://s.example/down"].status_code == 0 and "refused" in first["https://s.example/down"].error
+    assert ("GET", "/no-head") in calls and ("GET", "/ok") not in calls
+
+    calls.clear()
+    await checker.check_many(page_one[1:] + ["https://s.example/new"])  # second page, same worker
+    assert calls == [("HEAD", "/new")]
+
+    with patch.object(checker_module, "LINK_CACHE_TTL_SECONDS", -1):
+        checker._cache.clear()
+        await checker.check("https://s.example/ok")
+        await checker.check("https://s.example/ok")
+    assert calls.count(("HEAD", "/ok")) == 2  # expired entries are re-checked
+    await checker.close()
+
+
+@pytest.mark.asyncio
+async def test_validate_links_reports_broken_links_in_page_order():
+    agent = QATesterAgent()
+    agent._page = MagicMock()
+    agent._page.evaluate = AsyncMock(return_value=[
+        {"href": "https://s.example/ok", "text": "Home"},
+        {"href": "mailto:hi@s.example", "text": "Mail"},
+        {"href": "https://s.example/gone", "text": "Old post"},
+        {"href": "https://s.example/gone", "text": "Old post again"},
+        {"href": "https://down.example/", "text": "Partner"},
+    ])
+    statuses = {
+        "https://s.example/ok": LinkStatus(200),
+        "https://s.example/gone": LinkStatus(404),
+        "https://down.example/": LinkStatus(0, error="timed out"),
+    }
+    check_many = AsyncMock(return_value=statuses)
+    report = QAReport(url="https://s.example", audit_timestamp="now")
+
+    with patch.object(checker_module.link_checker, "check_many", check_many):
+        await agent._validate_links(report)
+
+    assert "mailto:hi@s.example" not in check_many.call_args.args[0] and len(check_many.call_args.args[0]) == 4
+    assert [(b.url, b.text, b.status_code, b.error) for b in report.broken_links] == [
+        ("https://s.example/gone", "Old post", 404, None),
+        ("https://s.example/gone", "Old post again", 404, None),
+        ("https://down.example/", "Partner", 0, "timed out"),
+    ]
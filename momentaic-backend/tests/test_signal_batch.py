@@ -0,0 +1,176 @@
+"""
+Tests for the vectorized batch signal / traction scoring engine
+"""
+
+import asyncio
+import random
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import httpx
+import numpy as np
+import pytest
+
+from app.api.v1.endpoints.signals import calculate_signal
+from app.services import signal_batch as batch_module
+from app.services.signal_batch import (
+    BatchSignalEngine, GitHubParticipationFetcher, MetricColumns, compute_signal_components,
+)
+from app.services.traction_score import TractionScoreEngine, percentile_ranks
+from tests.fake_redis import FakeRedis
+
+SIGNAL_COMPONENTS = ("tech_velocity", "pmf_score", "growth_momentum", "runway_health", "overall_score")
+
+
+def _random_metrics(rng: random.Random) -> dict:
+    pool = {
+        "dau": lambda: rng.randint(0, 5000), "mau": lambda: rng.choice([0, rng.randint(1, 20000)]),
+        "nps": lambda: rng.randint(-100, 100), "mrr": lambda: rng.choice([0, rng.uniform(0, 200000)]),
+        "mrr_prev_month": lambda: rng.choice([0, rng.uniform(0, 200000)]),
+        "runway_months": lambda: rng.uniform(0, 30), "burn_rate": lambda: rng.uniform(0, 50000),
+        "mrr_growth": lambda: rng.uniform(-10, 60), "ltv": lambda: rng.uniform(0, 5000),
+        "cac": lambda: rng.choice([0, rng.uniform(1, 1000)]), "user_growth": lambda: rng.uniform(-5, 80),
+        "waitlist": lambda: rng.randint(0, 20000), "social_growth": lambda: rng.uniform(-10, 150),
+        "retention_d30": lambda: rng.uniform(0, 50),
+        "mrr_wow": lambda: rng.choice([0, rng.uniform(-30, 40)]),
+        "users_wow": lambda: rng.choice([0, rng.uniform(-30, 40)]),
+        "engagement_wow": lambda: rng.choice([0, rng.uniform(-30, 40)]),
+    }
+    keys = rng.sample(sorted(pool), rng.randint(0, len(pool)))
+    return {k: pool[k]() for k in keys}
+
+
+def _rows(snapshots, repos=None):
+    repos = repos or [None] * len(snapshots)
+    return [(uuid4(), f"Startup {i}", repos[i], m) for i, m in enumerate(snapshots)]
+
+
+@pytest.mark.asyncio
+async def test_vectorized_signals_match_per_startup_calculation():
+    rng = random.Random(7)
+    snapshots = [_random_metrics(rng) for _ in range(300)] + [{}, {"mau": 0}, {"runway_months": 3}]
+    columns = MetricColumns.from_rows(_rows(snapshots))
+    n = len(columns)
+
+    batch = compute_signal_components(columns, np.zeros(n), np.zeros(n), np.zeros(n, dtype=bool))
+
+    for i, snapshot in enumerate(snapshots):
+        startup = SimpleNamespace(id=uuid4(), name="x", github_repo=None, metrics=snapshot)
+        expected = await calculate_signal(startup, db=None, include_github=False)
+        for name in SIGNAL_COMPONENTS:
+            assert round(float(batch[name][i]), 2) == getattr(expected, name), (name, snapshot)
+
+
+def test_tech_velocity_from_commit_columns():
+    columns = MetricColumns.from_rows(_rows([{}] * 5, repos=["a/b", "a/b", "a/b", "a/b", None]))
+    batch = compute_signal_components(
+        columns,
+        commits_7d=np.array([30.0, 5.0, 4.0, 0.0, 99.0]),
+        commits_prev_7d=np.array([10.0, 10.0, 0.0, 0.0, 1.0]),
+        has_github=np.array([True, True, True, True, False]),
+    )
+    assert batch["tech_velocity"].tolist() == [100.0, 25.0, 75.0, 25.0, 50.0]
+
+
+def test_batch_traction_matches_per_startup_scores():
+    rng = random.Random(11)
+    snapshots = [_random_metrics(rng) for _ in range(500)]
+    engine = TractionScoreEngine()
+    columns = MetricColumns.from_rows(_rows(snapshots))
+
+    batch = engine.calculate_scores_batch(
+        {name: columns.get(name, default) for name, default in engine.BATCH_INPUTS.items()}
+    )
+
+    for i, snapshot in enumerate(snapshots):
+        expected = engine.calculate_score(snapshot)
+        assert round(float(batch["overall_score"][i]), 1) == expected.overall_score, snapshot
+        assert round(float(batch["revenue_score"][i]), 1) == expected.revenue_score
+        assert round(float(batch["momentum_score"][i]), 1) == expected.momentum_score
+        assert batch["tier"][i] == expected.tier
+
+
+def test_percentiles_are_true_ranks_with_ties():
+    ranks = percentile_ranks(np.array([10.0, 50.0, 50.0, 90.0]))
+    assert ranks.tolist() == [0.0, 25.0, 25.0, 75.0]
+    assert percentile_ranks(np.array([])).tolist() == []
+
+
+@pytest.mark.asyncio
+async def test_github_fetches_are_concurrent_and_revalidate_with_etags():
+    in_flight, peak, seen_etags = 0, 0, []
+
+    async def handler(request: httpx.Request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"all": [1, 2, 8, 4]}, headers={"ETag": '"v1"'})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    fetcher = GitHubParticipationFetcher(concurrency=3, http_client=client)
+    repos = [f"org/repo{i}" for i in range(9)] + [None]
+
+    with patch.object(batch_module, "redis_client", FakeRedis()):
+        first = await fetcher.fetch_many(repos)
+        second = await fetcher.fetch_many(repos)
+    await client.aclose()
+
+    assert peak == 3
+    assert first[0].tolist() == second[0].tolist() == [4.0] * 9 + [0.0]
+    assert first[1].tolist()[:9] == [8.0] * 9
+    assert seen_etags[:9] == [None] * 9 and seen_etags[9:] == ['"v1"'] * 9
+
+
+@pytest.mark.asyncio
+async def test_run_bulk_inserts_signal_rows_in_chunks():
+    rng = random.Random(3)
+    columns = MetricColumns.from_rows(_rows([_random_metrics(rng) for _ in range(12)], repos=["o/r"] + [None] * 11))
+    fetcher = MagicMock()
+    fetcher.fetch_many = AsyncMock(return_value=(np.full(12, 6.0), np.full(12, 3.0)))
+    engine = BatchSignalEngine(fetcher=fetcher)
+
+    session = MagicMock()
+    session.__aenter__.return_value = session
+    session.execute = AsyncMock()
+    session.commit = AsyncMock()
+
+    with patch.object(engine, "load_columns", new_callable=AsyncMock, return_value=columns), \
+         patch.object(batch_module, "AsyncSessionLocal", return_value=session), \
+         patch.object(batch_module, "INSERT_CHUNK_SIZE", 5):
+        summary = await engine.run()
+
+    assert summary["calculated"] == 12 and summary["github_repos"] == 1
+    inserted = [call.args[1] for call in session.execute.await_args_list]
+    assert [len(chunk) for chunk in inserted] == [5, 5, 2]
+    first = inserted[0][0]
+    assert first["startup_id"] == columns.startup_ids[0]
+    assert first["raw_data"]["commits_7d"] == 6 and first["tech_velocity"] == 100.0
+    assert set(first["raw_data"]["traction"]) == {"score", "percentile", "tier"}
+    session.commit.assert_awaited_once()
+
+
+def test_insights_and_recommendations_match_per_startup_text():
+    from app.api.v1.endpoints.signals import generate_insights, generate_recommendations
+
+    rng = random.Random(5)
+    snapshots = [_random_metrics(rng) for _ in range(200)]
+    repos = [rng.choice([None, "o/r"]) for _ in snapshots]
+    columns = MetricColumns.from_rows(_rows(snapshots, repos=repos))
+    n = len(columns)
+    commits_7d = np.array([float(rng.randint(0, 20)) for _ in range(n)])
+    commits_prev = np.array([float(rng.randint(0, 20)) for _ in range(n)])
+    engine = BatchSignalEngine(fetcher=MagicMock())
+
+    scores = engine.score(columns, commits_7d, commits_prev)
+    rows = engine.build_rows(columns, scores, commits_7d, commits_prev)
+
+    for i, row in enumerate(rows):
+        values = [scores[name][i] for name in ("tech_velocity", "pmf_score", "growth_momentum", "runway_health")]
+        assert row["ai_insights"] == generate_insights(*values, SimpleNamespace(name=columns.names[i]))
+        assert row["recommendations"] == generate_recommendations(*values)
@@ -0,0 +1,135 @@
+"""
+Tests for the vectorized stats engine behind DataAnalystAgent, checked against reference values
+"""
+
+import numpy as np
+import pytest
+
+from app.agents.data_analyst_agent import DataAnalystAgent
+from app.services.stats_engine import (
+    bootstrap_ci,
+    bootstrap_lift_ci,
+    find_anomalies,
+    normal_sf,
+    robust_zscores,
+    rolling_robust_zscores,
+    sequential_test,
+    two_proportion_ztest,
+)
+
+
+def test_two_proportion_ztest_matches_reference():
+    # R: prop.test(c(250, 200), c(1000, 1000), correct = FALSE)
+    #    X-squared = 7.1685, p-value = 0.007419, 95% CI 0.01346 .. 0.08654
+    result = two_proportion_ztest(200, 1000, 250, 1000)
+    assert result["z_score"] ** 2 == pytest.approx(7.1685, abs=1e-4)
+    assert result["p_value"] == pytest.approx(0.007419, abs=1e-6)
+    assert (result["ci_low"], result["ci_high"]) == pytest.approx((0.013464, 0.086536), abs=1e-6)
+    assert result["lift"] == pytest.approx(0.25)
+    assert result["significant"] is True
+    assert normal_sf(1.959963984540054) == pytest.approx(0.025)
+
+    # Vectorized over many tests at once
+    batch = two_proportion_ztest([200, 100], [1000, 1000], [250, 104], [1000, 1000])
+    assert batch["p_value"][0] == pytest.approx(0.007419, abs=1e-6)
+    assert batch["significant"].tolist() == [True, False]
+
+
+def test_robust_zscores_match_hand_computed_values():
+    z = robust_zscores([1, 2, 3, 4, 100])  # median 3, MAD 1
+    assert z.tolist() == pytest.approx([-1.34898, -0.67449, 0.0, 0.67449, 65.42550], abs=1e-5)
+    # MAD is 0 when most points are equal: falls back to the mean absolute deviation
+    flat = robust_zscores([5, 5, 5, 5, 9])
+    assert flat[-1] == pytest.approx(0.7978845608 * 4 / 0.8)
+    assert robust_zscores([7, 7, 7]).tolist() == [0, 0, 0]
+
+
+def test_rolling_anomalies_find_spikes_under_trend_and_level_shift():
+    rng = np.random.default_rng(7)
+    n = 20_000
+    series = np.linspace(0, 500, n) + rng.normal(0, 1, n)
+    series[12_000:] += 50                   # level shift
+    spikes = [1_000, 8_500, 15_000]
+    series[spikes] += [12, -12, 15]
+
+    z, baseline = rolling_robust_zscores(series, 30)
+    assert np.isnan(z[:30]).all() and not np.isnan(z[30:]).any()
+    flagged = {a["index"] for a in find_anomalies(series, window=30, threshold=6)}
+    assert set(spikes) <= flagged
+    # Besides the spikes, only the start of the level shift, until it makes up half the window
+    assert all(12_000 <= i < 12_016 for i in flagged - set(spikes))
+    assert not any(12_016 <= i for i in flagged - set(spikes))
+    assert find_anomalies(series, window=30, threshold=6)[1]["direction"] == "drop"
+
+    # The global score cannot see them against the trend
+    assert not set(spikes) & {a["index"] for a in find_anomalies(series, threshold=6)}
+
+
+def test_sequential_test_controls_false_positives_under_peeking():
+    rng = np.random.default_rng(11)
+    sims, looks, per_look, rate = 2000, 30, 200, 0.1
+    c_conv = rng.binomial(per_look, rate, (sims, looks)).cumsum(axis=1)
+    v_conv = rng.binomial(per_look, rate, (sims, looks)).cumsum(axis=1)
+    visitors = np.arange(1, looks + 1) * per_look
+
+    naive = two_proportion_ztest(c_conv, visitors, v_conv, visitors)["significant"].any(axis=1).mean()
+    sequential = sequential_test(c_conv, visitors, v_conv, visitors)
+    assert naive > 0.15                                  # peeking at a fixed-horizon test
+    assert sequential["significant"].mean() <= 0.05
+    assert (np.diff(sequential["p_values"], axis=1) <= 0).all()
+
+    v_better = rng.binomial(per_look, 0.13, looks).cumsum()
+    result = sequential_test(c_conv[0], visitors, v_better, visitors)
+    assert result["significant"] is True and 0 <= result["stopped_at"] < looks
+
+
+def test_bootstrap_intervals_cover_reference_values():
+    rng = np.random.default_rng(3)
+    sample = rng.normal(10, 2, 5000)
+    ci = bootstrap_ci(sample, seed=1)
+    half_width = 1.96 * sample.std(ddof=1) / np.sqrt(len(sample))  # normal-theory reference
+    assert ci["ci_low"] < 10 < ci["ci_high"]
+    assert (ci["ci_high"] - ci["ci_low"]) / 2 == pytest.approx(half_width, rel=0.1)
+    assert bootstrap_ci(sample, statistic=np.median, seed=1)["estimate"] == pytest.approx(np.median(sample))
+
+    lift = bootstrap_lift_ci(200, 1000, 250, 1000, seed=0)
+    assert lift["ci_low"] < 0.25 < lift["ci_high"] and lift["ci_low"] > 0
+
+
+def test_agent_significance_and_anomalies_use_stats_engine():
+    agent = DataAnalystAgent.__new__(DataAnalystAgent)  # skip LLM construction
+    stats = agent._calculate_significance({
+        "control_visitors": 1000, "control_conversions": 200,
+        "variant_visitors": 1000, "variant_conversions": 250,
+        "daily": [{"control_visitors": 100, "control_conversions": 20,
+                   "variant_visitors": 100, "variant_conversions": 25}] * 10,
+    })
+    assert stats["p_value"] == pytest.approx(0.007419, abs=1e-6) and stats["significant"] is True
+    assert stats["lift_ci_low"] < stats["lift"] < stats["lift_ci_high"]
+    assert stats["sequential"]["days"] == 10
+
+    # Previously: z > 2 against the mean, which a single large outlier masks
+    values = [10, 11, 10, 12, 11, 10, 40, 11, 10, 200]
+    assert [a["index"] for a in agent._find_anomalies(values)] == [6, 9]
+    assert agent._find_anomalies([1, 2]) == []
+
+
+@pytest.mark.asyncio
+async def test_ab_analysis_rejects_impossible_counts_instead_of_raising():
+    agent = DataAnalystAgent.__new__(DataAnalystAgent)
+    agent.llm = None
+    valid = {"control_visitors": 100, "control_conversions": 20, "variant_visitors": 100, "variant_conversions": 25}
+
+    for bad, message in (
+        ({"variant_conversions": 150}, "variant_conversions (150) exceeds variant_visitors (100)"),
+        ({"control_visitors": 0, "control_conversions": 0}, "control_visitors must be positive"),
+        ({"control_conversions": -1}, "control_conversions must be a non-negative whole number"),
+        ({"variant_visitors": "100"}, "variant_visitors must be a non-negative whole number"),
+        ({"daily": [dict(valid, control_conversions=120)]}, "daily[0].control_conversions (120) exceeds"),
+    ):
+        result = await agent.analyze_ab_test({**valid, **bad})
+        assert result["error"] is True and message in result["analysis"]
+        assert "stats" not in result
+
+    result = await agent.analyze_ab_test(valid)
+    assert result["analysis"] == "AI Service Unavailable" and "p_value" in result["stats"]
@@ -0,0 +1,262 @@
+"""
+Tests for the incremental Stripe revenue engine.
+
+Stripe responses are replayed from recorded fixtures in tests/fixtures/stripe
+through an httpx MockTransport that honours Stripe's list paging
+(limit / starting_after / ending_before).
+"""
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.integrations.base import IntegrationCredentials
+from app.integrations.stripe import StripeCursorExpired, StripeIntegration
+from app.models.revenue import StripeCustomerRecord, StripeEventLog, StripeRevenueState
+from app.services.stripe_revenue import RevenueLedger, StripeRevenueEngine
+
+FIXTURES = Path(__file__).parent / "fixtures" / "stripe"
+
+
+def _recorded(name: str) -> list:
+    return json.loads((FIXTURES / f"{name}.json").read_text())["data"]
+
+
+class StripeReplay:
+    """Serves recorded Stripe list responses and records every request path."""
+
+    def __init__(self):
+        self.lists = {name: _recorded(name) for name in ("events", "subscriptions", "customers", "charges")}
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.path.rsplit("/", 1)[-1]
+        self.calls.append(name)
+        items = self.lists[name]  # newest first, like Stripe
+        params = request.url.params
+        limit = int(params.get("limit", 10))
+
+        if "types[]" in params:
+            types = set(params.get_list("types[]"))
+            items = [i for i in items if i["type"] in types]
+
+        ids = [i["id"] for i in items]
+        if params.get("ending_before"):
+            cursor = params["ending_before"]
+            if cursor not in ids:
+                return httpx.Response(404, json={"error": {"message": f"No such event: '{cursor}'"}})
+            newer = items[:ids.index(cursor)]
+            page, has_more = newer[-limit:], len(newer) > limit
+        else:
+            start = ids.index(params["starting_after"]) + 1 if params.get("starting_after") else 0
+            page, has_more = items[start:start + limit], len(items) > start + limit
+
+        return httpx.Response(200, json={"object": "list", "data": page, "has_more": has_more})
+
+
+def _client(replay: StripeReplay) -> StripeIntegration:
+    client = StripeIntegration(credentials=IntegrationCredentials(api_key="sk_test_123"))
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(replay))
+    return client
+
+
+def _events_oldest_first() -> list:
+    return list(reversed(_recorded("events")))
+
+
+def test_event_replay_matches_recorded_end_state():
+    ledger = RevenueLedger()
+    for event in _events_oldest_first():
+        ledger.apply(event)
+
+    # sub_1: 3 × $50/mo; sub_2 ($120/yr) trialed, converted, then canceled
+    assert ledger.totals == {
+        "mrr_cents": 15000,
+        "active_subscriptions": 1,
+        "trialing_subscriptions": 0,
+        "customers_total": 2,
+    }
+    # Two partial refunds on ch_1 (cumulative 2500 then 4000) count once each
+    assert ledger.buckets["2026-08"] == {"gross_cents": 10000, "refunded_cents": 4000, "charge_count": 1}
+    assert ledger.buckets["2026-09"] == {"gross_cents": 12000, "refunded_cents": 0, "charge_count": 1}
+    assert ledger.subscriptions["sub_2"]["status"] == "canceled"
+
+
+def test_full_rebuild_agrees_with_event_replay():
+    replayed = RevenueLedger()
+    for event in _events_oldest_first():
+        replayed.apply(event)
+
+    rebuilt = RevenueLedger.from_snapshot(
+        _recorded("subscriptions"), _recorded("customers"), _recorded("charges")
+    )
+
+    assert rebuilt.totals == replayed.totals
+    assert rebuilt.buckets == replayed.buckets
+
+
+def test_out_of_order_subscription_event_is_ignored():
+    events = {e["id"]: e for e in _events_oldest_first()}
+    ledger = RevenueLedger()
+    for event_id in ("evt_002", "evt_010", "evt_002"):
+        ledger.apply(events[event_id])
+
+    assert ledger.totals["mrr_cents"] == 15000
+    assert ledger.totals["active_subscriptions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_list_events_since_pages_forward_oldest_first():
+    replay = StripeReplay()
+    client = _client(replay)
+
+    events = await client.list_events_since("evt_008", max_events=4)
+    await client.close()
+
+    assert [e["id"] for e in events] == ["evt_009", "evt_010", "evt_011", "evt_012"]
+    assert replay.calls == ["events"]
+
+
+@pytest.mark.asyncio
+async def test_list_events_since_raises_on_expired_cursor():
+    client = _client(StripeReplay())
+    with pytest.raises(StripeCursorExpired):
+        await client.list_events_since("evt_gone")
+    await client.close()
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_only_reads_new_events():
+    replay = StripeReplay()
+    engine = StripeRevenueEngine()
+    integration = MagicMock(startup_id=uuid4())
+    state = StripeRevenueState(startup_id=integration.startup_id, event_cursor="evt_010")
+    db = MagicMock()
+    db.get = AsyncMock(return_value=state)
+
+    with patch.object(engine, "_client", return_value=_client(replay)), \
+         patch.object(engine, "apply_events", new_callable=AsyncMock, return_value=3) as mock_apply:
+        result = await engine.sync(db, integration)
+
+    assert replay.calls == ["events"]
+    assert [e["id"] for e in mock_apply.await_args.args[2]] == ["evt_011", "evt_012", "evt_013"]
+    assert state.event_cursor == "evt_013"
+    assert result == {"mode": "incremental", "events": 3, "applied": 3}
+
+
+@pytest.mark.asyncio
+async def test_expired_cursor_falls_back_to_rebuild():
+    engine = StripeRevenueEngine()
+    integration = MagicMock(startup_id=uuid4())
+    db = MagicMock()
+    db.get = AsyncMock(return_value=StripeRevenueState(startup_id=integration.startup_id, event_cursor="evt_gone"))
+
+    with patch.object(engine, "_client", return_value=_client(StripeReplay())), \
+         patch.object(engine, "rebuild", new_callable=AsyncMock, return_value={"mode": "rebuild"}) as mock_rebuild:
+        result = await engine.sync(db, integration)
+
+    mock_rebuild.assert_awaited_once()
+    assert result == {"mode": "rebuild"}
+
+
+@pytest.mark.asyncio
+async def test_sync_without_a_cursor_rebuilds_instead_of_skipping_to_the_newest_event():
+    replay = StripeReplay()
+    engine = StripeRevenueEngine()
+    integration = MagicMock(startup_id=uuid4())
+    db = MagicMock()
+    db.get = AsyncMock(return_value=StripeRevenueState(startup_id=integration.startup_id, event_cursor=None))
+
+    with patch.object(engine, "_client", return_value=_client(replay)), \
+         patch.object(engine, "rebuild", new_callable=AsyncMock, return_value={"mode": "rebuild"}) as mock_rebuild:
+        result = await engine.sync(db, integration)
+
+    mock_rebuild.assert_awaited_once()
+    assert result == {"mode": "rebuild"} and replay.calls == []
+
+
+@pytest.mark.asyncio
+async def test_rebuild_saves_the_account_id_and_clears_the_event_log():
+    class AccountReplay(StripeReplay):
+        def __call__(self, request):
+            if request.url.path.endswith("/account"):
+                return httpx.Response(200, json={"id": "acct_123", "object": "account"})
+            return super().__call__(request)
+
+    engine = StripeRevenueEngine()
+    integration = MagicMock(id=uuid4(), startup_id=uuid4(), config={"mode": "live"})  # detached, as sync passes it
+    no_state = MagicMock()
+    no_state.scalar_one_or_none.return_value = None
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=no_state)
+    db.flush = AsyncMock()
+
+    result = await engine.rebuild(db, integration, client=_client(AccountReplay()))
+
+    statements = [str(c.args[0]) for c in db.execute.await_args_list]
+    assert any(sql.startswith("DELETE FROM stripe_event_log") for sql in statements)
+    update = next(c.args[0] for c in db.execute.await_args_list if str(c.args[0]).startswith("UPDATE integrations"))
+    assert update.compile().params["config"] == {"mode": "live", "account_id": "acct_123"}
+    assert result["mode"] == "rebuild"
+
+
+@pytest.mark.asyncio
+async def test_apply_events_skips_already_logged_events():
+    engine = StripeRevenueEngine()
+    startup_id = uuid4()
+    events = {e["id"]: e for e in _events_oldest_first()}
+    state = StripeRevenueState(
+        startup_id=startup_id, mrr_cents=15000, active_subscriptions=1,
+        trialing_subscriptions=0, customers_total=3,
+    )
+    customer = StripeCustomerRecord(startup_id=startup_id, customer_id="cus_C", deleted=False)
+
+    locked = MagicMock()
+    locked.scalar_one_or_none.return_value = state
+    seen = MagicMock()
+    seen.scalars.return_value.all.return_value = ["evt_011"]
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[locked, seen])
+    db.flush = AsyncMock()
+
+    with patch.object(engine, "_load_touched", new_callable=AsyncMock, return_value=({}, {"cus_C": customer}, {})):
+        applied = await engine.apply_events(db, startup_id, [events["evt_011"], events["evt_012"]])
+
+    assert applied == 1
+    # The state row is read FOR UPDATE so concurrent deliveries cannot lose updates
+    assert "FOR UPDATE" in str(db.execute.await_args_list[0].args[0])
+    assert state.customers_total == 2
+    assert customer.deleted is True
+    logged = [c.args[0] for c in db.add.call_args_list if isinstance(c.args[0], StripeEventLog)]
+    assert [row.event_id for row in logged] == ["evt_012"]
+
+
+@pytest.mark.asyncio
+async def test_webhook_events_route_to_the_owning_startup_only():
+    engine = StripeRevenueEngine()
+    owner = uuid4()
+
+    def db_answering(*owners):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = list(owners)
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        return db
+
+    invoice = {"id": "evt_1", "type": "invoice.payment_failed", "data": {"object": {"object": "invoice", "customer": "cus_A"}}}
+    db = db_answering(owner)
+    assert await engine.resolve_startup(db, invoice) == owner
+    assert "stripe_customers.customer_id" in str(db.execute.await_args.args[0])
+
+    connect = {**invoice, "account": "acct_123"}
+    db = db_answering(owner)
+    assert await engine.resolve_startup(db, connect) == owner
+    assert "integrations" in str(db.execute.await_args.args[0])
+
+    assert await engine.resolve_startup(db_answering(), invoice) is None              # unknown customer
+    assert await engine.resolve_startup(db_answering(owner, uuid4()), invoice) is None  # ambiguous
+    assert await engine.resolve_startup(db_answering(owner), {"id": "evt_2", "data": {"object": {}}}) is None
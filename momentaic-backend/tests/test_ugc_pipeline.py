@@ -0,0 +1,129 @@
+"""
+Tests for the UGC pipeline stage graph (concurrency, timing, per-stage cache)
+"""
+
+import asyncio
+import json
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from app.services import ugc_pipeline as ugc_module
+from app.services.media_jobs import media_job_service
+from app.services.ugc_pipeline import UGCPipeline
+
+
+def _character():
+    return SimpleNamespace(
+        id=uuid4(), startup_id=uuid4(), name="Mika", persona={},
+        visual_identity={}, voice_identity={}, character_dna="",
+    )
+
+
+class FakeTracker:
+    """media_job_service.run_tracked stand-in: runs the provider call inline."""
+
+    def __init__(self):
+        self.jobs = []
+
+    async def run_tracked(self, provider, job_type, runner, **kwargs):
+        self.jobs.append((job_type, await runner(), kwargs["callback_context"]["field"]))
+        return SimpleNamespace(id=f"{job_type}-job")
+
+
+def _slow(result, delay=0.1):
+    async def _run(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return result
+    return AsyncMock(side_effect=_run)
+
+
+@pytest.fixture
+def pipeline():
+    with patch("app.services.ugc_pipeline.get_llm"):
+        instance = UGCPipeline()
+    instance._generate_script = _slow("[HOOK] hi [BODY] body [CTA] follow")
+    instance._generate_caption = _slow({"caption": "cap", "hashtags": ["#ai"], "hook": "h", "cta": ""})
+    instance._generate_character_image = _slow("https://cdn/img.png")
+    instance._generate_video = _slow("job-1")
+    instance._generate_voice = _slow("https://cdn/voice.mp3")
+    instance._predict_virality = _slow(72.5)
+    return instance
+
+
+@pytest.fixture
+def tracker():
+    fake = FakeTracker()
+    with patch.object(media_job_service, "run_tracked", side_effect=fake.run_tracked):
+        yield fake
+
+
+@pytest.fixture
+def memory_cache():
+    store = {}
+
+    async def fake_get(key):
+        return json.loads(store[key]) if key in store else ugc_module._CACHE_MISS
+
+    async def fake_set(key, value):
+        store[key] = json.dumps(value)
+
+    with patch.object(ugc_module, "_cache_get", side_effect=fake_get), \
+         patch.object(ugc_module, "_cache_set", side_effect=fake_set):
+        yield store
+
+
+@pytest.mark.asyncio
+async def test_stages_after_script_run_concurrently(pipeline, memory_cache, tracker):
+    started = time.perf_counter()
+    result = await pipeline.generate_ugc_content(_character(), platform="tiktok")
+    elapsed = time.perf_counter() - started
+
+    # script (0.1s) + the slowest fan-out stage (0.1s), not 6 × 0.1s
+    assert elapsed < 0.4
+
+    steps = {step["stage"]: step for step in result["pipeline"]["steps"]}
+    assert set(steps) == {"script", "caption", "image", "video", "voice", "virality"}
+    assert steps["caption"]["started_ms"] >= steps["script"]["duration_ms"]
+    assert all("duration_ms" in step for step in steps.values())
+    assert steps["video"]["job_id"] == "job-1"
+    assert steps["image"]["job_id"] == "character_image-job"
+    assert result["content_data"]["pending_media_jobs"] == ["character_image-job", "voiceover-job", "job-1"]
+    # Imagen and TTS calls run as tracked media jobs feeding the content fields
+    assert tracker.jobs == [("character_image", "https://cdn/img.png", "thumbnail_url"),
+                            ("voiceover", "https://cdn/voice.mp3", "voice_url")]
+    assert result["virality_score"] == 72.5
+
+
+@pytest.mark.asyncio
+async def test_rerender_with_same_script_hits_stage_cache(pipeline, memory_cache, tracker):
+    character = _character()
+    await pipeline.generate_ugc_content(character, script_override="same script")
+    result = await pipeline.generate_ugc_content(character, script_override="same script")
+
+    assert pipeline._generate_caption.await_count == 1
+    assert pipeline._generate_character_image.await_count == 1
+    # Video renders are durable media jobs and are never replayed from cache
+    assert pipeline._generate_video.await_count == 2
+
+    steps = {step["stage"]: step for step in result["pipeline"]["steps"]}
+    assert steps["caption"]["cached"] is True
+    assert steps["caption"]["cost_usd"] == 0
+    assert steps["video"]["cached"] is False
+    # A rendered image is reused without starting another tracked job
+    assert steps["image"]["cached"] is True and steps["image"]["cost_usd"] == 0
+    assert result["content_data"]["thumbnail_url"] == "https://cdn/img.png"
+    assert result["content_data"]["pending_media_jobs"] == ["job-1"]
+    assert len(tracker.jobs) == 2
+
+
+@pytest.mark.asyncio
+async def test_text_platform_skips_media_stages(pipeline, memory_cache, tracker):
+    result = await pipeline.generate_ugc_content(_character(), platform="twitter")
+
+    stages = {step["stage"] for step in result["pipeline"]["steps"]}
+    assert "video" not in stages and "voice" not in stages
+    pipeline._generate_video.assert_not_awaited()
+    assert result["content_data"]["pending_media_jobs"] == ["character_image-job"]
@@ -0,0 +1,122 @@
+"""
+Tests for concurrent, memoized WarRoomEngine debates
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.core.metrics import metrics
+from app.services import war_room as war_room_module
+from app.services.war_room import DebateConclusion, WarRoomEngine
+from tests.fake_redis import FakeRedis
+
+CALL_SECONDS = 0.1
+
+
+class FakeDebateLLM:
+    """Chat model stand-in: every call takes CALL_SECONDS and reports token usage."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, messages):
+        self.prompts.append(messages)
+        await asyncio.sleep(CALL_SECONDS)
+        speaker = "YC" if "Y Combinator" in messages[0].content else "Musk"
+        return AIMessage(content=f"{speaker} argument {len(self.prompts)}",
+                         usage_metadata={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+
+    def with_structured_output(self, schema, include_raw=False):
+        llm = self
+
+        class Structured:
+            async def ainvoke(self, messages):
+                llm.prompts.append(messages)
+                await asyncio.sleep(CALL_SECONDS)
+                raw = AIMessage(content="", usage_metadata={"input_tokens": 300, "output_tokens": 50, "total_tokens": 350})
+                parsed = {"yc_stance": "focus", "musk_stance": "delete", "unified_recommendation": "Ship in 96h to 10 users"}
+                return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        return Structured()
+
+
+@pytest.mark.asyncio
+async def test_independent_openings_run_concurrently_and_record_rounds():
+    metrics.reset()
+    llm = FakeDebateLLM()
+    engine = WarRoomEngine(llm=llm)
+
+    with patch.object(war_room_module, "redis_client", FakeRedis()):
+        started = time.perf_counter()
+        conclusion = await engine.trigger_debate("Churn spike", {"mrr": 12000})
+        elapsed = time.perf_counter() - started
+
+    assert conclusion == DebateConclusion(yc_stance="focus", musk_stance="delete",
+                                          unified_recommendation="Ship in 96h to 10 users")
+    assert len(llm.prompts) == 3 and elapsed < 2.5 * CALL_SECONDS    # sequential: 3 calls back to back
+    musk_prompt = llm.prompts[1][1].content
+    assert "The YC Partner argued" not in musk_prompt                 # openings are independent
+    assert metrics.histogram("war_room_round_seconds", round="opening").count == 1
+    assert metrics.counter("war_room_tokens_total", round="opening", kind="input") == 200
+    assert metrics.counter("war_room_tokens_total", round="synthesis", kind="output") == 50
+
+
+@pytest.mark.asyncio
+async def test_rebuttal_round_and_sequential_mode():
+    llm = FakeDebateLLM()
+    engine = WarRoomEngine(llm=llm)
+    with patch.object(war_room_module, "redis_client", FakeRedis()):
+        await engine.trigger_debate("Pricing", {"plan": "pro"}, rebuttal=True)
+        assert len(llm.prompts) == 5
+        yc_rebuttal, musk_rebuttal, synthesis = llm.prompts[2], llm.prompts[3], llm.prompts[4]
+        assert "Elon Musk argued:\nMusk argument" in yc_rebuttal[-1].content
+        assert "The YC Partner argued:\nYC argument" in musk_rebuttal[-1].content
+        assert "Rebuttal:" in synthesis[1].content
+
+        llm.prompts.clear()
+        await engine.trigger_debate("Pricing", {"plan": "pro"}, mode="sequential")
+        assert "The YC Partner argued:\nYC argument 1" in llm.prompts[1][1].content
+        with pytest.raises(ValueError):
+            await engine.trigger_debate("Pricing", {}, mode="freeform")
+
+
+@pytest.mark.asyncio
+async def test_repeated_escalations_reuse_the_conclusion():
+    metrics.reset()
+    llm = FakeDebateLLM()
+    fake_redis = FakeRedis()
+    with patch.object(war_room_module, "redis_client", fake_redis):
+        first, joined = await asyncio.gather(
+            WarRoomEngine(llm=llm).trigger_debate("Churn spike", {"mrr": 12000, "churn": 9}),
+            WarRoomEngine(llm=llm).trigger_debate("Churn spike", {"churn": 9, "mrr": 12000}),
+        )
+        assert first == joined and len(llm.prompts) == 3               # one debate for both escalations
+
+        again = await WarRoomEngine(llm=llm).trigger_debate("Churn spike", {"mrr": 12000, "churn": 9})
+        assert again == first and len(llm.prompts) == 3                # served from Redis
+        await WarRoomEngine(llm=llm).trigger_debate("Churn spike", {"mrr": 12000, "churn": 12})
+        assert len(llm.prompts) == 6                                   # new context, new debate
+
+    key = next(k for k in fake_redis.data if k.startswith("war_room_debate:"))
+    assert fake_redis.ttls[key] == war_room_module.DEBATE_CACHE_TTL_SECONDS
+    assert metrics.counter("war_room_cache_total", result="hit") == 1
+    assert metrics.counter("war_room_cache_total", result="joined") == 1
+
+
+@pytest.mark.asyncio
+async def test_joiner_reruns_the_debate_when_its_owner_is_cancelled():
+    llm = FakeDebateLLM()
+    with patch.object(war_room_module, "redis_client", FakeRedis()):
+        owner = asyncio.create_task(WarRoomEngine(llm=llm).trigger_debate("Runway", {"cash": 1}))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(WarRoomEngine(llm=llm).trigger_debate("Runway", {"cash": 1}))
+        await asyncio.sleep(CALL_SECONDS / 2)
+        owner.cancel()
+
+        conclusion = await joiner                                      # not CancelledError
+        assert owner.cancelled() and isinstance(conclusion, DebateConclusion)
+        assert not WarRoomEngine._in_flight